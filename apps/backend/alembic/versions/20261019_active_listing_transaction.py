@@ -0,0 +1,48 @@
+"""Allow one open transaction per listing instead of one ever
+
+transactions.listing_id was globally unique, so a refunded or cancelled
+listing could never be bought again. It is replaced by a partial unique
+index over open transactions, which also backs the atomic reservation in
+initiate_purchase against concurrent buyers.
+
+Revision ID: active_listing_txn_001
+Revises: transaction_timestamptz_001
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'active_listing_txn_001'
+down_revision: Union[str, None] = 'transaction_timestamptz_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATES = "state NOT IN ('completed', 'refunded', 'cancelled')"
+
+
+def upgrade() -> None:
+    # Build the replacement first so there is no window without a guard
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_transactions_active_listing',
+            'transactions',
+            ['listing_id'],
+            unique=True,
+            postgresql_where=sa.text(OPEN_STATES),
+            postgresql_concurrently=True,
+        )
+
+    op.execute("ALTER TABLE transactions DROP CONSTRAINT IF EXISTS transactions_listing_id_key;")
+    op.drop_index('ix_transactions_listing_id', table_name='transactions')
+    op.create_index('ix_transactions_listing_id', 'transactions', ['listing_id'], unique=False)
+
+
+def downgrade() -> None:
+    # Fails if a listing has been bought more than once since the upgrade
+    op.drop_index('ix_transactions_listing_id', table_name='transactions')
+    op.create_index('ix_transactions_listing_id', 'transactions', ['listing_id'], unique=True)
+    op.drop_index('uq_transactions_active_listing', table_name='transactions')
@@ -0,0 +1,55 @@
+"""Add contract rendering jobs
+
+Revision ID: contract_jobs_001
+Revises: payout_engine_001
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'contract_jobs_001'
+down_revision: Union[str, None] = 'payout_engine_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    job_status = postgresql.ENUM('queued', 'running', 'succeeded', 'failed', name='contractjobstatus')
+    job_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'contract_render_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.String(length=36), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by_id', sa.Integer(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='contractjobstatus', create_type=False), nullable=False, server_default='queued'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('render_ms', sa.Integer(), nullable=True),
+        sa.Column('contract_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['contract_id'], ['contracts.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_id')
+    )
+    op.create_index(op.f('ix_contract_render_jobs_job_id'), 'contract_render_jobs', ['job_id'], unique=False)
+    op.create_index(op.f('ix_contract_render_jobs_transaction_id'), 'contract_render_jobs', ['transaction_id'], unique=False)
+    op.create_index(op.f('ix_contract_render_jobs_status'), 'contract_render_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contract_render_jobs_status'), table_name='contract_render_jobs')
+    op.drop_index(op.f('ix_contract_render_jobs_transaction_id'), table_name='contract_render_jobs')
+    op.drop_index(op.f('ix_contract_render_jobs_job_id'), table_name='contract_render_jobs')
+    op.drop_table('contract_render_jobs')
+    postgresql.ENUM(name='contractjobstatus').drop(op.get_bind(), checkfirst=True)
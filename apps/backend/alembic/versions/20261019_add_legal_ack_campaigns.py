@@ -0,0 +1,82 @@
+"""Add re-acknowledgment campaigns and pending acknowledgment markers
+
+Revision ID: legal_campaigns_001
+Revises: legal_html_001
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'legal_campaigns_001'
+down_revision: Union[str, None] = 'legal_html_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    campaign_status = postgresql.ENUM('queued', 'running', 'completed', 'superseded', 'failed', name='ackcampaignstatus')
+    campaign_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'legal_ack_campaigns',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='ackcampaignstatus', create_type=False), nullable=False, server_default='queued'),
+        sa.Column('cursor_user_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total_users', sa.Integer(), nullable=True),
+        sa.Column('marked_users', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('notified_users', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('notify_failures', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['legal_documents.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_legal_ack_campaigns_document_id'), 'legal_ack_campaigns', ['document_id'], unique=False)
+    op.create_index(op.f('ix_legal_ack_campaigns_status'), 'legal_ack_campaigns', ['status'], unique=False)
+
+    op.create_table(
+        'pending_legal_acknowledgments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=False),
+        sa.Column('campaign_id', sa.Integer(), nullable=True),
+        sa.Column('notified_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('acknowledged_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['document_id'], ['legal_documents.id'], ),
+        sa.ForeignKeyConstraint(['campaign_id'], ['legal_ack_campaigns.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'document_id', name='uq_pending_ack_user_document')
+    )
+    op.create_index(op.f('ix_pending_legal_acknowledgments_user_id'), 'pending_legal_acknowledgments', ['user_id'], unique=False)
+    op.create_index(op.f('ix_pending_legal_acknowledgments_document_id'), 'pending_legal_acknowledgments', ['document_id'], unique=False)
+    # Outstanding markers per document (progress reporting)
+    op.create_index(
+        'ix_pending_legal_ack_outstanding',
+        'pending_legal_acknowledgments',
+        ['document_id'],
+        postgresql_where=sa.text('acknowledged_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pending_legal_ack_outstanding', table_name='pending_legal_acknowledgments')
+    op.drop_index(op.f('ix_pending_legal_acknowledgments_document_id'), table_name='pending_legal_acknowledgments')
+    op.drop_index(op.f('ix_pending_legal_acknowledgments_user_id'), table_name='pending_legal_acknowledgments')
+    op.drop_table('pending_legal_acknowledgments')
+    op.drop_index(op.f('ix_legal_ack_campaigns_status'), table_name='legal_ack_campaigns')
+    op.drop_index(op.f('ix_legal_ack_campaigns_document_id'), table_name='legal_ack_campaigns')
+    op.drop_table('legal_ack_campaigns')
+    postgresql.ENUM(name='ackcampaignstatus').drop(op.get_bind(), checkfirst=True)
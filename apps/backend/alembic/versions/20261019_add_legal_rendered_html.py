@@ -0,0 +1,28 @@
+"""Store pre-rendered HTML and a content hash on legal documents
+
+Revision ID: legal_html_001
+Revises: storage_keys_001
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'legal_html_001'
+down_revision: Union[str, None] = 'storage_keys_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('legal_documents', sa.Column('content_html', sa.Text(), nullable=True))
+    op.add_column('legal_documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    # Existing rows are rendered lazily on first public read
+
+
+def downgrade() -> None:
+    op.drop_column('legal_documents', 'content_hash')
+    op.drop_column('legal_documents', 'content_html')
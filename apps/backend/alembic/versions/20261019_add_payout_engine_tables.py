@@ -0,0 +1,90 @@
+"""Add seller payout accounts and payout transfer tracking
+
+Revision ID: payout_engine_001
+Revises: ksh_only_001
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'payout_engine_001'
+down_revision: Union[str, None] = 'ksh_only_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    payout_status = postgresql.ENUM(
+        'queued', 'pending', 'success', 'failed', 'reversed',
+        name='payouttransferstatus'
+    )
+    payout_status.create(op.get_bind(), checkfirst=True)
+
+    # Create seller_payout_accounts table
+    op.create_table(
+        'seller_payout_accounts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('recipient_type', sa.String(length=50), nullable=False, server_default='mobile_money'),
+        sa.Column('account_name', sa.String(length=255), nullable=False),
+        sa.Column('account_number', sa.String(length=50), nullable=False),
+        sa.Column('bank_code', sa.String(length=50), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False, server_default='KES'),
+        sa.Column('paystack_recipient_code', sa.String(length=100), nullable=True),
+        sa.Column('recipient_created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('seller_id')
+    )
+    op.create_index(op.f('ix_seller_payout_accounts_seller_id'), 'seller_payout_accounts', ['seller_id'], unique=False)
+
+    # Create payout_transfers table
+    op.create_table(
+        'payout_transfers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('reference', sa.String(length=100), nullable=False),
+        sa.Column('transfer_code', sa.String(length=100), nullable=True),
+        sa.Column('recipient_code', sa.String(length=100), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False, server_default='KES'),
+        sa.Column('status', postgresql.ENUM(name='payouttransferstatus', create_type=False), nullable=False, server_default='queued'),
+        sa.Column('batch_id', sa.String(length=64), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failure_reason', sa.Text(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transaction_id'),
+        sa.UniqueConstraint('reference')
+    )
+    op.create_index(op.f('ix_payout_transfers_transaction_id'), 'payout_transfers', ['transaction_id'], unique=False)
+    op.create_index(op.f('ix_payout_transfers_seller_id'), 'payout_transfers', ['seller_id'], unique=False)
+    op.create_index(op.f('ix_payout_transfers_reference'), 'payout_transfers', ['reference'], unique=False)
+    op.create_index(op.f('ix_payout_transfers_transfer_code'), 'payout_transfers', ['transfer_code'], unique=False)
+    op.create_index(op.f('ix_payout_transfers_status'), 'payout_transfers', ['status'], unique=False)
+    op.create_index(op.f('ix_payout_transfers_batch_id'), 'payout_transfers', ['batch_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_payout_transfers_batch_id'), table_name='payout_transfers')
+    op.drop_index(op.f('ix_payout_transfers_status'), table_name='payout_transfers')
+    op.drop_index(op.f('ix_payout_transfers_transfer_code'), table_name='payout_transfers')
+    op.drop_index(op.f('ix_payout_transfers_reference'), table_name='payout_transfers')
+    op.drop_index(op.f('ix_payout_transfers_seller_id'), table_name='payout_transfers')
+    op.drop_index(op.f('ix_payout_transfers_transaction_id'), table_name='payout_transfers')
+    op.drop_table('payout_transfers')
+    op.drop_index(op.f('ix_seller_payout_accounts_seller_id'), table_name='seller_payout_accounts')
+    op.drop_table('seller_payout_accounts')
+    postgresql.ENUM(name='payouttransferstatus').drop(op.get_bind(), checkfirst=True)
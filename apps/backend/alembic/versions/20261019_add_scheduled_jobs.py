@@ -0,0 +1,87 @@
+"""Add durable deadline jobs for the deadline scheduler
+
+Existing transactions already waiting in TEMPORARY_ACCESS_GRANTED or
+VERIFICATION_WINDOW get a job for their current deadline, so windows that
+expired before the scheduler existed fire on its first run.
+
+Revision ID: scheduled_jobs_001
+Revises: signature_keys_001
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'scheduled_jobs_001'
+down_revision: Union[str, None] = 'signature_keys_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    job_kind = postgresql.ENUM(
+        'temporary_access_expiry', 'verification_deadline',
+        name='scheduledjobkind'
+    )
+    job_kind.create(op.get_bind(), checkfirst=True)
+    job_status = postgresql.ENUM(
+        'pending', 'done', 'cancelled', 'failed',
+        name='scheduledjobstatus'
+    )
+    job_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'scheduled_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', postgresql.ENUM(name='scheduledjobkind', create_type=False), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='scheduledjobstatus', create_type=False), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('fired_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('result', sa.String(length=50), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('kind', 'transaction_id', name='uq_scheduled_job_kind_transaction')
+    )
+    op.create_index(op.f('ix_scheduled_jobs_transaction_id'), 'scheduled_jobs', ['transaction_id'], unique=False)
+    op.create_index(
+        'ix_scheduled_jobs_pending_due',
+        'scheduled_jobs',
+        ['due_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+    # Backfill deadlines of transactions already in a time-boxed step
+    op.execute("""
+        INSERT INTO scheduled_jobs (kind, transaction_id, due_at, status)
+        SELECT 'temporary_access_expiry', t.id, ta.access_expires_at, 'pending'
+        FROM transactions t
+        JOIN temporary_accesses ta ON ta.transaction_id = t.id
+        WHERE t.state = 'temporary_access_granted'
+        ON CONFLICT (kind, transaction_id) DO NOTHING;
+    """)
+    op.execute("""
+        INSERT INTO scheduled_jobs (kind, transaction_id, due_at, status)
+        SELECT 'verification_deadline', t.id, t.verification_deadline::timestamp AT TIME ZONE 'UTC', 'pending'
+        FROM transactions t
+        WHERE t.state = 'verification_window'
+          AND t.verification_deadline IS NOT NULL
+        ON CONFLICT (kind, transaction_id) DO NOTHING;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scheduled_jobs_pending_due', table_name='scheduled_jobs')
+    op.drop_index(op.f('ix_scheduled_jobs_transaction_id'), table_name='scheduled_jobs')
+    op.drop_table('scheduled_jobs')
+    postgresql.ENUM(name='scheduledjobstatus').drop(op.get_bind(), checkfirst=True)
+    postgresql.ENUM(name='scheduledjobkind').drop(op.get_bind(), checkfirst=True)
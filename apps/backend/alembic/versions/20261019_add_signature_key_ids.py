@@ -0,0 +1,28 @@
+"""Record which key produced each acknowledgment / agreement signature
+
+Revision ID: signature_keys_001
+Revises: legal_ack_unique_001
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'signature_keys_001'
+down_revision: Union[str, None] = 'legal_ack_unique_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL marks the earlier unkeyed hashes, reported as legacy by the verifier
+    op.add_column('user_legal_acknowledgments', sa.Column('signature_key_id', sa.String(length=16), nullable=True))
+    op.add_column('ownership_agreements', sa.Column('signature_key_id', sa.String(length=16), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('ownership_agreements', 'signature_key_id')
+    op.drop_column('user_legal_acknowledgments', 'signature_key_id')
@@ -0,0 +1,29 @@
+"""Add content-addressed storage keys to contracts and listing proofs
+
+Revision ID: storage_keys_001
+Revises: contract_jobs_001
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'storage_keys_001'
+down_revision: Union[str, None] = 'contract_jobs_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contracts', sa.Column('pdf_storage_key', sa.String(length=64), nullable=True))
+    op.add_column('listing_proofs', sa.Column('storage_key', sa.String(length=64), nullable=True))
+    op.create_index('ix_listing_proofs_storage_key', 'listing_proofs', ['storage_key'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_listing_proofs_storage_key', table_name='listing_proofs')
+    op.drop_column('listing_proofs', 'storage_key')
+    op.drop_column('contracts', 'pdf_storage_key')
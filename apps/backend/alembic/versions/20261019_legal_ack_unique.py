@@ -0,0 +1,59 @@
+"""Guarantee one acknowledgment per user and document
+
+The batch acknowledgment endpoint upserts with
+ON CONFLICT (user_id, document_id), which needs a unique index on exactly
+those columns. The original migration only declared an unnamed inline
+UNIQUE when it created the table itself (CREATE TABLE IF NOT EXISTS), so
+databases whose table predates it may have none and may hold duplicates.
+
+Revision ID: legal_ack_unique_001
+Revises: legal_campaigns_001
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'legal_ack_unique_001'
+down_revision: Union[str, None] = 'legal_campaigns_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the latest acknowledgment of each (user, document) pair
+    op.execute("""
+        DELETE FROM user_legal_acknowledgments a
+        USING user_legal_acknowledgments b
+        WHERE a.user_id = b.user_id
+          AND a.document_id = b.document_id
+          AND (a.acknowledged_at, a.id) < (b.acknowledged_at, b.id);
+    """)
+
+    # Replace the auto-named inline constraint with the name the model declares
+    op.execute("""
+        ALTER TABLE user_legal_acknowledgments
+        DROP CONSTRAINT IF EXISTS user_legal_acknowledgments_user_id_document_id_key;
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_constraint WHERE conname = 'uq_user_document_acknowledgment'
+            ) THEN
+                ALTER TABLE user_legal_acknowledgments
+                ADD CONSTRAINT uq_user_document_acknowledgment UNIQUE (user_id, document_id);
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_document_acknowledgment', 'user_legal_acknowledgments', type_='unique')
+    op.create_unique_constraint(
+        'user_legal_acknowledgments_user_id_document_id_key',
+        'user_legal_acknowledgments',
+        ['user_id', 'document_id'],
+    )
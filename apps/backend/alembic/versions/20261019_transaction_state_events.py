@@ -0,0 +1,57 @@
+"""Add transaction state history
+
+Every state change made through app/core/state_machine.py appends a row.
+Existing transactions get one row recording their current state, so every
+transaction has a history from the upgrade on.
+
+Revision ID: transaction_events_001
+Revises: active_listing_txn_001
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'transaction_events_001'
+down_revision: Union[str, None] = 'active_listing_txn_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'transaction_state_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('from_state', postgresql.ENUM(name='transactionstate', create_type=False), nullable=True),
+        sa.Column('to_state', postgresql.ENUM(name='transactionstate', create_type=False), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=True),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id'], ),
+        sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_transaction_state_events_transaction_id',
+        'transaction_state_events',
+        ['transaction_id', 'id'],
+        unique=False
+    )
+
+    op.execute("""
+        INSERT INTO transaction_state_events (transaction_id, from_state, to_state, reason, created_at)
+        SELECT id, NULL, state, 'State at history start', COALESCE(updated_at, created_at)
+        FROM transactions
+        ORDER BY id;
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transaction_state_events_transaction_id', table_name='transaction_state_events')
+    op.drop_table('transaction_state_events')
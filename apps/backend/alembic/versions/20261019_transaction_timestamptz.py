@@ -0,0 +1,160 @@
+"""Store transaction step timestamps as timestamptz
+
+The step columns were String(50) ISO strings, so range queries ("deadlines
+in the next hour", "completed this month") could not use an index. The
+conversion is done online instead of with ALTER COLUMN ... TYPE, which would
+rewrite the table under an ACCESS EXCLUSIVE lock:
+
+1. Add a shadow timestamptz column per step column and a trigger that keeps
+   it in sync with writes from the running (string-writing) application.
+2. Backfill the shadow columns in id-range batches, one commit per batch.
+3. In one short transaction, drop the string columns and rename the shadow
+   columns into place (catalog-only changes).
+4. Build the partial deadline indexes CONCURRENTLY.
+
+Strings without an offset were written with datetime.utcnow() and are read
+as UTC; unparseable values become NULL.
+
+Revision ID: transaction_timestamptz_001
+Revises: scheduled_jobs_001
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'transaction_timestamptz_001'
+down_revision: Union[str, None] = 'scheduled_jobs_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STEP_COLUMNS = (
+    'purchase_initiated_at',
+    'payment_pending_at',
+    'funds_held_at',
+    'temporary_access_granted_at',
+    'verification_window_started_at',
+    'verification_deadline',
+    'account_verified_at',
+    'ownership_agreement_pending_at',
+    'ownership_agreement_signed_at',
+    'funds_release_pending_at',
+    'funds_released_at',
+    'completed_at',
+    'refunded_at',
+    'cancelled_at',
+)
+
+BATCH_SIZE = 5000
+
+OPEN_STATES = "state NOT IN ('completed', 'refunded', 'cancelled')"
+
+
+def _backfill(target_expression: str, target_suffix: str) -> None:
+    """Copy every step column into its shadow column, BATCH_SIZE ids per commit"""
+    bind = op.get_bind()
+    bounds = bind.execute(sa.text("SELECT min(id), max(id) FROM transactions")).first()
+    if bounds[0] is None:
+        return
+    assignments = ", ".join(
+        f"{column}{target_suffix} = {target_expression.format(column=column)}" for column in STEP_COLUMNS
+    )
+    with op.get_context().autocommit_block():
+        for low in range(bounds[0], bounds[1] + 1, BATCH_SIZE):
+            bind.execute(
+                sa.text(f"UPDATE transactions SET {assignments} WHERE id >= :low AND id < :high"),
+                {"low": low, "high": low + BATCH_SIZE},
+            )
+
+
+def _swap_columns(old_suffix: str, new_suffix: str) -> None:
+    """Drop the originals and move the shadow columns into their place"""
+    op.execute("LOCK TABLE transactions IN ACCESS EXCLUSIVE MODE;")
+    op.execute("DROP TRIGGER IF EXISTS transactions_step_timestamps_sync ON transactions;")
+    op.execute("DROP FUNCTION IF EXISTS transactions_step_timestamps_sync();")
+    for column in STEP_COLUMNS:
+        op.execute(f"ALTER TABLE transactions DROP COLUMN {column}{old_suffix};")
+        op.execute(f"ALTER TABLE transactions RENAME COLUMN {column}{new_suffix} TO {column};")
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION escrow_parse_timestamptz(value text) RETURNS timestamptz AS $$
+        BEGIN
+            IF value IS NULL OR btrim(value) = '' THEN
+                RETURN NULL;
+            END IF;
+            IF value ~ '(Z|[+-][0-9]{2}(:?[0-9]{2})?)$' THEN
+                RETURN value::timestamptz;
+            END IF;
+            RETURN value::timestamp AT TIME ZONE 'UTC';
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE;
+    """)
+
+    # 1. Shadow columns, kept in sync with writes from the old application
+    for column in STEP_COLUMNS:
+        op.add_column('transactions', sa.Column(f'{column}_tz', sa.DateTime(timezone=True), nullable=True))
+    sync = "\n".join(
+        f"            NEW.{column}_tz := escrow_parse_timestamptz(NEW.{column});" for column in STEP_COLUMNS
+    )
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION transactions_step_timestamps_sync() RETURNS trigger AS $$
+        BEGIN
+{sync}
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER transactions_step_timestamps_sync
+        BEFORE INSERT OR UPDATE ON transactions
+        FOR EACH ROW EXECUTE FUNCTION transactions_step_timestamps_sync();
+    """)
+
+    # 2. Batched backfill (each batch commits on its own)
+    _backfill("escrow_parse_timestamptz({column})", "_tz")
+
+    # 3. Swap
+    _swap_columns("", "_tz")
+    op.execute("DROP FUNCTION IF EXISTS escrow_parse_timestamptz(text);")
+
+    # 4. Indexes for deadline / queue range scans over open transactions
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_verification_deadline_open',
+            'transactions',
+            ['verification_deadline'],
+            postgresql_where=sa.text(OPEN_STATES),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_transactions_funds_release_pending_at_open',
+            'transactions',
+            ['funds_release_pending_at'],
+            postgresql_where=sa.text(OPEN_STATES),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_transactions_completed_at',
+            'transactions',
+            ['completed_at'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_completed_at', table_name='transactions')
+    op.drop_index('ix_transactions_funds_release_pending_at_open', table_name='transactions')
+    op.drop_index('ix_transactions_verification_deadline_open', table_name='transactions')
+
+    for column in STEP_COLUMNS:
+        op.add_column('transactions', sa.Column(f'{column}_str', sa.String(length=50), nullable=True))
+    # Same naive-UTC ISO format the application used to write
+    _backfill("""to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US')""", "_str")
+    _swap_columns("", "_str")
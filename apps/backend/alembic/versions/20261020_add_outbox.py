@@ -0,0 +1,57 @@
+"""Add transactional outbox for emails and other side effects
+
+Rows are written in the same transaction as the state change that implies
+them and performed afterwards by the outbox dispatcher.
+
+Revision ID: outbox_001
+Revises: seller_stats_001
+Create Date: 2026-10-20 02:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'outbox_001'
+down_revision: Union[str, None] = 'seller_stats_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    outbox_status = postgresql.ENUM(
+        'pending', 'done', 'failed',
+        name='outboxstatus'
+    )
+    outbox_status.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        'outbox',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('topic', sa.String(length=100), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', postgresql.ENUM(name='outboxstatus', create_type=False), nullable=False, server_default='pending'),
+        sa.Column('available_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('dispatched_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbox_pending_available',
+        'outbox',
+        ['available_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbox_pending_available', table_name='outbox')
+    op.drop_table('outbox')
+    postgresql.ENUM(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,67 @@
+"""Add seller_stats summary for the seller dashboard
+
+One row per (seller, state) with the transaction count and amount sums,
+maintained by the state machine on every transition. Backfilled with one
+GROUP BY over transactions. Dashboard pages read transactions through a
+(seller_id, created_at) index.
+
+Revision ID: seller_stats_001
+Revises: transaction_events_001
+Create Date: 2026-10-20 01:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'seller_stats_001'
+down_revision: Union[str, None] = 'transaction_events_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'seller_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('state', postgresql.ENUM(name='transactionstate', create_type=False), nullable=False),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('amount_usd', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('payout_amount_usd', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.text('now()')),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('seller_id', 'state', name='uq_seller_stats_seller_state')
+    )
+    op.create_index(op.f('ix_seller_stats_seller_id'), 'seller_stats', ['seller_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO seller_stats (seller_id, state, transaction_count, amount_usd, payout_amount_usd)
+        SELECT
+            seller_id,
+            state,
+            count(*),
+            coalesce(sum(amount_usd), 0),
+            CASE WHEN state = 'completed' THEN coalesce(sum(payout_amount_usd), 0) ELSE 0 END
+        FROM transactions
+        GROUP BY seller_id, state;
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_transactions_seller_created',
+            'transactions',
+            ['seller_id', 'created_at'],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_seller_created', table_name='transactions')
+    op.drop_index(op.f('ix_seller_stats_seller_id'), table_name='seller_stats')
+    op.drop_table('seller_stats')
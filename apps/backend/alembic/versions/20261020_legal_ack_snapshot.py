@@ -0,0 +1,38 @@
+"""Snapshot the acknowledged document version and content hash on each acknowledgment
+
+Signatures cover the version and content hash as acknowledged. Verifying
+against the live legal_documents row broke every signature once a document
+was edited or re-published, so the values are now stored with the
+acknowledgment. Existing rows are backfilled from their document.
+
+Revision ID: legal_ack_snapshot_001
+Revises: payout_lease_001
+Create Date: 2026-10-20 04:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'legal_ack_snapshot_001'
+down_revision: Union[str, None] = 'payout_lease_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user_legal_acknowledgments', sa.Column('version', sa.String(length=20), nullable=True))
+    op.add_column('user_legal_acknowledgments', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.execute("""
+        UPDATE user_legal_acknowledgments AS a
+        SET version = d.version, content_hash = d.content_hash
+        FROM legal_documents AS d
+        WHERE d.id = a.document_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('user_legal_acknowledgments', 'content_hash')
+    op.drop_column('user_legal_acknowledgments', 'version')
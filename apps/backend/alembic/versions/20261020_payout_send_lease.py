@@ -0,0 +1,37 @@
+"""Add a sending lease to payout transfers and a fixed commission rate to transactions
+
+Transfers claimed by a payout run are marked 'sending' with claimed_at, so a
+concurrent run skips them until the lease expires. commission_percent records
+the rate used for both the USD commission and the KES transfer.
+
+Revision ID: payout_lease_001
+Revises: outbox_001
+Create Date: 2026-10-20 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'payout_lease_001'
+down_revision: Union[str, None] = 'outbox_001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ADD VALUE cannot run inside a transaction block on older PostgreSQL
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE payouttransferstatus ADD VALUE IF NOT EXISTS 'sending'")
+
+    op.add_column('payout_transfers', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('transactions', sa.Column('commission_percent', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    # Enum values cannot be dropped; 'sending' rows fall back to 'queued' (resent with the same reference)
+    op.execute("UPDATE payout_transfers SET status = 'queued' WHERE status = 'sending'")
+    op.drop_column('transactions', 'commission_percent')
+    op.drop_column('payout_transfers', 'claimed_at')
@@ -1,19 +1,25 @@
 """
 Admin endpoints for managing legal documents.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
 from app.api.v1.dependencies import get_current_user, require_super_admin
 from app.models.user import User
 from app.models.legal_document import LegalDocument, DocumentType
+from app.models.legal_ack_campaign import AckCampaignStatus
 from app.crud import legal_document as legal_document_crud
+from app.crud import legal_ack_campaign as campaign_crud
+from app.core.legal_campaigns import run_campaign_in_background
 from app.schemas.legal_document import (
     LegalDocumentCreate,
     LegalDocumentUpdate,
     LegalDocumentResponse,
-    LegalDocumentPublishRequest
+    LegalDocumentSummary,
+    LegalDocumentPage,
+    LegalDocumentPublishRequest,
+    LegalAckCampaignResponse
 )
 from app.core.events import AuditLogger
 from app.models.audit_log import AuditAction
@@ -22,27 +28,95 @@ from app.utils.request_utils import get_client_ip
 router = APIRouter()
 
 
-@router.get("", response_model=List[LegalDocumentResponse])
+@router.get("/campaigns", response_model=List[LegalAckCampaignResponse])
+async def get_ack_campaigns(
+    skip: int = 0,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Re-acknowledgment campaigns, newest first.
+    Super Admin only.
+    """
+    return campaign_crud.get_campaigns(db, skip=skip, limit=limit)
+
+
+@router.get("/campaigns/{campaign_id}", response_model=LegalAckCampaignResponse)
+async def get_ack_campaign(
+    campaign_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Campaign progress, including users who still have to acknowledge.
+    Super Admin only.
+    """
+    campaign = campaign_crud.get_campaign(db, campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    response = LegalAckCampaignResponse.model_validate(campaign)
+    response.outstanding = campaign_crud.count_outstanding(db, campaign.document_id)
+    return response
+
+
+@router.post("/campaigns/{campaign_id}/resume", response_model=LegalAckCampaignResponse, status_code=status.HTTP_202_ACCEPTED)
+async def resume_ack_campaign(
+    campaign_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Resume a failed or stalled campaign from its cursor.
+    Super Admin only.
+    """
+    campaign = campaign_crud.get_campaign(db, campaign_id)
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Campaign not found"
+        )
+    
+    background_tasks.add_task(run_campaign_in_background, campaign.id)
+    return campaign
+
+
+@router.get("", response_model=LegalDocumentPage)
 async def get_all_legal_documents_admin(
     document_type: Optional[DocumentType] = None,
     current_only: bool = False,
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """
-    Get all legal documents (admin view).
+    Get legal documents (admin view), newest first.
+    Metadata only; fetch /{document_id} for the content.
     Super Admin only.
     """
-    documents = legal_document_crud.get_all_legal_documents(
-        db=db,
-        document_type=document_type,
-        current_only=current_only,
-        skip=skip,
-        limit=limit
+    try:
+        documents, next_cursor = legal_document_crud.get_legal_document_page(
+            db=db,
+            document_type=document_type,
+            current_only=current_only,
+            cursor=cursor,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return LegalDocumentPage(
+        items=[LegalDocumentSummary.model_validate(document) for document in documents],
+        next_cursor=next_cursor
     )
-    return documents
 
 
 @router.get("/{document_id}", response_model=LegalDocumentResponse)
@@ -155,12 +229,14 @@ async def publish_legal_document(
     document_id: int,
     publish_request: LegalDocumentPublishRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_super_admin)
 ):
     """
     Publish a legal document as the current version.
     Automatically unpublishes previous version of the same type.
+    Required document types start a re-acknowledgment campaign in the background.
     Super Admin only.
     """
     document = legal_document_crud.get_legal_document_by_id(db, document_id)
@@ -199,6 +275,10 @@ async def publish_legal_document(
         success=True
     )
     
+    campaign = campaign_crud.get_latest_campaign_for_document(db, published_document.id)
+    if campaign and campaign.status == AckCampaignStatus.QUEUED:
+        background_tasks.add_task(run_campaign_in_background, campaign.id)
+    
     return published_document
 
 
@@ -58,12 +58,18 @@ async def force_release(
         )
     
     # Force release
-    transaction = escrow_completion.force_release(
-        db=db,
-        transaction=transaction,
-        reason=action_request.reason,
-        admin_id=current_user.id
-    )
+    try:
+        transaction = escrow_completion.force_release(
+            db=db,
+            transaction=transaction,
+            reason=action_request.reason,
+            admin_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     # Log event
     ip_address = get_client_ip(request)
@@ -116,12 +122,18 @@ async def process_refund(
         )
     
     # Process refund
-    transaction = escrow_completion.process_refund(
-        db=db,
-        transaction=transaction,
-        reason=action_request.reason,
-        admin_id=current_user.id
-    )
+    try:
+        transaction = escrow_completion.process_refund(
+            db=db,
+            transaction=transaction,
+            reason=action_request.reason,
+            admin_id=current_user.id
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     # Log event
     ip_address = get_client_ip(request)
@@ -178,3 +190,152 @@ async def get_transaction_details(
     
     return TransactionDetailResponse.model_validate(transaction)
 
+
+
+@router.post("/payouts/run")
+async def run_payouts(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Run one payout engine cycle now (Super Admin only).
+    Settles succeeded transfers and sends pending payouts as bulk transfers.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.payment.services.payout_engine import payout_engine
+    
+    result = await run_in_threadpool(payout_engine.run_once, db)
+    
+    AuditLogger.log_event(
+        db=db,
+        action=AuditAction.ADMIN_REVIEW_COMPLETED,
+        user_id=current_user.id,
+        ip_address=get_client_ip(request),
+        details={"action": "payout_run", **{k: v for k, v in result.items() if isinstance(v, int)}},
+        success=True
+    )
+    
+    return result
+
+
+@router.get("/payouts/stats")
+async def get_payout_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Payout throughput and failure accounting (Super Admin only)"""
+    from app.payment.services.payout_engine import payout_engine
+    
+    return payout_engine.stats(db)
+
+
+@router.post("/deadlines/run")
+async def run_deadlines(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Fire due temporary access / verification deadlines now (Super Admin only).
+    Uses the configured DEADLINE_*_ACTION for each kind.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.core.deadline_scheduler import deadline_scheduler
+    
+    result = await run_in_threadpool(deadline_scheduler.run_once, db)
+    
+    AuditLogger.log_event(
+        db=db,
+        action=AuditAction.ADMIN_REVIEW_COMPLETED,
+        user_id=current_user.id,
+        ip_address=get_client_ip(request),
+        details={"action": "deadline_run", **{k: v for k, v in result.items() if isinstance(v, int)}},
+        success=True
+    )
+    
+    return result
+
+
+@router.get("/deadlines/stats")
+async def get_deadline_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Deadline job counts, overdue backlog and run totals (Super Admin only)"""
+    from app.core.deadline_scheduler import deadline_scheduler
+    
+    return deadline_scheduler.stats(db)
+
+
+@router.post("/outbox/run")
+async def run_outbox(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Dispatch available outbox messages now (Super Admin only).
+    Sends one batch of emails queued by state changes and suspensions.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.core.outbox import outbox_dispatcher
+    
+    result = await run_in_threadpool(outbox_dispatcher.run_once, db)
+    
+    AuditLogger.log_event(
+        db=db,
+        action=AuditAction.ADMIN_REVIEW_COMPLETED,
+        user_id=current_user.id,
+        ip_address=get_client_ip(request),
+        details={"action": "outbox_run", **{k: v for k, v in result.items() if isinstance(v, int)}},
+        success=True
+    )
+    
+    return result
+
+
+@router.get("/outbox/stats")
+async def get_outbox_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """Outbox message counts by topic, oldest pending message and run totals (Super Admin only)"""
+    from app.core.outbox import outbox_dispatcher
+    
+    return outbox_dispatcher.stats(db)
+
+
+@router.post("/reconciliation/run")
+async def run_reconciliation(
+    request: Request,
+    auto_heal: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_super_admin)
+):
+    """
+    Reconcile transactions against payment events and Paystack (Super Admin only).
+    With auto_heal, verified payments whose webhook was lost are moved to FUNDS_HELD.
+    Large backlogs should use scripts/reconcile_payments.py instead.
+    """
+    from starlette.concurrency import run_in_threadpool
+    from app.payment.services.reconciliation import run_reconciliation as reconcile
+    
+    report = await run_in_threadpool(reconcile, db, auto_heal)
+    
+    AuditLogger.log_event(
+        db=db,
+        action=AuditAction.ADMIN_REVIEW_COMPLETED,
+        user_id=current_user.id,
+        ip_address=get_client_ip(request),
+        details={
+            "action": "reconciliation_run",
+            "auto_heal": auto_heal,
+            "scanned": report["scanned"],
+            "discrepancies": report["discrepancies"],
+            "healed": report["healed"]
+        },
+        success=True
+    )
+    
+    return report
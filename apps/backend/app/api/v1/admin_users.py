@@ -12,7 +12,7 @@ from app.crud import user as user_crud
 from app.schemas.auth import UserResponse
 from app.schemas.admin import SuspendUserRequest, DeleteUserRequest
 from app.core.events import AuditLogger
-from app.core.email import send_account_suspended_email
+from app.crud.outbox import ACCOUNT_SUSPENDED_EMAIL, enqueue_message
 from app.utils.request_utils import get_client_ip, get_user_agent
 
 router = APIRouter()
@@ -178,7 +178,7 @@ async def suspend_user_account(
 ):
     """
     Suspend a user account (admin only).
-    Sends email notification to the user with suspension reason and support link.
+    The suspension, audit log and notification email (via the outbox) commit together.
     """
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -197,25 +197,14 @@ async def suspend_user_account(
     if not user.is_active:
         return user  # Already suspended
     
-    # Suspend user
-    user_crud.suspend_user(db, user)
-    
-    # Send suspension email
-    from app.core.config import settings
-    support_link = f"{settings.FRONTEND_URL}/support"
-    email_sent = send_account_suspended_email(
-        user_email=user.email,
-        user_name=user.full_name,
-        reason=suspend_data.reason,
-        support_link=support_link
-    )
+    # Suspend user; the email is sent by the outbox dispatcher once this commits
+    user_crud.suspend_user(db, user, commit=False)
+    enqueue_message(db, ACCOUNT_SUSPENDED_EMAIL, {"user_id": user.id, "reason": suspend_data.reason})
     
     # Create audit log
     details = f"Account suspended by admin {current_user.email}. Reason: {suspend_data.reason}"
     if suspend_data.notes:
         details += f" Notes: {suspend_data.notes}"
-    if not email_sent:
-        details += " (Email notification failed to send)"
     
     audit_log = AuditLog(
         user_id=user.id,
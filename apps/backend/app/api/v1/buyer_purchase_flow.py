@@ -3,12 +3,15 @@ Step-locked buyer purchase flow endpoints.
 Buyer can only proceed one step at a time.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import List, Optional
 from app.core.database import get_db
-from app.api.v1.dependencies import get_current_user, require_buyer
+from app.api.v1.dependencies import get_current_user, require_buyer, transaction_ids_query
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionState
+from app.core.state_machine import TERMINAL_STATES
 from app.crud import transaction as transaction_crud
 from app.crud import buyer_purchase_flow as purchase_flow_crud
 from app.crud import listing as listing_crud
@@ -18,17 +21,23 @@ from app.schemas.buyer_purchase_flow import (
     AccountVerificationRequest,
     OwnershipAgreementSignRequest,
     FundsReleaseRequest,
-    TransactionStepResponse
+    TransactionStepResponse,
+    TransactionStepSummary,
+    TransactionStatusBatchResponse
 )
 from app.core.events import AuditLogger
 from app.models.audit_log import AuditAction
 from app.utils.request_utils import get_client_ip, get_user_agent
 from app.payment.services.paystack import PaystackService
 from app.models.currency import Currency
+import json
+import logging
 import secrets
 import string
 import re
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -197,6 +206,34 @@ async def step1_initiate_purchase(
         )
 
 
+def _verified_payment_mismatch(transaction: Transaction, reference: str, verification_data: dict) -> Optional[str]:
+    """
+    Why a successful Paystack verification cannot settle this transaction, or None.
+    The charge must be for this transaction (stored reference or metadata) and
+    for the amount and currency it was initialized with.
+    """
+    if verification_data.get("reference") not in (None, reference):
+        return "Payment reference does not match this transaction"
+    metadata = verification_data.get("metadata")
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            metadata = None
+    metadata_transaction_id = metadata.get("transaction_id") if isinstance(metadata, dict) else None
+    if metadata_transaction_id is not None and str(metadata_transaction_id) != str(transaction.id):
+        return "Payment belongs to another transaction"
+    if transaction.paystack_reference is None and metadata_transaction_id is None:
+        return "Payment reference does not match this transaction"
+    
+    expected_amount = transaction.payment_amount if transaction.payment_amount is not None else transaction.amount
+    if expected_amount is None or verification_data.get("amount") != expected_amount:
+        return f"Paid amount {verification_data.get('amount')} does not match expected {expected_amount}"
+    if (verification_data.get("currency") or "").upper() != "KES":
+        return f"Paid currency {verification_data.get('currency')} does not match KES"
+    return None
+
+
 @router.post("/purchase/{transaction_id}/payment/confirm", response_model=TransactionStepResponse)
 async def step2_confirm_payment(
     transaction_id: int,
@@ -209,6 +246,7 @@ async def step2_confirm_payment(
     STEP 2: Make Escrow Payment
     
     - Buyer completes payment into escrow
+    - Payment is verified with Paystack before funds are marked as held
     - Funds are securely held by platform
     - Payment receipt is generated
     """
@@ -226,13 +264,67 @@ async def step2_confirm_payment(
             detail="Not authorized for this transaction"
         )
     
+    if transaction.paystack_reference and transaction.paystack_reference != payment_data.paystack_reference:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Payment reference does not match this transaction"
+        )
+    
+    payment_confirmed_response = TransactionStepResponse(
+        transaction_id=transaction.id,
+        current_step=2,
+        current_state=TransactionState.FUNDS_HELD.value,
+        can_proceed=True,
+        next_step_available=True,
+        step_requirements_met={"payment_confirmed": True},
+        verification_deadline=None,
+        time_remaining_hours=None
+    )
+    
+    # The charge.success webhook may already have moved the transaction on
+    if transaction.state == TransactionState.FUNDS_HELD:
+        return payment_confirmed_response
+    
+    # Verify with Paystack off the event loop. Refreshes of the callback page
+    # share one in-flight request and reuse the cached terminal result.
+    try:
+        verification = await run_in_threadpool(
+            PaystackService().verify_transaction, payment_data.paystack_reference
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Could not verify payment with Paystack: {str(e)}"
+        )
+    
+    verification_data = verification.get("data") or {}
+    payment_status = verification_data.get("status")
+    if payment_status != "success":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Payment has not been completed (status: {payment_status})"
+        )
+    
+    mismatch = _verified_payment_mismatch(transaction, payment_data.paystack_reference, verification_data)
+    if mismatch:
+        logger.warning("Rejected payment confirmation for transaction %s: %s", transaction.id, mismatch)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=mismatch
+        )
+    
+    authorization_code = (
+        payment_data.paystack_authorization_code
+        or (verification_data.get("authorization") or {}).get("authorization_code")
+    )
+    
     try:
         # Confirm payment and update state
         transaction = purchase_flow_crud.confirm_payment(
             db=db,
             transaction=transaction,
             paystack_reference=payment_data.paystack_reference,
-            paystack_authorization_code=payment_data.paystack_authorization_code
+            paystack_authorization_code=authorization_code
         )
         
         # Log event
@@ -250,16 +342,7 @@ async def step2_confirm_payment(
             success=True
         )
         
-        return TransactionStepResponse(
-            transaction_id=transaction.id,
-            current_step=2,
-            current_state=transaction.state.value,
-            can_proceed=True,
-            next_step_available=True,
-            step_requirements_met={"payment_confirmed": True},
-            verification_deadline=None,
-            time_remaining_hours=None
-        )
+        return payment_confirmed_response
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -328,7 +411,7 @@ async def step3_grant_temporary_access(
             can_proceed=True,
             next_step_available=True,
             step_requirements_met={"temporary_access_granted": True},
-            verification_deadline=temporary_access.access_expires_at.isoformat(),
+            verification_deadline=temporary_access.access_expires_at,
             time_remaining_hours=time_remaining
         )
     except ValueError as e:
@@ -384,15 +467,11 @@ async def step4_start_verification(
             details={
                 "transaction_id": transaction.id,
                 "step": 4,
-                "verification_deadline": transaction.verification_deadline
+                "verification_deadline": transaction.verification_deadline.isoformat()
             },
             success=True
         )
         
-        deadline = datetime.fromisoformat(transaction.verification_deadline.replace('Z', '+00:00'))
-        now = datetime.utcnow()
-        time_remaining = (deadline - now).total_seconds() / 3600.0
-        
         return TransactionStepResponse(
             transaction_id=transaction.id,
             current_step=4,
@@ -401,7 +480,7 @@ async def step4_start_verification(
             next_step_available=True,
             step_requirements_met={"verification_window_started": True},
             verification_deadline=transaction.verification_deadline,
-            time_remaining_hours=time_remaining
+            time_remaining_hours=transaction.verification_hours_remaining
         )
     except ValueError as e:
         raise HTTPException(
@@ -608,8 +687,8 @@ async def step6_request_funds_release(
     
     - Buyer confirms ownership and requests fund release
     - Agreement is locked and archived
-    - Funds are released to seller
-    - Ownership is marked complete
+    - Payout to the seller is queued for the next payout engine run
+    - Transaction completes once the Paystack transfer succeeds
     """
     transaction = transaction_crud.get_transaction_by_id(db, transaction_id)
     
@@ -632,23 +711,12 @@ async def step6_request_funds_release(
             transaction=transaction
         )
         
-        # Calculate commission and payout
+        # Calculate commission and payout; the transfer itself is sent in a
+        # Paystack bulk transfer by the payout engine (app.payment.services.payout_engine)
         from app.payment.services.payout import PayoutService
-        commission_usd, payout_amount_usd = PayoutService.calculate_commission(transaction.amount_usd)
-        
-        # TODO: Process actual payout via Paystack transfer
-        # For now, we'll use a placeholder reference
-        # In production, this would call Paystack transfer API
-        payout_reference = f"PAYOUT_{transaction.id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
-        
-        # Release funds
-        transaction = purchase_flow_crud.release_funds(
-            db=db,
-            transaction=transaction,
-            payout_reference=payout_reference,
-            commission_usd=commission_usd,
-            payout_amount_usd=payout_amount_usd
-        )
+        commission_usd, payout_amount_usd = PayoutService.record_commission(transaction)
+        db.commit()
+        db.refresh(transaction)
         
         # Log event
         ip_address = get_client_ip(request)
@@ -660,19 +728,20 @@ async def step6_request_funds_release(
             details={
                 "transaction_id": transaction.id,
                 "step": 6,
-                "funds_released": True,
-                "payout_reference": payout_reference
+                "funds_release_requested": True,
+                "payout_queued": True,
+                "payout_amount_usd": payout_amount_usd
             },
             success=True
         )
         
         return TransactionStepResponse(
             transaction_id=transaction.id,
-            current_step=7,
+            current_step=6,
             current_state=transaction.state.value,
             can_proceed=False,
             next_step_available=False,
-            step_requirements_met={"transaction_completed": True},
+            step_requirements_met={"funds_release_requested": True, "payout_queued": True},
             verification_deadline=None,
             time_remaining_hours=None
         )
@@ -683,6 +752,29 @@ async def step6_request_funds_release(
         )
 
 
+@router.get("/purchase/status", response_model=TransactionStatusBatchResponse)
+async def get_purchase_statuses(
+    transaction_ids: List[int] = Depends(transaction_ids_query),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_buyer)
+):
+    """
+    Get step summaries of several purchases in one request (?ids=12,15,31).
+    All transactions and their related rows are loaded with a fixed number of queries.
+    """
+    transactions = transaction_crud.get_transactions_for_status(
+        db=db,
+        transaction_ids=transaction_ids,
+        buyer_id=current_user.id
+    )
+    by_id = {t.id: t for t in transactions}
+    
+    return TransactionStatusBatchResponse(
+        transactions=[_step_summary(by_id[i]) for i in transaction_ids if i in by_id],
+        missing_ids=[i for i in transaction_ids if i not in by_id]
+    )
+
+
 @router.get("/purchase/{transaction_id}/status", response_model=TransactionStepResponse)
 async def get_purchase_status(
     transaction_id: int,
@@ -713,7 +805,7 @@ async def get_purchase_status(
     if transaction.temporary_access:
         time_remaining = transaction.temporary_access.time_remaining_hours
         if transaction.temporary_access.access_expires_at:
-            verification_deadline = transaction.temporary_access.access_expires_at.isoformat()
+            verification_deadline = transaction.temporary_access.access_expires_at
     
     # Determine if can proceed
     can_proceed = transaction.can_proceed_to_next_step()
@@ -737,3 +829,26 @@ async def get_purchase_status(
         time_remaining_hours=time_remaining
     )
 
+
+def _step_summary(transaction: Transaction) -> TransactionStepSummary:
+    """Compact step status from an eagerly loaded transaction"""
+    temp_access = transaction.temporary_access
+    verification_deadline = transaction.verification_deadline
+    time_remaining = None
+    if temp_access:
+        time_remaining = temp_access.time_remaining_hours
+        if temp_access.access_expires_at:
+            verification_deadline = temp_access.access_expires_at
+    
+    return TransactionStepSummary(
+        transaction_id=transaction.id,
+        listing_id=transaction.listing_id,
+        current_step=transaction.get_current_step(),
+        current_state=transaction.state.value,
+        next_step_available=transaction.state not in TERMINAL_STATES,
+        temporary_access_active=bool(temp_access and temp_access.is_active),
+        ownership_agreement_signed=bool(transaction.ownership_agreement and transaction.ownership_agreement.is_signed),
+        contract_signed=bool(transaction.contract and transaction.contract.is_signed),
+        verification_deadline=verification_deadline,
+        time_remaining_hours=time_remaining
+    )
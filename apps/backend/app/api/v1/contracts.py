@@ -1,16 +1,18 @@
 """
 Contract API endpoints for generating and signing contracts.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Query
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.api.v1.dependencies import get_current_user, require_buyer
-from app.models.user import User
+from app.models.user import User, Role
 from app.models.transaction import TransactionState
 from app.crud import transaction as transaction_crud, listing as listing_crud
 from app.crud import user as user_crud
-from app.schemas.contract import ContractSignRequest, ContractResponse
-from app.core.pdf_generator import PDFContractGenerator
+from app.schemas.contract import ContractSignRequest, ContractResponse, ContractJobResponse
+from app.core.storage import blob_response
+from app.core.contract_worker import RenderQueueFull, contract_render_pool, enqueue_contract_job
+from app.models.contract_render_job import ContractRenderJob, ContractJobStatus
 from app.core.events import AuditLogger
 from app.models.audit_log import AuditAction
 from app.utils.request_utils import get_client_ip
@@ -18,16 +20,19 @@ from app.utils.request_utils import get_client_ip
 router = APIRouter()
 
 
-@router.post("/{transaction_id}/generate", response_model=ContractResponse)
+@router.post("/{transaction_id}/generate", response_model=ContractJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def generate_contract(
     transaction_id: int,
-    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_buyer)
 ):
     """
-    Generate contract PDF for a transaction.
+    Queue contract PDF generation for a transaction.
     Only buyer can generate contract for their transaction.
+    
+    Returns 202 with a job to poll at GET /contracts/jobs/{job_id},
+    or 200 with the contract if it already exists.
     """
     transaction = transaction_crud.get_transaction_by_id(db, transaction_id)
     
@@ -51,7 +56,12 @@ async def generate_contract(
     
     # Check if contract already exists
     if transaction.contract:
-        return ContractResponse.model_validate(transaction.contract)
+        response.status_code = status.HTTP_200_OK
+        return ContractJobResponse(
+            transaction_id=transaction_id,
+            status=ContractJobStatus.SUCCEEDED.value,
+            contract=ContractResponse.model_validate(transaction.contract)
+        )
     
     # Get listing and seller details
     listing = listing_crud.get_listing_by_id(db, transaction.listing_id)
@@ -63,45 +73,70 @@ async def generate_contract(
             detail="Listing or seller not found"
         )
     
-    # Generate PDF contract
-    pdf_bytes, pdf_hash = PDFContractGenerator.generate_contract(
-        seller_name=seller.full_name,
-        seller_email=seller.email,
-        buyer_name=current_user.full_name,
-        buyer_email=current_user.email,
-        listing_title=listing.title,
-        platform=listing.platform,
-        category=listing.category,
-        purchase_price=transaction.amount_usd / 100.0
-    )
+    # Render in the background worker pool (WeasyPrint never runs on the event loop)
+    payload = {
+        "seller_name": seller.full_name,
+        "seller_email": seller.email,
+        "buyer_name": current_user.full_name,
+        "buyer_email": current_user.email,
+        "listing_title": listing.title,
+        "platform": listing.platform,
+        "category": listing.category,
+        "purchase_price": transaction.amount_usd / 100.0
+    }
+    try:
+        job = enqueue_contract_job(
+            db=db,
+            transaction_id=transaction_id,
+            requested_by_id=current_user.id,
+            payload=payload
+        )
+    except (RenderQueueFull, RuntimeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Contract generation is busy, please retry shortly ({str(e)})",
+            headers={"Retry-After": "5"}
+        )
     
-    # Save PDF to storage
-    pdf_url = PDFContractGenerator.save_pdf_to_storage(pdf_bytes, transaction_id)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=ContractJobResponse)
+async def get_contract_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for completion (long-poll)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get contract rendering job status.
+    With ?wait=N the request is held until the job finishes (up to N seconds).
+    """
+    job = db.query(ContractRenderJob).filter(ContractRenderJob.job_id == job_id).first()
     
-    # Create contract record
-    contract = transaction_crud.create_contract(
-        db=db,
-        transaction_id=transaction_id,
-        pdf_hash=pdf_hash,
-        pdf_url=pdf_url
-    )
+    if not job or job.requested_by_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
     
-    # Log event
-    ip_address = get_client_ip(request)
-    AuditLogger.log_event(
-        db=db,
-        action=AuditAction.CONTRACT_GENERATED,
-        user_id=current_user.id,
-        ip_address=ip_address,
-        details={
-            "transaction_id": transaction_id,
-            "contract_id": contract.id,
-            "pdf_hash": pdf_hash
-        },
-        success=True
-    )
+    if wait and job.status in (ContractJobStatus.QUEUED, ContractJobStatus.RUNNING):
+        if await contract_render_pool.wait(job_id, wait):
+            db.refresh(job)
     
-    return ContractResponse.model_validate(contract)
+    return _job_response(job)
+
+
+def _job_response(job: ContractRenderJob) -> ContractJobResponse:
+    """Convert render job to response"""
+    return ContractJobResponse(
+        job_id=job.job_id,
+        transaction_id=job.transaction_id,
+        status=job.status.value,
+        error=job.error,
+        render_ms=job.render_ms,
+        contract=ContractResponse.model_validate(job.contract) if job.contract else None
+    )
 
 
 @router.post("/{transaction_id}/sign", response_model=ContractResponse)
@@ -211,3 +246,41 @@ async def get_contract(
     
     return ContractResponse.model_validate(transaction.contract)
 
+
+
+@router.get("/{transaction_id}/pdf")
+async def download_contract_pdf(
+    transaction_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download the contract PDF (buyer, seller or admin).
+    Served from blob storage; supports HTTP range requests.
+    """
+    transaction = transaction_crud.get_transaction_by_id(db, transaction_id)
+    
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+    
+    is_admin = current_user.role in (Role.ADMIN, Role.SUPER_ADMIN)
+    if current_user.id not in (transaction.buyer_id, transaction.seller_id) and not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this contract"
+        )
+    
+    if not transaction.contract:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Contract not found"
+        )
+    
+    return blob_response(
+        transaction.contract.pdf_storage_key,
+        filename=f"contract-{transaction_id}.pdf",
+        media_type="application/pdf"
+    )
@@ -2,10 +2,11 @@
 Dependency injection for API routes.
 Includes authentication, authorization, and role-based access control.
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User, Role
@@ -126,3 +127,33 @@ require_super_admin = require_role([Role.SUPER_ADMIN])
 # Users can switch between buying and selling without needing separate accounts
 require_seller = require_role([Role.BUYER, Role.SELLER, Role.ADMIN, Role.SUPER_ADMIN])
 require_buyer = require_role([Role.BUYER, Role.SELLER, Role.ADMIN, Role.SUPER_ADMIN])
+
+
+def transaction_ids_query(
+    ids: str = Query(..., description="Comma-separated transaction ids, e.g. 12,15,31")
+) -> List[int]:
+    """
+    Parse the ids of a batch status request.
+    Duplicates are dropped (first occurrence wins); at most
+    TRANSACTION_STATUS_BATCH_MAX_IDS ids are accepted.
+    """
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers"
+        )
+    
+    unique_ids = list(dict.fromkeys(parsed))
+    if not unique_ids:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one transaction id is required"
+        )
+    if len(unique_ids) > settings.TRANSACTION_STATUS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.TRANSACTION_STATUS_BATCH_MAX_IDS} transaction ids per request"
+        )
+    return unique_ids
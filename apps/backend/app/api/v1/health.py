@@ -1,13 +1,16 @@
 """
 Health check and monitoring endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from datetime import datetime
 from typing import Dict, Any
 from app.core.database import get_db
 from app.core.config import settings
+from app.core.metrics_exporter import metrics_refresher, render_latest
+from app.core.readiness import LIVE_BODY, readiness_monitor
 
 router = APIRouter()
 
@@ -53,6 +56,9 @@ async def detailed_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]
             "message": str(e)
         }
     
+    # Load-shedding signals (pool, loop lag, queue, Paystack breaker) as seen by /ready
+    health_status["checks"]["readiness"] = readiness_monitor.state
+    
     # Environment check
     health_status["checks"]["environment"] = {
         "status": "healthy",
@@ -64,58 +70,79 @@ async def detailed_health_check(db: Session = Depends(get_db)) -> Dict[str, Any]
 
 
 @router.get("/metrics")
-async def metrics(db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def metrics(request: Request, db: Session = Depends(get_db)):
     """
-    Basic metrics endpoint (for Prometheus scraping).
-    In production, use proper Prometheus client library.
+    Prometheus metrics (text exposition format, all workers).
+    
+    Business counts come from the background refresher (one GROUP BY per
+    table every METRICS_BUSINESS_REFRESH_SECONDS), so scrapes do not query
+    the database. Clients sending `Accept: application/json` get the previous
+    JSON summary instead.
     """
+    if "application/json" not in request.headers.get("accept", ""):
+        body, content_type = await run_in_threadpool(render_latest)
+        return Response(content=body, media_type=content_type)
+    
     metrics_data = {
         "timestamp": datetime.utcnow().isoformat(),
         "metrics": {}
     }
     
     try:
-        # Transaction metrics
-        from app.models.transaction import Transaction, TransactionState
-        
-        total_transactions = db.query(Transaction).count()
-        pending = db.query(Transaction).filter(Transaction.state == TransactionState.PAYMENT_PENDING).count()
-        completed = db.query(Transaction).filter(Transaction.state == TransactionState.COMPLETED).count()
-        refunded = db.query(Transaction).filter(Transaction.state == TransactionState.REFUNDED).count()
+        snapshot = metrics_refresher.snapshot
+        if snapshot is None:
+            # Refresher not running (tests, scripts): compute once
+            snapshot = await run_in_threadpool(metrics_refresher.refresh_business, db)
         
+        transactions = snapshot["transactions"]
         metrics_data["metrics"]["transactions"] = {
-            "total": total_transactions,
-            "pending": pending,
-            "completed": completed,
-            "refunded": refunded
+            "total": sum(transactions.values()),
+            "pending": transactions["payment_pending"],
+            "completed": transactions["completed"],
+            "refunded": transactions["refunded"],
+            "by_state": transactions
         }
         
-        # Listing metrics
-        from app.models.listing import Listing, ListingState
-        
-        total_listings = db.query(Listing).count()
-        approved = db.query(Listing).filter(Listing.state == ListingState.APPROVED).count()
-        sold = db.query(Listing).filter(Listing.state == ListingState.SOLD).count()
-        
+        listings = snapshot["listings"]
         metrics_data["metrics"]["listings"] = {
-            "total": total_listings,
-            "approved": approved,
-            "sold": sold
+            "total": sum(listings.values()),
+            "approved": listings["approved"],
+            "sold": listings["sold"],
+            "by_state": listings
         }
         
-        # User metrics
-        from app.models.user import User
-        
-        total_users = db.query(User).count()
-        verified_users = db.query(User).filter(
-            User.is_email_verified == True,
-            User.is_phone_verified == True
-        ).count()
-        
+        users = snapshot["users"]
         metrics_data["metrics"]["users"] = {
-            "total": total_users,
-            "verified": verified_users
+            "total": sum(users.values()),
+            "verified": sum(count for key, count in users.items() if key.endswith(":true"))
         }
+        metrics_data["metrics"]["refreshed_at"] = (
+            datetime.utcfromtimestamp(metrics_refresher.refreshed_at).isoformat()
+            if metrics_refresher.refreshed_at else None
+        )
+        metrics_data["metrics"]["db_pool"] = metrics_refresher.sample_pool()
+        
+        # Outbound Paystack calls (per-endpoint latency/errors, breaker state)
+        from app.payment.services.http_client import get_http_client
+        from app.payment.services.paystack import verification_cache
+        
+        metrics_data["metrics"]["paystack"] = get_http_client().get_stats()
+        metrics_data["metrics"]["paystack"]["verify_cache"] = verification_cache.stats()
+        
+        # Background contract rendering
+        from app.core.contract_worker import contract_render_pool
+        
+        metrics_data["metrics"]["contract_rendering"] = contract_render_pool.get_stats()
+        
+        # Public legal document cache
+        from app.api.v1.legal import public_document_cache, public_list_cache
+        
+        metrics_data["metrics"]["legal_document_cache"] = public_document_cache.stats()
+        metrics_data["metrics"]["legal_document_list_cache"] = public_list_cache.stats()
+        
+        from app.core.legal_compliance import compliance_cache
+        
+        metrics_data["metrics"]["legal_compliance_cache"] = compliance_cache.stats()
         
     except Exception as e:
         metrics_data["error"] = str(e)
@@ -155,3 +182,27 @@ async def liveness_check() -> Dict[str, Any]:
         "timestamp": datetime.utcnow().isoformat()
     }
 
+
+@router.get("/live")
+async def live() -> Response:
+    """
+    Liveness probe: answering at all means the worker's event loop runs.
+    """
+    return Response(content=LIVE_BODY, media_type="application/json")
+
+
+@router.get("/ready")
+async def ready() -> Response:
+    """
+    Readiness probe for the load balancer (503 = send traffic elsewhere).
+    
+    Answers from the readiness monitor's cached sample: DB pool saturation,
+    event loop lag and contract render queue depth against the READINESS_*
+    thresholds, plus the Paystack breaker state (reported only).
+    """
+    is_ready, body = readiness_monitor.readiness()
+    return Response(
+        content=body,
+        media_type="application/json",
+        status_code=status.HTTP_200_OK if is_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
@@ -1,9 +1,13 @@
 """
 Public endpoints for legal documents.
 """
-from fastapi import APIRouter, HTTPException, status, Depends, Request
+import hashlib
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from app.core.cache import CoalescingCache
+from app.core.config import settings
 from app.core.database import get_db
 from app.models.legal_document import DocumentType
 from app.crud import legal_document as legal_document_crud
@@ -11,85 +15,123 @@ from app.schemas.legal_document import (
     LegalDocumentPublicResponse,
     LegalDocumentListResponse
 )
-from app.utils.markdown_renderer import markdown_to_html_with_library
+from app.utils.request_utils import cached_bytes_response, etag_matches
 
 router = APIRouter()
 
+_LIST_ADAPTER = TypeAdapter(List[LegalDocumentListResponse])
+
+# Serialized public responses keyed by (document id, content hash). A publish or
+# edit changes the hash, so stale entries are never served and simply age out.
+public_document_cache = CoalescingCache(
+    "legal_document",
+    ttl_seconds=settings.LEGAL_DOCUMENT_CACHE_TTL_SECONDS,
+    max_entries=256
+)
+
+# Serialized public list keyed by the current-version set (id, content hash,
+# updated_at of every current document), so a publish or edit re-keys it.
+public_list_cache = CoalescingCache(
+    "legal_document_list",
+    ttl_seconds=settings.LEGAL_DOCUMENT_CACHE_TTL_SECONDS,
+    max_entries=16
+)
+
+
+def _serialize_document(db: Session, document_id: int) -> bytes:
+    """Build the public JSON body from the stored (pre-rendered) HTML"""
+    document = legal_document_crud.get_legal_document_by_id(db, document_id)
+    return LegalDocumentPublicResponse(
+        id=document.id,
+        title=document.title,
+        slug=document.slug,
+        document_type=document.document_type,
+        content_html=document.content_html,
+        version=document.version,
+        published_at=document.published_at,
+        updated_at=document.updated_at,
+        effective_date=document.published_at or document.created_at
+    ).model_dump_json().encode("utf-8")
+
+
+def _document_response(
+    request: Request,
+    db: Session,
+    ref: Optional[Tuple[int, Optional[str]]],
+    not_found_detail: str
+) -> Response:
+    if ref is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=not_found_detail
+        )
+    
+    document_id, content_hash = ref
+    if content_hash is None:
+        document = legal_document_crud.get_legal_document_by_id(db, document_id)
+        content_hash = legal_document_crud.ensure_rendered(db, document).content_hash
+    
+    etag = f'"{content_hash}"'
+    cache_control = f"public, max-age={settings.LEGAL_DOCUMENT_MAX_AGE_SECONDS}"
+    if etag_matches(request, etag):
+        return cached_bytes_response(request, b"", etag, cache_control)
+    
+    body = public_document_cache.get_or_load(
+        (document_id, content_hash),
+        lambda: _serialize_document(db, document_id)
+    )
+    return cached_bytes_response(request, body, etag, cache_control)
+
+
+def _serialize_list(db: Session) -> bytes:
+    documents = legal_document_crud.get_current_legal_documents(db)
+    return _LIST_ADAPTER.dump_json(
+        [LegalDocumentListResponse.model_validate(document) for document in documents]
+    )
+
 
 @router.get("", response_model=List[LegalDocumentListResponse])
 async def get_current_legal_documents(
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get all current legal documents (public).
-    Returns list of all published legal documents.
+    Metadata only; supports If-None-Match.
     """
-    documents = legal_document_crud.get_current_legal_documents(db)
-    return documents
+    version_set = legal_document_crud.get_current_version_set(db)
+    etag = '"' + hashlib.sha256(repr(version_set).encode("utf-8")).hexdigest()[:32] + '"'
+    cache_control = f"public, max-age={settings.LEGAL_DOCUMENT_MAX_AGE_SECONDS}"
+    if etag_matches(request, etag):
+        return cached_bytes_response(request, b"", etag, cache_control)
+    
+    body = public_list_cache.get_or_load(version_set, lambda: _serialize_list(db))
+    return cached_bytes_response(request, body, etag, cache_control)
 
 
 @router.get("/{slug}", response_model=LegalDocumentPublicResponse)
 async def get_legal_document_by_slug(
     slug: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get a legal document by slug (public).
-    Returns HTML-rendered content.
+    Returns HTML-rendered content. Supports If-None-Match.
     """
-    document = legal_document_crud.get_legal_document_by_slug(db, slug, current_only=True)
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Legal document not found"
-        )
-    
-    # Render markdown to HTML
-    content_html = markdown_to_html_with_library(document.content_markdown, library="markdown2")
-    
-    return LegalDocumentPublicResponse(
-        id=document.id,
-        title=document.title,
-        slug=document.slug,
-        document_type=document.document_type,
-        content_html=content_html,
-        version=document.version,
-        published_at=document.published_at,
-        updated_at=document.updated_at,
-        effective_date=document.published_at or document.created_at
-    )
+    ref = legal_document_crud.get_current_document_ref(db, slug=slug)
+    return _document_response(request, db, ref, "Legal document not found")
 
 
 @router.get("/{document_type}/current", response_model=LegalDocumentPublicResponse)
 async def get_current_document_by_type(
     document_type: DocumentType,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get current document by type (public).
     Direct access by document type (e.g., /legal/terms_of_service/current).
     """
-    document = legal_document_crud.get_current_document_by_type(db, document_type)
-    
-    if not document:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"No current {document_type.value} document found"
-        )
-    
-    # Render markdown to HTML
-    content_html = markdown_to_html_with_library(document.content_markdown, library="markdown2")
-    
-    return LegalDocumentPublicResponse(
-        id=document.id,
-        title=document.title,
-        slug=document.slug,
-        document_type=document.document_type,
-        content_html=content_html,
-        version=document.version,
-        published_at=document.published_at,
-        updated_at=document.updated_at,
-        effective_date=document.published_at or document.created_at
-    )
-
+    ref = legal_document_crud.get_current_document_ref(db, document_type=document_type)
+    return _document_response(request, db, ref, f"No current {document_type.value} document found")
@@ -1,12 +1,14 @@
 """
 Seller listing submission endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.api.v1.dependencies import get_current_user, require_seller
 from app.models.user import User, Role
+from app.models.listing_proof import ProofType
 from app.models.listing import Listing, ListingState
 from app.crud import listing as listing_crud
 from app.schemas.listing import (
@@ -19,6 +21,8 @@ from app.schemas.listing import (
 )
 from app.core.events import AuditLogger
 from app.core.config import settings
+from app.core.storage import StorageError, blob_response, get_storage
+from app.utils.file_validator import FileValidator
 from app.utils.request_utils import get_client_ip, get_user_agent
 
 router = APIRouter()
@@ -248,6 +252,120 @@ async def add_proof_file(
     return proof
 
 
+@router.post("/{listing_id}/proofs/upload", response_model=ProofFileResponse, status_code=status.HTTP_201_CREATED)
+async def upload_proof_file(
+    listing_id: int,
+    proof_type: ProofType = Form(...),
+    file: UploadFile = File(...),
+    description: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller)
+):
+    """
+    Upload a proof file into blob storage.
+    Content is stored once per SHA-256; re-uploading the same file to the
+    same listing returns the existing proof.
+    """
+    listing = listing_crud.get_listing_by_id(db, listing_id)
+    
+    if not listing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Listing not found"
+        )
+    
+    if listing.seller_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to add proof to this listing"
+        )
+    
+    if listing.state not in [ListingState.DRAFT, ListingState.UNDER_REVIEW]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Can only add proofs to DRAFT or UNDER_REVIEW listings"
+        )
+    
+    file_name = FileValidator.sanitize_file_name(file.filename or "")
+    mime_type = file.content_type
+    for is_valid, error in (
+        FileValidator.validate_file_name(file_name),
+        FileValidator.validate_mime_type(mime_type),
+    ):
+        if not is_valid:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    
+    # Trust the bytes, not the client's Content-Type
+    header = await file.read(FileValidator.SNIFF_BYTES)
+    await file.seek(0)
+    is_valid, error, mime_type = FileValidator.validate_content(header, mime_type)
+    if not is_valid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    
+    max_size = (
+        FileValidator.MAX_IMAGE_SIZE
+        if mime_type in FileValidator.ALLOWED_IMAGE_TYPES
+        else FileValidator.MAX_FILE_SIZE
+    )
+    try:
+        blob = await run_in_threadpool(get_storage().put_stream, file.file, max_size)
+    except StorageError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    is_valid, error = FileValidator.validate_file_size(blob.size, mime_type)
+    if not is_valid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    
+    existing = listing_crud.get_proof_by_storage_key(db, listing_id, blob.key)
+    if existing:
+        return existing
+    
+    return listing_crud.add_proof_file(
+        db=db,
+        listing_id=listing_id,
+        proof_type=proof_type.value,
+        file_url=f"/api/v1/listings/{listing_id}/proofs/files/{blob.key}",
+        file_name=file_name,
+        file_size=blob.size,
+        mime_type=mime_type,
+        description=description,
+        storage_key=blob.key
+    )
+
+
+@router.get("/{listing_id}/proofs/files/{storage_key}")
+async def download_proof_file(
+    listing_id: int,
+    storage_key: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller)
+):
+    """Download an uploaded proof file (listing owner or admin); supports HTTP range requests"""
+    listing = listing_crud.get_listing_by_id(db, listing_id)
+    
+    if not listing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Listing not found"
+        )
+    
+    is_admin = current_user.role in (Role.ADMIN, Role.SUPER_ADMIN)
+    if listing.seller_id != current_user.id and not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view proofs for this listing"
+        )
+    
+    proof = listing_crud.get_proof_by_storage_key(db, listing_id, storage_key)
+    if not proof:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Proof file not found"
+        )
+    
+    return blob_response(proof.storage_key, filename=proof.file_name, media_type=proof.mime_type)
+
+
 @router.get("/{listing_id}/proofs", response_model=List[ProofFileResponse])
 async def get_listing_proofs(
     listing_id: int,
@@ -2,11 +2,12 @@
 Step-locked seller sale flow endpoints.
 Mirrors buyer purchase flow with seller protections.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from sqlalchemy.orm import Session
 from datetime import datetime
+from typing import List
 from app.core.database import get_db
-from app.api.v1.dependencies import get_current_user, require_seller
+from app.api.v1.dependencies import get_current_user, require_seller, transaction_ids_query
 from app.models.user import User
 from app.models.transaction import Transaction, TransactionState
 from app.crud import transaction as transaction_crud
@@ -14,7 +15,10 @@ from app.crud import seller_sale_flow as seller_flow_crud
 from app.schemas.seller_sale_flow import (
     CredentialDeliveryRequest,
     SellerTransactionStatusResponse,
-    SellerDashboardResponse
+    SellerTransactionStatusBatchResponse,
+    SellerDashboardResponse,
+    SellerPayoutAccountRequest,
+    SellerPayoutAccountResponse
 )
 from app.core.events import AuditLogger
 from app.models.audit_log import AuditAction
@@ -25,15 +29,20 @@ router = APIRouter()
 
 @router.get("/sale/dashboard", response_model=SellerDashboardResponse)
 async def get_seller_dashboard(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_seller)
 ):
     """
-    Get seller dashboard with all transactions and earnings.
+    Get seller dashboard with earnings and one page of active and completed transactions.
+    Counts and earnings cover the seller's whole history.
     """
     dashboard_data = seller_flow_crud.get_seller_dashboard_data(
         db=db,
-        seller_id=current_user.id
+        seller_id=current_user.id,
+        skip=skip,
+        limit=limit
     )
     
     # Convert transactions to response format
@@ -51,7 +60,33 @@ async def get_seller_dashboard(
         total_earnings_usd=dashboard_data["total_earnings_usd"],
         pending_earnings_usd=dashboard_data["pending_earnings_usd"],
         active_count=dashboard_data["active_count"],
-        completed_count=dashboard_data["completed_count"]
+        completed_count=dashboard_data["completed_count"],
+        counts_by_state=dashboard_data["counts_by_state"],
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/sale/status", response_model=SellerTransactionStatusBatchResponse)
+async def get_seller_transaction_statuses(
+    transaction_ids: List[int] = Depends(transaction_ids_query),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller)
+):
+    """
+    Get seller status of several transactions in one request (?ids=12,15,31).
+    All transactions and their related rows are loaded with a fixed number of queries.
+    """
+    transactions = transaction_crud.get_transactions_for_status(
+        db=db,
+        transaction_ids=transaction_ids,
+        seller_id=current_user.id
+    )
+    by_id = {t.id: t for t in transactions}
+    
+    return SellerTransactionStatusBatchResponse(
+        transactions=[_transaction_to_seller_status(by_id[i], db) for i in transaction_ids if i in by_id],
+        missing_ids=[i for i in transaction_ids if i not in by_id]
     )
 
 
@@ -193,6 +228,73 @@ async def check_can_deliver_credentials(
         )
 
 
+@router.get("/sale/payout-account", response_model=SellerPayoutAccountResponse)
+async def get_payout_account(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller)
+):
+    """
+    Get where seller payouts are sent.
+    """
+    account = seller_flow_crud.get_payout_account(db=db, seller_id=current_user.id)
+    
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No payout account configured"
+        )
+    
+    return _payout_account_response(account)
+
+
+@router.put("/sale/payout-account", response_model=SellerPayoutAccountResponse)
+async def set_payout_account(
+    account_data: SellerPayoutAccountRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_seller)
+):
+    """
+    Set where seller payouts are sent.
+    Required before the payout engine can pay out completed sales.
+    """
+    account = seller_flow_crud.upsert_payout_account(
+        db=db,
+        seller_id=current_user.id,
+        recipient_type=account_data.recipient_type,
+        account_name=account_data.account_name,
+        account_number=account_data.account_number,
+        bank_code=account_data.bank_code
+    )
+    
+    AuditLogger.log_event(
+        db=db,
+        action=AuditAction.PROFILE_UPDATED,
+        user_id=current_user.id,
+        ip_address=get_client_ip(request),
+        details={
+            "payout_account_updated": True,
+            "recipient_type": account.recipient_type,
+            "bank_code": account.bank_code
+        },
+        success=True
+    )
+    
+    return _payout_account_response(account)
+
+
+def _payout_account_response(account) -> SellerPayoutAccountResponse:
+    """Convert payout account to response (account number masked)"""
+    return SellerPayoutAccountResponse(
+        recipient_type=account.recipient_type,
+        account_name=account.account_name,
+        account_number=f"****{account.account_number[-4:]}",
+        bank_code=account.bank_code,
+        currency=account.currency,
+        recipient_registered=account.paystack_recipient_code is not None
+    )
+
+
 def _transaction_to_seller_status(transaction: Transaction, db: Session) -> SellerTransactionStatusResponse:
     """Convert transaction to seller status response"""
     # Check if credentials delivered
@@ -201,7 +303,7 @@ def _transaction_to_seller_status(transaction: Transaction, db: Session) -> Sell
     if transaction.listing and transaction.listing.credentials:
         credentials_delivered = transaction.listing.credentials.revealed_at is not None
         if transaction.listing.credentials.revealed_at:
-            credentials_delivered_at = transaction.listing.credentials.revealed_at.isoformat()
+            credentials_delivered_at = transaction.listing.credentials.revealed_at
     
     # Check if can deliver credentials
     can_deliver, delivery_reason = seller_flow_crud.can_deliver_credentials(db, transaction)
@@ -209,7 +311,7 @@ def _transaction_to_seller_status(transaction: Transaction, db: Session) -> Sell
     # Get verification deadline from temporary access
     verification_deadline = None
     if transaction.temporary_access and transaction.temporary_access.access_expires_at:
-        verification_deadline = transaction.temporary_access.access_expires_at.isoformat()
+        verification_deadline = transaction.temporary_access.access_expires_at
     elif transaction.verification_deadline:
         verification_deadline = transaction.verification_deadline
     
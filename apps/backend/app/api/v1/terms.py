@@ -1,41 +1,58 @@
 """
 Terms of Service API endpoint.
+
+Responses are pre-serialized blobs from the terms bundle (built at startup);
+nothing is rendered or validated per request.
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import Response
 from typing import Optional
-from app.core.terms_of_service import TermsOfService
+from app.core.terms_of_service import TermsBlob, get_terms_bundle
 from app.schemas.terms import TermsResponse
+from app.utils.request_utils import cached_bytes_response
 
 router = APIRouter()
 
+# Versioned URLs never change; the current version may change on deploy
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+CURRENT_CACHE = "public, max-age=3600"
+
+
+def _terms_response(request: Request, blob: Optional[TermsBlob], version: Optional[str], media_type: str) -> Response:
+    if blob is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Terms of Service version {version} not found"
+        )
+    cache_control = IMMUTABLE_CACHE if version else CURRENT_CACHE
+    return cached_bytes_response(request, blob.body, blob.etag, cache_control, media_type)
+
 
 @router.get("/terms", response_model=TermsResponse)
-async def get_terms_of_service(version: Optional[str] = None):
+async def get_terms_of_service(request: Request, version: Optional[str] = None):
     """
     Get Terms of Service.
     
     Returns the current Terms of Service, or a specific version if requested.
     """
-    try:
-        terms_data = TermsOfService.get_terms(version=version)
-        return TermsResponse(**terms_data)
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve terms of service: {str(e)}"
-        )
+    return _terms_response(request, get_terms_bundle().get_json(version), version, "application/json")
+
+
+@router.get("/terms/html")
+async def get_terms_of_service_html(request: Request, version: Optional[str] = None):
+    """
+    Get Terms of Service rendered as HTML.
+    """
+    return _terms_response(request, get_terms_bundle().get_html(version), version, "text/html; charset=utf-8")
 
 
 @router.get("/terms/platform-role")
-async def get_platform_role_clause():
+async def get_platform_role_clause(request: Request):
     """
     Get the platform role clause (for contracts and agreements).
     
     Returns the platform role acknowledgment clause that should be included
     in purchase contracts and seller agreements.
     """
-    return {
-        "clause": TermsOfService.get_platform_role_clause(),
-        "version": TermsOfService.CURRENT_VERSION
-    }
-
+    blob = get_terms_bundle().platform_role
+    return cached_bytes_response(request, blob.body, blob.etag, CURRENT_CACHE)
@@ -2,11 +2,14 @@
 Transaction API endpoints for buyers.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
+import asyncio
+import json
 from app.core.database import get_db
 from app.api.v1.dependencies import get_current_user, require_buyer
-from app.models.user import User
+from app.models.user import User, Role
 from app.models.listing import ListingState
 from app.models.transaction import TransactionState
 from app.crud import transaction as transaction_crud, listing as listing_crud
@@ -18,6 +21,8 @@ from app.models.buyer_confirmation import ConfirmationStage
 from app.payment.services.paystack import PaystackService
 from app.core.events import AuditLogger
 from app.core.config import settings
+from app.core.event_broker import SubscriberLimitReached, transaction_event_broker
+from app.core.state_machine import TERMINAL_STATES
 from app.utils.request_utils import get_client_ip
 import secrets
 import string
@@ -63,14 +68,6 @@ async def initiate_purchase(
             detail="Only approved listings can be purchased"
         )
     
-    # Check if listing already has a transaction
-    existing_transaction = transaction_crud.get_transaction_by_listing_id(db, transaction_data.listing_id)
-    if existing_transaction:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Listing already has an active transaction"
-        )
-    
     # Generate Paystack reference
     paystack_reference = generate_paystack_reference()
     
@@ -196,6 +193,89 @@ async def get_transaction(
     return TransactionDetailResponse.model_validate(transaction)
 
 
+@router.get("/{transaction_id}/events")
+async def stream_transaction_events(
+    transaction_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of one transaction's state changes (buyer, seller or admin).
+    
+    Starts with a `snapshot` event of the current state, then one `transition` event
+    per change. Idle streams get a `: heartbeat` comment every SSE_HEARTBEAT_SECONDS.
+    The stream ends when the transaction reaches a terminal state (or after
+    SSE_MAX_STREAM_SECONDS, when EventSource reconnects by itself).
+    A `resync` event means events may have been missed: refetch the status.
+    """
+    transaction = transaction_crud.get_transaction_by_id(db, transaction_id)
+    
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+    
+    if current_user.id not in (transaction.buyer_id, transaction.seller_id) and current_user.role not in (Role.ADMIN, Role.SUPER_ADMIN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this transaction"
+        )
+    
+    try:
+        subscription = transaction_event_broker.subscribe(transaction_id)
+    except SubscriberLimitReached as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "30"}
+        )
+    
+    # Read the snapshot after subscribing so no change falls in between, then give
+    # the connection back to the pool: the stream may stay open for an hour
+    db.refresh(transaction)
+    snapshot = {
+        "type": "snapshot",
+        "transaction_id": transaction.id,
+        "state": transaction.state.value,
+        "current_step": transaction.get_current_step(),
+    }
+    db.close()
+    
+    return StreamingResponse(
+        _event_stream(subscription, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: dict) -> str:
+    """Format one event for the text/event-stream wire format"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def _event_stream(subscription, snapshot: dict):
+    """Yield the snapshot, then events and heartbeats until the transaction closes"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n" + _sse(snapshot)
+        if TransactionState(snapshot["state"]) in TERMINAL_STATES:
+            return
+        
+        while loop.time() < deadline:
+            event = await subscription.next_event(settings.SSE_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ": heartbeat\n\n"
+                continue
+            yield _sse(event)
+            if event.get("to_state") and TransactionState(event["to_state"]) in TERMINAL_STATES:
+                return
+    finally:
+        # Also runs when the client disconnects (the response task is cancelled)
+        transaction_event_broker.unsubscribe(subscription)
+
+
 @router.post("/{transaction_id}/confirm-access", response_model=TransactionResponse)
 async def confirm_access(
     transaction_id: int,
@@ -282,18 +362,15 @@ async def confirm_access(
         transaction.payout_amount_usd = payout_amount_usd
         transaction.payout_reference = capture_reference  # Placeholder
         
-        # Update transaction state to COMPLETED
+        # Update transaction state to COMPLETED (the listing is marked SOLD by the state machine)
         transaction = transaction_crud.update_transaction_state(
             db=db,
             transaction=transaction,
-            new_state=TransactionState.COMPLETED
+            new_state=TransactionState.COMPLETED,
+            actor_id=current_user.id,
+            reason="Buyer confirmed access"
         )
         
-        # Mark listing as SOLD
-        listing.state = ListingState.SOLD
-        db.commit()
-        db.refresh(transaction)
-        
         # Log event
         ip_address = get_client_ip(request)
         AuditLogger.log_event(
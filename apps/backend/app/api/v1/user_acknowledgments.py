@@ -1,23 +1,55 @@
 """
 User legal document acknowledgment endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.config import settings
+from app.core.legal_compliance import DOCUMENT_TYPE_BITS
 from app.core.database import get_db
 from app.api.v1.dependencies import get_current_user
 from app.models.user import User
-from app.models.legal_document import DocumentType
+from app.models.legal_document import DocumentType, LegalDocument
 from app.crud import user_legal_acknowledgment as acknowledgment_crud
 from app.crud import legal_document as legal_document_crud
-from app.schemas.legal_document import UserAcknowledgmentRequest, UserAcknowledgmentResponse
-from app.core.events import AuditLogger
-from app.models.audit_log import AuditAction
+from app.schemas.legal_document import (
+    UserAcknowledgmentRequest,
+    UserAcknowledgmentBatchRequest,
+    UserAcknowledgmentResponse,
+    ComplianceStatusResponse,
+    DocumentAcknowledgmentStatus,
+    CurrentDocumentSummary
+)
 from app.utils.request_utils import get_client_ip, get_user_agent
 
 router = APIRouter()
 
 
+def _validate_signature_name(signed_by_name: str, current_user: User) -> str:
+    """Signature name must match the user's registered full name"""
+    signed_name = signed_by_name.strip()
+    user_full_name = (current_user.full_name or "").strip()
+    
+    if user_full_name and signed_name.lower() != user_full_name.lower():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Signature name must match your registered full name. Expected: {user_full_name}, Provided: {signed_name}"
+        )
+    return signed_name
+
+
+def _acknowledgment_response(acknowledgment, document: LegalDocument) -> UserAcknowledgmentResponse:
+    return UserAcknowledgmentResponse(
+        user_id=acknowledgment.user_id,
+        document_id=document.id,
+        acknowledged_at=acknowledgment.acknowledged_at,
+        document_version=document.version,
+        document_title=document.title,
+        signed_by_name=acknowledgment.signed_by_name,
+        signature_hash=acknowledgment.signature_hash
+    )
+
+
 @router.post("/acknowledge", response_model=UserAcknowledgmentResponse)
 async def acknowledge_legal_document(
     request: Request,
@@ -38,60 +70,60 @@ async def acknowledge_legal_document(
         )
     
     # Validate signature name matches user profile
-    signed_name = acknowledgment_data.signed_by_name.strip()
-    user_full_name = (current_user.full_name or "").strip()
+    signed_name = _validate_signature_name(acknowledgment_data.signed_by_name, current_user)
     
-    if user_full_name and signed_name.lower() != user_full_name.lower():
+    # Sign and record the acknowledgment (with its audit entry) in one transaction
+    acknowledgment = acknowledgment_crud.acknowledge_documents(
+        db=db,
+        user_id=current_user.id,
+        documents=[document],
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        signed_by_name=signed_name
+    )[0]
+    
+    return _acknowledgment_response(acknowledgment, document)
+
+
+@router.post("/acknowledge/batch", response_model=List[UserAcknowledgmentResponse])
+async def acknowledge_legal_documents(
+    request: Request,
+    acknowledgment_data: UserAcknowledgmentBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Acknowledge several legal documents with one signature (signup and
+    purchase gates). All acknowledgments and their audit entries are
+    written in a single transaction.
+    """
+    document_ids = list(dict.fromkeys(acknowledgment_data.document_ids))
+    documents = {
+        document.id: document
+        for document in db.query(LegalDocument).filter(LegalDocument.id.in_(document_ids)).all()
+    }
+    missing = [document_id for document_id in document_ids if document_id not in documents]
+    if missing:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Signature name must match your registered full name. Expected: {user_full_name}, Provided: {signed_name}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Legal documents not found: {missing}"
         )
     
-    # Generate signature hash
-    import hashlib
-    from datetime import datetime
-    signature_string = f"{signed_name}:{current_user.id}:{acknowledgment_data.document_id}:{document.version}:{datetime.utcnow().isoformat()}"
-    signature_hash = hashlib.sha256(signature_string.encode('utf-8')).hexdigest()
+    signed_name = _validate_signature_name(acknowledgment_data.signed_by_name, current_user)
     
-    # Create acknowledgment
-    ip_address = get_client_ip(request)
-    user_agent = get_user_agent(request)
-    
-    acknowledgment = acknowledgment_crud.create_user_acknowledgment(
+    acknowledgments = acknowledgment_crud.acknowledge_documents(
         db=db,
         user_id=current_user.id,
-        document_id=acknowledgment_data.document_id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        signed_by_name=signed_name,
-        signature_hash=signature_hash
+        documents=[documents[document_id] for document_id in document_ids],
+        ip_address=get_client_ip(request),
+        user_agent=get_user_agent(request),
+        signed_by_name=signed_name
     )
     
-    # Log event
-    AuditLogger.log_event(
-        db=db,
-        action=AuditAction.LEGAL_DOCUMENT_ACKNOWLEDGED,
-        user_id=current_user.id,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        details={
-            "document_id": document.id,
-            "document_type": document.document_type.value,
-            "document_version": document.version,
-            "title": document.title
-        },
-        success=True
-    )
-    
-    return UserAcknowledgmentResponse(
-        user_id=current_user.id,
-        document_id=document.id,
-        acknowledged_at=acknowledgment.acknowledged_at,
-        document_version=document.version,
-        document_title=document.title,
-        signed_by_name=acknowledgment.signed_by_name,
-        signature_hash=acknowledgment.signature_hash
-    )
+    return [
+        _acknowledgment_response(acknowledgment, documents[acknowledgment.document_id])
+        for acknowledgment in acknowledgments
+    ]
 
 
 @router.get("/check/{document_type}")
@@ -110,7 +142,8 @@ async def check_acknowledgment_status(
         document_type=document_type.value
     )
     
-    current_doc = legal_document_crud.get_current_document_by_type(db, document_type)
+    catalog, _ = acknowledgment_crud.get_user_compliance(db, current_user.id)
+    current_doc = catalog.get(document_type)
     
     return {
         "has_acknowledged": has_acknowledged,
@@ -121,3 +154,36 @@ async def check_acknowledgment_status(
         } if current_doc else None
     }
 
+
+@router.get("/status", response_model=ComplianceStatusResponse)
+async def get_compliance_status(
+    document_types: Optional[List[DocumentType]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Acknowledgment status of several document types in one call.
+    Defaults to LEGAL_REQUIRED_DOCUMENT_TYPES. Types with no published
+    document are reported but never pending.
+    """
+    requested = document_types or [DocumentType(t) for t in settings.LEGAL_REQUIRED_DOCUMENT_TYPES]
+    catalog, acknowledged_mask = acknowledgment_crud.get_user_compliance(db, current_user.id)
+    
+    documents = []
+    pending = []
+    for document_type in dict.fromkeys(requested):
+        current = catalog.get(document_type)
+        has_acknowledged = current is not None and bool(acknowledged_mask & DOCUMENT_TYPE_BITS[document_type])
+        if current is not None and not has_acknowledged:
+            pending.append(document_type)
+        documents.append(DocumentAcknowledgmentStatus(
+            document_type=document_type,
+            has_acknowledged=has_acknowledged,
+            current_document=CurrentDocumentSummary(**current._asdict()) if current else None
+        ))
+    
+    return ComplianceStatusResponse(
+        all_acknowledged=not pending,
+        pending=pending,
+        documents=documents
+    )
@@ -2,11 +2,14 @@
 Caching utilities for performance optimization.
 """
 from functools import wraps
-from typing import Callable, Any, Optional
+from typing import Callable, Any, Optional, Dict
 from datetime import timedelta
+from time import monotonic
 import hashlib
 import json
 import logging
+import threading
+from app.core.metrics import CACHE_REQUESTS
 
 logger = logging.getLogger(__name__)
 
@@ -105,3 +108,123 @@ def get_cache_stats() -> dict:
         'expired_entries': expired_entries,
     }
 
+
+
+class _Flight:
+    """An in-progress load shared by every caller waiting on the same key"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CoalescingCache:
+    """
+    Thread-safe TTL cache with request coalescing (single-flight).
+    
+    Concurrent get_or_load() calls for the same key share one loader call.
+    Only results accepted by `should_cache` are kept for `ttl_seconds`;
+    everything else is returned to the waiting callers but not stored.
+    
+    Usage:
+        verify_cache = CoalescingCache("paystack_verify", ttl_seconds=30,
+                                       should_cache=lambda r: r["status"] == "success")
+        result = verify_cache.get_or_load(reference, lambda: fetch(reference))
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        max_entries: int = 10000
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.should_cache = should_cache or (lambda result: True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, tuple[Any, float]] = {}
+        self._in_flight: Dict[Any, _Flight] = {}
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+    
+    def get_or_load(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, joining or starting a load if needed"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if monotonic() < entry[1]:
+                    self._count("hits")
+                    return entry[0]
+                del self._entries[key]
+            
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self._count("coalesced")
+                leader = False
+            else:
+                self._count("misses")
+                flight = _Flight()
+                self._in_flight[key] = flight
+                leader = True
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._counters["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if flight.error is None and self.should_cache(flight.result):
+                    if len(self._entries) >= self.max_entries:
+                        self._evict_locked()
+                    self._entries[key] = (flight.result, monotonic() + self.ttl_seconds)
+            flight.done.set()
+        
+        return flight.result
+    
+    def invalidate(self, key: Any = None) -> None:
+        """Drop one key, or every entry when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+    
+    def stats(self) -> dict:
+        """Hit rate and number of upstream calls saved by caching and coalescing"""
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["hits"] + counters["misses"] + counters["coalesced"]
+        saved = counters["hits"] + counters["coalesced"]
+        return {
+            **counters,
+            "entries": entries,
+            "calls_saved": saved,
+            "hit_rate": round(saved / lookups, 4) if lookups else 0.0,
+        }
+    
+    def _count(self, result: str) -> None:
+        self._counters[result] += 1
+        CACHE_REQUESTS.labels(cache=self.name, result=result).inc()
+    
+    def _evict_locked(self) -> None:
+        now = monotonic()
+        expired = [k for k, (_, expiry) in self._entries.items() if expiry <= now]
+        for k in expired:
+            del self._entries[k]
+        if len(self._entries) >= self.max_entries:
+            # Drop the entry closest to expiry
+            oldest = min(self._entries, key=lambda k: self._entries[k][1])
+            del self._entries[oldest]
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import List
+from typing import Dict, List
 import os
 
 
@@ -97,12 +97,28 @@ class Settings(BaseSettings):
         env="PAYSTACK_CURRENCY",
         description="Paystack currency code - KES (Kenyan Shilling). KSH and KES are the same currency."
     )
+    PAYSTACK_BASE_URL: str = Field(
+        default="https://api.paystack.co",
+        env="PAYSTACK_BASE_URL",
+        description="Paystack API base URL (point at the local simulator for load tests)"
+    )
     FRONTEND_URL: str = Field(
         default="http://localhost:3000",
         env="FRONTEND_URL",
         description="Frontend URL for callback redirects"
     )
-    
+
+    # Paystack HTTP client (connection pool, timeouts, retries, circuit breaker)
+    PAYSTACK_HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.05
+    PAYSTACK_HTTP_READ_TIMEOUT_SECONDS: float = 15.0
+    PAYSTACK_HTTP_POOL_SIZE: int = 20  # Keep-alive connections per worker
+    PAYSTACK_HTTP_MAX_RETRIES: int = 3  # Retries for idempotent calls only
+    PAYSTACK_HTTP_BACKOFF_BASE_SECONDS: float = 0.25
+    PAYSTACK_HTTP_BACKOFF_MAX_SECONDS: float = 4.0
+    PAYSTACK_CIRCUIT_FAILURE_THRESHOLD: int = 5  # Consecutive failures before opening
+    PAYSTACK_CIRCUIT_RESET_SECONDS: float = 30.0  # Open -> half-open cool-down
+    PAYSTACK_VERIFY_CACHE_TTL_SECONDS: float = 30.0  # Cache for terminal verify results
+
     # M-Pesa (for future)
     MPESA_CONSUMER_KEY: str = ""
     MPESA_CONSUMER_SECRET: str = ""
@@ -111,10 +127,81 @@ class Settings(BaseSettings):
     # Platform Commission
     PLATFORM_COMMISSION_PERCENT: int = 10  # 10% default commission
     
+    # Seller payouts (batched Paystack bulk transfers)
+    PAYOUT_BATCH_SIZE: int = 500  # Transactions claimed per scheduler run
+    PAYOUT_BULK_CHUNK_SIZE: int = 100  # Transfers per bulk request (Paystack max is 100)
+    PAYOUT_MAX_ATTEMPTS: int = 3  # Failed transfers are retried up to this many times
+    PAYOUT_SEND_LEASE_SECONDS: float = 600.0  # Transfers being sent are skipped by other runs this long
+    PAYOUT_INTERVAL_SECONDS: float = 60.0  # Scheduler loop interval
+    
+    # Deadline scheduler (temporary access / verification window expiry)
+    DEADLINE_SCHEDULER_BATCH_SIZE: int = 500  # Due jobs claimed per run
+    DEADLINE_SCHEDULER_INTERVAL_SECONDS: float = 30.0  # Scheduler loop interval
+    DEADLINE_JOB_MAX_ATTEMPTS: int = 5  # Jobs whose run keeps failing are parked as failed
+    DEADLINE_TEMPORARY_ACCESS_ACTION: str = "escalate"  # refund or escalate
+    DEADLINE_VERIFICATION_ACTION: str = "escalate"  # advance, refund or escalate
+    
+    # Transactional outbox dispatcher (emails and other side effects of state changes)
+    OUTBOX_BATCH_SIZE: int = 100  # Messages claimed per run
+    OUTBOX_INTERVAL_SECONDS: float = 2.0  # Dispatcher loop interval when idle
+    OUTBOX_MAX_ATTEMPTS: int = 8  # Messages that keep failing are parked as failed
+    OUTBOX_RETRY_BASE_SECONDS: float = 30.0  # Backoff after the first failure, doubled per attempt
+    OUTBOX_RETRY_MAX_SECONDS: float = 3600.0  # Backoff cap
+    
+    # Batch status endpoints (/purchase/status, /sale/status)
+    TRANSACTION_STATUS_BATCH_MAX_IDS: int = 100  # Transaction ids accepted per request
+    
+    # Transaction events over Server-Sent Events (GET /transactions/{id}/events)
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Comment line sent on idle streams (keeps proxies from closing them)
+    SSE_QUEUE_SIZE: int = 16  # Events buffered per client; the oldest is dropped beyond this
+    SSE_MAX_CONNECTIONS: int = 10000  # Open streams per API worker; more are rejected (503)
+    SSE_MAX_STREAM_SECONDS: float = 3600.0  # Streams end after this; EventSource reconnects on its own
+    SSE_RETRY_MILLISECONDS: int = 3000  # Reconnect delay suggested to clients
+    SSE_NOTIFY_CHANNEL: str = "transaction_events"  # PostgreSQL LISTEN/NOTIFY channel
+    
+    # Payment reconciliation
+    RECONCILIATION_CHUNK_SIZE: int = 1000  # Transactions per keyset page
+    RECONCILIATION_CONCURRENCY: int = 8  # Parallel Paystack verify calls
+    RECONCILIATION_GRACE_MINUTES: int = 30  # Skip transactions younger than this (webhooks in flight)
+    
+    # Contract rendering worker pool
+    CONTRACT_RENDER_WORKERS: int = 2  # Worker processes per API process
+    CONTRACT_RENDER_QUEUE_SIZE: int = 100  # Jobs waiting beyond this are rejected (503)
+    CONTRACT_RENDER_TIMEOUT_SECONDS: float = 30.0  # Per-render limit; the worker is killed after this
+    CONTRACT_RENDER_JOB_STALE_SECONDS: int = 300  # Active jobs older than this are treated as lost
+    CONTRACT_RENDER_START_METHOD: str = "spawn"  # multiprocessing start method for workers
+    
+    # Public legal documents
+    LEGAL_DOCUMENT_CACHE_TTL_SECONDS: int = 3600  # In-process cache of rendered documents (keyed by content hash)
+    LEGAL_DOCUMENT_MAX_AGE_SECONDS: int = 300  # Cache-Control max-age sent to clients
+    LEGAL_REQUIRED_DOCUMENT_TYPES: List[str] = [
+        "terms_of_service", "privacy_policy", "buyer_agreement", "seller_agreement"
+    ]  # Checked by /acknowledgments/status when no types are given
+    LEGAL_COMPLIANCE_CACHE_TTL_SECONDS: int = 300  # Per-user compliance bitmap lifetime
+    LEGAL_CAMPAIGN_CHUNK_SIZE: int = 1000  # Users marked and notified per transaction
+    LEGAL_CAMPAIGN_USERS_PER_SECOND: float = 500.0  # Notification rate limit
+    LEGAL_CAMPAIGN_STALE_SECONDS: int = 300  # A running campaign without a heartbeat this long can be taken over
+    
     # Encryption
     ENCRYPTION_PEPPER: str = ""  # Server-side pepper for credential encryption
     
+    # Signatures on acknowledgments and ownership agreements (keyed BLAKE2b)
+    SIGNATURE_KEY: str = ""  # Falls back to JWT_SECRET_KEY when empty
+    SIGNATURE_KEY_ID: str = "k1"  # Stored with each signature; change together with SIGNATURE_KEY
+    SIGNATURE_RETIRED_KEYS: Dict[str, str] = {}  # key_id -> secret, still accepted when verifying
+    SIGNATURE_VERIFY_WORKERS: int = -1  # Bulk verifier processes (-1 = CPU count, 0 = inline)
+    SIGNATURE_VERIFY_CHUNK_SIZE: int = 5000  # Rows per keyset page / worker task
+    
+    # Readiness probe (/api/v1/ready), evaluated in the background every READINESS_SAMPLE_SECONDS
+    READINESS_SAMPLE_SECONDS: float = 0.5  # Loop lag is measured as the overshoot of this sleep
+    READINESS_MAX_LOOP_LAG_SECONDS: float = 0.25  # Not ready while the event loop is this late
+    READINESS_POOL_MAX_UTILIZATION: float = 0.9  # Not ready at this share of pool_size + max_overflow checked out
+    READINESS_QUEUE_MAX_UTILIZATION: float = 0.9  # Not ready at this share of the contract render queue
+    READINESS_STALE_SECONDS: float = 5.0  # Not ready if the last sample is older than this
+    
     # Observability
+    METRICS_BUSINESS_REFRESH_SECONDS: float = 30.0  # Business gauges (GROUP BY per table) refresh interval
+    METRICS_POOL_SAMPLE_SECONDS: float = 5.0  # DB pool gauges sampling interval
     SENTRY_DSN: str = ""  # Sentry DSN for error tracking
     ENABLE_SENTRY: bool = False
     
@@ -127,6 +214,12 @@ class Settings(BaseSettings):
     AWS_S3_BUCKET: str = ""
     AWS_REGION: str = "us-east-1"
     
+    # Content-addressed blob storage (contract PDFs, proof files)
+    STORAGE_BACKEND: str = "filesystem"  # "filesystem" or "s3"
+    STORAGE_ROOT: str = "./storage/blobs"  # Filesystem backend root
+    STORAGE_X_ACCEL_REDIRECT_PREFIX: str = ""  # e.g. "/_blobs" to let nginx sendfile() downloads
+    S3_ENDPOINT_URL: str = ""  # S3-compatible endpoint (MinIO/LocalStack); empty for AWS
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,350 @@
+"""
+Background contract rendering.
+
+WeasyPrint layout is CPU-bound and takes hundreds of milliseconds, so contract
+PDFs are rendered in a process pool instead of inside the request:
+
+    POST /contracts/{id}/generate  -> job row (queued) + in-process queue
+    consumer task                  -> worker process renders the PDF
+    on success                     -> PDF stored, Contract row created, job succeeded
+    GET /contracts/jobs/{job_id}   -> poll (optionally long-poll with ?wait=)
+
+Workers are warmed once (WeasyPrint import, font cache) by the pool initializer.
+Concurrency is capped at CONTRACT_RENDER_WORKERS, the queue at
+CONTRACT_RENDER_QUEUE_SIZE, and every render has CONTRACT_RENDER_TIMEOUT_SECONDS.
+A worker that hangs or crashes only fails its own job: the pool is replaced and
+jobs caught in the broken pool are retried once.
+"""
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import (
+    CONTRACT_RENDER_DURATION,
+    CONTRACT_RENDER_IN_FLIGHT,
+    CONTRACT_RENDER_JOBS,
+    CONTRACT_RENDER_QUEUE_DEPTH,
+)
+from app.models.contract_render_job import ContractJobStatus, ContractRenderJob
+
+logger = logging.getLogger(__name__)
+
+RenderResult = Tuple[bytes, str, float]  # (pdf_bytes, contract_hash, render_seconds)
+
+
+class RenderQueueFull(Exception):
+    """Raised when the render queue is at capacity"""
+    pass
+
+
+def _warm_worker() -> None:
+    """Process initializer: load WeasyPrint and its font cache once per worker"""
+    try:
+        from weasyprint import HTML
+        HTML(string="<p>warm-up</p>").write_pdf()
+    except Exception:
+        # Missing system libraries surface as a job error on the first real render
+        pass
+
+
+def render_contract(payload: Dict[str, Any]) -> RenderResult:
+    """Runs in a worker process"""
+    from app.core.pdf_generator import PDFContractGenerator
+
+    started = time.perf_counter()
+    pdf_bytes, contract_hash = PDFContractGenerator.generate_contract(**payload)
+    return pdf_bytes, contract_hash, time.perf_counter() - started
+
+
+class ContractRenderPool:
+    """Bounded asyncio queue in front of a ProcessPoolExecutor"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        timeout: Optional[float] = None,
+        render_fn: Callable[[Dict[str, Any]], RenderResult] = render_contract,
+        on_start: Optional[Callable[[str], None]] = None,
+        on_finish: Optional[Callable[[str, Optional[RenderResult], Optional[str]], None]] = None,
+        initializer: Optional[Callable[[], None]] = _warm_worker,
+    ):
+        self.max_workers = max_workers or settings.CONTRACT_RENDER_WORKERS
+        self.max_queue = max_queue or settings.CONTRACT_RENDER_QUEUE_SIZE
+        self.timeout = timeout or settings.CONTRACT_RENDER_TIMEOUT_SECONDS
+        self.render_fn = render_fn
+        self.on_start = on_start or mark_job_running
+        self.on_finish = on_finish or store_job_result
+        self.initializer = initializer
+        self._queue: Optional[asyncio.Queue] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._consumers: list = []
+        self._done: Dict[str, asyncio.Event] = {}
+        self.stats = {"succeeded": 0, "failed": 0, "timeouts": 0, "crashes": 0, "rejected": 0, "pool_restarts": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        context = multiprocessing.get_context(settings.CONTRACT_RENDER_START_METHOD)
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context, initializer=self.initializer)
+
+    async def start(self) -> None:
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = self._new_executor()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.max_workers)]
+
+    async def stop(self) -> None:
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._consumers = []
+        self._executor = None
+        self._queue = None
+        CONTRACT_RENDER_QUEUE_DEPTH.set(0)
+
+    def submit(self, job_id: str, payload: Dict[str, Any]) -> None:
+        """Queue a job; raises RenderQueueFull when at capacity"""
+        if self._queue is None:
+            raise RuntimeError("Contract render pool is not running")
+        try:
+            self._queue.put_nowait((job_id, payload))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            CONTRACT_RENDER_JOBS.labels(result="rejected").inc()
+            raise RenderQueueFull(f"Contract render queue is full ({self.max_queue} jobs)")
+        self._done[job_id] = asyncio.Event()
+        CONTRACT_RENDER_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def wait(self, job_id: str, timeout: float) -> bool:
+        """Wait for a job queued in this process; False if unknown here or still running"""
+        event = self._done.get(job_id)
+        if event is None:
+            return False
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "workers": self.max_workers,
+            "queue_depth": self.queue_depth(),
+            "queue_capacity": self.max_queue,
+            "timeout_seconds": self.timeout,
+            **self.stats,
+        }
+
+    def _recycle(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a pool whose worker hung or died (no-op if already replaced)"""
+        if self._executor is not broken:
+            return
+        for process in list((getattr(broken, "_processes", None) or {}).values()):
+            process.kill()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._new_executor()
+        self.stats["pool_restarts"] += 1
+
+    async def _render(self, payload: Dict[str, Any]) -> Tuple[Optional[RenderResult], Optional[str], str]:
+        """Returns (result, error, outcome)"""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, self.render_fn, payload), self.timeout
+                )
+                return result, None, "succeeded"
+            except asyncio.TimeoutError:
+                self._recycle(executor)
+                return None, f"Rendering timed out after {self.timeout:g}s", "timeout"
+            except BrokenProcessPool:
+                # The pool may have been broken by another job; retry once on a fresh pool
+                self._recycle(executor)
+                if attempt == 0:
+                    continue
+                return None, "Render worker crashed", "crashed"
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}", "failed"
+        return None, "Render worker crashed", "crashed"
+
+    async def _consume(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id, payload = await self._queue.get()
+            CONTRACT_RENDER_QUEUE_DEPTH.set(self._queue.qsize())
+            CONTRACT_RENDER_IN_FLIGHT.inc()
+            try:
+                await loop.run_in_executor(None, self.on_start, job_id)
+                result, error, outcome = await self._render(payload)
+                if result is not None:
+                    CONTRACT_RENDER_DURATION.observe(result[2])
+                CONTRACT_RENDER_JOBS.labels(result=outcome).inc()
+                if outcome == "succeeded":
+                    self.stats["succeeded"] += 1
+                else:
+                    self.stats["failed"] += 1
+                    if outcome == "timeout":
+                        self.stats["timeouts"] += 1
+                    elif outcome == "crashed":
+                        self.stats["crashes"] += 1
+                await loop.run_in_executor(None, self.on_finish, job_id, result, error)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Contract render job %s failed to complete", job_id)
+            finally:
+                CONTRACT_RENDER_IN_FLIGHT.dec()
+                event = self._done.pop(job_id, None)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
+
+
+def mark_job_running(job_id: str) -> None:
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.query(ContractRenderJob).filter(ContractRenderJob.job_id == job_id).update(
+            {
+                ContractRenderJob.status: ContractJobStatus.RUNNING,
+                ContractRenderJob.started_at: datetime.now(timezone.utc),
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def store_job_result(job_id: str, result: Optional[RenderResult], error: Optional[str]) -> None:
+    """Persist the PDF and Contract row (success) or the error (failure)"""
+    from app.core.database import SessionLocal
+    from app.core.events import AuditLogger
+    from app.core.pdf_generator import PDFContractGenerator
+    from app.crud import transaction as transaction_crud
+    from app.models.audit_log import AuditAction
+    from app.models.contract import Contract
+
+    db = SessionLocal()
+    try:
+        job = db.query(ContractRenderJob).filter(ContractRenderJob.job_id == job_id).first()
+        if job is None:
+            return
+        job.finished_at = datetime.now(timezone.utc)
+        if result is None:
+            job.status = ContractJobStatus.FAILED
+            job.error = error
+            db.commit()
+            return
+
+        pdf_bytes, pdf_hash, render_seconds = result
+        contract = db.query(Contract).filter(Contract.transaction_id == job.transaction_id).first()
+        if contract is None:
+            pdf_url, storage_key = PDFContractGenerator.save_pdf_to_storage(pdf_bytes, job.transaction_id)
+            contract = transaction_crud.create_contract(
+                db=db,
+                transaction_id=job.transaction_id,
+                pdf_hash=pdf_hash,
+                pdf_url=pdf_url,
+                pdf_storage_key=storage_key
+            )
+        job.status = ContractJobStatus.SUCCEEDED
+        job.contract_id = contract.id
+        job.render_ms = int(render_seconds * 1000)
+        db.commit()
+
+        AuditLogger.log_event(
+            db=db,
+            action=AuditAction.CONTRACT_GENERATED,
+            user_id=job.requested_by_id,
+            details={
+                "transaction_id": job.transaction_id,
+                "contract_id": contract.id,
+                "pdf_hash": contract.pdf_hash,
+                "job_id": job_id,
+                "render_ms": job.render_ms
+            },
+            success=True
+        )
+    finally:
+        db.close()
+
+
+def enqueue_contract_job(
+    db: Session,
+    transaction_id: int,
+    requested_by_id: int,
+    payload: Dict[str, Any],
+    pool: Optional[ContractRenderPool] = None,
+) -> ContractRenderJob:
+    """
+    Create (or reuse) a render job for a transaction and queue it.
+
+    An active job for the same transaction is returned instead of queueing a
+    duplicate, unless it is older than CONTRACT_RENDER_JOB_STALE_SECONDS (lost
+    in a restart), in which case it is failed and replaced.
+
+    Raises:
+        RenderQueueFull: If the render queue is at capacity
+    """
+    pool = pool or contract_render_pool
+    active = db.query(ContractRenderJob).filter(
+        ContractRenderJob.transaction_id == transaction_id,
+        ContractRenderJob.status.in_([ContractJobStatus.QUEUED, ContractJobStatus.RUNNING])
+    ).order_by(ContractRenderJob.id.desc()).first()
+
+    if active is not None:
+        created_at = active.created_at
+        if created_at is not None and created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.CONTRACT_RENDER_JOB_STALE_SECONDS)
+        if created_at is None or created_at > stale_before:
+            return active
+        active.status = ContractJobStatus.FAILED
+        active.error = "Job lost (worker restarted)"
+        active.finished_at = datetime.now(timezone.utc)
+
+    job = ContractRenderJob(
+        job_id=str(uuid.uuid4()),
+        transaction_id=transaction_id,
+        requested_by_id=requested_by_id,
+        status=ContractJobStatus.QUEUED
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    try:
+        pool.submit(job.job_id, payload)
+    except RenderQueueFull:
+        job.status = ContractJobStatus.FAILED
+        job.error = "Render queue full"
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        raise
+
+    return job
+
+
+contract_render_pool = ContractRenderPool()
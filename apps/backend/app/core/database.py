@@ -50,3 +50,15 @@ def get_db():
     finally:
         db.close()
 
+
+
+def dialect_insert(db, table):
+    """
+    INSERT construct for the session's dialect, with on_conflict_do_nothing()
+    and on_conflict_do_update(). PostgreSQL in production, SQLite in tests.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(table)
@@ -0,0 +1,247 @@
+"""
+Deadline scheduler for time-boxed transaction steps.
+
+Steps with a deadline schedule a row in scheduled_jobs in the same
+transaction as the state change (see crud/scheduled_job.py):
+    TEMPORARY_ACCESS_GRANTED -> temporary_access_expiry at access_expires_at
+    VERIFICATION_WINDOW      -> verification_deadline at verification_deadline
+
+Each run claims up to batch_size due jobs with FOR UPDATE SKIP LOCKED, fires
+them per kind with one guarded bulk transition (see core/state_machine.py),
+marks them done and commits, all in one short transaction. So:
+- several schedulers can poll at once without firing a job twice;
+- a crash before the commit leaves the jobs pending for the next run;
+- a buyer who acted just before the deadline wins: the guarded UPDATE
+  skips the transaction and the job is recorded as "skipped".
+
+What firing does is configured per kind:
+    advance   VERIFICATION_WINDOW -> OWNERSHIP_AGREEMENT_PENDING (silence counts as verified)
+    refund    -> REFUNDED, listing back to APPROVED, temporary access revoked
+    escalate  -> DISPUTED for an admin to resolve, temporary access revoked
+
+Run it periodically (see scripts/run_deadline_scheduler.py) or trigger a
+single run from the admin API.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import DEADLINE_FIRE_LAG, DEADLINE_JOBS
+from app.core.state_machine import transition_many
+from app.models.scheduled_job import ScheduledJob, ScheduledJobKind, ScheduledJobStatus
+from app.models.temporary_access import TemporaryAccess
+from app.models.transaction import Transaction, TransactionState
+
+logger = logging.getLogger(__name__)
+
+ADVANCE = "advance"
+REFUND = "refund"
+ESCALATE = "escalate"
+
+# State a transaction must still be in for its deadline to fire, and the actions allowed there
+DEADLINE_RULES = {
+    ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY: (TransactionState.TEMPORARY_ACCESS_GRANTED, (REFUND, ESCALATE)),
+    ScheduledJobKind.VERIFICATION_DEADLINE: (TransactionState.VERIFICATION_WINDOW, (ADVANCE, REFUND, ESCALATE)),
+}
+
+NOTES = {
+    ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY: "Temporary access expired before the buyer started verification",
+    ScheduledJobKind.VERIFICATION_DEADLINE: "Verification window closed without a buyer decision",
+}
+
+
+class DeadlineScheduler:
+    """Batched, SKIP LOCKED polling of durable deadline jobs"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        actions: Optional[Dict[ScheduledJobKind, str]] = None,
+    ):
+        self.batch_size = batch_size or settings.DEADLINE_SCHEDULER_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.DEADLINE_JOB_MAX_ATTEMPTS
+        self.actions = actions or {
+            ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY: settings.DEADLINE_TEMPORARY_ACCESS_ACTION,
+            ScheduledJobKind.VERIFICATION_DEADLINE: settings.DEADLINE_VERIFICATION_ACTION,
+        }
+        for kind, action in self.actions.items():
+            if action not in DEADLINE_RULES[kind][1]:
+                raise ValueError(f"Unsupported action '{action}' for {kind.value} deadlines")
+        self._lock = threading.Lock()
+        self._totals = {"runs": 0, "claimed": 0, "fired": 0, "skipped": 0, "errors": 0}
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def run_once(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Fire every due deadline (up to batch_size) in one transaction.
+
+        Returns:
+            Per-run statistics (counts, duration, throughput)
+        """
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        run = {"claimed": 0, "fired": 0, "skipped": 0, "errors": 0}
+
+        jobs = self._claim_jobs(db, now)
+        run["claimed"] = len(jobs)
+        if jobs:
+            try:
+                self._fire_jobs(db, jobs, now, run)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.exception("Deadline run failed; %s jobs stay pending", len(jobs))
+                self._record_failure(db, [job.id for job in jobs], str(e))
+                run.update(fired=0, skipped=0, errors=len(jobs))
+
+        duration = time.perf_counter() - started
+        run["duration_seconds"] = round(duration, 4)
+        run["jobs_per_second"] = round(run["claimed"] / duration, 2) if duration > 0 else 0.0
+        run["finished_at"] = datetime.utcnow().isoformat()
+
+        with self._lock:
+            self._totals["runs"] += 1
+            for key in ("claimed", "fired", "skipped", "errors"):
+                self._totals[key] += run[key]
+            self._last_run = run
+
+        if jobs:
+            logger.info("Deadline run finished: %s", run)
+        return run
+
+    def _claim_jobs(self, db: Session, now: datetime) -> List[ScheduledJob]:
+        """
+        Lock due pending jobs.
+        SKIP LOCKED lets concurrent schedulers take disjoint batches.
+        """
+        return (
+            db.query(ScheduledJob)
+            .filter(
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+                ScheduledJob.due_at <= now,
+            )
+            .order_by(ScheduledJob.due_at, ScheduledJob.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def _fire_jobs(self, db: Session, jobs: List[ScheduledJob], now: datetime, run: Dict[str, Any]) -> None:
+        by_kind: Dict[ScheduledJobKind, List[ScheduledJob]] = defaultdict(list)
+        for job in jobs:
+            by_kind[job.kind].append(job)
+
+        for kind, kind_jobs in by_kind.items():
+            action = self.actions[kind]
+            fired = self._apply(db, kind, action, [job.transaction_id for job in kind_jobs], now)
+            for job in kind_jobs:
+                job.status = ScheduledJobStatus.DONE
+                job.fired_at = now
+                job.attempts += 1
+                job.result = action if job.transaction_id in fired else "skipped"
+                due_at = job.due_at if job.due_at.tzinfo else job.due_at.replace(tzinfo=timezone.utc)
+                DEADLINE_FIRE_LAG.labels(kind=kind.value).observe(max((now - due_at).total_seconds(), 0.0))
+            skipped = len(kind_jobs) - len(fired)
+            run["fired"] += len(fired)
+            run["skipped"] += skipped
+            if fired:
+                DEADLINE_JOBS.labels(kind=kind.value, result=action).inc(len(fired))
+            if skipped:
+                DEADLINE_JOBS.labels(kind=kind.value, result="skipped").inc(skipped)
+
+    def _apply(
+        self,
+        db: Session,
+        kind: ScheduledJobKind,
+        action: str,
+        transaction_ids: List[int],
+        now: datetime,
+    ) -> Set[int]:
+        """Move transactions still in the expected state; returns the ids that moved"""
+        expected_state = DEADLINE_RULES[kind][0]
+        note = f"{NOTES[kind]} ({action}, {now.isoformat()})"
+
+        if action == ADVANCE:
+            to_state = TransactionState.OWNERSHIP_AGREEMENT_PENDING
+            values = {
+                "account_verified": True,
+                "account_verified_at": now,
+                "ownership_agreement_pending_at": now,
+            }
+        elif action == REFUND:
+            # The state machine returns the listing to APPROVED and revokes access
+            to_state = TransactionState.REFUNDED
+            values = {"refunded_at": now}
+        else:
+            to_state = TransactionState.DISPUTED
+            values = {}
+        values["notes"] = func.coalesce(Transaction.notes + "\n", "") + note
+
+        fired = set(transition_many(db, transaction_ids, expected_state, to_state, reason=note, values=values))
+        if fired and action == ESCALATE:
+            # Disputes opened by the buyer keep access; an expired deadline does not
+            db.execute(
+                update(TemporaryAccess)
+                .where(TemporaryAccess.transaction_id.in_(fired))
+                .values(access_revoked=True)
+                .execution_options(synchronize_session=False)
+            )
+        return fired
+
+    def _record_failure(self, db: Session, job_ids: List[int], error: str) -> None:
+        """Count the attempt; jobs that keep failing are parked as FAILED for an admin"""
+        try:
+            db.query(ScheduledJob).filter(
+                ScheduledJob.id.in_(job_ids),
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+            ).update(
+                {
+                    ScheduledJob.attempts: ScheduledJob.attempts + 1,
+                    ScheduledJob.last_error: error[:1000],
+                },
+                synchronize_session=False,
+            )
+            db.query(ScheduledJob).filter(
+                ScheduledJob.id.in_(job_ids),
+                ScheduledJob.status == ScheduledJobStatus.PENDING,
+                ScheduledJob.attempts >= self.max_attempts,
+            ).update({ScheduledJob.status: ScheduledJobStatus.FAILED}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Could not record deadline job failure")
+
+    def stats(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        """Cumulative accounting plus (optionally) current job counts and backlog"""
+        with self._lock:
+            result: Dict[str, Any] = {"totals": dict(self._totals), "last_run": self._last_run}
+        if db is not None:
+            counts = (
+                db.query(ScheduledJob.kind, ScheduledJob.status, func.count(ScheduledJob.id))
+                .group_by(ScheduledJob.kind, ScheduledJob.status)
+                .all()
+            )
+            by_kind: Dict[str, Dict[str, int]] = defaultdict(dict)
+            for kind, status, count in counts:
+                by_kind[getattr(kind, "value", kind)][getattr(status, "value", status)] = count
+            result["jobs_by_kind"] = dict(by_kind)
+            result["overdue"] = (
+                db.query(func.count(ScheduledJob.id))
+                .filter(
+                    ScheduledJob.status == ScheduledJobStatus.PENDING,
+                    ScheduledJob.due_at <= datetime.now(timezone.utc),
+                )
+                .scalar()
+            )
+        return result
+
+
+deadline_scheduler = DeadlineScheduler()
@@ -3,7 +3,8 @@ Email service for sending notifications to users.
 Uses Resend.com API for email delivery.
 """
 import logging
-from typing import Optional
+from html import escape
+from typing import Dict, List, Optional
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -174,3 +175,96 @@ The ESCROW Team
     
     return send_email(user_email, subject, html_content, text_content)
 
+
+
+# Resend's batch endpoint accepts at most 100 messages per call
+EMAIL_BATCH_LIMIT = 100
+
+
+def send_emails_batch(messages: List[Dict[str, str]]) -> int:
+    """
+    Send many emails with Resend's batch API (100 per request).
+    
+    Args:
+        messages: Dicts with "to", "subject", "html" and optional "text"
+    
+    Returns:
+        Number of messages accepted
+    """
+    if not messages:
+        return 0
+    
+    if not settings.RESEND_API_KEY:
+        logger.warning(f"Resend API key not configured. {len(messages)} batched emails would have been sent")
+        return len(messages)
+    
+    try:
+        import resend
+    except ImportError:
+        logger.error("Resend package not installed. Install with: pip install resend")
+        return 0
+    
+    resend.api_key = settings.RESEND_API_KEY
+    sender = f"{settings.RESEND_FROM_NAME} <{settings.RESEND_FROM_EMAIL}>"
+    sent = 0
+    for start in range(0, len(messages), EMAIL_BATCH_LIMIT):
+        chunk = messages[start:start + EMAIL_BATCH_LIMIT]
+        params = [
+            {"from": sender, "to": [m["to"]], "subject": m["subject"], "html": m["html"], **({"text": m["text"]} if m.get("text") else {})}
+            for m in chunk
+        ]
+        try:
+            resend.Batch.send(params)
+            sent += len(chunk)
+        except Exception as e:
+            logger.error(f"Error sending batch of {len(chunk)} emails: {str(e)}")
+    return sent
+
+
+def build_reacknowledgment_email(user_email: str, user_name: str, document_title: str, version: str) -> Dict[str, str]:
+    """Message asking a user to review and accept a newly published legal document"""
+    review_link = f"{settings.FRONTEND_URL}/legal"
+    subject = f"Updated {document_title} - ESCROW"
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <p>Dear {escape(user_name)},</p>
+        <p>We have published version {escape(version)} of our {escape(document_title)}. Please review and accept it to keep using ESCROW.</p>
+        <p><a href="{review_link}" style="display: inline-block; background-color: #007bff; color: #fff; padding: 12px 30px; text-decoration: none; border-radius: 4px; font-weight: bold;">Review {document_title}</a></p>
+        <p style="color: #6c757d; font-size: 12px;">This is an automated message. Please do not reply to this email.</p>
+    </body>
+    </html>
+    """
+    text_content = f"Dear {user_name},\n\nWe have published version {version} of our {document_title}. Please review and accept it: {review_link}\n"
+    return {"to": user_email, "subject": subject, "html": html_content, "text": text_content}
+
+
+# Subject and message of the transaction update email, by state
+TRANSACTION_UPDATE_MESSAGES = {
+    "funds_held": ("Payment received", "The buyer's payment for {title} is held in escrow. Please deliver the account credentials."),
+    "disputed": ("Transaction under review", "The transaction for {title} has been disputed. An admin will review it and contact you."),
+    "refunded": ("Transaction refunded", "The transaction for {title} has been refunded to the buyer."),
+    "cancelled": ("Transaction cancelled", "The transaction for {title} has been cancelled."),
+    "completed": ("Sale completed", "The sale of {title} is complete and your payout has been sent."),
+}
+
+
+def build_transaction_update_email(user_email: str, user_name: str, transaction_id: int, listing_title: str, state: str) -> Dict[str, str]:
+    """Message telling a buyer or seller that their transaction changed state"""
+    title, template = TRANSACTION_UPDATE_MESSAGES[state]
+    link = f"{settings.FRONTEND_URL}/transactions/{transaction_id}"
+    subject = f"{title} - ESCROW"
+    html_content = f"""
+    <!DOCTYPE html>
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <p>Dear {escape(user_name)},</p>
+        <p>{template.format(title=escape(listing_title))}</p>
+        <p><a href="{link}" style="display: inline-block; background-color: #007bff; color: #fff; padding: 12px 30px; text-decoration: none; border-radius: 4px; font-weight: bold;">View transaction</a></p>
+        <p style="color: #6c757d; font-size: 12px;">This is an automated message. Please do not reply to this email.</p>
+    </body>
+    </html>
+    """
+    text_content = f"Dear {user_name},\n\n{template.format(title=listing_title)}\n\nView transaction: {link}\n"
+    return {"to": user_email, "subject": subject, "html": html_content, "text": text_content}
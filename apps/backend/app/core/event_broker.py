@@ -0,0 +1,319 @@
+"""
+Transaction event push for Server-Sent Events.
+
+    transition (any process) --pg_notify, delivered on commit--> LISTEN bridge (every API worker)
+        --> TransactionEventBroker --> bounded queue per subscriber --> GET /transactions/{id}/events
+
+The state machine hook calls pg_notify inside the transition's own database
+transaction. So subscribers only hear about committed changes, and
+transitions made by webhooks, schedulers or another worker reach every API
+worker. Without LISTEN/NOTIFY (SQLite in tests) the hook publishes to the
+local broker after commit instead.
+
+The bridge also carries other notifications on the same channel: events
+whose "type" has a handler registered with notify_bridge.add_handler (e.g.
+legal compliance cache invalidations) go to that handler instead.
+
+Publishers never wait for subscribers. Each subscriber has a small queue.
+When a slow client falls behind, its oldest event is dropped. Every event
+carries the full new state, so the newest one is all a client needs. Idle
+subscribers cost one queue and one waiting task, so a worker can hold
+SSE_MAX_CONNECTIONS of them.
+"""
+import asyncio
+import json
+import logging
+import re
+import select
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import event as sa_event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import SSE_EVENTS, SSE_SUBSCRIBERS
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "transaction_events_pending"
+
+
+class SubscriberLimitReached(Exception):
+    """Raised when this worker already serves SSE_MAX_CONNECTIONS streams"""
+    pass
+
+
+class Subscription:
+    """One SSE client waiting for events of one transaction"""
+    __slots__ = ("transaction_id", "queue", "loop", "dropped")
+
+    def __init__(self, transaction_id: int, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.transaction_id = transaction_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Enqueue without blocking (runs on the subscriber's loop); drops the oldest when full"""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            SSE_EVENTS.labels(result="dropped").inc()
+        self.queue.put_nowait(event)
+
+    async def next_event(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None after timeout seconds of silence"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class TransactionEventBroker:
+    """In-process pub/sub keyed by transaction id (publish is thread-safe)"""
+
+    def __init__(self, max_queue: Optional[int] = None, max_subscribers: Optional[int] = None):
+        self.max_queue = max_queue or settings.SSE_QUEUE_SIZE
+        self.max_subscribers = max_subscribers or settings.SSE_MAX_CONNECTIONS
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "delivered": 0}
+
+    def subscribe(self, transaction_id: int) -> Subscription:
+        """Register a subscriber on the running event loop"""
+        subscription = Subscription(transaction_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                raise SubscriberLimitReached(f"SSE connection limit reached ({self.max_subscribers})")
+            self._subscribers[transaction_id].add(subscription)
+            self._count += 1
+        SSE_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.transaction_id)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.transaction_id]
+            self._count -= 1
+        SSE_SUBSCRIBERS.dec()
+
+    def publish(self, event: Dict[str, Any]) -> int:
+        """Fan an event out to the subscribers of its transaction; returns how many"""
+        with self._lock:
+            targets = list(self._subscribers.get(event.get("transaction_id"), ()))
+            self.stats["published"] += 1
+            self.stats["delivered"] += len(targets)
+        for subscription in targets:
+            self._deliver(subscription, event)
+        if targets:
+            SSE_EVENTS.labels(result="delivered").inc(len(targets))
+        return len(targets)
+
+    def publish_all(self, event: Dict[str, Any]) -> int:
+        """Send an event to every subscriber (e.g. resync after the bridge lost events)"""
+        with self._lock:
+            targets = [s for subscribers in self._subscribers.values() for s in subscribers]
+        for subscription in targets:
+            self._deliver(subscription, {**event, "transaction_id": subscription.transaction_id})
+        return len(targets)
+
+    @staticmethod
+    def _deliver(subscription: Subscription, event: Dict[str, Any]) -> None:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+        except RuntimeError:
+            # Loop already closed (worker shutting down)
+            pass
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return self._count
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": self._count,
+                "transactions": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "queue_size": self.max_queue,
+                **self.stats,
+            }
+
+
+class PostgresNotifyBridge:
+    """LISTENs on the notify channel in a daemon thread and feeds the local broker"""
+
+    def __init__(
+        self,
+        broker: TransactionEventBroker,
+        database_url: Optional[str] = None,
+        channel: Optional[str] = None,
+        poll_seconds: float = 5.0,
+        max_backoff_seconds: float = 30.0,
+    ):
+        self.broker = broker
+        self.database_url = database_url or settings.DATABASE_URL
+        self.channel = channel or settings.SSE_NOTIFY_CHANNEL
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", self.channel):
+            raise ValueError(f"Invalid notify channel name: {self.channel}")
+        self.poll_seconds = poll_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.connected = False
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self.stats = {"received": 0, "reconnects": 0, "errors": 0}
+
+    def add_handler(self, event_type: str, handler: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Route notifications with this "type" to handler (called on the bridge
+        thread). After a reconnect the handler gets {"type": "resync"}, since
+        notifications sent while disconnected are lost.
+        """
+        self.handlers[event_type] = handler
+
+    def dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed notification: %r", payload)
+            return
+        handler = self.handlers.get(event.get("type"))
+        if handler is not None:
+            handler(event)
+        else:
+            self.broker.publish(event)
+
+    def resync(self) -> None:
+        """Tell every consumer that notifications may have been missed"""
+        self.broker.publish_all({"type": "resync"})
+        for handler in self.handlers.values():
+            handler({"type": "resync"})
+
+    @property
+    def enabled(self) -> bool:
+        return self.database_url.startswith("postgresql")
+
+    def start(self) -> None:
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pg-notify-bridge", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+
+        dsn = make_url(self.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        conn = psycopg2.connect(dsn, application_name="escrow_event_bridge")
+        conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.channel};")
+        return conn
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                if self.stats["received"] or self.stats["errors"]:
+                    self.stats["reconnects"] += 1
+                    # Events published while disconnected are gone; clients refetch status
+                    self.resync()
+                self.connected = True
+                backoff = 1.0
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll_seconds) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.stats["received"] += 1
+                        self.dispatch(notify.payload)
+            except Exception:
+                self.stats["errors"] += 1
+                logger.exception("Transaction event bridge lost its connection")
+            finally:
+                self.connected = False
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "connected": self.connected, "channel": self.channel, **self.stats}
+
+
+def event_payload(transition_event: Any) -> Dict[str, Any]:
+    """Public part of a state machine TransitionEvent (no actor or reason)"""
+    occurred_at = transition_event.occurred_at or datetime.now(timezone.utc)
+    return {
+        "type": "transition",
+        "transaction_id": transition_event.transaction_id,
+        "from_state": transition_event.from_state.value if transition_event.from_state else None,
+        "to_state": transition_event.to_state.value,
+        "occurred_at": occurred_at.isoformat(),
+    }
+
+
+def publish_transitions(db: Session, events: List[Any]) -> None:
+    """State machine hook: publish once the surrounding transaction commits"""
+    payloads = [json.dumps(event_payload(e)) for e in events]
+    if db.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: delivered on commit, discarded on rollback
+        db.execute(
+            text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+            {"channel": settings.SSE_NOTIFY_CHANNEL, "payloads": payloads},
+        )
+    else:
+        db.info.setdefault(_PENDING_KEY, []).extend(payloads)
+
+
+def notify_workers(db: Session, event: Dict[str, Any]) -> bool:
+    """
+    Send an event to the bridge of every worker once db's transaction commits.
+    Returns False without LISTEN/NOTIFY (SQLite), where there is only this process.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": settings.SSE_NOTIFY_CHANNEL, "payload": json.dumps(event)},
+    )
+    return True
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    for payload in session.info.pop(_PENDING_KEY, []):
+        transaction_event_broker.publish(json.loads(payload))
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# Global broker and bridge (one per API worker)
+transaction_event_broker = TransactionEventBroker()
+notify_bridge = PostgresNotifyBridge(transaction_event_broker)
@@ -2,7 +2,8 @@
 Audit logging system for tracking all authentication and security events.
 """
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models.audit_log import AuditLog, AuditAction
 from app.models.user import User
@@ -41,6 +42,37 @@ class AuditLogger:
         
         return audit_log
     
+    @staticmethod
+    def log_events(
+        db: Session,
+        action: AuditAction,
+        details_list: List[Dict[str, Any]],
+        user_id: Optional[int] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        success: bool = True,
+        commit: bool = True
+    ) -> None:
+        """
+        Log several events of the same action in one multi-row INSERT.
+        With commit=False the rows join the caller's transaction.
+        """
+        if not details_list:
+            return
+        db.execute(insert(AuditLog), [
+            {
+                "user_id": user_id,
+                "action": action,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "details": json.dumps(details) if details else None,
+                "success": str(success).lower()
+            }
+            for details in details_list
+        ])
+        if commit:
+            db.commit()
+    
     @staticmethod
     def log_register(
         db: Session,
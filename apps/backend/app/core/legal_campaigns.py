@@ -0,0 +1,212 @@
+"""
+Re-acknowledgment campaign runner.
+
+Publishing a required legal document queues a LegalAckCampaign (see
+crud/legal_ack_campaign.py). The runner walks users in id order:
+1. One set-based query picks the next chunk of active users with no
+   acknowledgment of the document's current version (keyset on users.id, anti-join).
+2. Pending markers are inserted with ON CONFLICT DO NOTHING.
+3. The chunk is notified in one batched email call.
+4. The cursor, counters and heartbeat are committed.
+
+Each chunk is its own short transaction, so a run over 1M users never holds
+a long transaction. A crash resumes from the last committed cursor. A chunk
+that was notified but not committed is notified again (at-least-once).
+Throughput is capped at users_per_second. A campaign is claimed with a
+guarded UPDATE, so two runners never process the same campaign; a runner
+whose heartbeat goes stale can be taken over.
+"""
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, exists, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.email import build_reacknowledgment_email, send_emails_batch
+from app.core.metrics import LEGAL_CAMPAIGN_USERS
+from app.models.legal_ack_campaign import AckCampaignStatus, LegalAckCampaign, PendingLegalAcknowledgment
+from app.models.legal_document import LegalDocument
+from app.models.user import User
+from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
+
+logger = logging.getLogger(__name__)
+
+Notifier = Callable[[List[Dict[str, str]]], int]
+
+
+class AckCampaignRunner:
+    """Chunked, rate-limited, resumable fan-out of pending acknowledgments"""
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        users_per_second: float = 500.0,
+        stale_seconds: int = 300,
+        notifier: Optional[Notifier] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.chunk_size = chunk_size
+        self.users_per_second = users_per_second
+        self.stale_seconds = stale_seconds
+        self.notifier = notifier or send_emails_batch
+        self.sleep = sleep
+
+    def claim(self, db: Session, campaign_id: int) -> bool:
+        """Take ownership of a queued, failed or stale running campaign"""
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=self.stale_seconds)
+        claimed = db.query(LegalAckCampaign).filter(
+            LegalAckCampaign.id == campaign_id,
+            or_(
+                LegalAckCampaign.status.in_([AckCampaignStatus.QUEUED, AckCampaignStatus.FAILED]),
+                and_(
+                    LegalAckCampaign.status == AckCampaignStatus.RUNNING,
+                    or_(LegalAckCampaign.heartbeat_at.is_(None), LegalAckCampaign.heartbeat_at < stale_before)
+                )
+            )
+        ).update(
+            {
+                LegalAckCampaign.status: AckCampaignStatus.RUNNING,
+                LegalAckCampaign.heartbeat_at: now,
+                LegalAckCampaign.started_at: func.coalesce(LegalAckCampaign.started_at, now),
+                LegalAckCampaign.error: None,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+        return claimed == 1
+
+    def run(self, db: Session, campaign_id: int, max_chunks: Optional[int] = None) -> Optional[LegalAckCampaign]:
+        """Process a campaign until done (or max_chunks); None if another runner owns it"""
+        if not self.claim(db, campaign_id):
+            return None
+
+        campaign = db.query(LegalAckCampaign).populate_existing().filter(LegalAckCampaign.id == campaign_id).one()
+        document = campaign.document
+        if campaign.total_users is None:
+            campaign.total_users = self._affected_users(db, document, after_user_id=0).count()
+            db.commit()
+
+        chunks = 0
+        try:
+            while max_chunks is None or chunks < max_chunks:
+                db.refresh(document)
+                if not document.is_current:
+                    self._finish(db, campaign, AckCampaignStatus.SUPERSEDED)
+                    break
+                started = time.monotonic()
+                processed = self.process_chunk(db, campaign, document)
+                chunks += 1
+                if processed == 0:
+                    self._finish(db, campaign, AckCampaignStatus.COMPLETED)
+                    break
+                logger.info(
+                    f"Campaign {campaign.id}: {campaign.marked_users}/{campaign.total_users} users marked, "
+                    f"{campaign.notified_users} notified"
+                )
+                # Rate control: a chunk of N users takes at least N / users_per_second
+                remaining = processed / self.users_per_second - (time.monotonic() - started)
+                if remaining > 0:
+                    self.sleep(remaining)
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"Re-acknowledgment campaign {campaign_id} failed")
+            campaign.status = AckCampaignStatus.FAILED
+            campaign.error = f"{type(e).__name__}: {e}"
+            db.commit()
+        return campaign
+
+    def process_chunk(self, db: Session, campaign: LegalAckCampaign, document: LegalDocument) -> int:
+        """Mark and notify the next chunk of users; returns how many users it covered"""
+        users = self._affected_users(db, document, campaign.cursor_user_id).order_by(User.id).limit(self.chunk_size).all()
+        if not users:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        user_ids = [user.id for user in users]
+        stmt = dialect_insert(db, PendingLegalAcknowledgment.__table__).values([
+            {"user_id": user_id, "document_id": document.id, "campaign_id": campaign.id, "created_at": now}
+            for user_id in user_ids
+        ]).on_conflict_do_nothing(index_elements=["user_id", "document_id"])
+        marked = db.execute(stmt).rowcount
+
+        messages = [
+            build_reacknowledgment_email(user.email, user.full_name, document.title, document.version)
+            for user in users
+        ]
+        notified = self.notifier(messages)
+        if notified:
+            db.query(PendingLegalAcknowledgment).filter(
+                PendingLegalAcknowledgment.document_id == document.id,
+                PendingLegalAcknowledgment.user_id.in_(user_ids)
+            ).update({PendingLegalAcknowledgment.notified_at: now}, synchronize_session=False)
+
+        campaign.cursor_user_id = user_ids[-1]
+        campaign.marked_users += marked
+        campaign.notified_users += notified
+        campaign.notify_failures += len(users) - notified
+        campaign.heartbeat_at = now
+        db.commit()
+
+        LEGAL_CAMPAIGN_USERS.labels(result="marked").inc(marked)
+        LEGAL_CAMPAIGN_USERS.labels(result="notified").inc(notified)
+        LEGAL_CAMPAIGN_USERS.labels(result="notify_failed").inc(len(users) - notified)
+        return len(users)
+
+    def resume_pending(self, db: Session) -> List[LegalAckCampaign]:
+        """Run every campaign that is queued, failed or abandoned by a dead runner"""
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.stale_seconds)
+        campaign_ids = [row.id for row in db.query(LegalAckCampaign.id).filter(
+            or_(
+                LegalAckCampaign.status.in_([AckCampaignStatus.QUEUED, AckCampaignStatus.FAILED]),
+                and_(LegalAckCampaign.status == AckCampaignStatus.RUNNING, LegalAckCampaign.heartbeat_at < stale_before)
+            )
+        ).order_by(LegalAckCampaign.id).all()]
+        results = []
+        for campaign_id in campaign_ids:
+            campaign = self.run(db, campaign_id)
+            if campaign is not None:
+                results.append(campaign)
+        return results
+
+    @staticmethod
+    def _affected_users(db: Session, document: LegalDocument, after_user_id: int):
+        """Active users after the cursor who have not acknowledged this version of the document"""
+        acknowledged = exists().where(and_(
+            UserLegalAcknowledgment.user_id == User.id,
+            UserLegalAcknowledgment.document_id == document.id,
+            UserLegalAcknowledgment.version == document.version
+        ))
+        return db.query(User.id, User.email, User.full_name).filter(
+            User.id > after_user_id,
+            User.is_active == True,
+            ~acknowledged
+        )
+
+    @staticmethod
+    def _finish(db: Session, campaign: LegalAckCampaign, status: AckCampaignStatus) -> None:
+        campaign.status = status
+        campaign.finished_at = datetime.now(timezone.utc)
+        db.commit()
+
+
+def run_campaign_in_background(campaign_id: int) -> None:
+    """BackgroundTasks entry point: runs a campaign with its own session"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ack_campaign_runner.run(db, campaign_id)
+    finally:
+        db.close()
+
+
+ack_campaign_runner = AckCampaignRunner(
+    chunk_size=settings.LEGAL_CAMPAIGN_CHUNK_SIZE,
+    users_per_second=settings.LEGAL_CAMPAIGN_USERS_PER_SECOND,
+    stale_seconds=settings.LEGAL_CAMPAIGN_STALE_SECONDS,
+)
@@ -0,0 +1,136 @@
+"""
+Per-user legal compliance bitmaps.
+
+Bit N of a user's mask is set when the user has acknowledged the current
+document of DocumentType number N. Every current document (id, version,
+title) and the user's mask come from one joined query. Results are cached per
+user in-process:
+- publishing a document bumps the epoch, which drops every user's entry at once;
+- acknowledging drops only that user's entry;
+- both changes are also broadcast with pg_notify in the writing transaction,
+  so every other worker drops the same entries as soon as it commits (see
+  core/event_broker.py);
+- the TTL bounds staleness only while a worker's LISTEN bridge is down, and
+  a reconnecting bridge drops everything.
+The cache holds at most max_entries users and evicts the least recently used.
+"""
+import threading
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.event_broker import notify_bridge, notify_workers
+from app.core.metrics import CACHE_REQUESTS
+from app.models.legal_document import DocumentType
+
+COMPLIANCE_EVENT = "legal_compliance"
+
+DOCUMENT_TYPE_BITS: Dict[DocumentType, int] = {t: 1 << i for i, t in enumerate(DocumentType)}
+
+
+class CurrentDocument(NamedTuple):
+    id: int
+    version: str
+    title: str
+
+
+# Current documents keyed by type; shared by every user loaded in the same epoch
+Catalog = Dict[DocumentType, CurrentDocument]
+
+
+def mask_for(document_types: Iterable[DocumentType]) -> int:
+    mask = 0
+    for document_type in document_types:
+        mask |= DOCUMENT_TYPE_BITS[document_type]
+    return mask
+
+
+class ComplianceCache:
+    """Thread-safe per-user (catalog, acknowledged mask) cache with epoch invalidation"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 100000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._epoch = 0
+        self._entries: "OrderedDict[int, Tuple[int, float, Catalog, int]]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def epoch(self) -> int:
+        """Read before loading; put() ignores results loaded in an older epoch"""
+        return self._epoch
+
+    def get(self, user_id: int) -> Optional[Tuple[Catalog, int]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == self._epoch and monotonic() < entry[1]:
+                self._entries.move_to_end(user_id)
+                self._count("hits")
+                return entry[2], entry[3]
+            self._entries.pop(user_id, None)
+            self._count("misses")
+            return None
+
+    def put(self, user_id: int, epoch: int, catalog: Catalog, acknowledged_mask: int) -> None:
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[user_id] = (epoch, monotonic() + self.ttl_seconds, catalog, acknowledged_mask)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._counters["invalidations"] += 1
+
+    def invalidate_all(self) -> None:
+        """Called when the set of current documents changes"""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._counters["invalidations"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            entries = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "entries": entries,
+            "epoch": self._epoch,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+    def _count(self, result: str) -> None:
+        self._counters[result] += 1
+        CACHE_REQUESTS.labels(cache="legal_compliance", result=result).inc()
+
+
+compliance_cache = ComplianceCache(ttl_seconds=settings.LEGAL_COMPLIANCE_CACHE_TTL_SECONDS)
+
+
+def broadcast_invalidation(db: Session, user_id: Optional[int] = None) -> None:
+    """
+    Ask every worker to drop cached compliance (one user's, or everyone's when
+    user_id is None) once db's transaction commits. The caller still
+    invalidates this process's cache after its commit.
+    """
+    notify_workers(db, {"type": COMPLIANCE_EVENT, "user_id": user_id})
+
+
+def _apply_invalidation(event: Dict[str, Any]) -> None:
+    user_id = event.get("user_id")
+    if user_id is None:
+        compliance_cache.invalidate_all()  # Also the answer to a bridge resync
+    else:
+        compliance_cache.invalidate_user(user_id)
+
+
+notify_bridge.add_handler(COMPLIANCE_EVENT, _apply_invalidation)
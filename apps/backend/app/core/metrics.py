@@ -0,0 +1,201 @@
+"""
+Prometheus metric definitions shared across the application.
+Metrics are declared once here so every module records into the same series.
+
+Under several uvicorn workers set PROMETHEUS_MULTIPROC_DIR (an empty directory)
+before the workers start: every process then writes its samples to that
+directory and /api/v1/metrics aggregates them (see core/metrics_exporter.py).
+Gauges declare how worker values combine (multiprocess_mode).
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+# Outbound Paystack API calls
+PAYSTACK_REQUEST_LATENCY = Histogram(
+    "paystack_request_duration_seconds",
+    "Latency of outbound Paystack API calls",
+    ["endpoint", "method"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+PAYSTACK_REQUEST_ERRORS = Counter(
+    "paystack_request_errors_total",
+    "Failed outbound Paystack API calls by reason",
+    ["endpoint", "reason"],
+)
+PAYSTACK_REQUEST_RETRIES = Counter(
+    "paystack_request_retries_total",
+    "Retried outbound Paystack API calls",
+    ["endpoint"],
+)
+PAYSTACK_CIRCUIT_OPEN = Gauge(
+    "paystack_circuit_open",
+    "1 if the Paystack circuit breaker is open, 0 otherwise",
+    multiprocess_mode="livemax",
+)
+
+# In-process caches (hit / miss / coalesced lookups)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result",
+    ["cache", "result"],
+)
+
+# Seller payout engine
+PAYOUT_TRANSFERS = Counter(
+    "payout_transfers_total",
+    "Payout transfers by outcome (queued, failed, missing_recipient, completed, reversed_after_success)",
+    ["result"],
+)
+PAYOUT_BULK_REQUEST_LATENCY = Histogram(
+    "payout_bulk_request_duration_seconds",
+    "Latency of Paystack bulk transfer requests",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+PAYOUT_RUN_DURATION = Histogram(
+    "payout_run_duration_seconds",
+    "Duration of a full payout scheduler run",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+
+# Deadline scheduler
+DEADLINE_JOBS = Counter(
+    "deadline_jobs_total",
+    "Deadline jobs fired by the scheduler, by kind and outcome",
+    ["kind", "result"],  # advance, refund, escalate, skipped
+)
+DEADLINE_FIRE_LAG = Histogram(
+    "deadline_fire_lag_seconds",
+    "Delay between a deadline passing and the scheduler firing it",
+    ["kind"],
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0),
+)
+
+# Payment reconciliation
+RECONCILIATION_DISCREPANCIES = Counter(
+    "reconciliation_discrepancies_total",
+    "Discrepancies found by the reconciliation job, by kind",
+    ["kind"],
+)
+
+# Contract rendering worker pool
+CONTRACT_RENDER_QUEUE_DEPTH = Gauge(
+    "contract_render_queue_depth",
+    "Contract render jobs waiting for a worker",
+    multiprocess_mode="livesum",
+)
+CONTRACT_RENDER_IN_FLIGHT = Gauge(
+    "contract_render_in_flight",
+    "Contract render jobs currently being processed",
+    multiprocess_mode="livesum",
+)
+CONTRACT_RENDER_DURATION = Histogram(
+    "contract_render_duration_seconds",
+    "Time spent rendering a contract PDF in a worker process",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+CONTRACT_RENDER_JOBS = Counter(
+    "contract_render_jobs_total",
+    "Contract render jobs by outcome (succeeded, failed, timeout, crashed, rejected)",
+    ["result"],
+)
+
+# Legal re-acknowledgment campaigns
+LEGAL_CAMPAIGN_USERS = Counter(
+    "legal_campaign_users_total",
+    "Users processed by re-acknowledgment campaigns",
+    ["result"],  # marked, notified, notify_failed
+)
+
+# Signature verification
+SIGNATURE_VERIFICATIONS = Counter(
+    "signature_verifications_total",
+    "Stored signatures checked by the bulk verifier",
+    ["kind", "result"],  # valid, mismatch, legacy, unknown_key
+)
+
+# Server-Sent Events (transaction status push)
+SSE_SUBSCRIBERS = Gauge(
+    "sse_subscribers",
+    "Open transaction event streams",
+    multiprocess_mode="livesum",
+)
+SSE_EVENTS = Counter(
+    "sse_events_total",
+    "Transaction events by outcome (delivered to a subscriber queue, or dropped for a slow client)",
+    ["result"],
+)
+
+# Transactional outbox dispatcher
+OUTBOX_MESSAGES = Counter(
+    "outbox_messages_total",
+    "Outbox messages handled by the dispatcher, by topic and outcome",
+    ["topic", "result"],  # sent, retried, failed
+)
+OUTBOX_DISPATCH_LAG = Histogram(
+    "outbox_dispatch_lag_seconds",
+    "Delay between an outbox message being written and it being dispatched",
+    ["topic"],
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0),
+)
+OUTBOX_RUN_DURATION = Histogram(
+    "outbox_run_duration_seconds",
+    "Duration of one outbox dispatcher batch",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+# HTTP requests (route is the path template, e.g. /api/v1/transactions/{transaction_id})
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to the end of the response body, by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+
+# Database connection pool (sampled by the metrics refresher)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state (size, checked_out, idle, overflow)",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+# Business gauges, refreshed in the background from one GROUP BY per table
+TRANSACTIONS_BY_STATE = Gauge(
+    "escrow_transactions",
+    "Transactions by state",
+    ["state"],
+    multiprocess_mode="mostrecent",
+)
+LISTINGS_BY_STATE = Gauge(
+    "escrow_listings",
+    "Listings by state",
+    ["state"],
+    multiprocess_mode="mostrecent",
+)
+USERS_BY_ROLE = Gauge(
+    "escrow_users",
+    "Users by role and verification (email and phone verified)",
+    ["role", "verified"],
+    multiprocess_mode="mostrecent",
+)
+BUSINESS_METRICS_REFRESHED = Gauge(
+    "escrow_business_metrics_refreshed_timestamp_seconds",
+    "Unix time of the last business gauge refresh",
+    multiprocess_mode="mostrecent",
+)
+
+# Readiness monitor
+EVENT_LOOP_LAG = Gauge(
+    "event_loop_lag_seconds",
+    "How late the readiness monitor's last wake-up was",
+    multiprocess_mode="livemax",
+)
+READY = Gauge(
+    "ready",
+    "1 if this worker reports ready, 0 otherwise",
+    multiprocess_mode="liveall",
+)
@@ -0,0 +1,210 @@
+"""
+Prometheus exposition for /api/v1/metrics.
+
+Scrapes never touch the database. A background task in every worker
+- samples the SQLAlchemy pool every METRICS_POOL_SAMPLE_SECONDS;
+- every METRICS_BUSINESS_REFRESH_SECONDS runs one GROUP BY per table
+  (transactions, listings, users) and sets the business gauges.
+
+With PROMETHEUS_MULTIPROC_DIR set, render_latest() aggregates the sample
+files of every worker (prometheus_client multiprocess mode); otherwise it
+reads the in-process registry. Cache hit ratios are derived at scrape time
+from the aggregated cache_requests_total counters, so they cover all workers.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+from prometheus_client.metrics_core import GaugeMetricFamily, Metric
+from sqlalchemy import and_, func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import (
+    BUSINESS_METRICS_REFRESHED,
+    DB_POOL_CONNECTIONS,
+    LISTINGS_BY_STATE,
+    TRANSACTIONS_BY_STATE,
+    USERS_BY_ROLE,
+)
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+
+logger = logging.getLogger(__name__)
+
+# cache_requests_total results that were answered without calling upstream
+_CACHE_SAVED_RESULTS = ("hits", "coalesced")
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def business_snapshot(db: Session) -> Dict[str, Dict[str, int]]:
+    """Counts behind the business gauges: one GROUP BY per table"""
+    verified = and_(User.is_email_verified == True, User.is_phone_verified == True)  # noqa: E712
+    transactions = dict(db.query(Transaction.state, func.count(Transaction.id)).group_by(Transaction.state).all())
+    listings = dict(db.query(Listing.state, func.count(Listing.id)).group_by(Listing.state).all())
+    users: Dict[str, int] = {}
+    for role, is_verified, count in db.query(User.role, verified, func.count(User.id)).group_by(User.role, verified):
+        key = f"{role.value}:{'true' if is_verified else 'false'}"
+        users[key] = users.get(key, 0) + count
+    return {
+        "transactions": {state.value: transactions.get(state, 0) for state in TransactionState},
+        "listings": {state.value: listings.get(state, 0) for state in ListingState},
+        "users": {f"{role.value}:{v}": users.get(f"{role.value}:{v}", 0) for role in Role for v in ("true", "false")},
+    }
+
+
+def pool_snapshot(engine: Engine) -> Dict[str, int]:
+    """Connection counts of a QueuePool (zeros for pools without them, e.g. SQLite)"""
+    pool = engine.pool
+    size = getattr(pool, "size", lambda: 0)()
+    checked_out = getattr(pool, "checkedout", lambda: 0)()
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "idle": getattr(pool, "checkedin", lambda: 0)(),
+        "overflow": max(getattr(pool, "overflow", lambda: 0)(), 0),
+    }
+
+
+class MetricsRefresher:
+    """Keeps pool and business gauges current so scrapes are free"""
+
+    def __init__(
+        self,
+        business_interval: Optional[float] = None,
+        pool_interval: Optional[float] = None,
+    ):
+        self.business_interval = business_interval or settings.METRICS_BUSINESS_REFRESH_SECONDS
+        self.pool_interval = pool_interval or settings.METRICS_POOL_SAMPLE_SECONDS
+        self.snapshot: Optional[Dict[str, Dict[str, int]]] = None
+        self.refreshed_at: Optional[float] = None
+        self.pool: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def sample_pool(self, engine: Optional[Engine] = None) -> Dict[str, int]:
+        if engine is None:
+            from app.core.database import engine
+        self.pool = pool_snapshot(engine)
+        for state, value in self.pool.items():
+            DB_POOL_CONNECTIONS.labels(state=state).set(value)
+        return self.pool
+
+    def refresh_business(self, db: Optional[Session] = None) -> Dict[str, Dict[str, int]]:
+        """Run the GROUP BYs and set the gauges (opens its own session when db is None)"""
+        own_session = db is None
+        if own_session:
+            from app.core.database import SessionLocal
+            db = SessionLocal()
+        try:
+            snapshot = business_snapshot(db)
+        finally:
+            if own_session:
+                db.close()
+        for state, count in snapshot["transactions"].items():
+            TRANSACTIONS_BY_STATE.labels(state=state).set(count)
+        for state, count in snapshot["listings"].items():
+            LISTINGS_BY_STATE.labels(state=state).set(count)
+        for key, count in snapshot["users"].items():
+            role, verified = key.split(":")
+            USERS_BY_ROLE.labels(role=role, verified=verified).set(count)
+        self.snapshot = snapshot
+        self.refreshed_at = time.time()
+        BUSINESS_METRICS_REFRESHED.set(self.refreshed_at)
+        return snapshot
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        next_business = 0.0
+        while True:
+            try:
+                self.sample_pool()
+                if time.monotonic() >= next_business:
+                    next_business = time.monotonic() + self.business_interval
+                    await run_in_threadpool(self.refresh_business)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Metrics refresh failed")
+            await asyncio.sleep(self.pool_interval)
+
+
+def _cache_hit_ratios(families: Iterable[Metric]) -> GaugeMetricFamily:
+    lookups: Dict[str, float] = defaultdict(float)
+    saved: Dict[str, float] = defaultdict(float)
+    for family in families:
+        if family.name != "cache_requests":
+            continue
+        for sample in family.samples:
+            if not sample.name.endswith("_total"):
+                continue
+            cache = sample.labels["cache"]
+            result = sample.labels["result"]
+            if result in ("hits", "misses", "coalesced"):
+                lookups[cache] += sample.value
+            if result in _CACHE_SAVED_RESULTS:
+                saved[cache] += sample.value
+    ratio = GaugeMetricFamily(
+        "cache_hit_ratio",
+        "Share of cache lookups answered without an upstream call, since process start",
+        labels=["cache"],
+    )
+    for cache, total in sorted(lookups.items()):
+        ratio.add_metric([cache], saved[cache] / total if total else 0.0)
+    return ratio
+
+
+class _Families:
+    """Collected families in the shape generate_latest expects"""
+
+    def __init__(self, families: List[Metric]):
+        self._families = families
+
+    def collect(self) -> List[Metric]:
+        return self._families
+
+
+def _source_registry() -> CollectorRegistry:
+    if not multiprocess_enabled():
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_latest() -> Tuple[bytes, str]:
+    """Text exposition of every metric (all workers in multiprocess mode)"""
+    families = list(_source_registry().collect())
+    families.append(_cache_hit_ratios(families))
+    return generate_latest(_Families(families)), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: Optional[int] = None) -> None:
+    """Drop this worker's live gauge files so livesum/livemax gauges forget it"""
+    if multiprocess_enabled():
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+metrics_refresher = MetricsRefresher()
@@ -0,0 +1,218 @@
+"""
+Outbox dispatcher for side effects of state changes.
+
+Request handlers and a state machine hook write an outbox row in the same
+transaction as the change (see crud/outbox.py) instead of calling email
+code inline:
+    suspend_user_account          -> email.account_suspended
+    FUNDS_HELD, DISPUTED, REFUNDED,
+    CANCELLED, COMPLETED          -> email.transaction_update (buyer and/or seller)
+
+Each run claims up to batch_size available messages with FOR UPDATE SKIP
+LOCKED, calls the handler registered for each topic, marks the rows done and
+commits. So:
+- a slow email provider no longer adds latency to the request;
+- a crash after the state change commits leaves the message pending, and a
+  crash before the dispatcher commits means it is sent again (at least once);
+- several dispatchers can run at once on disjoint batches.
+
+A failing handler is retried with exponential backoff (available_at moves
+forward); after max_attempts the message is parked as FAILED.
+
+Run it periodically (see scripts/run_outbox_dispatcher.py) or trigger a
+single run from the admin API.
+"""
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.email import build_transaction_update_email, send_account_suspended_email, send_email
+from app.core.metrics import OUTBOX_DISPATCH_LAG, OUTBOX_MESSAGES, OUTBOX_RUN_DURATION
+from app.crud.outbox import ACCOUNT_SUSPENDED_EMAIL, TRANSACTION_UPDATE_EMAIL
+from app.models.outbox_message import OutboxMessage, OutboxStatus
+from app.models.transaction import Transaction
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+OutboxHandler = Callable[[Session, Dict[str, Any]], None]
+
+_handlers: Dict[str, OutboxHandler] = {}
+
+
+def outbox_handler(topic: str) -> Callable[[OutboxHandler], OutboxHandler]:
+    """
+    Register the handler of a topic. Handlers get (db, payload), run after the
+    producing transaction committed and must raise to ask for a retry.
+    Messages can be delivered more than once, so handlers should tolerate that.
+    """
+    def decorator(handler: OutboxHandler) -> OutboxHandler:
+        _handlers[topic] = handler
+        return handler
+    return decorator
+
+
+@outbox_handler(ACCOUNT_SUSPENDED_EMAIL)
+def _send_account_suspended(db: Session, payload: Dict[str, Any]) -> None:
+    user = db.get(User, payload["user_id"])
+    if user is None:
+        return
+    if not send_account_suspended_email(user.email, user.full_name, payload["reason"]):
+        raise RuntimeError(f"Suspension email to user {user.id} was not accepted")
+
+
+@outbox_handler(TRANSACTION_UPDATE_EMAIL)
+def _send_transaction_update(db: Session, payload: Dict[str, Any]) -> None:
+    user = db.get(User, payload["user_id"])
+    transaction = db.get(Transaction, payload["transaction_id"])
+    if user is None or transaction is None:
+        return
+    message = build_transaction_update_email(
+        user.email, user.full_name, transaction.id, transaction.listing.title, payload["state"]
+    )
+    if not send_email(message["to"], message["subject"], message["html"], message["text"]):
+        raise RuntimeError(f"Transaction update email to user {user.id} was not accepted")
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class OutboxDispatcher:
+    """Batched, SKIP LOCKED polling of outbox messages"""
+
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        handlers: Optional[Dict[str, OutboxHandler]] = None,
+    ):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.OUTBOX_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds or settings.OUTBOX_RETRY_MAX_SECONDS
+        self.handlers = _handlers if handlers is None else handlers
+        self._lock = threading.Lock()
+        self._totals = {"runs": 0, "claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    def run_once(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Dispatch every available message (up to batch_size) in one transaction.
+
+        Returns:
+            Per-run statistics (counts, duration, throughput)
+        """
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        run = {"claimed": 0, "sent": 0, "retried": 0, "failed": 0}
+
+        messages = self._claim_messages(db, now)
+        run["claimed"] = len(messages)
+        for message in messages:
+            self._dispatch(db, message, now, run)
+        if messages:
+            db.commit()
+
+        duration = time.perf_counter() - started
+        OUTBOX_RUN_DURATION.observe(duration)
+        run["duration_seconds"] = round(duration, 4)
+        run["messages_per_second"] = round(run["claimed"] / duration, 2) if duration > 0 else 0.0
+        run["finished_at"] = datetime.utcnow().isoformat()
+
+        with self._lock:
+            self._totals["runs"] += 1
+            for key in ("claimed", "sent", "retried", "failed"):
+                self._totals[key] += run[key]
+            self._last_run = run
+
+        if messages:
+            logger.info("Outbox run finished: %s", run)
+        return run
+
+    def _claim_messages(self, db: Session, now: datetime) -> List[OutboxMessage]:
+        """
+        Lock available pending messages.
+        SKIP LOCKED lets concurrent dispatchers take disjoint batches.
+        """
+        return (
+            db.query(OutboxMessage)
+            .filter(
+                OutboxMessage.status == OutboxStatus.PENDING,
+                OutboxMessage.available_at <= now,
+            )
+            .order_by(OutboxMessage.available_at, OutboxMessage.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    def _dispatch(self, db: Session, message: OutboxMessage, now: datetime, run: Dict[str, Any]) -> None:
+        handler = self.handlers.get(message.topic)
+        message.attempts += 1
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for topic '{message.topic}'")
+            # A savepoint keeps a handler's database error from aborting the batch
+            with db.begin_nested():
+                handler(db, json.loads(message.payload))
+        except Exception as e:
+            logger.warning("Outbox message %s (%s) failed: %s", message.id, message.topic, e)
+            message.last_error = str(e)[:1000]
+            if handler is None or message.attempts >= self.max_attempts:
+                message.status = OutboxStatus.FAILED
+                result = "failed"
+            else:
+                delay = min(self.retry_base_seconds * 2 ** (message.attempts - 1), self.retry_max_seconds)
+                message.available_at = now + timedelta(seconds=delay)
+                result = "retried"
+        else:
+            dispatched_at = datetime.now(timezone.utc)
+            message.status = OutboxStatus.DONE
+            message.dispatched_at = dispatched_at
+            message.last_error = None
+            if message.created_at is not None:
+                lag = (dispatched_at - _as_utc(message.created_at)).total_seconds()
+                OUTBOX_DISPATCH_LAG.labels(topic=message.topic).observe(max(lag, 0.0))
+            result = "sent"
+        run[result] += 1
+        OUTBOX_MESSAGES.labels(topic=message.topic, result=result).inc()
+
+    def stats(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        """Cumulative accounting plus (optionally) current message counts and backlog age"""
+        with self._lock:
+            result: Dict[str, Any] = {"totals": dict(self._totals), "last_run": self._last_run}
+        if db is not None:
+            counts = (
+                db.query(OutboxMessage.topic, OutboxMessage.status, func.count(OutboxMessage.id))
+                .group_by(OutboxMessage.topic, OutboxMessage.status)
+                .all()
+            )
+            by_topic: Dict[str, Dict[str, int]] = defaultdict(dict)
+            for topic, status, count in counts:
+                by_topic[topic][getattr(status, "value", status)] = count
+            result["messages_by_topic"] = dict(by_topic)
+            oldest = (
+                db.query(func.min(OutboxMessage.created_at))
+                .filter(OutboxMessage.status == OutboxStatus.PENDING)
+                .scalar()
+            )
+            if isinstance(oldest, str):
+                oldest = datetime.fromisoformat(oldest)
+            result["oldest_pending_seconds"] = (
+                round((datetime.now(timezone.utc) - _as_utc(oldest)).total_seconds(), 1) if oldest else 0.0
+            )
+        return result
+
+
+outbox_dispatcher = OutboxDispatcher()
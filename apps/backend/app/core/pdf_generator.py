@@ -1,9 +1,16 @@
 """
 PDF contract generator using WeasyPrint.
 WeasyPrint is lazy-loaded to prevent import failures when system dependencies are missing.
+
+The contract hash is a SHA-256 over a canonical JSON form of the contract data
+(not the PDF bytes), so it is known before rendering and each contract needs a
+single WeasyPrint layout. The hash is printed in the footer and embedded in the
+PDF metadata (Subject / Keywords).
 """
 import hashlib
+import json
 import os
+import unicodedata
 from datetime import datetime
 from typing import Dict, Any, Optional, Tuple
 from jinja2 import Template
@@ -19,6 +26,10 @@ class PDFContractGenerator:
 <head>
     <meta charset="UTF-8">
     <title>Escrow Contract</title>
+    <meta name="description" content="Contract Hash: {{ contract_hash }}">
+    <meta name="keywords" content="escrow-contract, sha256:{{ contract_hash }}, template:{{ template_version }}">
+    <meta name="generator" content="ESCROW platform">
+    <meta name="dcterms.created" content="{{ generated_at }}">
     <style>
         body {
             font-family: Arial, sans-serif;
@@ -155,6 +166,56 @@ class PDFContractGenerator:
 </html>
 """
     
+    # Compiled once at class load; rendering reuses the parsed template
+    _template = Template(CONTRACT_TEMPLATE)
+    
+    # Identifies the contract wording; part of the canonical hash so a text change yields a new hash
+    TEMPLATE_VERSION = hashlib.sha256(CONTRACT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+    
+    # Fields covered by the contract hash (generated_at is deliberately excluded)
+    CANONICAL_FIELDS = (
+        "contract_date",
+        "seller_name",
+        "seller_email",
+        "buyer_name",
+        "buyer_email",
+        "listing_title",
+        "platform",
+        "category",
+        "purchase_price",
+        "signed_by_name",
+        "signed_at",
+        "template_version",
+    )
+    
+    @staticmethod
+    def compute_contract_hash(contract_data: Dict[str, Any]) -> str:
+        """
+        SHA-256 over the canonical form of the contract data.
+        
+        Canonical form: CANONICAL_FIELDS only, strings NFC-normalized and stripped,
+        JSON with sorted keys and no insignificant whitespace.
+        
+        Args:
+            contract_data: Template data (extra keys are ignored)
+            
+        Returns:
+            Hex-encoded SHA-256 hash
+        """
+        canonical = {}
+        for field in PDFContractGenerator.CANONICAL_FIELDS:
+            value = contract_data.get(field)
+            if isinstance(value, str):
+                value = unicodedata.normalize("NFC", value).strip()
+            canonical[field] = value
+        payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def render_html(template_data: Dict[str, Any]) -> str:
+        """Render contract HTML with the precompiled template"""
+        return PDFContractGenerator._template.render(**template_data)
+    
     @staticmethod
     def generate_contract(
         seller_name: str,
@@ -169,7 +230,7 @@ class PDFContractGenerator:
         signed_at: Optional[str] = None
     ) -> tuple[bytes, str]:
         """
-        Generate PDF contract.
+        Generate PDF contract (one WeasyPrint layout per contract).
         
         Args:
             seller_name: Seller's full name
@@ -203,17 +264,18 @@ class PDFContractGenerator:
             "signed_by_name": signed_by_name,
             "signed_at": signed_at,
             "generated_at": generated_at,
-            "contract_hash": ""  # Will be set after generation
+            "template_version": PDFContractGenerator.TEMPLATE_VERSION,
         }
         
-        # Render HTML template
-        template = Template(PDFContractGenerator.CONTRACT_TEMPLATE)
-        html_content = template.render(**template_data)
+        # Hash is known before rendering, so it can be printed and embedded in one pass
+        contract_hash = PDFContractGenerator.compute_contract_hash(template_data)
+        template_data["contract_hash"] = contract_hash
+        html_content = PDFContractGenerator.render_html(template_data)
         
         # Lazy-load WeasyPrint to prevent import failures when system deps are missing
         try:
             from weasyprint import HTML
-        except ImportError as e:
+        except (ImportError, OSError) as e:
             raise ImportError(
                 "WeasyPrint is not available. Install system dependencies:\n"
                 "  macOS: brew install cairo pango gdk-pixbuf libffi glib\n"
@@ -222,35 +284,25 @@ class PDFContractGenerator:
             )
         
         # Generate PDF
-        html = HTML(string=html_content)
-        pdf_bytes = html.write_pdf()
-        
-        # Calculate SHA-256 hash
-        contract_hash = hashlib.sha256(pdf_bytes).hexdigest()
-        
-        # Update template with hash (for display in PDF)
-        template_data["contract_hash"] = contract_hash
-        html_content = template.render(**template_data)
-        html = HTML(string=html_content)
-        pdf_bytes = html.write_pdf()
+        pdf_bytes = HTML(string=html_content).write_pdf()
         
         return pdf_bytes, contract_hash
     
     @staticmethod
-    def save_pdf_to_storage(pdf_bytes: bytes, transaction_id: int) -> str:
+    def save_pdf_to_storage(pdf_bytes: bytes, transaction_id: int) -> Tuple[str, str]:
         """
-        Save PDF to storage (Cloudinary or S3).
-        For now, returns a placeholder URL.
-        In production, upload to Cloudinary/S3.
+        Save PDF to content-addressed blob storage.
+        Identical PDFs are stored once.
         
         Args:
             pdf_bytes: PDF file bytes
             transaction_id: Transaction ID
             
         Returns:
-            PDF URL
+            (download URL, storage key)
         """
-        # TODO: Implement Cloudinary/S3 upload
-        # For now, return placeholder
-        return f"https://storage.escrow.com/contracts/{transaction_id}.pdf"
+        from app.core.storage import get_storage
+
+        blob = get_storage().put_bytes(pdf_bytes)
+        return f"/api/v1/contracts/{transaction_id}/pdf", blob.key
 
@@ -0,0 +1,124 @@
+"""
+Liveness and readiness state for the load balancer.
+
+A background task wakes up every READINESS_SAMPLE_SECONDS, measures how late
+it woke up (event loop lag) and evaluates the signals below. The probes only
+return the cached, pre-serialised result, so they answer without touching
+the database or the event loop's backlog.
+
+    check              not ready when
+    db_pool            checked out >= READINESS_POOL_MAX_UTILIZATION of pool_size + max_overflow
+    event_loop         lag >= READINESS_MAX_LOOP_LAG_SECONDS
+    contract_queue     depth >= READINESS_QUEUE_MAX_UTILIZATION of the render queue
+    paystack           never (reported only: the breaker is shared by every worker,
+                       so moving traffic elsewhere would not help)
+    sample age         the last sample is older than READINESS_STALE_SECONDS
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.contract_worker import contract_render_pool
+from app.core.database import engine as default_engine
+from app.core.metrics import EVENT_LOOP_LAG, READY
+from app.core.metrics_exporter import pool_snapshot
+from app.payment.services.http_client import paystack_circuit_state
+
+logger = logging.getLogger(__name__)
+
+LIVE_BODY = json.dumps({"status": "alive"}).encode()
+
+
+class ReadinessMonitor:
+    """Samples load-shedding signals in the background; probes read the cache"""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        max_loop_lag: Optional[float] = None,
+        pool_max_utilization: Optional[float] = None,
+        queue_max_utilization: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+    ):
+        self.interval = interval or settings.READINESS_SAMPLE_SECONDS
+        self.max_loop_lag = max_loop_lag or settings.READINESS_MAX_LOOP_LAG_SECONDS
+        self.pool_max_utilization = pool_max_utilization or settings.READINESS_POOL_MAX_UTILIZATION
+        self.queue_max_utilization = queue_max_utilization or settings.READINESS_QUEUE_MAX_UTILIZATION
+        self.stale_seconds = stale_seconds or settings.READINESS_STALE_SECONDS
+        self.state: Optional[Dict[str, Any]] = None
+        self._body = b""
+        self._sampled_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def evaluate(self, loop_lag: float = 0.0, engine=None) -> Dict[str, Any]:
+        """Sample every signal once and cache the verdict"""
+        engine = engine or default_engine
+        pool = pool_snapshot(engine)
+        capacity = pool["size"] + max(getattr(engine.pool, "_max_overflow", 0), 0)
+        pool_utilization = pool["checked_out"] / capacity if capacity else 0.0
+        queue_depth = contract_render_pool.queue_depth()
+        queue_utilization = queue_depth / contract_render_pool.max_queue if contract_render_pool.max_queue else 0.0
+
+        checks = {
+            "db_pool": {
+                "ok": pool_utilization < self.pool_max_utilization,
+                "checked_out": pool["checked_out"],
+                "capacity": capacity,
+                "utilization": round(pool_utilization, 3),
+            },
+            "event_loop": {
+                "ok": loop_lag < self.max_loop_lag,
+                "lag_seconds": round(loop_lag, 4),
+            },
+            "contract_queue": {
+                "ok": queue_utilization < self.queue_max_utilization,
+                "depth": queue_depth,
+                "capacity": contract_render_pool.max_queue,
+            },
+            "paystack": {
+                "ok": True,
+                "circuit_state": paystack_circuit_state(),
+            },
+        }
+        ready = all(check["ok"] for check in checks.values())
+        self._sampled_at = time.monotonic()
+        self.state = {"status": "ready" if ready else "not_ready", "checks": checks}
+        self._body = json.dumps(self.state).encode()
+        EVENT_LOOP_LAG.set(loop_lag)
+        READY.set(1 if ready else 0)
+        return self.state
+
+    def readiness(self) -> Tuple[bool, bytes]:
+        """Cached (ready, JSON body); samples once if the monitor is not running"""
+        if self.state is None:
+            self.evaluate()
+        age = time.monotonic() - self._sampled_at
+        if self._task is not None and age > self.stale_seconds:
+            return False, json.dumps({"status": "not_ready", "reason": f"last sample {age:.1f}s old"}).encode()
+        return self.state["status"] == "ready", self._body
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            try:
+                self.evaluate(max(loop.time() - expected, 0.0))
+            except Exception:
+                logger.exception("Readiness sample failed")
+
+
+readiness_monitor = ReadinessMonitor()
@@ -0,0 +1,343 @@
+"""
+Signatures over legal acknowledgments and ownership transfer agreements.
+
+What was signed is serialized canonically (sorted-key compact JSON with a
+`kind` domain separator, timestamps normalized to UTC with microseconds) and
+hashed with keyed BLAKE2b (32-byte digest, so it fits the existing 64-char
+signature_hash columns). Acknowledgments sign the document version and
+content hash snapshotted on the acknowledgment row, which is also what the
+verifier reads. The key id is stored next to the hash, which allows
+key rotation: SIGNATURE_KEY_ID signs, SIGNATURE_RETIRED_KEYS still verify.
+Rows with no key id carry the old unkeyed hashes, whose inputs were never
+stored, and are reported as legacy rather than verified.
+
+The bulk verifier streams rows in keyset-paginated chunks of plain tuples
+and hashes each chunk in a process pool with a bounded number of chunks in
+flight, so memory stays flat for millions of rows.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import SIGNATURE_VERIFICATIONS
+
+logger = logging.getLogger(__name__)
+
+ACKNOWLEDGMENT = "legal_acknowledgment"
+OWNERSHIP_AGREEMENT = "ownership_agreement"
+KINDS = (ACKNOWLEDGMENT, OWNERSHIP_AGREEMENT)
+
+# Verification results
+VALID = "valid"
+MISMATCH = "mismatch"
+LEGACY = "legacy"  # Unkeyed hash from before the signature service
+UNKNOWN_KEY = "unknown_key"  # Signed with a key that is no longer configured
+
+
+def canonical_timestamp(value: datetime) -> str:
+    """UTC ISO-8601 with microseconds; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def canonical_payload(kind: str, fields: Dict[str, Any]) -> bytes:
+    """Deterministic bytes for a signed record"""
+    return json.dumps(
+        {"kind": kind, **fields}, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def acknowledgment_payload(
+    user_id: int,
+    document_id: int,
+    document_version: str,
+    document_content_hash: Optional[str],
+    signed_by_name: str,
+    signed_at: datetime
+) -> bytes:
+    return canonical_payload(ACKNOWLEDGMENT, {
+        "user_id": user_id,
+        "document_id": document_id,
+        "document_version": document_version,
+        "document_content_hash": document_content_hash or "",
+        "signed_by_name": signed_by_name,
+        "signed_at": canonical_timestamp(signed_at),
+    })
+
+
+def ownership_agreement_payload(
+    transaction_id: int,
+    agreement_version: str,
+    agreement_content: str,
+    signed_by_name: str,
+    signed_at: datetime
+) -> bytes:
+    return canonical_payload(OWNERSHIP_AGREEMENT, {
+        "transaction_id": transaction_id,
+        "agreement_version": agreement_version,
+        "agreement_content_sha256": hashlib.sha256(agreement_content.encode("utf-8")).hexdigest(),
+        "signed_by_name": signed_by_name,
+        "signed_at": canonical_timestamp(signed_at),
+    })
+
+
+def _derive_key(secret: str) -> bytes:
+    # BLAKE2b keys are at most 64 bytes; any configured secret maps to 32
+    return hashlib.sha256(secret.encode("utf-8")).digest()
+
+
+def _digest(key: bytes, payload: bytes) -> str:
+    return hashlib.blake2b(payload, key=key, digest_size=32).hexdigest()
+
+
+class Signer:
+    """Signs with the active key and verifies against any configured key"""
+
+    def __init__(self, key_id: str, keys: Dict[str, bytes]):
+        self.key_id = key_id
+        self.keys = keys
+
+    @classmethod
+    def from_secrets(cls, key_id: str, secret: str, retired: Optional[Dict[str, str]] = None) -> "Signer":
+        keys = {kid: _derive_key(value) for kid, value in (retired or {}).items()}
+        keys[key_id] = _derive_key(secret)
+        return cls(key_id, keys)
+
+    def sign(self, payload: bytes) -> Tuple[str, str]:
+        """Returns (key_id, signature_hash)"""
+        return self.key_id, _digest(self.keys[self.key_id], payload)
+
+    def verify(self, payload: bytes, key_id: Optional[str], signature_hash: Optional[str]) -> str:
+        if not key_id:
+            return LEGACY
+        key = self.keys.get(key_id)
+        if key is None:
+            return UNKNOWN_KEY
+        return VALID if hmac.compare_digest(_digest(key, payload), signature_hash or "") else MISMATCH
+
+
+_signer: Optional[Signer] = None
+
+
+def get_signer() -> Signer:
+    global _signer
+    if _signer is None:
+        _signer = Signer.from_secrets(
+            settings.SIGNATURE_KEY_ID,
+            settings.SIGNATURE_KEY or settings.JWT_SECRET_KEY,
+            settings.SIGNATURE_RETIRED_KEYS,
+        )
+    return _signer
+
+
+# Bulk verification. Rows are plain tuples so they pickle cheaply:
+#   acknowledgment: (id, user_id, document_id, version, content_hash, signed_by_name, signed_at, key_id, hash)
+#   ownership agreement: (id, transaction_id, version, content, signed_by_name, signed_at, key_id, hash)
+
+def _row_payload(kind: str, row: Sequence[Any]) -> bytes:
+    if kind == ACKNOWLEDGMENT:
+        return acknowledgment_payload(*row[1:7])
+    return ownership_agreement_payload(*row[1:6])
+
+
+def verify_rows(kind: str, rows: List[Sequence[Any]], signer: Signer) -> List[Tuple[int, str]]:
+    """(id, result) for every row that is not VALID"""
+    failures = []
+    for row in rows:
+        result = signer.verify(_row_payload(kind, row), row[-2], row[-1])
+        if result != VALID:
+            failures.append((row[0], result))
+    return failures
+
+
+_worker_signer: Optional[Signer] = None
+
+
+def _init_worker(key_id: str, keys: Dict[str, bytes]) -> None:
+    global _worker_signer
+    _worker_signer = Signer(key_id, keys)
+
+
+def _verify_chunk(kind: str, rows: List[Sequence[Any]]) -> List[Tuple[int, str]]:
+    return verify_rows(kind, rows, _worker_signer)
+
+
+class SignatureReport:
+    """Running totals plus a capped sample of failed rows"""
+
+    def __init__(self, sample_limit: int = 500, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.sample_limit = sample_limit
+        self.sink = sink
+        self.checked: Dict[str, int] = {kind: 0 for kind in KINDS}
+        self.counts: Dict[str, Dict[str, int]] = {kind: {} for kind in KINDS}
+        self.chunks = 0
+        self.samples: List[Dict[str, Any]] = []
+        self.started_at = datetime.utcnow().isoformat()
+        self._started = time.perf_counter()
+        self.duration_seconds = 0.0
+
+    def add_chunk(self, kind: str, size: int, failures: List[Tuple[int, str]]) -> None:
+        self.chunks += 1
+        self.checked[kind] += size
+        counts = self.counts[kind]
+        for row_id, result in failures:
+            counts[result] = counts.get(result, 0) + 1
+            SIGNATURE_VERIFICATIONS.labels(kind=kind, result=result).inc()
+            if result == LEGACY:
+                continue  # Counted only; there is nothing to investigate per row
+            item = {"kind": kind, "id": row_id, "result": result}
+            if len(self.samples) < self.sample_limit:
+                self.samples.append(item)
+            if self.sink:
+                self.sink(item)
+        SIGNATURE_VERIFICATIONS.labels(kind=kind, result=VALID).inc(size - len(failures))
+
+    def finish(self) -> None:
+        self.duration_seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        checked = sum(self.checked.values())
+        by_kind = {}
+        for kind in KINDS:
+            counts = self.counts[kind]
+            by_kind[kind] = {
+                "checked": self.checked[kind],
+                VALID: self.checked[kind] - sum(counts.values()),
+                **{result: counts.get(result, 0) for result in (MISMATCH, LEGACY, UNKNOWN_KEY)},
+            }
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "checked": checked,
+            "chunks": self.chunks,
+            "mismatches": sum(kind[MISMATCH] for kind in by_kind.values()),
+            "by_kind": by_kind,
+            "rows_per_second": round(checked / self.duration_seconds, 1) if self.duration_seconds else 0.0,
+            "samples": self.samples,
+        }
+
+
+class SignatureVerifier:
+    """Streams signed rows and verifies them chunk by chunk in worker processes"""
+
+    def __init__(self, signer: Optional[Signer] = None, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.signer = signer or get_signer()
+        self.workers = settings.SIGNATURE_VERIFY_WORKERS if workers is None else workers
+        if self.workers < 0:
+            self.workers = os.cpu_count() or 1
+        self.chunk_size = chunk_size or settings.SIGNATURE_VERIFY_CHUNK_SIZE
+
+    def iter_chunks(self, db: Session, kind: str) -> Iterator[List[Tuple]]:
+        """Keyset pagination on id; signed rows only, as plain tuples"""
+        from app.models.ownership_agreement import OwnershipAgreement
+        from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
+
+        if kind == ACKNOWLEDGMENT:
+            # The version and content hash snapshotted at signing time, so later
+            # edits or re-publication of the document do not break old signatures
+            model = UserLegalAcknowledgment
+            query = db.query(
+                UserLegalAcknowledgment.id,
+                UserLegalAcknowledgment.user_id,
+                UserLegalAcknowledgment.document_id,
+                UserLegalAcknowledgment.version,
+                UserLegalAcknowledgment.content_hash,
+                UserLegalAcknowledgment.signed_by_name,
+                UserLegalAcknowledgment.acknowledged_at,
+                UserLegalAcknowledgment.signature_key_id,
+                UserLegalAcknowledgment.signature_hash,
+            )
+        else:
+            model = OwnershipAgreement
+            query = db.query(
+                OwnershipAgreement.id,
+                OwnershipAgreement.transaction_id,
+                OwnershipAgreement.agreement_version,
+                OwnershipAgreement.agreement_content,
+                OwnershipAgreement.signed_by_name,
+                OwnershipAgreement.signed_at,
+                OwnershipAgreement.signature_key_id,
+                OwnershipAgreement.signature_hash,
+            )
+        query = query.filter(model.signature_hash.isnot(None))
+
+        last_id = 0
+        while True:
+            rows = query.filter(model.id > last_id).order_by(model.id).limit(self.chunk_size).all()
+            if not rows:
+                return
+            yield [tuple(row) for row in rows]
+            last_id = rows[-1][0]
+
+    def run(self, db: Session, kinds: Sequence[str] = KINDS, report: Optional[SignatureReport] = None) -> SignatureReport:
+        report = report or SignatureReport()
+        if self.workers == 0:
+            for kind in kinds:
+                for rows in self.iter_chunks(db, kind):
+                    report.add_chunk(kind, len(rows), verify_rows(kind, rows, self.signer))
+        else:
+            self._run_pool(db, kinds, report)
+        report.finish()
+        logger.info("Signature verification finished: %s", {k: v for k, v in report.to_dict().items() if k != "samples"})
+        return report
+
+    def _run_pool(self, db: Session, kinds: Sequence[str], report: SignatureReport) -> None:
+        in_flight: Deque[Tuple[str, int, Future]] = deque()
+        max_in_flight = self.workers * 2  # Bounds memory; the next page is read while workers hash
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.signer.key_id, self.signer.keys),
+        ) as pool:
+            for kind in kinds:
+                for rows in self.iter_chunks(db, kind):
+                    if len(in_flight) >= max_in_flight:
+                        self._collect(in_flight.popleft(), report)
+                    in_flight.append((kind, len(rows), pool.submit(_verify_chunk, kind, rows)))
+            while in_flight:
+                self._collect(in_flight.popleft(), report)
+
+    @staticmethod
+    def _collect(entry: Tuple[str, int, Future], report: SignatureReport) -> None:
+        kind, size, future = entry
+        report.add_chunk(kind, size, future.result())
+
+
+def run_signature_verification(
+    db: Session,
+    kinds: Sequence[str] = KINDS,
+    report_path: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Verify every stored signature.
+
+    Args:
+        db: Database session
+        kinds: Record kinds to check (legal_acknowledgment, ownership_agreement)
+        report_path: Optional JSON-lines file receiving every failed row
+        **kwargs: SignatureVerifier options (workers, chunk_size)
+
+    Returns:
+        Report summary with a capped sample of failures
+    """
+    verifier = SignatureVerifier(**kwargs)
+    if not report_path:
+        return verifier.run(db, kinds).to_dict()
+
+    with open(report_path, "a", encoding="utf-8") as handle:
+        def sink(item: Dict[str, Any]) -> None:
+            handle.write(json.dumps(item) + "\n")
+
+        return verifier.run(db, kinds, SignatureReport(sink=sink)).to_dict()
@@ -0,0 +1,356 @@
+"""
+Transaction state machine.
+
+The transition table is compiled once into frozensets, so checks are O(1)
+lookups. There is one way to move transactions between states:
+
+    transition(db, transaction, TransactionState.FUNDS_HELD, reason="charge.success")
+    transition_many(db, ids, TransactionState.FUNDS_RELEASED, TransactionState.COMPLETED)
+
+Both issue a guarded UPDATE ... WHERE id = :id AND state = :expected, so two
+concurrent writers can never both move the same transaction. The loser gets a
+StaleTransitionError (single) or is left out of the result (bulk). Every
+transition that happens does two more things in the same database transaction:
+- it appends a transaction_state_events row;
+- it runs the hooks registered for the target state.
+
+The step timestamp of the target state (funds_held_at, completed_at, ...) is
+set automatically.
+
+Hooks receive every event of one call at once, so bulk callers pay one
+statement per hook rather than one per transaction:
+
+    @on_transition(TransactionState.COMPLETED)
+    def _mark_listing_sold(db, events): ...
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.sql.elements import ClauseElement
+
+from app.models.listing import Listing, ListingState
+from app.models.temporary_access import TemporaryAccess
+from app.models.transaction import Transaction, TransactionState
+from app.models.transaction_state_event import TransactionStateEvent
+
+S = TransactionState
+
+TRANSITIONS: Mapping[TransactionState, FrozenSet[TransactionState]] = MappingProxyType({
+    # STEP 1: Initiate Purchase (charge.success may arrive without a PAYMENT_PENDING step)
+    S.PURCHASE_INITIATED: frozenset({S.PAYMENT_PENDING, S.FUNDS_HELD, S.CANCELLED}),
+    # STEP 2: Payment
+    S.PAYMENT_PENDING: frozenset({S.FUNDS_HELD, S.CANCELLED, S.REFUNDED}),
+    S.FUNDS_HELD: frozenset({S.TEMPORARY_ACCESS_GRANTED, S.REFUNDED, S.DISPUTED}),
+    # STEP 3: Temporary Access
+    S.TEMPORARY_ACCESS_GRANTED: frozenset({S.VERIFICATION_WINDOW, S.REFUNDED, S.DISPUTED}),
+    # STEP 4: Verification Window
+    S.VERIFICATION_WINDOW: frozenset({S.OWNERSHIP_AGREEMENT_PENDING, S.REFUNDED, S.DISPUTED}),
+    # STEP 5: Ownership Agreement
+    S.OWNERSHIP_AGREEMENT_PENDING: frozenset({S.OWNERSHIP_AGREEMENT_SIGNED, S.REFUNDED, S.DISPUTED}),
+    S.OWNERSHIP_AGREEMENT_SIGNED: frozenset({S.FUNDS_RELEASE_PENDING, S.REFUNDED, S.DISPUTED}),
+    # STEP 6: Final Confirmation
+    S.FUNDS_RELEASE_PENDING: frozenset({S.FUNDS_RELEASED, S.REFUNDED, S.DISPUTED}),
+    S.FUNDS_RELEASED: frozenset({S.COMPLETED}),
+    # STEP 7: Transaction Closed (terminal)
+    S.COMPLETED: frozenset(),
+    S.REFUNDED: frozenset(),
+    S.CANCELLED: frozenset(),
+    # Dispute can lead to refund or completion (admin decision)
+    S.DISPUTED: frozenset({S.REFUNDED, S.COMPLETED, S.FUNDS_RELEASED}),
+})
+
+TERMINAL_STATES: FrozenSet[TransactionState] = frozenset(state for state, targets in TRANSITIONS.items() if not targets)
+
+STEP_NUMBERS: Mapping[TransactionState, int] = MappingProxyType({
+    S.PURCHASE_INITIATED: 1,
+    S.PAYMENT_PENDING: 2,
+    S.FUNDS_HELD: 2,
+    S.TEMPORARY_ACCESS_GRANTED: 3,
+    S.VERIFICATION_WINDOW: 4,
+    S.OWNERSHIP_AGREEMENT_PENDING: 5,
+    S.OWNERSHIP_AGREEMENT_SIGNED: 5,
+    S.FUNDS_RELEASE_PENDING: 6,
+    S.FUNDS_RELEASED: 6,
+    S.COMPLETED: 7,
+    S.REFUNDED: 0,  # Terminal
+    S.CANCELLED: 0,  # Terminal
+    S.DISPUTED: 0,  # Special state
+})
+
+# Step timestamp set when a transaction enters a state
+ENTRY_TIMESTAMPS: Mapping[TransactionState, str] = MappingProxyType({
+    S.PURCHASE_INITIATED: "purchase_initiated_at",
+    S.PAYMENT_PENDING: "payment_pending_at",
+    S.FUNDS_HELD: "funds_held_at",
+    S.TEMPORARY_ACCESS_GRANTED: "temporary_access_granted_at",
+    S.VERIFICATION_WINDOW: "verification_window_started_at",
+    S.OWNERSHIP_AGREEMENT_PENDING: "ownership_agreement_pending_at",
+    S.OWNERSHIP_AGREEMENT_SIGNED: "ownership_agreement_signed_at",
+    S.FUNDS_RELEASE_PENDING: "funds_release_pending_at",
+    S.FUNDS_RELEASED: "funds_released_at",
+    S.COMPLETED: "completed_at",
+    S.REFUNDED: "refunded_at",
+    S.CANCELLED: "cancelled_at",
+})
+
+
+class InvalidTransitionError(ValueError):
+    """The transition table does not allow this move"""
+
+
+class StaleTransitionError(InvalidTransitionError):
+    """The transaction left the expected state before the guarded UPDATE ran"""
+
+
+@dataclass(frozen=True)
+class TransitionEvent:
+    """A state change that has happened (visible to hooks before commit)"""
+    transaction_id: int
+    listing_id: int
+    from_state: Optional[TransactionState]
+    to_state: TransactionState
+    actor_id: Optional[int]
+    reason: Optional[str]
+    occurred_at: datetime
+
+
+Hook = Callable[[Session, List[TransitionEvent]], None]
+
+_hooks: Dict[Optional[TransactionState], List[Hook]] = defaultdict(list)
+
+
+def can_transition(from_state: TransactionState, to_state: TransactionState) -> bool:
+    """True if the table allows from_state -> to_state"""
+    return to_state in TRANSITIONS.get(from_state, frozenset())
+
+
+def register_hook(hook: Hook, to_states: Optional[Iterable[TransactionState]] = None) -> Hook:
+    """Run hook for transitions into any of to_states (every transition if None)"""
+    for state in (to_states if to_states is not None else [None]):
+        if hook not in _hooks[state]:
+            _hooks[state].append(hook)
+    return hook
+
+
+def on_transition(*to_states: TransactionState) -> Callable[[Hook], Hook]:
+    """Decorator form of register_hook"""
+    def decorator(hook: Hook) -> Hook:
+        return register_hook(hook, to_states or None)
+    return decorator
+
+
+def _entry_values(to_state: TransactionState, now: datetime, values: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    updates: Dict[str, Any] = {"state": to_state}
+    column = ENTRY_TIMESTAMPS.get(to_state)
+    if column:
+        updates[column] = now
+    updates.update(values or {})
+    return updates
+
+
+def _record(db: Session, events: List[TransitionEvent]) -> None:
+    """Append the history rows and run hooks (no commit)"""
+    if not events:
+        return
+    db.execute(insert(TransactionStateEvent), [
+        {
+            "transaction_id": event.transaction_id,
+            "from_state": event.from_state,
+            "to_state": event.to_state,
+            "actor_id": event.actor_id,
+            "reason": event.reason,
+            "created_at": event.occurred_at,
+        }
+        for event in events
+    ])
+
+    by_hook: Dict[Hook, List[TransitionEvent]] = {}
+    for event in events:
+        for hook in _hooks.get(event.to_state, []) + _hooks.get(None, []):
+            by_hook.setdefault(hook, []).append(event)
+    for hook, hook_events in by_hook.items():
+        hook(db, hook_events)
+
+
+def record_creation(
+    db: Session,
+    transaction: Transaction,
+    actor_id: Optional[int] = None,
+    reason: Optional[str] = None
+) -> None:
+    """Record the initial state of a newly inserted transaction (flushes, no commit)"""
+    db.flush()
+    _record(db, [TransitionEvent(
+        transaction_id=transaction.id,
+        listing_id=transaction.listing_id,
+        from_state=None,
+        to_state=transaction.state,
+        actor_id=actor_id,
+        reason=reason,
+        occurred_at=datetime.now(timezone.utc),
+    )])
+
+
+def transition(
+    db: Session,
+    transaction: Transaction,
+    to_state: TransactionState,
+    *,
+    actor_id: Optional[int] = None,
+    reason: Optional[str] = None,
+    values: Optional[Dict[str, Any]] = None,
+    force: bool = False,
+    commit: bool = True
+) -> Transaction:
+    """
+    Move one transaction to to_state.
+
+    Args:
+        db: Database session (pending changes to the transaction are flushed first)
+        transaction: Transaction in the state the caller expects it to be in
+        to_state: Target state
+        actor_id: User causing the change (None for webhooks and schedulers)
+        reason: Free-text reason stored with the event
+        values: Extra columns to set in the same UPDATE
+        force: Skip the transition table (admin overrides); the state guard still applies
+        commit: Commit and refresh; with False the change joins the caller's transaction
+
+    Raises:
+        InvalidTransitionError: The table does not allow the move
+        StaleTransitionError: The transaction changed state concurrently (rolled back)
+    """
+    from_state = transaction.state
+    if not force and not can_transition(from_state, to_state):
+        raise InvalidTransitionError(f"Cannot transition from {from_state.value} to {to_state.value}")
+
+    db.flush()
+    now = datetime.now(timezone.utc)
+    updates = _entry_values(to_state, now, values)
+    result = db.execute(
+        update(Transaction)
+        .where(Transaction.id == transaction.id, Transaction.state == from_state)
+        .values(**updates)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        raise StaleTransitionError(f"Transaction {transaction.id} is no longer {from_state.value}")
+
+    # Keep the loaded object in line with the row without marking it dirty
+    for key, value in updates.items():
+        if isinstance(value, ClauseElement):
+            db.expire(transaction, [key])
+        else:
+            set_committed_value(transaction, key, value)
+
+    _record(db, [TransitionEvent(
+        transaction_id=transaction.id,
+        listing_id=transaction.listing_id,
+        from_state=from_state,
+        to_state=to_state,
+        actor_id=actor_id,
+        reason=reason,
+        occurred_at=now,
+    )])
+
+    if commit:
+        db.commit()
+        db.refresh(transaction)
+    return transaction
+
+
+def transition_many(
+    db: Session,
+    transaction_ids: List[int],
+    from_state: TransactionState,
+    to_state: TransactionState,
+    *,
+    actor_id: Optional[int] = None,
+    reason: Optional[str] = None,
+    values: Optional[Dict[str, Any]] = None
+) -> List[int]:
+    """
+    Move every listed transaction still in from_state to to_state in one UPDATE (no commit).
+
+    Returns:
+        Ids that moved; the others had already left from_state
+    """
+    if not can_transition(from_state, to_state):
+        raise InvalidTransitionError(f"Cannot transition from {from_state.value} to {to_state.value}")
+    if not transaction_ids:
+        return []
+
+    now = datetime.now(timezone.utc)
+    rows = db.execute(
+        update(Transaction)
+        .where(Transaction.id.in_(transaction_ids), Transaction.state == from_state)
+        .values(**_entry_values(to_state, now, values))
+        .returning(Transaction.id, Transaction.listing_id)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    _record(db, [
+        TransitionEvent(
+            transaction_id=row.id,
+            listing_id=row.listing_id,
+            from_state=from_state,
+            to_state=to_state,
+            actor_id=actor_id,
+            reason=reason,
+            occurred_at=now,
+        )
+        for row in rows
+    ])
+    return [row.id for row in rows]
+
+
+# Side effects shared by every path --------------------------------------------
+
+@on_transition(S.FUNDS_HELD)
+def _reserve_listing(db: Session, events: List[TransitionEvent]) -> None:
+    """Paid listings stay off the catalog"""
+    db.query(Listing).filter(Listing.id.in_([e.listing_id for e in events])).update(
+        {Listing.state: ListingState.RESERVED},
+        synchronize_session=False
+    )
+
+
+@on_transition(S.REFUNDED, S.CANCELLED)
+def _release_listing(db: Session, events: List[TransitionEvent]) -> None:
+    """Seller can relist after a refund or cancellation"""
+    db.query(Listing).filter(
+        Listing.id.in_([e.listing_id for e in events]),
+        Listing.state == ListingState.RESERVED
+    ).update({Listing.state: ListingState.APPROVED}, synchronize_session=False)
+
+
+@on_transition(S.COMPLETED)
+def _mark_listing_sold(db: Session, events: List[TransitionEvent]) -> None:
+    db.query(Listing).filter(Listing.id.in_([e.listing_id for e in events])).update(
+        {Listing.state: ListingState.SOLD},
+        synchronize_session=False
+    )
+
+
+@on_transition(S.REFUNDED, S.CANCELLED)
+def _revoke_temporary_access(db: Session, events: List[TransitionEvent]) -> None:
+    """The buyer loses account access once the purchase is unwound"""
+    db.query(TemporaryAccess).filter(
+        TemporaryAccess.transaction_id.in_([e.transaction_id for e in events])
+    ).update({TemporaryAccess.access_revoked: True}, synchronize_session=False)
+
+
+# Imported last: app.crud imports this module for transition()
+from app.crud.seller_stats import apply_transitions as _update_seller_stats  # noqa: E402
+from app.core.event_broker import publish_transitions as _publish_events  # noqa: E402
+from app.crud.outbox import TRANSACTION_UPDATE_RECIPIENTS, enqueue_transition_notifications as _enqueue_notifications  # noqa: E402
+
+register_hook(_update_seller_stats)
+register_hook(_publish_events)
+register_hook(_enqueue_notifications, to_states=TRANSACTION_UPDATE_RECIPIENTS)
@@ -0,0 +1,315 @@
+"""
+Content-addressed object storage for contract PDFs and proof files.
+
+Blobs are keyed by the SHA-256 of their content, so identical uploads are
+stored once and a key always refers to the same bytes.
+
+Backends:
+- FilesystemStorage: blobs under STORAGE_ROOT/ab/cd/abcd..., written to a temp
+  file and atomically renamed into place. Served with FileResponse (HTTP range
+  requests, zero-copy pathsend where the server supports it) or handed to
+  nginx via X-Accel-Redirect.
+- S3Storage: any S3-compatible endpoint (AWS, MinIO, LocalStack via
+  S3_ENDPOINT_URL). Served by redirecting to a short-lived presigned URL.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, RedirectResponse, Response
+
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class StorageError(Exception):
+    """Raised for invalid keys, missing blobs and oversized uploads"""
+    pass
+
+
+class StoredBlob:
+    """Result of a put: key (sha256 hex), size in bytes, and whether it was already stored"""
+
+    def __init__(self, key: str, size: int, deduplicated: bool = False):
+        self.key = key
+        self.size = size
+        self.deduplicated = deduplicated
+
+    def __repr__(self) -> str:
+        return f"StoredBlob(key={self.key[:12]}..., size={self.size}, deduplicated={self.deduplicated})"
+
+
+def validate_key(key: str) -> str:
+    if not SHA256_PATTERN.match(key or ""):
+        raise StorageError("Invalid storage key")
+    return key
+
+
+class StorageBackend(ABC):
+    """Interface shared by all backends"""
+
+    @abstractmethod
+    def put_bytes(self, data: bytes) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    def put_stream(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def open(self, key: str) -> Iterator[bytes]:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def download_response(self, key: str, filename: str, media_type: Optional[str] = None) -> Response:
+        ...
+
+
+class FilesystemStorage(StorageBackend):
+    """Local content-addressed blob store"""
+
+    def __init__(self, root: str, accel_redirect_prefix: str = ""):
+        self.root = os.path.abspath(root)
+        self.tmp_dir = os.path.join(self.root, "tmp")
+        self.accel_redirect_prefix = accel_redirect_prefix.rstrip("/")
+        os.makedirs(self.tmp_dir, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        validate_key(key)
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def put_bytes(self, data: bytes) -> StoredBlob:
+        key = hashlib.sha256(data).hexdigest()
+        final_path = self.path_for(key)
+        if os.path.exists(final_path):
+            return StoredBlob(key, len(data), deduplicated=True)
+        tmp_path = self._tmp_path()
+        with open(tmp_path, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        return self._commit(tmp_path, key, len(data))
+
+    def put_stream(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        """Hash while copying to a temp file; never holds the whole blob in memory"""
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = self._tmp_path()
+        try:
+            with open(tmp_path, "wb") as handle:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise StorageError(f"File exceeds maximum size of {max_size} bytes")
+                    digest.update(chunk)
+                    handle.write(chunk)
+                handle.flush()
+                os.fsync(handle.fileno())
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+        return self._commit(tmp_path, digest.hexdigest(), size)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def open(self, key: str) -> Iterator[bytes]:
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            raise StorageError("Blob not found")
+        with open(path, "rb") as handle:
+            while True:
+                chunk = handle.read(CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+
+    def delete(self, key: str) -> None:
+        self._discard(self.path_for(key))
+
+    def download_response(self, key: str, filename: str, media_type: Optional[str] = None) -> Response:
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            raise StorageError("Blob not found")
+        headers = {"ETag": f'"{key}"', "Cache-Control": "private, max-age=31536000, immutable"}
+        if self.accel_redirect_prefix:
+            # nginx serves the file itself with sendfile()
+            headers["X-Accel-Redirect"] = f"{self.accel_redirect_prefix}/{key[:2]}/{key[2:4]}/{key}"
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+            return Response(status_code=200, headers=headers, media_type=media_type)
+        return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+    def _tmp_path(self) -> str:
+        return os.path.join(self.tmp_dir, f"{uuid.uuid4().hex}.part")
+
+    def _commit(self, tmp_path: str, key: str, size: int) -> StoredBlob:
+        final_path = self.path_for(key)
+        if os.path.exists(final_path):
+            self._discard(tmp_path)
+            return StoredBlob(key, size, deduplicated=True)
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.chmod(tmp_path, 0o444)
+        # Atomic on POSIX: readers see either no file or the complete blob
+        os.replace(tmp_path, final_path)
+        return StoredBlob(key, size)
+
+    @staticmethod
+    def _discard(path: str) -> None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class S3Storage(StorageBackend):
+    """Content-addressed blobs in an S3-compatible bucket"""
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        prefix: str = "blobs",
+        presign_seconds: int = 300,
+        client=None,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.presign_seconds = presign_seconds
+        if client is None:
+            import boto3
+
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url or None,
+                region_name=region or None,
+                aws_access_key_id=access_key or None,
+                aws_secret_access_key=secret_key or None,
+            )
+        self.client = client
+
+    def object_key(self, key: str) -> str:
+        validate_key(key)
+        return f"{self.prefix}/{key[:2]}/{key[2:4]}/{key}"
+
+    def put_bytes(self, data: bytes) -> StoredBlob:
+        key = hashlib.sha256(data).hexdigest()
+        if self.exists(key):
+            return StoredBlob(key, len(data), deduplicated=True)
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.object_key(key),
+            Body=data,
+            ChecksumSHA256=_b64_sha256(key),
+        )
+        return StoredBlob(key, len(data))
+
+    def put_stream(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        """The key is only known after hashing, so the stream is spooled first (to disk past 8 MB)"""
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.SpooledTemporaryFile(max_size=8 * CHUNK_SIZE) as spool:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise StorageError(f"File exceeds maximum size of {max_size} bytes")
+                digest.update(chunk)
+                spool.write(chunk)
+            key = digest.hexdigest()
+            if self.exists(key):
+                return StoredBlob(key, size, deduplicated=True)
+            spool.seek(0)
+            self.client.upload_fileobj(spool, self.bucket, self.object_key(key))
+        return StoredBlob(key, size)
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def open(self, key: str) -> Iterator[bytes]:
+        response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        yield from response["Body"].iter_chunks(CHUNK_SIZE)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def download_response(self, key: str, filename: str, media_type: Optional[str] = None) -> Response:
+        params = {
+            "Bucket": self.bucket,
+            "Key": self.object_key(key),
+            "ResponseContentDisposition": f'attachment; filename="{filename}"',
+        }
+        if media_type:
+            params["ResponseContentType"] = media_type
+        url = self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=self.presign_seconds)
+        # S3 itself serves the bytes (and Range requests)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+
+def _b64_sha256(hex_digest: str) -> str:
+    import base64
+
+    return base64.b64encode(bytes.fromhex(hex_digest)).decode("ascii")
+
+
+def build_storage() -> StorageBackend:
+    """Create the backend selected by STORAGE_BACKEND"""
+    if settings.STORAGE_BACKEND == "s3":
+        return S3Storage(
+            bucket=settings.AWS_S3_BUCKET,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.AWS_REGION,
+            access_key=settings.AWS_ACCESS_KEY_ID,
+            secret_key=settings.AWS_SECRET_ACCESS_KEY,
+        )
+    return FilesystemStorage(settings.STORAGE_ROOT, accel_redirect_prefix=settings.STORAGE_X_ACCEL_REDIRECT_PREFIX)
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    global _storage
+    if _storage is None:
+        _storage = build_storage()
+    return _storage
+
+
+def blob_response(key: Optional[str], filename: str, media_type: Optional[str] = None) -> Response:
+    """Download response for a stored blob, 404 if missing"""
+    if not key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not stored")
+    try:
+        return get_storage().download_response(key, filename, media_type)
+    except StorageError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="File not found")
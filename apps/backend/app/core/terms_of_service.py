@@ -1,8 +1,14 @@
 """
 Terms of Service content and versioning.
+
+Every published version is compiled once (at startup, see get_terms_bundle)
+into immutable JSON and HTML byte blobs with ETags, which the /terms
+endpoints return as-is.
 """
-from datetime import datetime
-from typing import Dict, Any
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional
 
 
 class TermsOfService:
@@ -138,6 +144,12 @@ For questions about these terms, contact: support@escrow.com
 **By using the Escrow platform, you acknowledge that you have read, understood, and agree to be bound by these Terms of Service.**
 """
     
+    # Published versions: version -> (effective date, markdown).
+    # Add new versions here; never edit a published one (clients cache them forever).
+    VERSIONS = {
+        CURRENT_VERSION: (EFFECTIVE_DATE, FULL_TERMS),
+    }
+    
     @staticmethod
     def get_terms(version: str = None) -> Dict[str, Any]:
         """
@@ -148,13 +160,18 @@ For questions about these terms, contact: support@escrow.com
             
         Returns:
             Dictionary with terms content and metadata
+            
+        Raises:
+            KeyError: If the version was never published
         """
+        version = version or TermsOfService.CURRENT_VERSION
+        effective_date, content = TermsOfService.VERSIONS[version]
         return {
-            "version": version or TermsOfService.CURRENT_VERSION,
-            "effective_date": TermsOfService.EFFECTIVE_DATE,
-            "content": TermsOfService.FULL_TERMS,
+            "version": version,
+            "effective_date": effective_date,
+            "content": content,
             "platform_role_clause": TermsOfService.PLATFORM_ROLE_CLAUSE,
-            "last_updated": datetime.utcnow().isoformat()
+            "last_updated": f"{effective_date}T00:00:00Z"
         }
     
     @staticmethod
@@ -162,3 +179,47 @@ For questions about these terms, contact: support@escrow.com
         """Get the platform role clause for contracts and agreements"""
         return TermsOfService.PLATFORM_ROLE_CLAUSE
 
+
+class TermsBlob(NamedTuple):
+    """Pre-serialized response body and its strong ETag"""
+    body: bytes
+    etag: str
+
+
+def _blob(body: bytes) -> TermsBlob:
+    return TermsBlob(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def _json_blob(data: Dict[str, Any]) -> TermsBlob:
+    return _blob(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+class TermsBundle:
+    """Every terms version compiled to JSON and HTML blobs"""
+    
+    def __init__(self):
+        from app.utils.markdown_renderer import markdown_to_html_with_library
+        
+        self.json: Dict[str, TermsBlob] = {}
+        self.html: Dict[str, TermsBlob] = {}
+        for version in TermsOfService.VERSIONS:
+            terms = TermsOfService.get_terms(version)
+            self.json[version] = _json_blob(terms)
+            html = markdown_to_html_with_library(terms["content"], library="markdown2")
+            self.html[version] = _blob(html.encode("utf-8"))
+        self.platform_role = _json_blob({
+            "clause": TermsOfService.PLATFORM_ROLE_CLAUSE,
+            "version": TermsOfService.CURRENT_VERSION
+        })
+    
+    def get_json(self, version: Optional[str] = None) -> Optional[TermsBlob]:
+        return self.json.get(version or TermsOfService.CURRENT_VERSION)
+    
+    def get_html(self, version: Optional[str] = None) -> Optional[TermsBlob]:
+        return self.html.get(version or TermsOfService.CURRENT_VERSION)
+
+
+@lru_cache(maxsize=1)
+def get_terms_bundle() -> TermsBundle:
+    """Build the bundle once per process (warmed at startup)"""
+    return TermsBundle()
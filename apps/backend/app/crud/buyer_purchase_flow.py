@@ -2,14 +2,18 @@
 CRUD operations for step-locked buyer purchase flow.
 Each step must be completed before proceeding to the next.
 """
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from app.models.transaction import Transaction, TransactionState
-from app.models.listing import Listing, ListingState
 from app.models.ownership_agreement import OwnershipAgreement
 from app.models.temporary_access import TemporaryAccess
 from app.models.credential_vault import CredentialVault
+from app.models.scheduled_job import ScheduledJobKind
+from app.crud.scheduled_job import cancel_deadline, schedule_deadline
+from app.crud.listing import reservation_failure_reason, reserve_listing
+from app.core.state_machine import record_creation, transition
 
 
 def initiate_purchase(
@@ -19,44 +23,33 @@ def initiate_purchase(
 ) -> Transaction:
     """
     STEP 1: Initiate Secure Purchase
-    - Lock listing to buyer
+    - Lock listing to buyer (atomic; concurrent buyers of the same listing get a ValueError)
     - Create transaction in PURCHASE_INITIATED state
     """
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
-    if not listing:
-        raise ValueError("Listing not found")
-    
-    if listing.state != ListingState.APPROVED:
-        raise ValueError("Only approved listings can be purchased")
-    
-    # Check for existing transaction
-    existing = db.query(Transaction).filter(
-        Transaction.listing_id == listing_id,
-        Transaction.state.notin_([
-            TransactionState.REFUNDED,
-            TransactionState.CANCELLED,
-            TransactionState.COMPLETED
-        ])
-    ).first()
-    
-    if existing:
-        raise ValueError("Listing already has an active transaction")
+    # Lock listing
+    listing = reserve_listing(db, listing_id)
+    if listing is None:
+        db.rollback()
+        raise ValueError(reservation_failure_reason(db, listing_id))
     
     # Create transaction
     transaction = Transaction(
-        listing_id=listing_id,
+        listing_id=listing.id,
         buyer_id=buyer_id,
         seller_id=listing.seller_id,
         amount_usd=listing.price_usd,
         state=TransactionState.PURCHASE_INITIATED,
-        purchase_initiated_at=datetime.utcnow().isoformat()
+        purchase_initiated_at=datetime.now(timezone.utc)
     )
-    
-    # Lock listing
-    listing.state = ListingState.RESERVED
-    
     db.add(transaction)
-    db.commit()
+    
+    try:
+        record_creation(db, transaction, actor_id=buyer_id)
+        db.commit()
+    except IntegrityError:
+        # uq_transactions_active_listing: an open transaction exists although the listing was APPROVED
+        db.rollback()
+        raise ValueError("Listing already has an active transaction")
     db.refresh(transaction)
     
     return transaction
@@ -76,16 +69,11 @@ def confirm_payment(
     if transaction.state != TransactionState.PURCHASE_INITIATED:
         raise ValueError(f"Cannot confirm payment. Current state: {transaction.state.value}")
     
-    transaction.state = TransactionState.FUNDS_HELD
-    transaction.funds_held_at = datetime.utcnow().isoformat()
-    transaction.paystack_reference = paystack_reference
+    values = {"paystack_reference": paystack_reference}
     if paystack_authorization_code:
-        transaction.paystack_authorization_code = paystack_authorization_code
+        values["paystack_authorization_code"] = paystack_authorization_code
     
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    return transition(db, transaction, TransactionState.FUNDS_HELD, reason="Payment confirmed", values=values)
 
 
 def grant_temporary_access(
@@ -124,8 +112,8 @@ def grant_temporary_access(
     
     # Update transaction state if needed
     if transaction.state == TransactionState.FUNDS_HELD:
-        transaction.state = TransactionState.TEMPORARY_ACCESS_GRANTED
-        transaction.temporary_access_granted_at = datetime.utcnow().isoformat()
+        schedule_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, transaction.id, existing.access_expires_at)
+        transition(db, transaction, TransactionState.TEMPORARY_ACCESS_GRANTED, commit=False)
     
     db.commit()
     db.refresh(existing)
@@ -155,17 +143,17 @@ def start_verification_window(
     if not temp_access or not temp_access.is_active:
         raise ValueError("Temporary access is not active")
     
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     deadline = now + timedelta(hours=verification_duration_hours)
     
-    transaction.state = TransactionState.VERIFICATION_WINDOW
-    transaction.verification_window_started_at = now.isoformat()
-    transaction.verification_deadline = deadline.isoformat()
+    cancel_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, transaction.id)
+    schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, deadline)
     
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    return transition(
+        db, transaction, TransactionState.VERIFICATION_WINDOW,
+        actor_id=transaction.buyer_id,
+        values={"verification_window_started_at": now, "verification_deadline": deadline}
+    )
 
 
 def verify_account(
@@ -182,12 +170,15 @@ def verify_account(
         raise ValueError(f"Cannot verify account. Current state: {transaction.state.value}")
     
     transaction.account_verified = verified
-    transaction.account_verified_at = datetime.utcnow().isoformat()
+    transaction.account_verified_at = datetime.now(timezone.utc)
     
     if verified:
         # Can proceed to ownership agreement
-        transaction.state = TransactionState.OWNERSHIP_AGREEMENT_PENDING
-        transaction.ownership_agreement_pending_at = datetime.utcnow().isoformat()
+        cancel_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id)
+        return transition(
+            db, transaction, TransactionState.OWNERSHIP_AGREEMENT_PENDING,
+            actor_id=transaction.buyer_id, reason="Account verified"
+        )
     
     db.commit()
     db.refresh(transaction)
@@ -268,10 +259,8 @@ def sign_ownership_agreement(
         raise ValueError("Signature name must match your registered full name")
     
     # Sign agreement
-    now = datetime.utcnow()
-    agreement.signed_by_name = buyer_full_name
-    agreement.signed_at = now
-    agreement.signature_hash = agreement.generate_signature_hash(buyer_full_name, now.isoformat())
+    now = datetime.now(timezone.utc)
+    agreement.sign(buyer_full_name, now)
     agreement.ip_address = ip_address
     agreement.user_agent = user_agent
     agreement.verified_account_acknowledged = verified_account
@@ -280,8 +269,10 @@ def sign_ownership_agreement(
     agreement.platform_liability_ends_acknowledged = platform_liability_ends
     
     # Update transaction state
-    transaction.state = TransactionState.OWNERSHIP_AGREEMENT_SIGNED
-    transaction.ownership_agreement_signed_at = now.isoformat()
+    transition(
+        db, transaction, TransactionState.OWNERSHIP_AGREEMENT_SIGNED,
+        actor_id=transaction.buyer_id, values={"ownership_agreement_signed_at": now}, commit=False
+    )
     
     db.commit()
     db.refresh(agreement)
@@ -310,13 +301,7 @@ def request_funds_release(
     if not agreement or not agreement.is_signed:
         raise ValueError("Ownership agreement must be signed before releasing funds")
     
-    transaction.state = TransactionState.FUNDS_RELEASE_PENDING
-    transaction.funds_release_pending_at = datetime.utcnow().isoformat()
-    
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    return transition(db, transaction, TransactionState.FUNDS_RELEASE_PENDING, actor_id=transaction.buyer_id)
 
 
 def release_funds(
@@ -335,25 +320,18 @@ def release_funds(
     if transaction.state != TransactionState.FUNDS_RELEASE_PENDING:
         raise ValueError(f"Cannot release funds. Current state: {transaction.state.value}")
     
-    transaction.state = TransactionState.FUNDS_RELEASED
-    transaction.funds_released_at = datetime.utcnow().isoformat()
-    transaction.payout_reference = payout_reference
-    transaction.commission_usd = commission_usd
-    transaction.payout_amount_usd = payout_amount_usd
-    
-    # Automatically move to completed
-    transaction.state = TransactionState.COMPLETED
-    transaction.completed_at = datetime.utcnow().isoformat()
-    
-    # Mark listing as SOLD
-    listing = transaction.listing
-    if listing:
-        listing.state = ListingState.SOLD
-    
-    db.commit()
-    db.refresh(transaction)
+    transition(
+        db, transaction, TransactionState.FUNDS_RELEASED,
+        values={
+            "payout_reference": payout_reference,
+            "commission_usd": commission_usd,
+            "payout_amount_usd": payout_amount_usd,
+        },
+        commit=False
+    )
     
-    return transaction
+    # Automatically move to completed (the COMPLETED hook marks the listing SOLD)
+    return transition(db, transaction, TransactionState.COMPLETED)
 
 
 def open_dispute(
@@ -373,11 +351,9 @@ def open_dispute(
     if transaction.state not in valid_states:
         raise ValueError(f"Cannot open dispute. Current state: {transaction.state.value}")
     
-    transaction.state = TransactionState.DISPUTED
-    transaction.notes = f"Dispute opened: {reason}"
-    
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    return transition(
+        db, transaction, TransactionState.DISPUTED,
+        actor_id=transaction.buyer_id, reason=reason,
+        values={"notes": f"Dispute opened: {reason}"}
+    )
 
@@ -0,0 +1,77 @@
+"""
+CRUD operations for re-acknowledgment campaigns and pending acknowledgments.
+"""
+from sqlalchemy.orm import Session
+from typing import Optional, List
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.models.legal_ack_campaign import AckCampaignStatus, LegalAckCampaign, PendingLegalAcknowledgment
+from app.models.legal_document import LegalDocument
+
+ACTIVE_STATUSES = (AckCampaignStatus.QUEUED, AckCampaignStatus.RUNNING, AckCampaignStatus.FAILED)
+
+
+def queue_campaign(db: Session, document: LegalDocument) -> Optional[LegalAckCampaign]:
+    """
+    Queue a campaign for a newly published document (no commit; part of the publish).
+    Only required document types get one. Unfinished campaigns for older versions
+    of the same type are superseded.
+    """
+    if document.document_type.value not in settings.LEGAL_REQUIRED_DOCUMENT_TYPES:
+        return None
+    
+    older_document_ids = db.query(LegalDocument.id).filter(
+        LegalDocument.document_type == document.document_type,
+        LegalDocument.id != document.id
+    )
+    db.query(LegalAckCampaign).filter(
+        LegalAckCampaign.document_id.in_(older_document_ids),
+        LegalAckCampaign.status.in_(ACTIVE_STATUSES)
+    ).update(
+        {
+            LegalAckCampaign.status: AckCampaignStatus.SUPERSEDED,
+            LegalAckCampaign.finished_at: datetime.now(timezone.utc)
+        },
+        synchronize_session=False
+    )
+    
+    campaign = LegalAckCampaign(document_id=document.id, status=AckCampaignStatus.QUEUED)
+    db.add(campaign)
+    return campaign
+
+
+def get_campaign(db: Session, campaign_id: int) -> Optional[LegalAckCampaign]:
+    """Get campaign by ID"""
+    return db.query(LegalAckCampaign).filter(LegalAckCampaign.id == campaign_id).first()
+
+
+def get_latest_campaign_for_document(db: Session, document_id: int) -> Optional[LegalAckCampaign]:
+    """Most recent campaign of a document"""
+    return db.query(LegalAckCampaign).filter(
+        LegalAckCampaign.document_id == document_id
+    ).order_by(LegalAckCampaign.id.desc()).first()
+
+
+def get_campaigns(db: Session, skip: int = 0, limit: int = 50) -> List[LegalAckCampaign]:
+    """Campaigns, newest first"""
+    return db.query(LegalAckCampaign).order_by(LegalAckCampaign.id.desc()).offset(skip).limit(limit).all()
+
+
+def count_outstanding(db: Session, document_id: int) -> int:
+    """Pending markers of a document not yet acknowledged"""
+    return db.query(PendingLegalAcknowledgment).filter(
+        PendingLegalAcknowledgment.document_id == document_id,
+        PendingLegalAcknowledgment.acknowledged_at.is_(None)
+    ).count()
+
+
+def mark_documents_acknowledged(db: Session, user_id: int, document_ids: List[int]) -> None:
+    """Close the user's pending markers for several documents in one UPDATE (no commit)"""
+    db.query(PendingLegalAcknowledgment).filter(
+        PendingLegalAcknowledgment.user_id == user_id,
+        PendingLegalAcknowledgment.document_id.in_(document_ids),
+        PendingLegalAcknowledgment.acknowledged_at.is_(None)
+    ).update(
+        {PendingLegalAcknowledgment.acknowledged_at: datetime.now(timezone.utc)},
+        synchronize_session=False
+    )
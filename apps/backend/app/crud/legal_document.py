@@ -1,12 +1,62 @@
 """
 CRUD operations for legal documents.
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional, List
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, tuple_
+from typing import Optional, List, Tuple
 from datetime import datetime
+import base64
+import hashlib
+import json
+from app.core.legal_compliance import broadcast_invalidation, compliance_cache
+from app.crud import legal_ack_campaign as campaign_crud
 from app.models.legal_document import LegalDocument, DocumentType
 from app.schemas.legal_document import LegalDocumentCreate, LegalDocumentUpdate
+from app.utils.markdown_renderer import markdown_to_html_with_library
+
+
+def render_legal_document(document: LegalDocument) -> None:
+    """
+    Render markdown to HTML and hash the public representation.
+    Called whenever content, title, version or publication changes, so
+    public reads never run the markdown renderer.
+    """
+    document.content_html = markdown_to_html_with_library(document.content_markdown, library="markdown2")
+    fingerprint = json.dumps(
+        [
+            document.title,
+            document.slug,
+            document.version,
+            document.published_at.isoformat() if document.published_at else None,
+            document.content_html,
+        ],
+        separators=(",", ":"),
+    )
+    document.content_hash = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+
+def ensure_rendered(db: Session, document: LegalDocument) -> LegalDocument:
+    """Render and persist documents stored before HTML was pre-rendered"""
+    if document.content_hash is None:
+        render_legal_document(document)
+        db.commit()
+        db.refresh(document)
+    return document
+
+
+def get_current_document_ref(
+    db: Session,
+    slug: Optional[str] = None,
+    document_type: Optional[DocumentType] = None
+) -> Optional[Tuple[int, Optional[str]]]:
+    """(id, content_hash) of the current document by slug or type, without loading content"""
+    query = db.query(LegalDocument.id, LegalDocument.content_hash).filter(LegalDocument.is_current == True)
+    if slug is not None:
+        query = query.filter(LegalDocument.slug == slug)
+    if document_type is not None:
+        query = query.filter(LegalDocument.document_type == document_type)
+    row = query.first()
+    return (row.id, row.content_hash) if row else None
 
 
 def get_legal_document_by_id(db: Session, document_id: int) -> Optional[LegalDocument]:
@@ -32,15 +82,49 @@ def get_current_document_by_type(db: Session, document_type: DocumentType) -> Op
     ).first()
 
 
-def get_all_legal_documents(
+# Columns needed by list views; content_markdown / content_html are never loaded
+LIST_COLUMNS = (
+    LegalDocument.id,
+    LegalDocument.title,
+    LegalDocument.slug,
+    LegalDocument.document_type,
+    LegalDocument.version,
+    LegalDocument.is_current,
+    LegalDocument.content_hash,
+    LegalDocument.published_at,
+    LegalDocument.published_by_id,
+    LegalDocument.created_at,
+    LegalDocument.updated_at,
+)
+
+
+def encode_list_cursor(document: LegalDocument) -> str:
+    """Opaque keyset cursor: position after this document in (created_at desc, id desc) order"""
+    raw = f"{document.created_at.isoformat()}|{document.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_list_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Inverse of encode_list_cursor; raises ValueError on malformed input"""
+    try:
+        created_at, document_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.fromisoformat(created_at), int(document_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def get_legal_document_page(
     db: Session,
     document_type: Optional[DocumentType] = None,
     current_only: bool = False,
-    skip: int = 0,
+    cursor: Optional[str] = None,
     limit: int = 100
-) -> List[LegalDocument]:
-    """Get all legal documents with optional filters"""
-    query = db.query(LegalDocument)
+) -> Tuple[List[LegalDocument], Optional[str]]:
+    """
+    Metadata-only page of documents, newest first, with keyset pagination.
+    Returns (documents, next_cursor); next_cursor is None on the last page.
+    """
+    query = db.query(LegalDocument).options(load_only(*LIST_COLUMNS))
     
     if document_type:
         query = query.filter(LegalDocument.document_type == document_type)
@@ -48,12 +132,40 @@ def get_all_legal_documents(
     if current_only:
         query = query.filter(LegalDocument.is_current == True)
     
-    return query.order_by(LegalDocument.created_at.desc()).offset(skip).limit(limit).all()
+    if cursor:
+        created_at, document_id = decode_list_cursor(cursor)
+        query = query.filter(tuple_(LegalDocument.created_at, LegalDocument.id) < tuple_(created_at, document_id))
+    
+    documents = query.order_by(
+        LegalDocument.created_at.desc(),
+        LegalDocument.id.desc()
+    ).limit(limit + 1).all()
+    
+    if len(documents) <= limit:
+        return documents, None
+    documents = documents[:limit]
+    return documents, encode_list_cursor(documents[-1])
 
 
 def get_current_legal_documents(db: Session) -> List[LegalDocument]:
-    """Get all current legal documents"""
-    return db.query(LegalDocument).filter(LegalDocument.is_current == True).all()
+    """Get all current legal documents (metadata columns only)"""
+    return db.query(LegalDocument).options(load_only(*LIST_COLUMNS)).filter(
+        LegalDocument.is_current == True
+    ).order_by(LegalDocument.document_type, LegalDocument.id).all()
+
+
+def get_current_version_set(db: Session) -> Tuple[Tuple[int, Optional[str], Optional[datetime]], ...]:
+    """
+    (id, content_hash, updated_at) of every current document. Any publish or
+    edit of a current document changes it, so it keys the cached public list.
+    """
+    return tuple(
+        tuple(row) for row in db.query(
+            LegalDocument.id,
+            LegalDocument.content_hash,
+            LegalDocument.updated_at
+        ).filter(LegalDocument.is_current == True).order_by(LegalDocument.id).all()
+    )
 
 
 def create_legal_document(
@@ -82,6 +194,7 @@ def create_legal_document(
         is_current=False,  # New documents are not current until published
         published_by_id=published_by_id
     )
+    render_legal_document(document)
     
     db.add(document)
     db.commit()
@@ -102,9 +215,14 @@ def update_legal_document(
         document.content_markdown = document_data.content_markdown
     if document_data.version is not None:
         document.version = document_data.version
+    render_legal_document(document)
+    if document.is_current:
+        broadcast_invalidation(db)
     
     db.commit()
     db.refresh(document)
+    if document.is_current:
+        compliance_cache.invalidate_all()
     
     return document
 
@@ -133,9 +251,15 @@ def publish_legal_document(
     document.is_current = True
     document.published_at = datetime.utcnow()
     document.published_by_id = published_by_id
+    render_legal_document(document)
+    
+    # Re-acknowledgment fan-out runs after the commit (see core/legal_campaigns.py)
+    campaign_crud.queue_campaign(db, document)
+    broadcast_invalidation(db)
     
     db.commit()
     db.refresh(document)
+    compliance_cache.invalidate_all()
     
     return document
 
@@ -3,7 +3,7 @@ CRUD operations for listings.
 """
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, update
 from app.models.listing import Listing, ListingState
 from app.models.credential_vault import CredentialVault
 from app.models.listing_proof import ListingProof
@@ -222,6 +222,34 @@ def change_listing_state(
     return listing
 
 
+def reserve_listing(db: Session, listing_id: int):
+    """
+    Atomically move an APPROVED listing to RESERVED (no commit).
+    A conditional UPDATE ... RETURNING: of any number of concurrent callers exactly
+    one gets the row back; the others wait on the row lock, re-check the state
+    and match nothing.
+    
+    Returns:
+        Row (id, seller_id, price_usd), or None if the listing is missing or not approved
+    """
+    return db.execute(
+        update(Listing)
+        .where(Listing.id == listing_id, Listing.state == ListingState.APPROVED)
+        .values(state=ListingState.RESERVED)
+        .returning(Listing.id, Listing.seller_id, Listing.price_usd)
+    ).first()
+
+
+def reservation_failure_reason(db: Session, listing_id: int) -> str:
+    """Explain why reserve_listing() returned nothing"""
+    state = db.query(Listing.state).filter(Listing.id == listing_id).scalar()
+    if state is None:
+        return "Listing not found"
+    if state == ListingState.RESERVED:
+        return "Listing already has an active transaction"
+    return "Only approved listings can be purchased"
+
+
 def add_proof_file(
     db: Session,
     listing_id: int,
@@ -230,7 +258,8 @@ def add_proof_file(
     file_name: str,
     file_size: Optional[int] = None,
     mime_type: Optional[str] = None,
-    description: Optional[str] = None
+    description: Optional[str] = None,
+    storage_key: Optional[str] = None
 ) -> ListingProof:
     """Add proof file to listing"""
     proof = ListingProof(
@@ -240,7 +269,8 @@ def add_proof_file(
         file_name=file_name,
         file_size=file_size,
         mime_type=mime_type,
-        description=description
+        description=description,
+        storage_key=storage_key
     )
     
     db.add(proof)
@@ -249,6 +279,14 @@ def add_proof_file(
     return proof
 
 
+def get_proof_by_storage_key(db: Session, listing_id: int, storage_key: str) -> Optional[ListingProof]:
+    """Get an uploaded proof file of a listing by its content hash"""
+    return db.query(ListingProof).filter(
+        ListingProof.listing_id == listing_id,
+        ListingProof.storage_key == storage_key
+    ).first()
+
+
 def get_listing_proofs(db: Session, listing_id: int) -> List[ListingProof]:
     """Get all proof files for a listing"""
     return db.query(ListingProof).filter(ListingProof.listing_id == listing_id).all()
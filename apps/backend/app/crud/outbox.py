@@ -0,0 +1,83 @@
+"""
+CRUD operations for the transactional outbox.
+enqueue_messages joins the caller's transaction (no commit), so a side
+effect is recorded if and only if the state change that implies it commits.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.outbox_message import OutboxMessage, OutboxStatus
+from app.models.transaction import Transaction, TransactionState
+
+ACCOUNT_SUSPENDED_EMAIL = "email.account_suspended"
+TRANSACTION_UPDATE_EMAIL = "email.transaction_update"
+
+# Who hears about a transaction entering each state
+TRANSACTION_UPDATE_RECIPIENTS = {
+    TransactionState.FUNDS_HELD: ("seller",),
+    TransactionState.DISPUTED: ("buyer", "seller"),
+    TransactionState.REFUNDED: ("buyer", "seller"),
+    TransactionState.CANCELLED: ("buyer",),
+    TransactionState.COMPLETED: ("seller",),
+}
+
+
+def enqueue_messages(
+    db: Session,
+    messages: Iterable[Tuple[str, Dict[str, Any]]],
+    delay_seconds: float = 0
+) -> int:
+    """
+    Record (topic, payload) side effects with one multi-row INSERT.
+    Payloads must be JSON-serialisable.
+
+    Returns:
+        Number of messages written
+    """
+    available_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    rows = [
+        {
+            "topic": topic,
+            "payload": json.dumps(payload, sort_keys=True, default=str),
+            "status": OutboxStatus.PENDING,
+            "available_at": available_at,
+            "attempts": 0,
+        }
+        for topic, payload in messages
+    ]
+    if rows:
+        db.execute(insert(OutboxMessage), rows)
+    return len(rows)
+
+
+def enqueue_message(db: Session, topic: str, payload: Dict[str, Any], delay_seconds: float = 0) -> None:
+    """Record one side effect (no commit)"""
+    enqueue_messages(db, [(topic, payload)], delay_seconds)
+
+
+def enqueue_transition_notifications(db: Session, events: Iterable[Any]) -> None:
+    """State machine hook: queue buyer/seller emails for notable transitions (no commit)"""
+    events = [e for e in events if e.to_state in TRANSACTION_UPDATE_RECIPIENTS]
+    if not events:
+        return
+    parties = {
+        row.id: row
+        for row in db.query(Transaction.id, Transaction.buyer_id, Transaction.seller_id)
+        .filter(Transaction.id.in_({e.transaction_id for e in events}))
+    }
+    messages = []
+    for event in events:
+        row = parties.get(event.transaction_id)
+        if row is None:
+            continue
+        for role in TRANSACTION_UPDATE_RECIPIENTS[event.to_state]:
+            messages.append((TRANSACTION_UPDATE_EMAIL, {
+                "transaction_id": row.id,
+                "user_id": row.buyer_id if role == "buyer" else row.seller_id,
+                "state": event.to_state.value,
+            }))
+    enqueue_messages(db, messages)
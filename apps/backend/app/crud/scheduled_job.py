@@ -0,0 +1,57 @@
+"""
+CRUD operations for durable deadline jobs.
+Both functions join the caller's transaction (no commit), so a deadline is
+scheduled or cancelled atomically with the state change that implies it.
+"""
+from sqlalchemy.orm import Session
+from datetime import datetime, timezone
+from app.core.database import dialect_insert
+from app.models.scheduled_job import ScheduledJob, ScheduledJobKind, ScheduledJobStatus
+
+
+def schedule_deadline(
+    db: Session,
+    kind: ScheduledJobKind,
+    transaction_id: int,
+    due_at: datetime
+) -> None:
+    """
+    Schedule (or re-arm) the deadline of a transaction.
+    One row per (kind, transaction); rescheduling moves due_at and resets it to pending.
+    Naive datetimes are treated as UTC.
+    """
+    if due_at.tzinfo is None:
+        due_at = due_at.replace(tzinfo=timezone.utc)
+
+    stmt = dialect_insert(db, ScheduledJob.__table__).values(
+        kind=kind,
+        transaction_id=transaction_id,
+        due_at=due_at,
+        status=ScheduledJobStatus.PENDING,
+        attempts=0
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["kind", "transaction_id"],
+        set_={
+            "due_at": stmt.excluded.due_at,
+            "status": ScheduledJobStatus.PENDING,
+            "attempts": 0,
+            "fired_at": None,
+            "result": None,
+            "last_error": None,
+            "updated_at": datetime.now(timezone.utc)
+        }
+    )
+    db.execute(stmt)
+
+
+def cancel_deadline(db: Session, kind: ScheduledJobKind, transaction_id: int) -> None:
+    """Cancel a pending deadline because the buyer completed the step in time"""
+    db.query(ScheduledJob).filter(
+        ScheduledJob.kind == kind,
+        ScheduledJob.transaction_id == transaction_id,
+        ScheduledJob.status == ScheduledJobStatus.PENDING
+    ).update(
+        {ScheduledJob.status: ScheduledJobStatus.CANCELLED},
+        synchronize_session=False
+    )
@@ -2,12 +2,17 @@
 CRUD operations for step-locked seller sale flow.
 Mirrors buyer purchase flow with seller protections.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
 from typing import Optional
 from app.models.transaction import Transaction, TransactionState
 from app.models.listing import Listing, ListingState
 from app.models.credential_vault import CredentialVault
+from app.models.payout import SellerPayoutAccount
+from app.models.scheduled_job import ScheduledJobKind
+from app.crud.scheduled_job import schedule_deadline
+from app.crud.seller_stats import CLOSED_STATES, get_seller_summary
+from app.core.state_machine import transition
 from app.core.encryption import EncryptionService
 
 
@@ -144,11 +149,6 @@ def deliver_credentials(
     existing_vault.tag = tag_password
     existing_vault.encryption_key_id = "default_v1"
     
-    # Update transaction state to TEMPORARY_ACCESS_GRANTED
-    # This triggers buyer's STEP 3
-    transaction.state = TransactionState.TEMPORARY_ACCESS_GRANTED
-    transaction.temporary_access_granted_at = datetime.utcnow().isoformat()
-    
     # Create TemporaryAccess record for buyer
     # This is created when seller delivers credentials (STEP 4)
     from app.models.temporary_access import TemporaryAccess
@@ -172,6 +172,15 @@ def deliver_credentials(
         )
         db.add(temp_access)
     
+    schedule_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, transaction.id, temp_access.access_expires_at)
+    
+    # Update transaction state to TEMPORARY_ACCESS_GRANTED
+    # This triggers buyer's STEP 3
+    transition(
+        db, transaction, TransactionState.TEMPORARY_ACCESS_GRANTED,
+        actor_id=transaction.seller_id, reason="Credentials delivered", commit=False
+    )
+    
     db.commit()
     db.refresh(existing_vault)
     
@@ -180,37 +189,78 @@ def deliver_credentials(
 
 def get_seller_dashboard_data(
     db: Session,
-    seller_id: int
+    seller_id: int,
+    skip: int = 0,
+    limit: int = 20
 ) -> dict:
     """
-    Get seller dashboard data showing all active transactions.
+    Get seller dashboard data.
+    Totals come from the seller_stats summary; the active and completed lists
+    are one page each, with listing, credentials and temporary access eager-loaded.
     """
-    transactions = db.query(Transaction).filter(
-        Transaction.seller_id == seller_id
-    ).order_by(Transaction.created_at.desc()).all()
-    
-    # Group by state
-    active_transactions = [t for t in transactions if t.state not in [
-        TransactionState.COMPLETED,
-        TransactionState.REFUNDED,
-        TransactionState.CANCELLED
-    ]]
-    
-    completed_transactions = [t for t in transactions if t.state == TransactionState.COMPLETED]
-    
-    # Calculate stats
-    total_earnings = sum(t.payout_amount_usd or 0 for t in completed_transactions)
-    pending_earnings = sum(
-        t.amount_usd for t in active_transactions 
-        if t.state in [TransactionState.FUNDS_HELD, TransactionState.TEMPORARY_ACCESS_GRANTED, TransactionState.VERIFICATION_WINDOW]
-    )
+    def page(*criteria):
+        return db.query(Transaction).options(
+            selectinload(Transaction.listing).selectinload(Listing.credentials),
+            selectinload(Transaction.temporary_access),
+        ).filter(
+            Transaction.seller_id == seller_id,
+            *criteria
+        ).order_by(Transaction.created_at.desc(), Transaction.id.desc()).offset(skip).limit(limit).all()
+    
+    summary = get_seller_summary(db, seller_id)
     
     return {
-        "active_transactions": active_transactions,
-        "completed_transactions": completed_transactions,
-        "total_earnings_usd": total_earnings / 100,  # Convert cents to dollars
-        "pending_earnings_usd": pending_earnings / 100,
-        "active_count": len(active_transactions),
-        "completed_count": len(completed_transactions)
+        "active_transactions": page(Transaction.state.notin_(CLOSED_STATES)),
+        "completed_transactions": page(Transaction.state == TransactionState.COMPLETED),
+        "total_earnings_usd": summary["total_earnings_usd"] / 100,  # Convert cents to dollars
+        "pending_earnings_usd": summary["pending_earnings_usd"] / 100,
+        "active_count": summary["active_count"],
+        "completed_count": summary["completed_count"],
+        "counts_by_state": summary["counts_by_state"]
     }
 
+
+
+def get_payout_account(
+    db: Session,
+    seller_id: int
+) -> Optional[SellerPayoutAccount]:
+    """Get seller's payout destination"""
+    return db.query(SellerPayoutAccount).filter(
+        SellerPayoutAccount.seller_id == seller_id
+    ).first()
+
+
+def upsert_payout_account(
+    db: Session,
+    seller_id: int,
+    recipient_type: str,
+    account_name: str,
+    account_number: str,
+    bank_code: str
+) -> SellerPayoutAccount:
+    """
+    Create or update seller's payout destination.
+    The cached Paystack recipient is dropped when account details change.
+    """
+    account = get_payout_account(db, seller_id)
+    
+    if account is None:
+        account = SellerPayoutAccount(seller_id=seller_id)
+        db.add(account)
+    elif (account.recipient_type, account.account_name, account.account_number, account.bank_code) != (
+        recipient_type, account_name, account_number, bank_code
+    ):
+        account.paystack_recipient_code = None
+        account.recipient_created_at = None
+    
+    account.recipient_type = recipient_type
+    account.account_name = account_name
+    account.account_number = account_number
+    account.bank_code = bank_code
+    account.currency = "KES"
+    
+    db.commit()
+    db.refresh(account)
+    
+    return account
@@ -0,0 +1,131 @@
+"""
+Seller summary counters.
+
+apply_transitions runs as a state machine hook, so every state change moves
+one transaction between two (seller, state) rows in the same database
+transaction. The upsert adds deltas (count = count + excluded.count), which
+row-locks only the touched rows; keys are written in sorted order so two
+concurrent transitions of the same seller cannot deadlock.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.seller_stats import SellerStats
+from app.models.transaction import Transaction, TransactionState
+
+# Money held in escrow that has not yet moved to the seller
+PENDING_EARNINGS_STATES = frozenset({
+    TransactionState.FUNDS_HELD,
+    TransactionState.TEMPORARY_ACCESS_GRANTED,
+    TransactionState.VERIFICATION_WINDOW,
+})
+
+CLOSED_STATES = frozenset({TransactionState.COMPLETED, TransactionState.REFUNDED, TransactionState.CANCELLED})
+
+
+def _upsert(db: Session, deltas: Dict[Tuple[int, TransactionState], List[int]]) -> None:
+    rows = [
+        {
+            "seller_id": seller_id,
+            "state": state,
+            "transaction_count": count,
+            "amount_usd": amount,
+            "payout_amount_usd": payout,
+        }
+        for (seller_id, state), (count, amount, payout) in sorted(deltas.items(), key=lambda item: (item[0][0], item[0][1].value))
+        if count or amount or payout
+    ]
+    if not rows:
+        return
+    table = SellerStats.__table__
+    stmt = dialect_insert(db, table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["seller_id", "state"],
+        set_={
+            "transaction_count": table.c.transaction_count + stmt.excluded.transaction_count,
+            "amount_usd": table.c.amount_usd + stmt.excluded.amount_usd,
+            "payout_amount_usd": table.c.payout_amount_usd + stmt.excluded.payout_amount_usd,
+            "updated_at": datetime.now(timezone.utc),
+        }
+    )
+    db.execute(stmt)
+
+
+def apply_transitions(db: Session, events: Iterable[Any]) -> None:
+    """
+    Move transactions between summary rows (state machine hook, no commit).
+    Events need transaction_id, from_state (None on creation) and to_state.
+    """
+    events = list(events)
+    if not events:
+        return
+    amounts = {
+        row.id: row
+        for row in db.query(
+            Transaction.id, Transaction.seller_id, Transaction.amount_usd, Transaction.payout_amount_usd
+        ).filter(Transaction.id.in_({e.transaction_id for e in events}))
+    }
+
+    deltas: Dict[Tuple[int, TransactionState], List[int]] = defaultdict(lambda: [0, 0, 0])
+    for event in events:
+        row = amounts.get(event.transaction_id)
+        if row is None:
+            continue
+        if event.from_state is not None:
+            delta = deltas[(row.seller_id, event.from_state)]
+            delta[0] -= 1
+            delta[1] -= row.amount_usd
+        delta = deltas[(row.seller_id, event.to_state)]
+        delta[0] += 1
+        delta[1] += row.amount_usd
+        if event.to_state == TransactionState.COMPLETED:
+            # COMPLETED is terminal, so the payout sum never has to be taken out again
+            delta[2] += row.payout_amount_usd or 0
+    _upsert(db, deltas)
+
+
+def rebuild_seller_stats(db: Session, seller_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute summary rows from transactions with one GROUP BY (no commit).
+    For repairs and backfills; seller_ids=None rebuilds every seller.
+
+    Returns:
+        Number of summary rows written
+    """
+    stale = db.query(SellerStats)
+    source = db.query(
+        Transaction.seller_id,
+        Transaction.state,
+        func.count(Transaction.id),
+        func.coalesce(func.sum(Transaction.amount_usd), 0),
+        func.coalesce(func.sum(Transaction.payout_amount_usd), 0),
+    )
+    if seller_ids is not None:
+        stale = stale.filter(SellerStats.seller_id.in_(seller_ids))
+        source = source.filter(Transaction.seller_id.in_(seller_ids))
+    stale.delete(synchronize_session=False)
+
+    deltas = {
+        (seller_id, state): [count, amount, payout if state == TransactionState.COMPLETED else 0]
+        for seller_id, state, count, amount, payout in source.group_by(Transaction.seller_id, Transaction.state)
+    }
+    _upsert(db, deltas)
+    return len(deltas)
+
+
+def get_seller_summary(db: Session, seller_id: int) -> Dict[str, Any]:
+    """Dashboard totals of one seller (amounts in USD cents)"""
+    rows = db.query(SellerStats).filter(SellerStats.seller_id == seller_id).all()
+    counts = {row.state: row.transaction_count for row in rows if row.transaction_count}
+    return {
+        "total_earnings_usd": sum(row.payout_amount_usd for row in rows if row.state == TransactionState.COMPLETED),
+        "pending_earnings_usd": sum(row.amount_usd for row in rows if row.state in PENDING_EARNINGS_STATES),
+        "active_count": sum(count for state, count in counts.items() if state not in CLOSED_STATES),
+        "completed_count": counts.get(TransactionState.COMPLETED, 0),
+        "counts_by_state": {state.value: count for state, count in counts.items()},
+    }
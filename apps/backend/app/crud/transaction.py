@@ -2,13 +2,16 @@
 CRUD operations for transactions.
 """
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_
-from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone
 from app.models.transaction import Transaction, TransactionState
-from app.models.listing import Listing, ListingState
+from app.models.listing import Listing
 from app.models.contract import Contract
 from app.models.payment_event import PaymentEvent, PaymentEventType
+from app.crud.listing import reservation_failure_reason, reserve_listing
+from app.core.state_machine import record_creation, transition
 
 
 def get_transaction_by_id(db: Session, transaction_id: int) -> Optional[Transaction]:
@@ -17,8 +20,37 @@ def get_transaction_by_id(db: Session, transaction_id: int) -> Optional[Transact
 
 
 def get_transaction_by_listing_id(db: Session, listing_id: int) -> Optional[Transaction]:
-    """Get transaction by listing ID"""
-    return db.query(Transaction).filter(Transaction.listing_id == listing_id).first()
+    """Get the latest transaction of a listing (earlier ones were refunded or cancelled)"""
+    return db.query(Transaction).filter(
+        Transaction.listing_id == listing_id
+    ).order_by(Transaction.id.desc()).first()
+
+
+def get_transactions_for_status(
+    db: Session,
+    transaction_ids: List[int],
+    buyer_id: Optional[int] = None,
+    seller_id: Optional[int] = None
+) -> List[Transaction]:
+    """
+    Load several transactions of one buyer or seller for status pages.
+    Temporary access, ownership agreement and contract (plus listing credentials
+    for sellers) are loaded with one IN query each, so the cost does not grow
+    with the number of ids. Ids that do not exist or belong to someone else are
+    simply absent from the result.
+    """
+    options = [
+        selectinload(Transaction.temporary_access),
+        selectinload(Transaction.ownership_agreement),
+        selectinload(Transaction.contract),
+    ]
+    query = db.query(Transaction).filter(Transaction.id.in_(transaction_ids))
+    if buyer_id is not None:
+        query = query.filter(Transaction.buyer_id == buyer_id)
+    if seller_id is not None:
+        query = query.filter(Transaction.seller_id == seller_id)
+        options.append(selectinload(Transaction.listing).selectinload(Listing.credentials))
+    return query.options(*options).all()
 
 
 def get_transactions_by_buyer(
@@ -56,18 +88,11 @@ def create_transaction(
     Returns:
         Created Transaction
     """
-    # Get listing to get seller_id
-    listing = db.query(Listing).filter(Listing.id == listing_id).first()
-    if not listing:
-        raise ValueError("Listing not found")
-    
-    if listing.state != ListingState.APPROVED:
-        raise ValueError("Only approved listings can be purchased")
-    
-    # Check if listing already has a transaction
-    existing = get_transaction_by_listing_id(db, listing_id)
-    if existing:
-        raise ValueError("Listing already has an active transaction")
+    # Reserve the listing atomically (also yields seller_id)
+    listing = reserve_listing(db, listing_id)
+    if listing is None:
+        db.rollback()
+        raise ValueError(reservation_failure_reason(db, listing_id))
     
     # Create transaction
     transaction = Transaction(
@@ -76,11 +101,17 @@ def create_transaction(
         seller_id=listing.seller_id,
         amount_usd=amount_usd,
         state=TransactionState.PURCHASE_INITIATED,
+        purchase_initiated_at=datetime.now(timezone.utc),
         paystack_reference=paystack_reference
     )
     
     db.add(transaction)
-    db.commit()
+    try:
+        record_creation(db, transaction, actor_id=buyer_id)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise ValueError("Listing already has an active transaction")
     db.refresh(transaction)
     
     return transaction
@@ -90,7 +121,9 @@ def update_transaction_state(
     db: Session,
     transaction: Transaction,
     new_state: TransactionState,
-    paystack_authorization_code: Optional[str] = None
+    paystack_authorization_code: Optional[str] = None,
+    actor_id: Optional[int] = None,
+    reason: Optional[str] = None
 ) -> Transaction:
     """
     Update transaction state with validation.
@@ -100,44 +133,28 @@ def update_transaction_state(
         transaction: Transaction to update
         new_state: New state
         paystack_authorization_code: Authorization code (if funds held)
+        actor_id: User causing the change (None for webhooks)
+        reason: Reason recorded in the state history
         
     Returns:
         Updated Transaction
+        
+    Raises:
+        InvalidTransitionError: Transition not allowed, or the state changed concurrently
     """
-    if not transaction.can_transition_to(new_state):
-        raise ValueError(f"Cannot transition from {transaction.state} to {new_state}")
-    
-    transaction.state = new_state
-    
-    # Update timestamps
-    now = datetime.utcnow().isoformat()
+    values = {}
     if new_state == TransactionState.FUNDS_HELD:
-        transaction.funds_held_at = now
-        transaction.paystack_authorization_code = paystack_authorization_code
-        # Update listing to RESERVED
-        listing = db.query(Listing).filter(Listing.id == transaction.listing_id).first()
-        if listing:
-            listing.state = ListingState.RESERVED
-    elif new_state == TransactionState.OWNERSHIP_AGREEMENT_SIGNED:
-        transaction.ownership_agreement_signed_at = now
-    elif new_state == TransactionState.TEMPORARY_ACCESS_GRANTED:
-        transaction.temporary_access_granted_at = now
-    elif new_state == TransactionState.COMPLETED:
-        transaction.completed_at = now
-    elif new_state == TransactionState.REFUNDED:
-        transaction.refunded_at = now
+        values["paystack_authorization_code"] = paystack_authorization_code
     
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    return transition(db, transaction, new_state, actor_id=actor_id, reason=reason, values=values)
 
 
 def create_contract(
     db: Session,
     transaction_id: int,
     pdf_hash: str,
-    pdf_url: Optional[str] = None
+    pdf_url: Optional[str] = None,
+    pdf_storage_key: Optional[str] = None
 ) -> Contract:
     """
     Create a contract for a transaction.
@@ -147,6 +164,7 @@ def create_contract(
         transaction_id: Transaction ID
         pdf_hash: SHA-256 hash of PDF
         pdf_url: URL to stored PDF
+        pdf_storage_key: Blob storage key of the PDF
         
     Returns:
         Created Contract
@@ -154,7 +172,8 @@ def create_contract(
     contract = Contract(
         transaction_id=transaction_id,
         pdf_hash=pdf_hash,
-        pdf_url=pdf_url
+        pdf_url=pdf_url,
+        pdf_storage_key=pdf_storage_key
     )
     
     db.add(contract)
@@ -118,11 +118,12 @@ def verify_phone(db: Session, user: User) -> User:
     return user
 
 
-def suspend_user(db: Session, user: User) -> User:
-    """Suspend user account"""
+def suspend_user(db: Session, user: User, commit: bool = True) -> User:
+    """Suspend user account (commit=False joins the caller's transaction)"""
     user.is_active = False
-    db.commit()
-    db.refresh(user)
+    if commit:
+        db.commit()
+        db.refresh(user)
     return user
 
 
@@ -2,11 +2,24 @@
 CRUD operations for user legal acknowledgments.
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import Optional, List
-from datetime import datetime
+from sqlalchemy import and_, func
+from typing import Optional, List, Tuple
+from datetime import datetime, timezone
+from app.core.database import dialect_insert
+from app.core.events import AuditLogger
+from app.core.signatures import acknowledgment_payload, get_signer
+from app.crud.legal_ack_campaign import mark_documents_acknowledged
+from app.crud.legal_document import ensure_rendered
+from app.core.legal_compliance import (
+    DOCUMENT_TYPE_BITS,
+    Catalog,
+    CurrentDocument,
+    broadcast_invalidation,
+    compliance_cache,
+)
 from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
-from app.models.legal_document import LegalDocument
+from app.models.legal_document import LegalDocument, DocumentType
+from app.models.audit_log import AuditAction
 
 
 def get_user_acknowledgment(
@@ -33,24 +46,53 @@ def has_user_acknowledged(
     return acknowledgment is not None
 
 
+def get_user_compliance(db: Session, user_id: int) -> Tuple[Catalog, int]:
+    """
+    Current documents by type and the user's acknowledged-types bitmap.
+    One joined query on a cache miss, none on a hit.
+    """
+    cached = compliance_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
+    epoch = compliance_cache.epoch
+    rows = db.query(
+        LegalDocument.id,
+        LegalDocument.document_type,
+        LegalDocument.version,
+        LegalDocument.title,
+        UserLegalAcknowledgment.id.label("acknowledgment_id")
+    ).outerjoin(
+        UserLegalAcknowledgment,
+        and_(
+            UserLegalAcknowledgment.document_id == LegalDocument.id,
+            UserLegalAcknowledgment.version == LegalDocument.version,
+            UserLegalAcknowledgment.user_id == user_id
+        )
+    ).filter(LegalDocument.is_current == True).all()
+    
+    catalog: Catalog = {}
+    acknowledged_mask = 0
+    for row in rows:
+        catalog[row.document_type] = CurrentDocument(row.id, row.version, row.title)
+        if row.acknowledgment_id is not None:
+            acknowledged_mask |= DOCUMENT_TYPE_BITS[row.document_type]
+    
+    compliance_cache.put(user_id, epoch, catalog, acknowledged_mask)
+    return catalog, acknowledged_mask
+
+
 def has_user_acknowledged_current(
     db: Session,
     user_id: int,
     document_type: str
 ) -> bool:
     """Check if user has acknowledged the current version of a document type"""
-    # Get current document of this type
-    current_doc = db.query(LegalDocument).filter(
-        and_(
-            LegalDocument.document_type == document_type,
-            LegalDocument.is_current == True
-        )
-    ).first()
-    
-    if not current_doc:
+    document_type = DocumentType(document_type)
+    catalog, acknowledged_mask = get_user_compliance(db, user_id)
+    if document_type not in catalog:
         return False
-    
-    return has_user_acknowledged(db, user_id, current_doc.id)
+    return bool(acknowledged_mask & DOCUMENT_TYPE_BITS[document_type])
 
 
 def create_user_acknowledgment(
@@ -59,41 +101,105 @@ def create_user_acknowledgment(
     document_id: int,
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None,
-    signed_by_name: Optional[str] = None,
-    signature_hash: Optional[str] = None
+    signed_by_name: Optional[str] = None
 ) -> UserLegalAcknowledgment:
-    """Create a new user acknowledgment with digital signature"""
-    # Check if already acknowledged
-    existing = get_user_acknowledgment(db, user_id, document_id)
-    if existing:
-        # Update timestamp and signature
-        existing.acknowledged_at = datetime.utcnow()
-        existing.ip_address = ip_address
-        existing.user_agent = user_agent
+    """Create or refresh a user's acknowledgment of one document (signed when a name is given)"""
+    document = db.query(LegalDocument).filter(LegalDocument.id == document_id).first()
+    if not document:
+        raise ValueError("Legal document not found")
+    return acknowledge_documents(db, user_id, [document], ip_address, user_agent, signed_by_name)[0]
+
+
+def acknowledge_documents(
+    db: Session,
+    user_id: int,
+    documents: List[LegalDocument],
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    signed_by_name: Optional[str] = None
+) -> List[UserLegalAcknowledgment]:
+    """
+    Record acknowledgments of several documents in one transaction.
+    
+    Rows are upserted with a single INSERT ... ON CONFLICT (user_id,
+    document_id) DO UPDATE, pending markers are closed with one UPDATE and
+    the audit entries go in with one multi-row INSERT. A re-acknowledgment
+    replaces the previous signature, since the signature covers the
+    acknowledgment time. Returns acknowledgments in the order given.
+    """
+    if not documents:
+        return []
+    
+    table = UserLegalAcknowledgment.__table__
+    acknowledged_at = datetime.now(timezone.utc)
+    signer = get_signer()
+    rows = []
+    for document in documents:
+        ensure_rendered(db, document)  # Snapshot (and signature) cover the rendered content hash
+        signature_key_id = signature_hash = None
         if signed_by_name:
-            existing.signed_by_name = signed_by_name
-        if signature_hash:
-            existing.signature_hash = signature_hash
-        db.commit()
-        db.refresh(existing)
-        return existing
+            signature_key_id, signature_hash = signer.sign(acknowledgment_payload(
+                user_id, document.id, document.version, document.content_hash, signed_by_name, acknowledged_at
+            ))
+        rows.append({
+            "user_id": user_id,
+            "document_id": document.id,
+            "version": document.version,
+            "content_hash": document.content_hash,
+            "acknowledged_at": acknowledged_at,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "signed_by_name": signed_by_name,
+            "signature_hash": signature_hash,
+            "signature_key_id": signature_key_id
+        })
     
-    # Create new acknowledgment
-    acknowledgment = UserLegalAcknowledgment(
+    stmt = dialect_insert(db, table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.document_id],
+        set_={
+            "version": stmt.excluded.version,
+            "content_hash": stmt.excluded.content_hash,
+            "acknowledged_at": stmt.excluded.acknowledged_at,
+            "ip_address": stmt.excluded.ip_address,
+            "user_agent": stmt.excluded.user_agent,
+            "signed_by_name": stmt.excluded.signed_by_name,
+            "signature_hash": stmt.excluded.signature_hash,
+            "signature_key_id": stmt.excluded.signature_key_id,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt)
+    
+    document_ids = [document.id for document in documents]
+    mark_documents_acknowledged(db, user_id, document_ids)
+    AuditLogger.log_events(
+        db=db,
+        action=AuditAction.LEGAL_DOCUMENT_ACKNOWLEDGED,
+        details_list=[
+            {
+                "document_id": document.id,
+                "document_type": document.document_type.value,
+                "document_version": document.version,
+                "title": document.title
+            }
+            for document in documents
+        ],
         user_id=user_id,
-        document_id=document_id,
-        acknowledged_at=datetime.utcnow(),
         ip_address=ip_address,
         user_agent=user_agent,
-        signed_by_name=signed_by_name,
-        signature_hash=signature_hash
+        commit=False
     )
-    
-    db.add(acknowledgment)
+    broadcast_invalidation(db, user_id)
     db.commit()
-    db.refresh(acknowledgment)
+    compliance_cache.invalidate_user(user_id)
     
-    return acknowledgment
+    acknowledgments = db.query(UserLegalAcknowledgment).filter(
+        UserLegalAcknowledgment.user_id == user_id,
+        UserLegalAcknowledgment.document_id.in_(document_ids)
+    ).populate_existing().all()
+    by_document = {acknowledgment.document_id: acknowledgment for acknowledgment in acknowledgments}
+    return [by_document[document_id] for document_id in document_ids]
 
 
 def get_user_acknowledgments(
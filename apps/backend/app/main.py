@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
@@ -9,7 +10,14 @@ from slowapi.errors import RateLimitExceeded
 from app.core.config import settings
 from app.api.v1.router import api_router
 from app.middleware.security import SecurityHeadersMiddleware, RateLimitHeadersMiddleware
+from app.middleware.metrics import PrometheusMiddleware
 from app.utils.observability import setup_sentry, logger
+from app.payment.services.http_client import close_http_clients
+from app.core.contract_worker import contract_render_pool
+from app.core.event_broker import notify_bridge
+from app.core.metrics_exporter import mark_worker_dead, metrics_refresher
+from app.core.readiness import readiness_monitor
+from app.core.terms_of_service import get_terms_bundle
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -55,10 +63,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per route (outermost, so it covers every other middleware)
+app.add_middleware(PrometheusMiddleware)
+
 # Include API routers
 app.include_router(api_router)
 
 
+@app.on_event("startup")
+async def start_contract_render_pool():
+    """Start background contract rendering workers"""
+    await contract_render_pool.start()
+
+
+@app.on_event("startup")
+async def start_transaction_event_bridge():
+    """Relay transaction events from PostgreSQL NOTIFY to SSE subscribers"""
+    notify_bridge.start()
+
+
+@app.on_event("startup")
+async def start_metrics_refresher():
+    """Refresh pool and business gauges in the background (scrapes stay query-free)"""
+    await metrics_refresher.start()
+
+
+@app.on_event("startup")
+async def start_readiness_monitor():
+    """Sample pool, loop lag and queue depth for /api/v1/ready"""
+    await readiness_monitor.start()
+
+
+@app.on_event("startup")
+async def build_terms_bundle():
+    """Compile every Terms of Service version into response blobs"""
+    get_terms_bundle()
+
+
+@app.on_event("shutdown")
+async def shutdown_http_clients():
+    """Close pooled outbound HTTP connections"""
+    await close_http_clients()
+
+
+@app.on_event("shutdown")
+async def stop_contract_render_pool():
+    """Stop contract rendering workers"""
+    await contract_render_pool.stop()
+
+
+@app.on_event("shutdown")
+async def stop_transaction_event_bridge():
+    """Stop the LISTEN thread (it wakes up at least every few seconds)"""
+    await asyncio.to_thread(notify_bridge.stop)
+
+
+@app.on_event("shutdown")
+async def stop_readiness_monitor():
+    """Stop readiness sampling"""
+    await readiness_monitor.stop()
+
+
+@app.on_event("shutdown")
+async def stop_metrics_refresher():
+    """Stop the refresher and retire this worker's live gauges"""
+    await metrics_refresher.stop()
+    mark_worker_dead()
+
+
 # Health check endpoints are now in /api/v1/health
 # Keeping root health for backward compatibility
 @app.get("/health")
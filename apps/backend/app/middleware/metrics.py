@@ -0,0 +1,49 @@
+"""
+Request metrics middleware.
+Plain ASGI (no BaseHTTPMiddleware) so streamed responses pass through untouched.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+
+
+class PrometheusMiddleware:
+    """
+    Record request latency per route template and method.
+    Unmatched paths share one "unmatched" label so scanners cannot blow up
+    the series count. Event streams are counted but not timed (they stay open
+    for as long as the client listens).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        streaming = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        streaming = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method=method, route=path, status=str(status_code)).inc()
+            if not streaming:
+                HTTP_REQUEST_DURATION.labels(method=method, route=path).observe(time.perf_counter() - started)
@@ -6,14 +6,21 @@ from app.models.listing import Listing, ListingState
 from app.models.credential_vault import CredentialVault
 from app.models.listing_proof import ListingProof, ProofType
 from app.models.transaction import Transaction, TransactionState
+from app.models.transaction_state_event import TransactionStateEvent
 from app.models.buyer_confirmation import BuyerConfirmation, ConfirmationStage
 from app.models.contract import Contract
+from app.models.contract_render_job import ContractRenderJob, ContractJobStatus
 from app.models.payment_event import PaymentEvent, PaymentEventType
 from app.models.legal_document import LegalDocument, DocumentType
 from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
+from app.models.legal_ack_campaign import LegalAckCampaign, PendingLegalAcknowledgment, AckCampaignStatus
 from app.models.ownership_agreement import OwnershipAgreement
 from app.models.temporary_access import TemporaryAccess
 from app.models.listing_draft import ListingDraft, DraftStatus
+from app.models.payout import SellerPayoutAccount, PayoutTransfer, PayoutTransferStatus
+from app.models.scheduled_job import ScheduledJob, ScheduledJobKind, ScheduledJobStatus
+from app.models.seller_stats import SellerStats
+from app.models.outbox_message import OutboxMessage, OutboxStatus
 
 __all__ = [
     "Timestamped",
@@ -29,17 +36,32 @@ __all__ = [
     "ProofType",
     "Transaction",
     "TransactionState",
+    "TransactionStateEvent",
     "BuyerConfirmation",
     "ConfirmationStage",
     "Contract",
+    "ContractRenderJob",
+    "ContractJobStatus",
     "PaymentEvent",
     "PaymentEventType",
     "LegalDocument",
     "DocumentType",
     "UserLegalAcknowledgment",
+    "LegalAckCampaign",
+    "PendingLegalAcknowledgment",
+    "AckCampaignStatus",
     "OwnershipAgreement",
     "TemporaryAccess",
     "ListingDraft",
     "DraftStatus",
+    "SellerPayoutAccount",
+    "PayoutTransfer",
+    "PayoutTransferStatus",
+    "ScheduledJob",
+    "ScheduledJobKind",
+    "ScheduledJobStatus",
+    "SellerStats",
+    "OutboxMessage",
+    "OutboxStatus",
 ]
 
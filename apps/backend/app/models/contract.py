@@ -9,8 +9,9 @@ class Contract(Timestamped):
     transaction_id = Column(Integer, ForeignKey("transactions.id"), unique=True, nullable=False, index=True)
     
     # PDF contract storage
-    pdf_url = Column(String(500), nullable=True)  # Stored in Cloudinary/S3
-    pdf_hash = Column(String(64), nullable=False)  # SHA-256 hash for integrity verification
+    pdf_url = Column(String(500), nullable=True)  # Download URL
+    pdf_storage_key = Column(String(64), nullable=True)  # SHA-256 of the PDF bytes in blob storage (app.core.storage)
+    pdf_hash = Column(String(64), nullable=False)  # SHA-256 of canonical contract data (also embedded in the PDF)
     
     # E-signature (buyer signs by typing full legal name)
     signed_by_name = Column(String(255), nullable=True)  # Buyer's full legal name (must match registration)
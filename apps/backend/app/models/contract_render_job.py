@@ -0,0 +1,37 @@
+"""
+Contract rendering job model.
+Contract PDFs are rendered in a background process pool; clients poll the job.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+import enum
+from app.models.base import Timestamped
+
+
+class ContractJobStatus(str, enum.Enum):
+    """Lifecycle of a contract rendering job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ContractRenderJob(Timestamped):
+    __tablename__ = "contract_render_jobs"
+    
+    job_id = Column(String(36), unique=True, nullable=False, index=True)  # Public UUID used for polling
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False, index=True)
+    requested_by_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    status = Column(SQLEnum(ContractJobStatus, values_callable=lambda x: [e.value for e in x]), default=ContractJobStatus.QUEUED, nullable=False, index=True)
+    error = Column(Text, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    render_ms = Column(Integer, nullable=True)  # Time spent in the worker process
+    
+    # Result
+    contract_id = Column(Integer, ForeignKey("contracts.id"), nullable=True)
+    
+    # Relationships
+    transaction = relationship("Transaction")
+    contract = relationship("Contract")
@@ -0,0 +1,62 @@
+"""
+Re-acknowledgment campaigns.
+Publishing a required legal document creates a campaign that marks every
+active user who has not acknowledged it as pending and notifies them, in
+chunks, resuming from cursor_user_id after a restart.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Text, DateTime, UniqueConstraint, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+import enum
+from app.models.base import Timestamped
+
+
+class AckCampaignStatus(str, enum.Enum):
+    """Lifecycle of a re-acknowledgment campaign"""
+    QUEUED = "queued"  # Created at publish, not yet picked up
+    RUNNING = "running"  # Claimed by a runner (heartbeat_at is refreshed per chunk)
+    COMPLETED = "completed"  # Every affected user marked and notified
+    SUPERSEDED = "superseded"  # A newer version of the document was published first
+    FAILED = "failed"  # Stopped on an error; resumable
+
+
+class LegalAckCampaign(Timestamped):
+    """Fan-out progress for one published document"""
+    __tablename__ = "legal_ack_campaigns"
+
+    document_id = Column(Integer, ForeignKey("legal_documents.id"), nullable=False, index=True)
+    status = Column(
+        SQLEnum(AckCampaignStatus, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        default=AckCampaignStatus.QUEUED,
+        index=True
+    )
+
+    # Progress (keyset cursor over users.id)
+    cursor_user_id = Column(Integer, nullable=False, default=0)
+    total_users = Column(Integer, nullable=True)  # Affected users counted when the run starts
+    marked_users = Column(Integer, nullable=False, default=0)
+    notified_users = Column(Integer, nullable=False, default=0)
+    notify_failures = Column(Integer, nullable=False, default=0)
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Relationships
+    document = relationship("LegalDocument")
+
+
+class PendingLegalAcknowledgment(Timestamped):
+    """A user who must acknowledge a newly published document"""
+    __tablename__ = "pending_legal_acknowledgments"
+
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    document_id = Column(Integer, ForeignKey("legal_documents.id"), nullable=False, index=True)
+    campaign_id = Column(Integer, ForeignKey("legal_ack_campaigns.id"), nullable=True)
+    notified_at = Column(DateTime(timezone=True), nullable=True)
+    acknowledged_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint('user_id', 'document_id', name='uq_pending_ack_user_document'),
+    )
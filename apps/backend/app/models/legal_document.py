@@ -31,6 +31,8 @@ class LegalDocument(Timestamped):
         index=True
     )
     content_markdown = Column(Text, nullable=False)  # Written in Markdown for rich formatting
+    content_html = Column(Text, nullable=True)  # Rendered once on create/update/publish
+    content_hash = Column(String(64), nullable=True)  # SHA-256 of the public representation (ETag)
     version = Column(String(20), default="1.0", nullable=False)  # e.g., "2.1"
     is_current = Column(Boolean, default=True, nullable=False, index=True)  # Only one per type is current
     published_at = Column(DateTime(timezone=True), nullable=True)
@@ -19,8 +19,9 @@ class ListingProof(Timestamped):
     listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False, index=True)
     proof_type = Column(SQLEnum(ProofType, values_callable=lambda x: [e.value for e in x]), nullable=False)
     
-    # File storage (Cloudinary URL or S3 key)
+    # File storage (external URL, or the download URL of an uploaded blob)
     file_url = Column(String(500), nullable=False)
+    storage_key = Column(String(64), nullable=True, index=True)  # SHA-256 of uploaded content (app.core.storage)
     file_name = Column(String(255), nullable=False)
     file_size = Column(Integer, nullable=True)  # Size in bytes
     mime_type = Column(String(100), nullable=True)
@@ -0,0 +1,45 @@
+"""
+Transactional outbox.
+Side effects of a state change (emails, notifications) are written here in
+the same database transaction as the change itself; the outbox dispatcher
+claims pending rows with SKIP LOCKED and performs them after commit.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum, text
+import enum
+from app.models.base import Timestamped
+
+
+class OutboxStatus(str, enum.Enum):
+    """Lifecycle of an outbox message"""
+    PENDING = "pending"  # Waiting for available_at (first attempt or retry)
+    DONE = "done"  # Handler succeeded
+    FAILED = "failed"  # Gave up after OUTBOX_MAX_ATTEMPTS errors (or no handler for the topic)
+
+
+class OutboxMessage(Timestamped):
+    """One side effect to perform once the transaction that wrote it commits"""
+    __tablename__ = "outbox"
+
+    topic = Column(String(100), nullable=False)  # Handler name, e.g. "email.account_suspended"
+    payload = Column(Text, nullable=False)  # JSON arguments for the handler
+    status = Column(
+        SQLEnum(OutboxStatus, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        default=OutboxStatus.PENDING
+    )
+    available_at = Column(DateTime(timezone=True), nullable=False)  # Not dispatched before this (retry backoff)
+
+    # Outcome
+    attempts = Column(Integer, nullable=False, default=0)
+    dispatched_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # The dispatcher only ever looks at pending rows in availability order
+        Index(
+            'ix_outbox_pending_available',
+            'available_at',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
@@ -4,8 +4,9 @@ Tracks digital signature with legal name validation.
 """
 from sqlalchemy import Column, Integer, ForeignKey, String, Text, Boolean, DateTime
 from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.core.signatures import get_signer, ownership_agreement_payload
 from app.models.base import Timestamped
-import hashlib
 
 
 class OwnershipAgreement(Timestamped):
@@ -23,7 +24,8 @@ class OwnershipAgreement(Timestamped):
     # Digital signature
     signed_by_name = Column(String(255), nullable=True)  # Buyer's full legal name (must match user profile)
     signed_at = Column(DateTime(timezone=True), nullable=True)
-    signature_hash = Column(String(64), nullable=True)  # SHA-256 hash for integrity verification
+    signature_hash = Column(String(64), nullable=True)  # Keyed BLAKE2b over the canonical payload (app.core.signatures)
+    signature_key_id = Column(String(16), nullable=True)  # Key that produced signature_hash; NULL for legacy unkeyed hashes
     ip_address = Column(String(45), nullable=True)  # IP address at time of signature
     user_agent = Column(Text, nullable=True)  # User agent at time of signature
     
@@ -52,8 +54,11 @@ class OwnershipAgreement(Timestamped):
             and self.platform_liability_ends_acknowledged
         )
     
-    def generate_signature_hash(self, buyer_full_name: str, timestamp: str) -> str:
-        """Generate SHA-256 hash of signature for integrity verification"""
-        signature_string = f"{buyer_full_name}:{timestamp}:{self.transaction_id}:{self.agreement_version}"
-        return hashlib.sha256(signature_string.encode('utf-8')).hexdigest()
+    def sign(self, buyer_full_name: str, signed_at: datetime) -> None:
+        """Record the buyer's signature over the agreement text"""
+        self.signed_by_name = buyer_full_name
+        self.signed_at = signed_at
+        self.signature_key_id, self.signature_hash = get_signer().sign(ownership_agreement_payload(
+            self.transaction_id, self.agreement_version, self.agreement_content, buyer_full_name, signed_at
+        ))
 
@@ -0,0 +1,67 @@
+"""
+Seller payout models.
+Stores where sellers get paid (with the cached Paystack recipient code)
+and tracks every payout transfer through Paystack webhooks.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+import enum
+from app.models.base import Timestamped
+
+
+class PayoutTransferStatus(str, enum.Enum):
+    """Lifecycle of a single payout transfer"""
+    QUEUED = "queued"  # Row written, not yet sent (or send outcome unknown); resent with the same reference
+    SENDING = "sending"  # Claimed by a run that is calling Paystack; skipped until claimed_at + lease
+    PENDING = "pending"  # Accepted by Paystack, waiting for transfer webhook
+    SUCCESS = "success"  # transfer.success received
+    FAILED = "failed"  # Rejected by Paystack or transfer.failed received
+    REVERSED = "reversed"  # transfer.reversed received
+
+
+class SellerPayoutAccount(Timestamped):
+    """
+    Seller's payout destination (bank or mobile money).
+    paystack_recipient_code caches the create_transfer_recipient result.
+    """
+    __tablename__ = "seller_payout_accounts"
+
+    seller_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False, index=True)
+    recipient_type = Column(String(50), nullable=False, default="mobile_money")  # nuban, mobile_money, basa, ...
+    account_name = Column(String(255), nullable=False)
+    account_number = Column(String(50), nullable=False)
+    bank_code = Column(String(50), nullable=False)  # e.g. MPESA for M-Pesa mobile money
+    currency = Column(String(3), nullable=False, default="KES")
+
+    # Cached Paystack recipient (cleared whenever account details change)
+    paystack_recipient_code = Column(String(100), nullable=True)
+    recipient_created_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    seller = relationship("User")
+
+
+class PayoutTransfer(Timestamped):
+    """One Paystack transfer paying a seller for one transaction"""
+    __tablename__ = "payout_transfers"
+
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), unique=True, nullable=False, index=True)
+    seller_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+
+    # Transfer details
+    reference = Column(String(100), unique=True, nullable=False, index=True)  # Idempotency key sent to Paystack
+    transfer_code = Column(String(100), nullable=True, index=True)
+    recipient_code = Column(String(100), nullable=False)
+    amount = Column(Integer, nullable=False)  # KES cents
+    currency = Column(String(3), nullable=False, default="KES")
+
+    # Tracking
+    status = Column(SQLEnum(PayoutTransferStatus, values_callable=lambda x: [e.value for e in x]), default=PayoutTransferStatus.QUEUED, nullable=False, index=True)
+    batch_id = Column(String(64), nullable=True, index=True)  # Bulk transfer request this was sent in
+    attempts = Column(Integer, default=0, nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # Start of the SENDING lease
+    failure_reason = Column(Text, nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    transaction = relationship("Transaction")
@@ -0,0 +1,58 @@
+"""
+Durable deadline jobs.
+Every time-boxed transaction step (temporary access, verification window)
+schedules one row here; the deadline scheduler polls due rows with
+SKIP LOCKED and fires the configured transition.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, Index, UniqueConstraint, Enum as SQLEnum, text
+from sqlalchemy.orm import relationship
+import enum
+from app.models.base import Timestamped
+
+
+class ScheduledJobKind(str, enum.Enum):
+    """Deadlines the scheduler knows how to fire"""
+    TEMPORARY_ACCESS_EXPIRY = "temporary_access_expiry"  # TemporaryAccess.access_expires_at passed in TEMPORARY_ACCESS_GRANTED
+    VERIFICATION_DEADLINE = "verification_deadline"  # Transaction.verification_deadline passed in VERIFICATION_WINDOW
+
+
+class ScheduledJobStatus(str, enum.Enum):
+    """Lifecycle of a deadline job"""
+    PENDING = "pending"  # Waiting for due_at
+    DONE = "done"  # Fired (or found the transaction already moved on)
+    CANCELLED = "cancelled"  # The buyer acted before the deadline
+    FAILED = "failed"  # Gave up after DEADLINE_JOB_MAX_ATTEMPTS errors
+
+
+class ScheduledJob(Timestamped):
+    """One pending deadline for one transaction (re-armed in place when rescheduled)"""
+    __tablename__ = "scheduled_jobs"
+
+    kind = Column(SQLEnum(ScheduledJobKind, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False, index=True)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+    status = Column(
+        SQLEnum(ScheduledJobStatus, values_callable=lambda x: [e.value for e in x]),
+        nullable=False,
+        default=ScheduledJobStatus.PENDING
+    )
+
+    # Outcome
+    attempts = Column(Integer, nullable=False, default=0)
+    fired_at = Column(DateTime(timezone=True), nullable=True)
+    result = Column(String(50), nullable=True)  # Action taken (escalate, refund, advance) or "skipped"
+    last_error = Column(Text, nullable=True)
+
+    # Relationships
+    transaction = relationship("Transaction")
+
+    __table_args__ = (
+        UniqueConstraint('kind', 'transaction_id', name='uq_scheduled_job_kind_transaction'),
+        # The poll only ever looks at pending rows in due order
+        Index(
+            'ix_scheduled_jobs_pending_due',
+            'due_at',
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+    )
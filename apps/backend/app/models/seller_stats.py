@@ -0,0 +1,24 @@
+"""
+Per-seller transaction summary.
+One row per (seller, state), kept current by a state machine hook in the
+same database transaction as every transition (see crud/seller_stats.py),
+so the seller dashboard never aggregates the transactions table.
+"""
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, UniqueConstraint, Enum as SQLEnum
+from app.models.base import Timestamped
+from app.models.transaction import TransactionState
+
+
+class SellerStats(Timestamped):
+    """Transactions of one seller currently in one state"""
+    __tablename__ = "seller_stats"
+
+    seller_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    state = Column(SQLEnum(TransactionState, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    transaction_count = Column(Integer, nullable=False, default=0, server_default="0")
+    amount_usd = Column(BigInteger, nullable=False, default=0, server_default="0")  # Sum of amount_usd (cents)
+    payout_amount_usd = Column(BigInteger, nullable=False, default=0, server_default="0")  # Sum of payout_amount_usd (cents), COMPLETED only
+
+    __table_args__ = (
+        UniqueConstraint('seller_id', 'state', name='uq_seller_stats_seller_state'),
+    )
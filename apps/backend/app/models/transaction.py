@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric, Enum as SQLEnum, String, Text, Boolean
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, Enum as SQLEnum, String, Text, Boolean, DateTime, Index, text
 from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+from typing import Optional
 import enum
 from app.models.base import Timestamped
 from app.models.currency import Currency
@@ -37,10 +39,14 @@ class TransactionState(str, enum.Enum):
     CANCELLED = "cancelled"  # Transaction cancelled before completion
 
 
+# Terminal states never gain a new deadline or payout; partial indexes skip them
+OPEN_STATES_SQL = "state NOT IN ('completed', 'refunded', 'cancelled')"
+
+
 class Transaction(Timestamped):
     __tablename__ = "transactions"
     
-    listing_id = Column(Integer, ForeignKey("listings.id"), unique=True, nullable=False, index=True)
+    listing_id = Column(Integer, ForeignKey("listings.id"), nullable=False, index=True)  # One open transaction per listing, see __table_args__
     buyer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     seller_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     
@@ -59,21 +65,21 @@ class Transaction(Timestamped):
     paystack_authorization_code = Column(String(255), nullable=True)
     paystack_customer_code = Column(String(255), nullable=True)
     
-    # State timestamps (ISO format strings)
-    purchase_initiated_at = Column(String(50), nullable=True)  # STEP 1
-    payment_pending_at = Column(String(50), nullable=True)
-    funds_held_at = Column(String(50), nullable=True)  # STEP 2
-    temporary_access_granted_at = Column(String(50), nullable=True)  # STEP 3
-    verification_window_started_at = Column(String(50), nullable=True)  # STEP 4
-    verification_deadline = Column(String(50), nullable=True)  # Deadline for verification (e.g., 48 hours)
-    account_verified_at = Column(String(50), nullable=True)  # Buyer verified account is valid
-    ownership_agreement_pending_at = Column(String(50), nullable=True)  # STEP 5
-    ownership_agreement_signed_at = Column(String(50), nullable=True)
-    funds_release_pending_at = Column(String(50), nullable=True)  # STEP 6
-    funds_released_at = Column(String(50), nullable=True)
-    completed_at = Column(String(50), nullable=True)  # STEP 7
-    refunded_at = Column(String(50), nullable=True)
-    cancelled_at = Column(String(50), nullable=True)
+    # State timestamps (UTC)
+    purchase_initiated_at = Column(DateTime(timezone=True), nullable=True)  # STEP 1
+    payment_pending_at = Column(DateTime(timezone=True), nullable=True)
+    funds_held_at = Column(DateTime(timezone=True), nullable=True)  # STEP 2
+    temporary_access_granted_at = Column(DateTime(timezone=True), nullable=True)  # STEP 3
+    verification_window_started_at = Column(DateTime(timezone=True), nullable=True)  # STEP 4
+    verification_deadline = Column(DateTime(timezone=True), nullable=True)  # Deadline for verification (e.g., 48 hours)
+    account_verified_at = Column(DateTime(timezone=True), nullable=True)  # Buyer verified account is valid
+    ownership_agreement_pending_at = Column(DateTime(timezone=True), nullable=True)  # STEP 5
+    ownership_agreement_signed_at = Column(DateTime(timezone=True), nullable=True)
+    funds_release_pending_at = Column(DateTime(timezone=True), nullable=True)  # STEP 6
+    funds_released_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)  # STEP 7
+    refunded_at = Column(DateTime(timezone=True), nullable=True)
+    cancelled_at = Column(DateTime(timezone=True), nullable=True)
     
     # Buyer confirmation
     buyer_confirmed_access = Column(Boolean, default=False, nullable=False)
@@ -81,6 +87,7 @@ class Transaction(Timestamped):
     
     # Payout details
     payout_reference = Column(String(255), nullable=True)  # Paystack transfer reference
+    commission_percent = Column(Integer, nullable=True)  # Rate fixed at funds release; applied to the KES payout too
     commission_usd = Column(Integer, nullable=True)  # Platform commission in USD cents
     payout_amount_usd = Column(Integer, nullable=True)  # Amount to seller after commission
     
@@ -97,98 +104,56 @@ class Transaction(Timestamped):
     payment_events = relationship("PaymentEvent", back_populates="transaction", cascade="all, delete-orphan")
     buyer_confirmations = relationship("BuyerConfirmation", back_populates="transaction", cascade="all, delete-orphan", order_by="BuyerConfirmation.created_at")
     
+    __table_args__ = (
+        # A listing can be bought again after a refund or cancellation, never twice at once
+        Index(
+            'uq_transactions_active_listing',
+            'listing_id',
+            unique=True,
+            postgresql_where=text(OPEN_STATES_SQL),
+            sqlite_where=text(OPEN_STATES_SQL),
+        ),
+        # Deadline / queue range scans only ever look at open transactions
+        Index(
+            'ix_transactions_verification_deadline_open',
+            'verification_deadline',
+            postgresql_where=text(OPEN_STATES_SQL),
+            sqlite_where=text(OPEN_STATES_SQL),
+        ),
+        Index(
+            'ix_transactions_funds_release_pending_at_open',
+            'funds_release_pending_at',
+            postgresql_where=text(OPEN_STATES_SQL),
+            sqlite_where=text(OPEN_STATES_SQL),
+        ),
+        Index('ix_transactions_completed_at', 'completed_at'),
+        # Seller dashboard pages (newest first per seller)
+        Index('ix_transactions_seller_created', 'seller_id', 'created_at'),
+    )
+    
+    @property
+    def verification_hours_remaining(self) -> Optional[float]:
+        """Hours left in the verification window (0 once passed, None if not started)"""
+        if self.verification_deadline is None:
+            return None
+        deadline = self.verification_deadline
+        if deadline.tzinfo is None:
+            deadline = deadline.replace(tzinfo=timezone.utc)
+        remaining = (deadline - datetime.now(timezone.utc)).total_seconds() / 3600.0
+        return max(remaining, 0.0)
+    
     def can_transition_to(self, new_state: "TransactionState") -> bool:
         """
         Check if state transition is valid (step-locked flow).
-        Buyer can only move forward one step at a time.
+        The table lives in app.core.state_machine.TRANSITIONS.
         """
-        transitions = {
-            # STEP 1: Initiate Purchase
-            TransactionState.PURCHASE_INITIATED: [
-                TransactionState.PAYMENT_PENDING,
-                TransactionState.CANCELLED
-            ],
-            
-            # STEP 2: Payment
-            TransactionState.PAYMENT_PENDING: [
-                TransactionState.FUNDS_HELD,
-                TransactionState.CANCELLED,
-                TransactionState.REFUNDED
-            ],
-            TransactionState.FUNDS_HELD: [
-                TransactionState.TEMPORARY_ACCESS_GRANTED,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            
-            # STEP 3: Temporary Access
-            TransactionState.TEMPORARY_ACCESS_GRANTED: [
-                TransactionState.VERIFICATION_WINDOW,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            
-            # STEP 4: Verification Window
-            TransactionState.VERIFICATION_WINDOW: [
-                TransactionState.OWNERSHIP_AGREEMENT_PENDING,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            
-            # STEP 5: Ownership Agreement
-            TransactionState.OWNERSHIP_AGREEMENT_PENDING: [
-                TransactionState.OWNERSHIP_AGREEMENT_SIGNED,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            TransactionState.OWNERSHIP_AGREEMENT_SIGNED: [
-                TransactionState.FUNDS_RELEASE_PENDING,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            
-            # STEP 6: Final Confirmation
-            TransactionState.FUNDS_RELEASE_PENDING: [
-                TransactionState.FUNDS_RELEASED,
-                TransactionState.REFUNDED,
-                TransactionState.DISPUTED
-            ],
-            TransactionState.FUNDS_RELEASED: [
-                TransactionState.COMPLETED
-            ],
-            
-            # STEP 7: Transaction Closed (Terminal)
-            TransactionState.COMPLETED: [],  # Terminal state
-            TransactionState.REFUNDED: [],  # Terminal state
-            TransactionState.CANCELLED: [],  # Terminal state
-            
-            # Dispute can lead to refund or completion (admin decision)
-            TransactionState.DISPUTED: [
-                TransactionState.REFUNDED,
-                TransactionState.COMPLETED,
-                TransactionState.FUNDS_RELEASED  # Admin can force release
-            ]
-        }
-        return new_state in transitions.get(self.state, [])
+        from app.core.state_machine import can_transition
+        return can_transition(self.state, new_state)
     
     def get_current_step(self) -> int:
         """Get current step number (1-7)"""
-        step_map = {
-            TransactionState.PURCHASE_INITIATED: 1,
-            TransactionState.PAYMENT_PENDING: 2,
-            TransactionState.FUNDS_HELD: 2,
-            TransactionState.TEMPORARY_ACCESS_GRANTED: 3,
-            TransactionState.VERIFICATION_WINDOW: 4,
-            TransactionState.OWNERSHIP_AGREEMENT_PENDING: 5,
-            TransactionState.OWNERSHIP_AGREEMENT_SIGNED: 5,
-            TransactionState.FUNDS_RELEASE_PENDING: 6,
-            TransactionState.FUNDS_RELEASED: 6,
-            TransactionState.COMPLETED: 7,
-            TransactionState.REFUNDED: 0,  # Terminal
-            TransactionState.CANCELLED: 0,  # Terminal
-            TransactionState.DISPUTED: 0,  # Special state
-        }
-        return step_map.get(self.state, 0)
+        from app.core.state_machine import STEP_NUMBERS
+        return STEP_NUMBERS.get(self.state, 0)
     
     def can_proceed_to_next_step(self) -> bool:
         """Check if all requirements for current step are met"""
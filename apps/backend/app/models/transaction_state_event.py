@@ -0,0 +1,29 @@
+"""
+Transaction state history.
+One row per state change, appended by app/core/state_machine.py in the same
+database transaction as the change itself.
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Text, Index, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from app.models.base import Timestamped
+from app.models.transaction import TransactionState
+
+
+class TransactionStateEvent(Timestamped):
+    """A transaction moved from one state to another (from_state is NULL on creation)"""
+    __tablename__ = "transaction_state_events"
+
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=False)
+    from_state = Column(SQLEnum(TransactionState, values_callable=lambda x: [e.value for e in x]), nullable=True)
+    to_state = Column(SQLEnum(TransactionState, values_callable=lambda x: [e.value for e in x]), nullable=False)
+    actor_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # NULL for webhooks and schedulers
+    reason = Column(Text, nullable=True)
+
+    # Relationships
+    transaction = relationship("Transaction")
+    actor = relationship("User")
+
+    __table_args__ = (
+        # History of one transaction, in order
+        Index('ix_transaction_state_events_transaction_id', 'transaction_id', 'id'),
+    )
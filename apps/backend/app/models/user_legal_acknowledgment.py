@@ -17,9 +17,14 @@ class UserLegalAcknowledgment(Timestamped):
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(String(500), nullable=True)
     
+    # Snapshot of the document as acknowledged; the signature covers these, not the live document row
+    version = Column(String(20), nullable=True)
+    content_hash = Column(String(64), nullable=True)
+    
     # Digital signature (full legal name)
     signed_by_name = Column(String(255), nullable=True)  # Full legal name as digital signature
-    signature_hash = Column(String(64), nullable=True)  # SHA-256 hash for integrity verification
+    signature_hash = Column(String(64), nullable=True)  # Keyed BLAKE2b over the canonical payload (app.core.signatures)
+    signature_key_id = Column(String(16), nullable=True)  # Key that produced signature_hash; NULL for legacy unkeyed hashes
     
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
@@ -5,7 +5,7 @@ from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 from app.models.transaction import Transaction, TransactionState
-from app.models.listing import Listing, ListingState
+from app.core.state_machine import TERMINAL_STATES, InvalidTransitionError, transition
 
 
 def mark_access_confirmed(
@@ -51,23 +51,16 @@ def finalize_transaction(
     Returns:
         Finalized Transaction
     """
-    transaction.commission_usd = commission_usd
-    transaction.payout_amount_usd = payout_amount_usd
-    transaction.payout_reference = payout_reference
-    transaction.completed_at = datetime.utcnow().isoformat()
-    
-    # Mark listing as SOLD
-    listing = db.query(Listing).filter(Listing.id == transaction.listing_id).first()
-    if listing:
-        listing.state = ListingState.SOLD
-    
-    # Update transaction state
-    transaction.state = TransactionState.COMPLETED
-    
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    # The COMPLETED hook marks the listing SOLD
+    return transition(
+        db, transaction, TransactionState.COMPLETED,
+        reason="Payout finalized",
+        values={
+            "commission_usd": commission_usd,
+            "payout_amount_usd": payout_amount_usd,
+            "payout_reference": payout_reference,
+        }
+    )
 
 
 def process_refund(
@@ -87,20 +80,16 @@ def process_refund(
         
     Returns:
         Refunded Transaction
+        
+    Raises:
+        InvalidTransitionError: The transaction cannot be refunded from its current state
     """
-    transaction.state = TransactionState.REFUNDED
-    transaction.refunded_at = datetime.utcnow().isoformat()
-    transaction.notes = f"Refunded by admin {admin_id}. Reason: {reason}"
-    
-    # Return listing to APPROVED state (seller can relist)
-    listing = db.query(Listing).filter(Listing.id == transaction.listing_id).first()
-    if listing:
-        listing.state = ListingState.APPROVED
-    
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    # The REFUNDED hooks return the listing to APPROVED (seller can relist) and revoke access
+    return transition(
+        db, transaction, TransactionState.REFUNDED,
+        actor_id=admin_id, reason=reason,
+        values={"notes": f"Refunded by admin {admin_id}. Reason: {reason}"}
+    )
 
 
 def force_release(
@@ -120,18 +109,19 @@ def force_release(
         
     Returns:
         Released Transaction
+        
+    Raises:
+        InvalidTransitionError: The transaction is already closed
+        StaleTransitionError: The transaction changed state concurrently
     """
-    transaction.state = TransactionState.COMPLETED
-    transaction.completed_at = datetime.utcnow().isoformat()
-    transaction.notes = f"Forced release by admin {admin_id}. Reason: {reason}"
-    
-    # Mark listing as SOLD
-    listing = db.query(Listing).filter(Listing.id == transaction.listing_id).first()
-    if listing:
-        listing.state = ListingState.SOLD
-    
-    db.commit()
-    db.refresh(transaction)
-    
-    return transaction
+    # Admin override: any open state may be closed, but never a terminal one, and the
+    # guarded UPDATE still refuses to race another writer. The event keeps the reason.
+    if transaction.state in TERMINAL_STATES:
+        raise InvalidTransitionError(f"Cannot force release a {transaction.state.value} transaction")
+    
+    return transition(
+        db, transaction, TransactionState.COMPLETED,
+        actor_id=admin_id, reason=f"Forced release: {reason}", force=True,
+        values={"notes": f"Forced release by admin {admin_id}. Reason: {reason}"}
+    )
 
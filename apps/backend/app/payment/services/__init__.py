@@ -4,9 +4,29 @@ Payment services for escrow transactions.
 
 from app.payment.services.paystack import PaystackService
 from app.payment.services.payout import PayoutService
+from app.payment.services.payout_engine import PayoutEngine, payout_engine
+from app.payment.services.reconciliation import Reconciler, run_reconciliation
+from app.payment.services.http_client import (
+    PaystackHTTPClient,
+    AsyncPaystackHTTPClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    get_http_client,
+    get_async_http_client,
+)
 
 __all__ = [
     "PaystackService",
     "PayoutService",
+    "PayoutEngine",
+    "payout_engine",
+    "Reconciler",
+    "run_reconciliation",
+    "PaystackHTTPClient",
+    "AsyncPaystackHTTPClient",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_http_client",
+    "get_async_http_client",
 ]
 
@@ -0,0 +1,421 @@
+"""
+Shared, connection-pooled HTTP clients for outbound Paystack calls.
+
+Both the sync (requests) and async (httpx) clients keep connections alive
+across calls, apply per-call timeouts, retry idempotent calls with jittered
+exponential backoff and share a circuit breaker so a failing Paystack does
+not tie up workers and database connections.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.core.config import settings
+from app.core.metrics import (
+    PAYSTACK_CIRCUIT_OPEN,
+    PAYSTACK_REQUEST_ERRORS,
+    PAYSTACK_REQUEST_LATENCY,
+    PAYSTACK_REQUEST_RETRIES,
+)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half-open once `reset_timeout` seconds have passed; a single
+    trial call is then let through and closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be attempted now"""
+        with self._lock:
+            state = self._state_locked()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+        PAYSTACK_CIRCUIT_OPEN.set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                opened = True
+            else:
+                opened = False
+        if opened:
+            PAYSTACK_CIRCUIT_OPEN.set(1)
+
+    def release_trial(self) -> None:
+        """Give up a half-open trial without an outcome (e.g. the call was cancelled)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class _EndpointStats:
+    """Per-endpoint latency and error bookkeeping for get_stats()"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _entry(self, method: str, endpoint: str) -> Dict[str, float]:
+        return self._stats.setdefault(
+            f"{method} {endpoint}",
+            {"calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+
+    def record(self, method: str, endpoint: str, duration: Optional[float], error: Optional[str]) -> None:
+        """Record one attempt; duration is None when no request was sent"""
+        with self._lock:
+            entry = self._entry(method, endpoint)
+            if duration is not None:
+                duration_ms = duration * 1000
+                entry["calls"] += 1
+                entry["total_ms"] += duration_ms
+                entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            if error:
+                entry["errors"] += 1
+        if duration is not None:
+            PAYSTACK_REQUEST_LATENCY.labels(endpoint=endpoint, method=method).observe(duration)
+        if error:
+            PAYSTACK_REQUEST_ERRORS.labels(endpoint=endpoint, reason=error).inc()
+
+    def record_retry(self, method: str, endpoint: str) -> None:
+        with self._lock:
+            self._entry(method, endpoint)["retries"] += 1
+        PAYSTACK_REQUEST_RETRIES.labels(endpoint=endpoint).inc()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                label: {
+                    "calls": int(entry["calls"]),
+                    "errors": int(entry["errors"]),
+                    "retries": int(entry["retries"]),
+                    "avg_ms": round(entry["total_ms"] / entry["calls"], 2) if entry["calls"] else 0.0,
+                    "max_ms": round(entry["max_ms"], 2),
+                }
+                for label, entry in self._stats.items()
+            }
+
+
+class _BasePaystackClient:
+    """Retry policy, breaker and metrics shared by the sync and async clients"""
+
+    def __init__(
+        self,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        pool_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.connect_timeout = connect_timeout if connect_timeout is not None else settings.PAYSTACK_HTTP_CONNECT_TIMEOUT_SECONDS
+        self.read_timeout = read_timeout if read_timeout is not None else settings.PAYSTACK_HTTP_READ_TIMEOUT_SECONDS
+        self.pool_size = pool_size if pool_size is not None else settings.PAYSTACK_HTTP_POOL_SIZE
+        self.max_retries = max_retries if max_retries is not None else settings.PAYSTACK_HTTP_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else settings.PAYSTACK_HTTP_BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max if backoff_max is not None else settings.PAYSTACK_HTTP_BACKOFF_MAX_SECONDS
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.PAYSTACK_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.PAYSTACK_CIRCUIT_RESET_SECONDS,
+        )
+        self._stats = _EndpointStats()
+
+    def _max_attempts(self, method: str, idempotent: Optional[bool]) -> int:
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        return 1 + self.max_retries if idempotent else 1
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _check_circuit(self, method: str, endpoint: str) -> None:
+        if not self.breaker.allow_request():
+            self._stats.record(method, endpoint, None, "circuit_open")
+            raise CircuitOpenError("Paystack is temporarily unavailable (circuit open)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-endpoint call, error and latency summary plus breaker state"""
+        return {
+            "circuit_state": self.breaker.state,
+            "endpoints": self._stats.snapshot(),
+        }
+
+
+class PaystackHTTPClient(_BasePaystackClient):
+    """Thread-safe, connection-pooled requests client for Paystack"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+    ) -> requests.Response:
+        """
+        Send a request with timeout, retry and circuit breaking.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            endpoint: Low-cardinality endpoint label for metrics (e.g. "/transaction/verify")
+            headers: Request headers
+            json: JSON body
+            timeout: Read timeout override in seconds
+            idempotent: Force retry behaviour; defaults to the HTTP method semantics
+
+        Returns:
+            The final requests.Response (4xx/5xx responses are returned, not raised)
+        """
+        method = method.upper()
+        attempts = self._max_attempts(method, idempotent)
+        request_timeout = (self.connect_timeout, timeout if timeout is not None else self.read_timeout)
+
+        for attempt in range(attempts):
+            self._check_circuit(method, endpoint)
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers=headers, json=json, timeout=request_timeout)
+            except requests.exceptions.RequestException as e:
+                reason = "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection"
+                self._stats.record(method, endpoint, time.perf_counter() - start, reason)
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                self._stats.record_retry(method, endpoint)
+                time.sleep(self._backoff(attempt))
+                continue
+            except Exception:
+                self._stats.record(method, endpoint, time.perf_counter() - start, "error")
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+
+            duration = time.perf_counter() - start
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self._stats.record(method, endpoint, duration, f"http_{response.status_code}")
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if attempt + 1 < attempts:
+                    self._stats.record_retry(method, endpoint)
+                    response.close()
+                    time.sleep(self._backoff(attempt))
+                    continue
+                return response
+
+            self._stats.record(method, endpoint, duration, None if response.ok else f"http_{response.status_code}")
+            self.breaker.record_success()
+            return response
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    def get(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, endpoint, **kwargs)
+
+    def post(self, url: str, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, endpoint, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncPaystackHTTPClient(_BasePaystackClient):
+    """Connection-pooled httpx.AsyncClient for Paystack, for use inside async endpoints"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        idempotent: Optional[bool] = None,
+    ) -> httpx.Response:
+        """Async counterpart of PaystackHTTPClient.request"""
+        method = method.upper()
+        attempts = self._max_attempts(method, idempotent)
+        request_timeout = httpx.Timeout(
+            timeout if timeout is not None else self.read_timeout,
+            connect=self.connect_timeout,
+        )
+
+        for attempt in range(attempts):
+            self._check_circuit(method, endpoint)
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, headers=headers, json=json, timeout=request_timeout)
+            except httpx.HTTPError as e:
+                reason = "timeout" if isinstance(e, httpx.TimeoutException) else "connection"
+                self._stats.record(method, endpoint, time.perf_counter() - start, reason)
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                self._stats.record_retry(method, endpoint)
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+            except Exception:
+                self._stats.record(method, endpoint, time.perf_counter() - start, "error")
+                self.breaker.record_failure()
+                raise
+            except BaseException:
+                self.breaker.release_trial()
+                raise
+
+            duration = time.perf_counter() - start
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                self._stats.record(method, endpoint, duration, f"http_{response.status_code}")
+                if response.status_code >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if attempt + 1 < attempts:
+                    self._stats.record_retry(method, endpoint)
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                return response
+
+            self._stats.record(method, endpoint, duration, None if response.is_success else f"http_{response.status_code}")
+            self.breaker.record_success()
+            return response
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def get(self, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, endpoint, **kwargs)
+
+    async def post(self, url: str, endpoint: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, endpoint, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+# Process-wide shared clients (one connection pool per worker)
+_client_lock = threading.Lock()
+_sync_client: Optional[PaystackHTTPClient] = None
+_async_client: Optional[AsyncPaystackHTTPClient] = None
+_shared_breaker: Optional[CircuitBreaker] = None
+
+
+def _get_shared_breaker() -> CircuitBreaker:
+    global _shared_breaker
+    if _shared_breaker is None:
+        _shared_breaker = CircuitBreaker(
+            failure_threshold=settings.PAYSTACK_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.PAYSTACK_CIRCUIT_RESET_SECONDS,
+        )
+    return _shared_breaker
+
+
+def paystack_circuit_state() -> str:
+    """State of the breaker shared by the sync and async clients"""
+    return _get_shared_breaker().state
+
+
+def get_http_client() -> PaystackHTTPClient:
+    """Get the shared sync Paystack client (created lazily)"""
+    global _sync_client
+    if _sync_client is None:
+        with _client_lock:
+            if _sync_client is None:
+                _sync_client = PaystackHTTPClient(breaker=_get_shared_breaker())
+    return _sync_client
+
+
+def get_async_http_client() -> AsyncPaystackHTTPClient:
+    """Get the shared async Paystack client (created lazily)"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncPaystackHTTPClient(breaker=_get_shared_breaker())
+    return _async_client
+
+
+async def close_http_clients() -> None:
+    """Close shared clients and their pools (called on application shutdown)"""
+    global _sync_client, _async_client
+    with _client_lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = None
+        _async_client = None
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.aclose()
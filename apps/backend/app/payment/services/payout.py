@@ -32,6 +32,23 @@ class PayoutService:
         
         return commission_usd, payout_amount_usd
     
+    @staticmethod
+    def record_commission(transaction) -> Tuple[int, int]:
+        """
+        Fix the commission rate of a transaction and record its USD split.
+        The rate is stored on the transaction so the payout engine applies the
+        same rate to the KES transfer, even if the configured rate changes.
+        
+        Returns:
+            Tuple of (commission_usd, payout_amount_usd) in cents
+        """
+        if transaction.commission_percent is None:
+            transaction.commission_percent = PayoutService.get_commission_percentage()
+        transaction.commission_usd, transaction.payout_amount_usd = PayoutService.calculate_commission(
+            transaction.amount_usd, transaction.commission_percent
+        )
+        return transaction.commission_usd, transaction.payout_amount_usd
+    
     @staticmethod
     def get_commission_percentage() -> int:
         """Get configured commission percentage"""
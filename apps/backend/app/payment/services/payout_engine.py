@@ -0,0 +1,489 @@
+"""
+Batched seller payout engine.
+
+Collects FUNDS_RELEASE_PENDING transactions, pays sellers through Paystack
+bulk transfers (up to 100 per request) and settles transactions in bulk once
+transfer webhooks confirm the money arrived.
+
+Lifecycle of a payout:
+    FUNDS_RELEASE_PENDING --(bulk transfer accepted)--> FUNDS_RELEASED
+    FUNDS_RELEASED --(transfer.success webhook, next run)--> COMPLETED
+
+Transfers are marked SENDING (with claimed_at) and committed before Paystack
+is called. Other runs skip them until PAYOUT_SEND_LEASE_SECONDS have passed,
+so two schedulers never send the same transfer. When the outcome of a send is
+unknown the transfer keeps its reference, so a resend is deduped by Paystack;
+only transfers Paystack reports as failed get a fresh reference.
+
+Run it periodically (see scripts/run_payout_scheduler.py) or trigger a single
+run from the admin API.
+"""
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, func, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.metrics import PAYOUT_BULK_REQUEST_LATENCY, PAYOUT_RUN_DURATION, PAYOUT_TRANSFERS
+from app.core.state_machine import transition_many
+from app.models.payout import PayoutTransfer, PayoutTransferStatus, SellerPayoutAccount
+from app.models.transaction import Transaction, TransactionState
+from app.payment.services.payout import PayoutService
+from app.payment.services.paystack import PaystackService
+
+logger = logging.getLogger(__name__)
+
+# Transfer statuses that may be (re)sent on the next run
+RESENDABLE_STATUSES = (
+    PayoutTransferStatus.QUEUED,  # Never sent, or outcome unknown: resent with the same reference
+    PayoutTransferStatus.FAILED,
+    PayoutTransferStatus.REVERSED,
+)
+
+# Statuses Paystack reports for transfers that will not pay out
+_FAILED_TRANSFER_STATUSES = ("failed", "reversed", "abandoned", "rejected")
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class PayoutEngine:
+    """Scheduler-driven payout processing with cumulative accounting"""
+
+    def __init__(
+        self,
+        paystack_service: Optional[PaystackService] = None,
+        batch_size: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        send_lease_seconds: Optional[float] = None,
+    ):
+        self._paystack = paystack_service
+        self.batch_size = batch_size or settings.PAYOUT_BATCH_SIZE
+        self.chunk_size = min(chunk_size or settings.PAYOUT_BULK_CHUNK_SIZE, 100)
+        self.max_attempts = max_attempts or settings.PAYOUT_MAX_ATTEMPTS
+        self.send_lease_seconds = send_lease_seconds or settings.PAYOUT_SEND_LEASE_SECONDS
+        self._lock = threading.Lock()
+        self._totals = {
+            "runs": 0,
+            "queued": 0,
+            "failed": 0,
+            "missing_recipient": 0,
+            "missing_amount": 0,
+            "recipients_created": 0,
+            "completed": 0,
+            "bulk_requests": 0,
+        }
+        self._last_run: Optional[Dict[str, Any]] = None
+
+    @property
+    def paystack(self) -> PaystackService:
+        if self._paystack is None:
+            self._paystack = PaystackService()
+        return self._paystack
+
+    def run_once(self, db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Run one payout cycle: settle confirmed transfers, then send new ones.
+
+        Returns:
+            Per-run statistics (counts, duration, throughput)
+        """
+        started = time.perf_counter()
+        now = now or datetime.now(timezone.utc)
+        run = {
+            "selected": 0,
+            "queued": 0,
+            "failed": 0,
+            "missing_recipient": 0,
+            "missing_amount": 0,
+            "recipients_created": 0,
+            "recipients_cached": 0,
+            "bulk_requests": 0,
+            "completed": 0,
+        }
+
+        run["completed"] = self.settle_completed(db)
+
+        claimed = self._claim_transactions(db, now)
+        run["selected"] = len(claimed)
+        if claimed:
+            self._send_payouts(db, claimed, now, run)
+
+        duration = time.perf_counter() - started
+        run["duration_seconds"] = round(duration, 4)
+        run["transfers_per_second"] = round(run["queued"] / duration, 2) if duration > 0 else 0.0
+        run["finished_at"] = datetime.utcnow().isoformat()
+
+        PAYOUT_RUN_DURATION.observe(duration)
+        for key in ("queued", "failed", "missing_recipient", "missing_amount", "completed"):
+            if run[key]:
+                PAYOUT_TRANSFERS.labels(result=key).inc(run[key])
+
+        with self._lock:
+            self._totals["runs"] += 1
+            for key in ("queued", "failed", "missing_recipient", "missing_amount", "recipients_created", "completed"):
+                self._totals[key] += run[key]
+            self._totals["bulk_requests"] += run["bulk_requests"]
+            self._last_run = run
+
+        logger.info("Payout run finished: %s", run)
+        return run
+
+    def _retryable(self, now: datetime):
+        """Transfers a run may send again: resendable statuses and SENDING rows whose lease expired"""
+        lease_expired = and_(
+            PayoutTransfer.status == PayoutTransferStatus.SENDING,
+            PayoutTransfer.claimed_at < now - timedelta(seconds=self.send_lease_seconds),
+        )
+        return or_(PayoutTransfer.status.in_(RESENDABLE_STATUSES), lease_expired)
+
+    def _claim_transactions(self, db: Session, now: datetime) -> List[Transaction]:
+        """
+        Select transactions that need a transfer sent.
+        SKIP LOCKED keeps concurrent schedulers apart while claiming; the SENDING
+        lease written by _send_payouts keeps them apart while Paystack is called.
+        """
+        resendable = and_(self._retryable(now), PayoutTransfer.attempts < self.max_attempts)
+        return (
+            db.query(Transaction)
+            .outerjoin(PayoutTransfer, PayoutTransfer.transaction_id == Transaction.id)
+            .filter(
+                or_(
+                    and_(
+                        Transaction.state == TransactionState.FUNDS_RELEASE_PENDING,
+                        or_(PayoutTransfer.id.is_(None), resendable),
+                    ),
+                    # Released but the transfer failed or was reversed: retry it
+                    and_(Transaction.state == TransactionState.FUNDS_RELEASED, resendable),
+                )
+            )
+            .order_by(Transaction.funds_release_pending_at, Transaction.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True, of=Transaction)
+            .all()
+        )
+
+    def _resolve_recipients(self, db: Session, seller_ids: List[int], run: Dict[str, Any]) -> Dict[int, str]:
+        """Return {seller_id: recipient_code}, creating Paystack recipients once per seller"""
+        accounts = (
+            db.query(SellerPayoutAccount)
+            .options(joinedload(SellerPayoutAccount.seller))
+            .filter(SellerPayoutAccount.seller_id.in_(seller_ids))
+            .all()
+        )
+        recipients: Dict[int, str] = {}
+        for account in accounts:
+            if account.paystack_recipient_code:
+                recipients[account.seller_id] = account.paystack_recipient_code
+                run["recipients_cached"] += 1
+                continue
+            try:
+                response = self.paystack.create_transfer_recipient(
+                    type=account.recipient_type,
+                    name=account.account_name,
+                    account_number=account.account_number,
+                    bank_code=account.bank_code,
+                    email=account.seller.email,
+                )
+            except ValueError as e:
+                logger.warning("Could not create transfer recipient for seller %s: %s", account.seller_id, e)
+                continue
+            code = (response.get("data") or {}).get("recipient_code")
+            if not code:
+                continue
+            account.paystack_recipient_code = code
+            account.recipient_created_at = datetime.utcnow()
+            recipients[account.seller_id] = code
+            run["recipients_created"] += 1
+        return recipients
+
+    def _send_payouts(self, db: Session, transactions: List[Transaction], now: datetime, run: Dict[str, Any]) -> None:
+        seller_ids = sorted({t.seller_id for t in transactions})
+        recipients = self._resolve_recipients(db, seller_ids, run)
+
+        existing = {
+            transfer.transaction_id: transfer
+            for transfer in db.query(PayoutTransfer).filter(
+                PayoutTransfer.transaction_id.in_([t.id for t in transactions])
+            )
+        }
+
+        # 1. Write (or re-arm) one transfer row per transaction and take the send lease
+        transfers: List[PayoutTransfer] = []
+        for transaction in transactions:
+            if transaction.amount is None:
+                # amount_usd is USD cents; never send it as KES
+                logger.warning("Transaction %s has no KES amount; payout skipped", transaction.id)
+                run["missing_amount"] += 1
+                continue
+            recipient_code = recipients.get(transaction.seller_id)
+            if not recipient_code:
+                run["missing_recipient"] += 1
+                continue
+
+            # One stored rate for the recorded USD commission and the KES transfer
+            PayoutService.record_commission(transaction)
+            _, payout_amount = PayoutService.calculate_commission(transaction.amount, transaction.commission_percent)
+
+            transfer = existing.get(transaction.id)
+            if transfer is None:
+                transfer = PayoutTransfer(
+                    transaction_id=transaction.id,
+                    seller_id=transaction.seller_id,
+                    reference=f"PAYOUT_{transaction.id}",
+                    attempts=0,
+                )
+                db.add(transfer)
+            elif transfer.status in (PayoutTransferStatus.FAILED, PayoutTransferStatus.REVERSED):
+                # A failed reference is burnt at Paystack; retries need a fresh one
+                transfer.reference = f"PAYOUT_{transaction.id}_R{transfer.attempts}"
+                transfer.transfer_code = None
+            transfer.recipient_code = recipient_code
+            transfer.amount = payout_amount
+            transfer.currency = "KES"
+            transfer.status = PayoutTransferStatus.SENDING
+            transfer.claimed_at = now
+            transfer.failure_reason = None
+            transfer.attempts += 1
+            transfers.append(transfer)
+
+        db.flush()
+        # Plain snapshots: the commit below expires the ORM objects
+        sends = [
+            {
+                "id": transfer.id,
+                "transaction_id": transfer.transaction_id,
+                "reference": transfer.reference,
+                "recipient": transfer.recipient_code,
+                "amount": transfer.amount,
+                "transfer_code": transfer.transfer_code,
+            }
+            for transfer in transfers
+        ]
+        release_pending = {t.id for t in transactions if t.state == TransactionState.FUNDS_RELEASE_PENDING}
+        db.commit()  # Durable intent; the SENDING lease keeps other runs off these transfers
+
+        # 2. Send in bulk chunks and record the outcome per transfer
+        transfer_updates: List[Dict[str, Any]] = []
+        released_ids: List[int] = []
+
+        def outcome(transfer, batch_id, status, transfer_code=None, failure_reason=None):
+            transfer_updates.append({
+                "_id": transfer["id"],
+                "batch_id": batch_id,
+                "status": status,
+                "transfer_code": transfer_code or transfer["transfer_code"],
+                "failure_reason": failure_reason,
+            })
+            if status == PayoutTransferStatus.PENDING:
+                released_ids.append(transfer["transaction_id"])
+                run["queued"] += 1
+            else:
+                run["failed"] += 1
+
+        for chunk in _chunks(sends, self.chunk_size):
+            batch_id = uuid.uuid4().hex
+            items = [
+                {
+                    "amount": transfer["amount"],
+                    "recipient": transfer["recipient"],
+                    "reference": transfer["reference"],
+                    "reason": f"Escrow payout for transaction {transfer['transaction_id']}",
+                }
+                for transfer in chunk
+            ]
+            run["bulk_requests"] += 1
+            started = time.perf_counter()
+            try:
+                response = self.paystack.initiate_bulk_transfer(items)
+                accepted = {item.get("reference"): item for item in (response.get("data") or [])}
+                error = None if response.get("status") else response.get("message", "Bulk transfer rejected")
+            except ValueError as e:
+                # Outcome unknown: QUEUED keeps the references, so the next run
+                # resends them and Paystack dedupes anything it already accepted
+                for transfer in chunk:
+                    outcome(transfer, batch_id, PayoutTransferStatus.QUEUED, failure_reason=str(e))
+                continue
+            finally:
+                PAYOUT_BULK_REQUEST_LATENCY.observe(time.perf_counter() - started)
+
+            for transfer in chunk:
+                item = accepted.get(transfer["reference"])
+                if error is not None:
+                    outcome(transfer, batch_id, PayoutTransferStatus.FAILED, failure_reason=error)
+                elif item is not None:
+                    outcome(transfer, batch_id, PayoutTransferStatus.PENDING, transfer_code=item.get("transfer_code"))
+                else:
+                    outcome(transfer, batch_id, *self._lookup_transfer(transfer["reference"]))
+
+        # 3. Record outcomes and release transactions. Only rows still under this
+        # run's lease are updated, so a transfer webhook that arrived meanwhile wins.
+        if transfer_updates:
+            table = PayoutTransfer.__table__
+            db.execute(
+                table.update()
+                .where(
+                    table.c.id == bindparam("_id"),
+                    table.c.status == PayoutTransferStatus.SENDING,
+                    table.c.claimed_at == now,
+                )
+                .values(
+                    batch_id=bindparam("batch_id"),
+                    status=bindparam("status"),
+                    transfer_code=bindparam("transfer_code"),
+                    failure_reason=bindparam("failure_reason"),
+                    claimed_at=None,
+                ),
+                transfer_updates,
+            )
+        references = {transfer["transaction_id"]: transfer["reference"] for transfer in sends}
+        if released_ids:
+            db.bulk_update_mappings(Transaction, [
+                {"id": transaction_id, "payout_reference": references[transaction_id]}
+                for transaction_id in released_ids
+            ])
+            # Resent transfers are already FUNDS_RELEASED; the guard leaves them alone
+            transition_many(
+                db,
+                [i for i in released_ids if i in release_pending],
+                TransactionState.FUNDS_RELEASE_PENDING,
+                TransactionState.FUNDS_RELEASED,
+                reason="Payout transfer queued",
+            )
+        db.commit()
+
+    def _lookup_transfer(self, reference: str) -> Tuple[PayoutTransferStatus, Optional[str], Optional[str]]:
+        """
+        Resolve a transfer missing from a bulk response by looking up its reference.
+
+        Returns:
+            (status, transfer_code, failure_reason); QUEUED when Paystack has no
+            answer, so the next run resends the same reference
+        """
+        try:
+            data = self.paystack.verify_transfer_by_reference(reference).get("data") or {}
+        except ValueError as e:
+            logger.warning("Lookup of transfer %s failed: %s", reference, e)
+            data = {}
+        paystack_status = data.get("status")
+        if not paystack_status:
+            return PayoutTransferStatus.QUEUED, None, "Transfer missing from bulk response; outcome unknown"
+        if paystack_status in _FAILED_TRANSFER_STATUSES:
+            return PayoutTransferStatus.FAILED, data.get("transfer_code"), data.get("reason") or f"Transfer {paystack_status}"
+        return PayoutTransferStatus.PENDING, data.get("transfer_code"), None
+
+    def settle_completed(self, db: Session) -> int:
+        """
+        Complete every FUNDS_RELEASED transaction whose transfer succeeded.
+        One UPDATE for transactions; the state machine hook marks their listings SOLD.
+        """
+        rows = (
+            db.query(Transaction.id)
+            .join(PayoutTransfer, PayoutTransfer.transaction_id == Transaction.id)
+            .filter(
+                Transaction.state == TransactionState.FUNDS_RELEASED,
+                PayoutTransfer.status == PayoutTransferStatus.SUCCESS,
+            )
+            .all()
+        )
+        if not rows:
+            return 0
+
+        completed = transition_many(
+            db,
+            [row.id for row in rows],
+            TransactionState.FUNDS_RELEASED,
+            TransactionState.COMPLETED,
+            reason="Payout transfer succeeded",
+        )
+        db.commit()
+        return len(completed)
+
+    def stats(self, db: Optional[Session] = None) -> Dict[str, Any]:
+        """Cumulative accounting plus (optionally) current transfer counts by status"""
+        with self._lock:
+            result: Dict[str, Any] = {"totals": dict(self._totals), "last_run": self._last_run}
+        if db is not None:
+            counts = (
+                db.query(PayoutTransfer.status, func.count(PayoutTransfer.id))
+                .group_by(PayoutTransfer.status)
+                .all()
+            )
+            result["transfers_by_status"] = {
+                (status.value if hasattr(status, "value") else status): count for status, count in counts
+            }
+            result["exhausted"] = (
+                db.query(func.count(PayoutTransfer.id))
+                .filter(
+                    self._retryable(datetime.now(timezone.utc)),
+                    PayoutTransfer.attempts >= self.max_attempts,
+                )
+                .scalar()
+            )
+        return result
+
+
+def apply_transfer_event(db: Session, event_type: str, data: Dict[str, Any]) -> Optional[PayoutTransfer]:
+    """
+    Record a transfer.success / transfer.failed / transfer.reversed webhook.
+    Settlement of the transaction happens in bulk on the next scheduler run.
+
+    Returns:
+        The matching PayoutTransfer, or None if the transfer is not ours
+    """
+    reference = data.get("reference")
+    transfer_code = data.get("transfer_code")
+    query = db.query(PayoutTransfer)
+    if reference:
+        transfer = query.filter(PayoutTransfer.reference == reference).first()
+    elif transfer_code:
+        transfer = query.filter(PayoutTransfer.transfer_code == transfer_code).first()
+    else:
+        return None
+    if transfer is None:
+        return None
+
+    status_map = {
+        "transfer.success": PayoutTransferStatus.SUCCESS,
+        "transfer.failed": PayoutTransferStatus.FAILED,
+        "transfer.reversed": PayoutTransferStatus.REVERSED,
+    }
+    new_status = status_map.get(event_type)
+    if new_status is None:
+        return transfer
+    reversed_after_success = (
+        transfer.status == PayoutTransferStatus.SUCCESS and new_status == PayoutTransferStatus.REVERSED
+    )
+    if transfer.status == PayoutTransferStatus.SUCCESS and not reversed_after_success:
+        return transfer  # Already settled (duplicate delivery)
+    if transfer.status == PayoutTransferStatus.REVERSED:
+        return transfer  # Final for this reference; a resend gets a new one
+
+    transfer.status = new_status
+    if transfer_code and not transfer.transfer_code:
+        transfer.transfer_code = transfer_code
+    if new_status == PayoutTransferStatus.SUCCESS:
+        transfer.completed_at = datetime.utcnow()
+    else:
+        transfer.failure_reason = data.get("reason") or data.get("gateway_response") or event_type
+    db.commit()
+
+    if reversed_after_success:
+        # The seller was not paid. A FUNDS_RELEASED transaction is resent on the
+        # next run; a COMPLETED one needs ops (reconciliation reports it too).
+        PAYOUT_TRANSFERS.labels(result="reversed_after_success").inc()
+        logger.error(
+            "Payout transfer %s for transaction %s (%s) was reversed after success: %s",
+            transfer.reference, transfer.transaction_id, transfer.transaction.state.value, transfer.failure_reason,
+        )
+    return transfer
+
+
+payout_engine = PayoutEngine()
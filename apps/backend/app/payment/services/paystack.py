@@ -1,12 +1,31 @@
 """
 Paystack payment integration for escrow payments.
 """
+import copy
 import hmac
 import hashlib
 import json
 import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from app.core.cache import CoalescingCache
 from app.core.config import settings
+from app.payment.services.http_client import get_http_client
+
+# Paystack transaction statuses that will not change any more
+TERMINAL_TRANSACTION_STATUSES = frozenset({"success", "failed", "reversed"})
+
+
+def _is_terminal_verification(result: Dict[str, Any]) -> bool:
+    return (result.get("data") or {}).get("status") in TERMINAL_TRANSACTION_STATUSES
+
+
+# Shared per worker: concurrent verifications of one reference make a single
+# upstream call, and terminal answers are reused for a short TTL.
+verification_cache = CoalescingCache(
+    "paystack_verify",
+    ttl_seconds=settings.PAYSTACK_VERIFY_CACHE_TTL_SECONDS,
+    should_cache=_is_terminal_verification,
+)
 
 
 class PaystackService:
@@ -19,10 +38,12 @@ class PaystackService:
         if not settings.PAYSTACK_SECRET_KEY:
             raise ValueError("PAYSTACK_SECRET_KEY not configured")
         self.secret_key = settings.PAYSTACK_SECRET_KEY
+        self.BASE_URL = settings.PAYSTACK_BASE_URL.rstrip("/") or self.BASE_URL
         self.headers = {
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json"
         }
+        self.client = get_http_client()
     
     def initialize_payment(
         self,
@@ -72,7 +93,7 @@ class PaystackService:
             if callback_url:
                 payload["callback_url"] = callback_url
             
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.client.post(url, "/transaction/initialize", json=payload, headers=self.headers)
             
             # Check for errors in response
             if not response.ok:
@@ -126,15 +147,25 @@ class PaystackService:
             
         Returns:
             Transaction verification response
+            
+        Note:
+            Concurrent calls for the same reference are coalesced into one
+            request, and terminal results (success/failed/reversed) are cached
+            for PAYSTACK_VERIFY_CACHE_TTL_SECONDS. Pending results are never cached.
         """
         try:
-            url = f"{self.BASE_URL}/transaction/verify/{reference}"
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.json()
+            result = verification_cache.get_or_load(reference, lambda: self._fetch_verification(reference))
+            return copy.deepcopy(result)
         except Exception as e:
             raise ValueError(f"Failed to verify transaction: {str(e)}")
     
+    def _fetch_verification(self, reference: str) -> Dict[str, Any]:
+        """Call Paystack's verify endpoint (uncached)"""
+        url = f"{self.BASE_URL}/transaction/verify/{reference}"
+        response = self.client.get(url, "/transaction/verify", headers=self.headers)
+        response.raise_for_status()
+        return response.json()
+    
     def charge_authorization(
         self,
         authorization_code: str,
@@ -163,7 +194,7 @@ class PaystackService:
                 "amount": amount,
                 "reference": reference
             }
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.client.post(url, "/transaction/charge_authorization", json=payload, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -250,7 +281,7 @@ class PaystackService:
                 "bank_code": bank_code,
                 "email": email
             }
-            response = requests.post(url, json=payload, headers=self.headers)
+            response = self.client.post(url, "/transferrecipient", json=payload, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -286,12 +317,45 @@ class PaystackService:
                 "reference": reference,
                 "reason": reason or "Escrow payout"
             }
-            response = requests.post(url, json=payload, headers=self.headers)
+            # Paystack dedupes transfers by reference, so retrying is safe
+            response = self.client.post(url, "/transfer", json=payload, headers=self.headers, idempotent=True)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             raise ValueError(f"Failed to initiate transfer: {str(e)}")
     
+    def initiate_bulk_transfer(
+        self,
+        transfers: List[Dict[str, Any]],
+        source: str = "balance",
+        currency: str = "KES"
+    ) -> Dict[str, Any]:
+        """
+        Initiate several transfers in one request (payout batching).
+        
+        Args:
+            transfers: Up to 100 items of {amount, recipient, reference, reason}
+            source: Transfer source (usually "balance")
+            currency: Transfer currency code
+            
+        Returns:
+            Bulk transfer response; data lists each queued transfer with its
+            reference, transfer_code and status
+        """
+        try:
+            url = f"{self.BASE_URL}/transfer/bulk"
+            payload = {
+                "currency": currency,
+                "source": source,
+                "transfers": transfers
+            }
+            # Every item carries its own reference, so Paystack dedupes retries
+            response = self.client.post(url, "/transfer/bulk", json=payload, headers=self.headers, idempotent=True)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise ValueError(f"Failed to initiate bulk transfer: {str(e)}")
+    
     def verify_transfer(self, transfer_code: str) -> Dict[str, Any]:
         """
         Verify transfer status.
@@ -304,7 +368,25 @@ class PaystackService:
         """
         try:
             url = f"{self.BASE_URL}/transfer/{transfer_code}"
-            response = requests.get(url, headers=self.headers)
+            response = self.client.get(url, "/transfer/verify", headers=self.headers)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise ValueError(f"Failed to verify transfer: {str(e)}")
+
+    def verify_transfer_by_reference(self, reference: str) -> Dict[str, Any]:
+        """
+        Look up a transfer by the reference we sent with it.
+        
+        Args:
+            reference: Transfer reference (idempotency key)
+            
+        Returns:
+            Transfer verification response (data.status is pending, success, failed, ...)
+        """
+        try:
+            url = f"{self.BASE_URL}/transfer/verify/{reference}"
+            response = self.client.get(url, "/transfer/verify", headers=self.headers)
             response.raise_for_status()
             return response.json()
         except Exception as e:
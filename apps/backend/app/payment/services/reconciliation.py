@@ -0,0 +1,315 @@
+"""
+Reconciliation between transactions, payment_events and Paystack.
+
+Finds transactions whose state disagrees with the webhook trail or with
+Paystack itself:
+
+- payment stuck in PURCHASE_INITIATED / PAYMENT_PENDING with no charge.success
+- FUNDS_HELD without a charge.success event (verified against Paystack)
+- FUNDS_RELEASED / COMPLETED with no successful payout transfer (a transfer
+  still in flight at Paystack is not a discrepancy)
+- Paystack amount different from the KES amount charged (payment_amount, else amount)
+
+Transactions are streamed in keyset-paginated chunks and joined against
+payment_events / payout_transfers in one aggregate query per chunk, so memory
+stays flat regardless of table size. Only rows the database cannot resolve
+are verified against Paystack, with bounded concurrency.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import RECONCILIATION_DISCREPANCIES
+from app.core.state_machine import transition_many
+from app.models.payment_event import PaymentEvent, PaymentEventType
+from app.models.payout import PayoutTransfer, PayoutTransferStatus
+from app.models.transaction import Transaction, TransactionState
+from app.payment.services.paystack import PaystackService
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATES = (TransactionState.PURCHASE_INITIATED, TransactionState.PAYMENT_PENDING)
+PAYOUT_STATES = (TransactionState.FUNDS_RELEASED, TransactionState.COMPLETED)
+CHECKED_STATES = PAYMENT_STATES + (TransactionState.FUNDS_HELD,) + PAYOUT_STATES
+
+# Discrepancy kinds
+MISSING_CHARGE_WEBHOOK = "missing_charge_webhook"  # Paid at Paystack, webhook never processed
+PAYMENT_ABANDONED = "payment_abandoned"  # Never paid; stale checkout
+FUNDS_HELD_UNPAID = "funds_held_unpaid"  # FUNDS_HELD but Paystack has no successful charge
+FUNDS_HELD_NO_EVENT = "funds_held_no_event"  # FUNDS_HELD, paid, but no charge.success event stored
+AMOUNT_MISMATCH = "amount_mismatch"
+COMPLETED_WITHOUT_TRANSFER = "completed_without_transfer"
+
+# Transfers sent (or being sent) whose webhook has not arrived yet
+IN_FLIGHT_TRANSFER_STATUSES = (
+    PayoutTransferStatus.QUEUED,
+    PayoutTransferStatus.SENDING,
+    PayoutTransferStatus.PENDING,
+)
+VERIFY_FAILED = "verify_failed"  # Paystack lookup failed; retry next run
+
+
+class ReconciliationReport:
+    """Running totals plus a capped sample of discrepancies"""
+
+    def __init__(self, sample_limit: int = 500, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.sample_limit = sample_limit
+        self.sink = sink
+        self.scanned = 0
+        self.chunks = 0
+        self.verified = 0
+        self.healed = 0
+        self.counts: Dict[str, int] = {}
+        self.samples: List[Dict[str, Any]] = []
+        self.started_at = datetime.utcnow().isoformat()
+        self._started = time.perf_counter()
+        self.duration_seconds = 0.0
+
+    def add(self, transaction_id: int, kind: str, state: str, reference: Optional[str], detail: str, healed: bool = False) -> None:
+        item = {
+            "transaction_id": transaction_id,
+            "kind": kind,
+            "state": state,
+            "reference": reference,
+            "detail": detail,
+            "healed": healed,
+        }
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+        if healed:
+            self.healed += 1
+        if len(self.samples) < self.sample_limit:
+            self.samples.append(item)
+        if self.sink:
+            self.sink(item)
+        RECONCILIATION_DISCREPANCIES.labels(kind=kind).inc()
+
+    def finish(self) -> None:
+        self.duration_seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "scanned": self.scanned,
+            "chunks": self.chunks,
+            "verified_with_paystack": self.verified,
+            "healed": self.healed,
+            "discrepancies": sum(self.counts.values()),
+            "by_kind": dict(self.counts),
+            "rows_per_second": round(self.scanned / self.duration_seconds, 1) if self.duration_seconds else 0.0,
+            "samples": self.samples,
+        }
+
+
+class Reconciler:
+    """Streams transactions and classifies each against events and Paystack"""
+
+    def __init__(
+        self,
+        paystack_service: Optional[PaystackService] = None,
+        chunk_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        grace_minutes: Optional[int] = None,
+        auto_heal: bool = False,
+    ):
+        self._paystack = paystack_service
+        self.chunk_size = chunk_size or settings.RECONCILIATION_CHUNK_SIZE
+        self.concurrency = concurrency or settings.RECONCILIATION_CONCURRENCY
+        self.grace = timedelta(minutes=settings.RECONCILIATION_GRACE_MINUTES if grace_minutes is None else grace_minutes)
+        self.auto_heal = auto_heal
+
+    @property
+    def paystack(self) -> PaystackService:
+        if self._paystack is None:
+            self._paystack = PaystackService()
+        return self._paystack
+
+    def iter_chunks(self, db: Session, cutoff: datetime) -> Iterator[List[Any]]:
+        """
+        Yield lightweight rows chunk by chunk (keyset pagination on id).
+        Each row carries per-transaction flags aggregated from payment_events;
+        rows are plain tuples, so nothing accumulates in the session.
+        """
+        has_charge = func.max(case((PaymentEvent.event_type == PaymentEventType.CHARGE_SUCCESS, 1), else_=0))
+        has_transfer = func.max(case((PaymentEvent.event_type == PaymentEventType.TRANSFER_SUCCESS, 1), else_=0))
+        # Payout rows age from their release, everything else from creation
+        released_at = func.coalesce(Transaction.funds_released_at, Transaction.completed_at, Transaction.created_at)
+        old_enough = or_(
+            and_(Transaction.state.in_(PAYOUT_STATES), released_at < cutoff),
+            and_(Transaction.state.notin_(PAYOUT_STATES), Transaction.created_at < cutoff),
+        )
+        last_id = 0
+        while True:
+            rows = (
+                db.query(
+                    Transaction.id,
+                    Transaction.state,
+                    Transaction.listing_id,
+                    Transaction.paystack_reference,
+                    Transaction.payment_amount,
+                    Transaction.amount,
+                    has_charge.label("has_charge"),
+                    has_transfer.label("has_transfer"),
+                    PayoutTransfer.status.label("transfer_status"),
+                )
+                .outerjoin(PaymentEvent, PaymentEvent.transaction_id == Transaction.id)
+                .outerjoin(PayoutTransfer, PayoutTransfer.transaction_id == Transaction.id)
+                .filter(
+                    Transaction.id > last_id,
+                    Transaction.state.in_(CHECKED_STATES),
+                    old_enough,
+                )
+                .group_by(
+                    Transaction.id,
+                    Transaction.state,
+                    Transaction.listing_id,
+                    Transaction.paystack_reference,
+                    Transaction.payment_amount,
+                    Transaction.amount,
+                    PayoutTransfer.status,
+                )
+                .order_by(Transaction.id)
+                .limit(self.chunk_size)
+                .all()
+            )
+            if not rows:
+                return
+            yield rows
+            last_id = rows[-1].id
+
+    def run(self, db: Session, report: Optional[ReconciliationReport] = None) -> ReconciliationReport:
+        report = report or ReconciliationReport()
+        cutoff = datetime.now(timezone.utc) - self.grace
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="reconcile") as pool:
+            for rows in self.iter_chunks(db, cutoff):
+                report.chunks += 1
+                report.scanned += len(rows)
+                self._process_chunk(db, rows, pool, report)
+        report.finish()
+        logger.info("Reconciliation finished: %s", {k: v for k, v in report.to_dict().items() if k != "samples"})
+        return report
+
+    def _process_chunk(self, db: Session, rows: List[Any], pool: ThreadPoolExecutor, report: ReconciliationReport) -> None:
+        to_verify = []
+        for row in rows:
+            if row.state in PAYOUT_STATES:
+                in_flight = (
+                    row.state == TransactionState.FUNDS_RELEASED
+                    and row.transfer_status in IN_FLIGHT_TRANSFER_STATUSES
+                )
+                # A reversal after transfer.success leaves the success event behind
+                reversed_transfer = row.transfer_status == PayoutTransferStatus.REVERSED
+                paid_out = row.transfer_status == PayoutTransferStatus.SUCCESS or (row.has_transfer and not reversed_transfer)
+                if not paid_out and not in_flight:
+                    report.add(
+                        row.id, COMPLETED_WITHOUT_TRANSFER, row.state.value, row.paystack_reference,
+                        f"No successful payout transfer (transfer status: "
+                        f"{row.transfer_status.value if row.transfer_status else 'none'})",
+                    )
+            elif row.paystack_reference and (row.state in PAYMENT_STATES or not row.has_charge):
+                to_verify.append(row)
+
+        if not to_verify:
+            return
+
+        results = pool.map(self._verify, [row.paystack_reference for row in to_verify])
+        for row, (data, error) in zip(to_verify, results):
+            report.verified += 1
+            if error:
+                report.add(row.id, VERIFY_FAILED, row.state.value, row.paystack_reference, error)
+                continue
+            self._classify(db, row, data, report)
+
+    def _verify(self, reference: str):
+        """Return (data, error) so one failed lookup never aborts the chunk"""
+        try:
+            response = self.paystack.verify_transaction(reference)
+            return response.get("data") or {}, None
+        except ValueError as e:
+            return None, str(e)
+
+    def _classify(self, db: Session, row: Any, data: Dict[str, Any], report: ReconciliationReport) -> None:
+        paid = data.get("status") == "success"
+        # What Paystack was asked to charge, in KES cents (same order as step 2)
+        expected_amount = row.payment_amount if row.payment_amount is not None else row.amount
+        state = row.state.value
+
+        if paid and (expected_amount is None or data.get("amount") != expected_amount):
+            # Never auto-heal a payment that does not match what the buyer owes
+            report.add(
+                row.id, AMOUNT_MISMATCH, state, row.paystack_reference,
+                f"Paystack amount {data.get('amount')} != expected {expected_amount}",
+            )
+            return
+
+        if row.state in PAYMENT_STATES:
+            if paid:
+                healed = self.auto_heal and self._heal_funds_held(db, row, data)
+                report.add(
+                    row.id, MISSING_CHARGE_WEBHOOK, state, row.paystack_reference,
+                    "Paid at Paystack but charge.success was never processed", healed=healed,
+                )
+            else:
+                report.add(
+                    row.id, PAYMENT_ABANDONED, state, row.paystack_reference,
+                    f"Paystack status: {data.get('status')}",
+                )
+        elif row.state == TransactionState.FUNDS_HELD:
+            if paid:
+                report.add(
+                    row.id, FUNDS_HELD_NO_EVENT, state, row.paystack_reference,
+                    "Paystack confirms payment but no charge.success event is stored",
+                )
+            else:
+                report.add(
+                    row.id, FUNDS_HELD_UNPAID, state, row.paystack_reference,
+                    f"Marked FUNDS_HELD but Paystack status is {data.get('status')}",
+                )
+
+    def _heal_funds_held(self, db: Session, row: Any, data: Dict[str, Any]) -> bool:
+        """
+        Move a verified, correctly paid transaction to FUNDS_HELD.
+        The transition is guarded on the current state so a late webhook cannot be overwritten.
+        """
+        authorization_code = (data.get("authorization") or {}).get("authorization_code")
+        healed = transition_many(
+            db,
+            [row.id],
+            row.state,
+            TransactionState.FUNDS_HELD,
+            reason="Reconciliation: charge.success webhook was never processed",
+            values={"paystack_authorization_code": authorization_code},
+        )
+        db.commit()
+        return bool(healed)
+
+
+def run_reconciliation(db: Session, auto_heal: bool = False, report_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Run a full reconciliation pass.
+
+    Args:
+        db: Database session
+        auto_heal: Apply safe fixes (verified payments whose webhook was lost)
+        report_path: Optional JSON-lines file receiving every discrepancy
+        **kwargs: Reconciler options (chunk_size, concurrency, grace_minutes)
+
+    Returns:
+        Report summary with a capped sample of discrepancies
+    """
+    reconciler = Reconciler(auto_heal=auto_heal, **kwargs)
+    if not report_path:
+        return reconciler.run(db).to_dict()
+
+    with open(report_path, "a", encoding="utf-8") as handle:
+        def sink(item: Dict[str, Any]) -> None:
+            handle.write(json.dumps(item) + "\n")
+
+        return reconciler.run(db, ReconciliationReport(sink=sink)).to_dict()
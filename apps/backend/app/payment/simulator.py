@@ -0,0 +1,380 @@
+"""
+Local Paystack simulator for load testing and offline development.
+
+Implements the Paystack endpoints PaystackService uses and delivers
+HMAC-SHA512 signed webhooks back to the API, with configurable latency,
+error rate and duplicate deliveries.
+
+Run it next to the API and point the backend at it:
+
+    uvicorn app.payment.simulator:app --port 8100
+    PAYSTACK_BASE_URL=http://localhost:8100 uvicorn app.main:app
+
+Simulator knobs are read from PAYSTACK_SIM_* environment variables and can
+be changed at runtime with `POST /_sim/config`.
+"""
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import random
+import secrets
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, RedirectResponse
+
+from app.core.config import settings
+
+WebhookSender = Callable[[str, bytes, Dict[str, str]], Awaitable[None]]
+
+
+class SimulatorConfig:
+    """Runtime knobs for the simulator"""
+
+    FIELDS = (
+        "latency_ms",
+        "latency_jitter_ms",
+        "error_rate",
+        "duplicate_rate",
+        "webhook_url",
+        "webhook_delay_ms",
+        "auto_charge",
+        "secret_key",
+    )
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        latency_jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        duplicate_rate: float = 0.0,
+        webhook_url: Optional[str] = None,
+        webhook_delay_ms: float = 0.0,
+        auto_charge: bool = False,
+        secret_key: Optional[str] = None,
+    ):
+        self.latency_ms = latency_ms  # Base latency added to every API call
+        self.latency_jitter_ms = latency_jitter_ms  # Uniform +/- jitter on top of latency_ms
+        self.error_rate = error_rate  # Fraction of API calls answered with HTTP 500
+        self.duplicate_rate = duplicate_rate  # Fraction of webhooks delivered twice
+        self.webhook_url = webhook_url or f"{settings.BACKEND_URL}/api/v1/webhooks/paystack"
+        self.webhook_delay_ms = webhook_delay_ms  # Delay before a webhook is delivered
+        self.auto_charge = auto_charge  # Emit charge.success right after initialize (no checkout visit)
+        self.secret_key = secret_key or settings.PAYSTACK_SECRET_KEY
+
+    @classmethod
+    def from_env(cls) -> "SimulatorConfig":
+        env = os.environ
+        return cls(
+            latency_ms=float(env.get("PAYSTACK_SIM_LATENCY_MS", 0)),
+            latency_jitter_ms=float(env.get("PAYSTACK_SIM_LATENCY_JITTER_MS", 0)),
+            error_rate=float(env.get("PAYSTACK_SIM_ERROR_RATE", 0)),
+            duplicate_rate=float(env.get("PAYSTACK_SIM_DUPLICATE_RATE", 0)),
+            webhook_url=env.get("PAYSTACK_SIM_WEBHOOK_URL"),
+            webhook_delay_ms=float(env.get("PAYSTACK_SIM_WEBHOOK_DELAY_MS", 0)),
+            auto_charge=env.get("PAYSTACK_SIM_AUTO_CHARGE", "false").lower() == "true",
+        )
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            if key in self.FIELDS:
+                setattr(self, key, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.FIELDS if key != "secret_key"}
+
+
+def sign_payload(secret_key: str, body: bytes) -> str:
+    """Compute the X-Paystack-Signature header value for a webhook body"""
+    return hmac.new(secret_key.encode("utf-8"), body, hashlib.sha512).hexdigest()
+
+
+async def _http_webhook_sender(url: str, body: bytes, headers: Dict[str, str]) -> None:
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        await client.post(url, content=body, headers=headers)
+
+
+class PaystackSimulator:
+    """In-memory Paystack state plus webhook delivery"""
+
+    def __init__(self, config: Optional[SimulatorConfig] = None, webhook_sender: Optional[WebhookSender] = None):
+        self.config = config or SimulatorConfig.from_env()
+        self.webhook_sender = webhook_sender or _http_webhook_sender
+        self.transactions: Dict[str, Dict[str, Any]] = {}
+        self.recipients: Dict[str, Dict[str, Any]] = {}
+        self.transfers: Dict[str, Dict[str, Any]] = {}
+        self.deliveries: List[Dict[str, Any]] = []
+        self.stats = {"requests": 0, "injected_errors": 0, "webhooks_sent": 0, "webhook_failures": 0, "duplicates_sent": 0}
+        self._ids = itertools.count(100000)
+        self._tasks: set = set()
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    async def simulate_latency(self) -> None:
+        delay_ms = self.config.latency_ms
+        if self.config.latency_jitter_ms:
+            delay_ms += random.uniform(-self.config.latency_jitter_ms, self.config.latency_jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+    def should_fail(self) -> bool:
+        return self.config.error_rate > 0 and random.random() < self.config.error_rate
+
+    def emit(self, event: str, data: Dict[str, Any]) -> None:
+        """Schedule a signed webhook delivery (possibly duplicated)"""
+        task = asyncio.get_running_loop().create_task(self._deliver(event, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, event: str, data: Dict[str, Any]) -> None:
+        if self.config.webhook_delay_ms:
+            await asyncio.sleep(self.config.webhook_delay_ms / 1000)
+        body = json.dumps({"event": event, "data": data}).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "X-Paystack-Signature": sign_payload(self.config.secret_key, body),
+        }
+        copies = 2 if self.config.duplicate_rate and random.random() < self.config.duplicate_rate else 1
+        for copy in range(copies):
+            try:
+                await self.webhook_sender(self.config.webhook_url, body, headers)
+                self.stats["webhooks_sent"] += 1
+                if copy:
+                    self.stats["duplicates_sent"] += 1
+            except Exception:
+                self.stats["webhook_failures"] += 1
+            self.deliveries.append({"event": event, "reference": data.get("reference"), "body": body, "headers": headers})
+
+    async def drain(self) -> None:
+        """Wait for all scheduled webhook deliveries (used by tests and load scripts)"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def charge(self, reference: str) -> Dict[str, Any]:
+        """Mark a transaction paid and emit charge.success"""
+        txn = self.transactions[reference]
+        if txn["status"] != "success":
+            txn["status"] = "success"
+            txn["gateway_response"] = "Successful"
+            txn["paid_at"] = datetime.utcnow().isoformat() + "Z"
+            txn["authorization"] = {
+                "authorization_code": f"AUTH_{secrets.token_hex(5)}",
+                "channel": "card",
+                "reusable": True,
+            }
+        self.emit("charge.success", txn)
+        return txn
+
+
+def _ok(message: str, data: Any) -> Dict[str, Any]:
+    return {"status": True, "message": message, "data": data}
+
+
+def _error(status_code: int, message: str) -> JSONResponse:
+    return JSONResponse(status_code=status_code, content={"status": False, "message": message})
+
+
+def create_simulator_app(
+    config: Optional[SimulatorConfig] = None,
+    webhook_sender: Optional[WebhookSender] = None,
+) -> FastAPI:
+    """Build the simulator ASGI app"""
+    sim = PaystackSimulator(config=config, webhook_sender=webhook_sender)
+    sim_app = FastAPI(title="Paystack Simulator", docs_url=None, redoc_url=None)
+    sim_app.state.simulator = sim
+
+    @sim_app.middleware("http")
+    async def latency_and_errors(request: Request, call_next):
+        path = request.url.path
+        if path.startswith("/_sim") or path.startswith("/checkout"):
+            return await call_next(request)
+        sim.stats["requests"] += 1
+        await sim.simulate_latency()
+        if sim.should_fail():
+            sim.stats["injected_errors"] += 1
+            return _error(500, "Simulated upstream error")
+        return await call_next(request)
+
+    @sim_app.post("/transaction/initialize")
+    async def initialize(request: Request):
+        payload = await request.json()
+        reference = payload.get("reference") or secrets.token_hex(10)
+        if not payload.get("email"):
+            return _error(400, "Invalid email address")
+        if reference in sim.transactions:
+            return _error(400, "Duplicate Transaction Reference")
+        access_code = secrets.token_hex(8)
+        sim.transactions[reference] = {
+            "id": sim.next_id(),
+            "reference": reference,
+            "amount": payload.get("amount"),
+            "currency": payload.get("currency", "KES"),
+            "status": "abandoned",
+            "gateway_response": "The transaction was not completed",
+            "paid_at": None,
+            "metadata": payload.get("metadata") or {},
+            "customer": {"email": payload.get("email"), "customer_code": f"CUS_{secrets.token_hex(6)}"},
+            "authorization": {},
+            "callback_url": payload.get("callback_url"),
+            "access_code": access_code,
+        }
+        if sim.config.auto_charge:
+            sim.charge(reference)
+        authorization_url = f"{str(request.base_url).rstrip('/')}/checkout/{access_code}?reference={reference}"
+        return _ok("Authorization URL created", {
+            "authorization_url": authorization_url,
+            "access_code": access_code,
+            "reference": reference,
+        })
+
+    @sim_app.get("/checkout/{access_code}")
+    async def checkout(access_code: str, reference: str, outcome: str = "success"):
+        """Stand-in for the hosted checkout page: completes payment and redirects"""
+        txn = sim.transactions.get(reference)
+        if not txn or txn["access_code"] != access_code:
+            return _error(404, "Transaction not found")
+        if outcome == "success":
+            sim.charge(reference)
+        else:
+            txn["status"] = "failed"
+            txn["gateway_response"] = "Declined"
+            sim.emit("charge.failed", txn)
+        if txn.get("callback_url"):
+            return RedirectResponse(txn["callback_url"], status_code=302)
+        return _ok("Checkout completed", {"reference": reference, "status": txn["status"]})
+
+    @sim_app.get("/transaction/verify/{reference}")
+    async def verify(reference: str):
+        txn = sim.transactions.get(reference)
+        if not txn:
+            return _error(400, "Transaction reference not found")
+        return _ok("Verification successful", txn)
+
+    @sim_app.post("/transaction/charge_authorization")
+    async def charge_authorization(request: Request):
+        payload = await request.json()
+        reference = payload.get("reference") or secrets.token_hex(10)
+        txn = {
+            "id": sim.next_id(),
+            "reference": reference,
+            "amount": payload.get("amount"),
+            "status": "success",
+            "gateway_response": "Approved",
+            "paid_at": datetime.utcnow().isoformat() + "Z",
+            "customer": {"email": payload.get("email")},
+            "authorization": {"authorization_code": payload.get("authorization_code")},
+            "metadata": {},
+        }
+        sim.transactions[reference] = txn
+        sim.emit("charge.success", txn)
+        return _ok("Charge attempted", txn)
+
+    @sim_app.post("/transferrecipient")
+    async def create_recipient(request: Request):
+        payload = await request.json()
+        key = f"{payload.get('type')}:{payload.get('bank_code')}:{payload.get('account_number')}"
+        recipient = sim.recipients.get(key)
+        if recipient is None:
+            recipient = {
+                "id": sim.next_id(),
+                "recipient_code": f"RCP_{secrets.token_hex(6)}",
+                "type": payload.get("type"),
+                "name": payload.get("name"),
+                "email": payload.get("email"),
+                "details": {"account_number": payload.get("account_number"), "bank_code": payload.get("bank_code")},
+            }
+            sim.recipients[key] = recipient
+        return JSONResponse(status_code=201, content=_ok("Transfer recipient created successfully", recipient))
+
+    @sim_app.post("/transfer")
+    async def initiate_transfer(request: Request):
+        payload = await request.json()
+        reference = payload.get("reference") or secrets.token_hex(10)
+        existing = next((t for t in sim.transfers.values() if t["reference"] == reference), None)
+        if existing:
+            return _ok("Transfer has been queued", existing)
+        transfer = {
+            "id": sim.next_id(),
+            "transfer_code": f"TRF_{secrets.token_hex(6)}",
+            "reference": reference,
+            "amount": payload.get("amount"),
+            "recipient": payload.get("recipient"),
+            "reason": payload.get("reason"),
+            "source": payload.get("source", "balance"),
+            "status": "success",
+        }
+        sim.transfers[transfer["transfer_code"]] = transfer
+        sim.emit("transfer.success", transfer)
+        return _ok("Transfer has been queued", transfer)
+
+    @sim_app.post("/transfer/bulk")
+    async def bulk_transfer(request: Request):
+        payload = await request.json()
+        queued = []
+        for item in payload.get("transfers", []):
+            reference = item.get("reference") or secrets.token_hex(10)
+            transfer = next((t for t in sim.transfers.values() if t["reference"] == reference), None)
+            if transfer is None:
+                transfer = {
+                    "id": sim.next_id(),
+                    "transfer_code": f"TRF_{secrets.token_hex(6)}",
+                    "reference": reference,
+                    "amount": item.get("amount"),
+                    "recipient": item.get("recipient"),
+                    "reason": item.get("reason"),
+                    "source": payload.get("source", "balance"),
+                    "currency": payload.get("currency", "KES"),
+                    "status": "success",
+                }
+                sim.transfers[transfer["transfer_code"]] = transfer
+                sim.emit("transfer.success", transfer)
+            queued.append({
+                "reference": transfer["reference"],
+                "recipient": transfer["recipient"],
+                "amount": transfer["amount"],
+                "transfer_code": transfer["transfer_code"],
+                "currency": transfer.get("currency", "KES"),
+                "status": "pending",
+            })
+        return _ok(f"{len(queued)} transfers queued.", queued)
+
+    @sim_app.get("/transfer/verify/{reference}")
+    async def verify_transfer(reference: str):
+        transfer = next((t for t in sim.transfers.values() if t["reference"] == reference), None)
+        if not transfer:
+            return _error(404, "Transfer not found")
+        return _ok("Transfer retrieved", transfer)
+
+    @sim_app.get("/transfer/{transfer_code}")
+    async def fetch_transfer(transfer_code: str):
+        transfer = sim.transfers.get(transfer_code)
+        if not transfer:
+            return _error(404, "Transfer not found")
+        return _ok("Transfer retrieved", transfer)
+
+    @sim_app.get("/_sim/config")
+    async def get_config():
+        return {"config": sim.config.to_dict(), "stats": sim.stats}
+
+    @sim_app.post("/_sim/config")
+    async def update_config(request: Request):
+        sim.config.update(await request.json())
+        return {"config": sim.config.to_dict()}
+
+    @sim_app.post("/_sim/charge/{reference}")
+    async def force_charge(reference: str):
+        """Pay a pending transaction without going through checkout"""
+        if reference not in sim.transactions:
+            return _error(404, "Transaction not found")
+        return _ok("Charged", sim.charge(reference))
+
+    return sim_app
+
+
+app = create_simulator_app()
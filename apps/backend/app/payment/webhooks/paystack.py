@@ -5,8 +5,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
 from sqlalchemy.orm import Session
 from typing import Optional
 import json
+from datetime import datetime
 from app.core.database import get_db
 from app.payment.services.paystack import PaystackService
+from app.payment.services.payout_engine import apply_transfer_event
 from app.core.events import AuditLogger
 from app.models.audit_log import AuditAction
 from app.crud import transaction as transaction_crud
@@ -63,7 +65,13 @@ async def handle_paystack_webhook(
     
     # Find transaction by reference
     transaction = None
-    if reference:
+    payout_transfer = None
+    if event_type and event_type.startswith("transfer."):
+        # Seller payout: reference is the payout transfer reference
+        payout_transfer = apply_transfer_event(db, event_type, event_data.get("data") or {})
+        if payout_transfer:
+            transaction = payout_transfer.transaction
+    elif reference:
         transaction = db.query(transaction_crud.Transaction).filter(
             transaction_crud.Transaction.paystack_reference == reference
         ).first()
@@ -74,6 +82,7 @@ async def handle_paystack_webhook(
         "charge.failed": PaymentEventType.CHARGE_FAILED,
         "transfer.success": PaymentEventType.TRANSFER_SUCCESS,
         "transfer.failed": PaymentEventType.TRANSFER_FAILED,
+        "transfer.reversed": PaymentEventType.TRANSFER_FAILED,
         "authorization": PaymentEventType.AUTHORIZATION,
         "refund": PaymentEventType.REFUND
     }
@@ -94,6 +103,12 @@ async def handle_paystack_webhook(
         signature_verified=True
     )
     
+    if payout_transfer:
+        # Transfer status is recorded; the payout engine settles transactions in bulk
+        payment_event.processed = True
+        payment_event.processed_at = datetime.utcnow().isoformat()
+        db.commit()
+    
     # Process event based on type
     if transaction:
         if event_type == "charge.success" and transaction.state in [TransactionState.PURCHASE_INITIATED, TransactionState.PAYMENT_PENDING]:
@@ -103,12 +118,13 @@ async def handle_paystack_webhook(
                 db=db,
                 transaction=transaction,
                 new_state=TransactionState.FUNDS_HELD,
-                paystack_authorization_code=authorization_code
+                paystack_authorization_code=authorization_code,
+                reason="charge.success"
             )
             
             # Mark event as processed
             payment_event.processed = True
-            payment_event.processed_at = transaction.funds_held_at
+            payment_event.processed_at = transaction.funds_held_at.isoformat()
             db.commit()
             
             # Log event
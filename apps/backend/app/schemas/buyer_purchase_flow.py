@@ -68,7 +68,7 @@ class TransactionStepResponse(BaseModel):
     can_proceed: bool
     next_step_available: bool
     step_requirements_met: dict
-    verification_deadline: Optional[str] = None
+    verification_deadline: Optional[datetime] = None
     time_remaining_hours: Optional[float] = None
     # Payment data (for step 1)
     payment_authorization_url: Optional[str] = None
@@ -77,3 +77,22 @@ class TransactionStepResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class TransactionStepSummary(BaseModel):
+    """Compact step status of one transaction (batch status endpoint)"""
+    transaction_id: int
+    listing_id: int
+    current_step: int
+    current_state: str
+    next_step_available: bool
+    temporary_access_active: bool = False
+    ownership_agreement_signed: bool = False
+    contract_signed: bool = False
+    verification_deadline: Optional[datetime] = None
+    time_remaining_hours: Optional[float] = None
+
+
+class TransactionStatusBatchResponse(BaseModel):
+    """Step summaries in the requested order; unknown or foreign ids are listed in missing_ids"""
+    transactions: list[TransactionStepSummary]
+    missing_ids: list[int] = []
@@ -26,3 +26,13 @@ class ContractResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class ContractJobResponse(BaseModel):
+    """Schema for a background contract rendering job"""
+    job_id: Optional[str] = None  # None when the contract already existed
+    transaction_id: int
+    status: str  # queued, running, succeeded, failed
+    error: Optional[str] = None
+    render_ms: Optional[int] = None
+    contract: Optional[ContractResponse] = None
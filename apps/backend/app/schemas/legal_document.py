@@ -58,6 +58,29 @@ class LegalDocumentResponse(BaseModel):
         from_attributes = True
 
 
+class LegalDocumentSummary(BaseModel):
+    """Schema for admin list views (metadata only, no content)"""
+    id: int
+    title: str
+    slug: str
+    document_type: DocumentType
+    version: str
+    is_current: bool
+    published_at: Optional[datetime]
+    published_by_id: Optional[int]
+    created_at: datetime
+    updated_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class LegalDocumentPage(BaseModel):
+    """Keyset-paginated admin list; pass next_cursor back as `cursor`"""
+    items: List[LegalDocumentSummary]
+    next_cursor: Optional[str] = None
+
+
 class LegalDocumentPublicResponse(BaseModel):
     """Schema for public-facing legal document (HTML rendered)"""
     id: int
@@ -105,6 +128,18 @@ class UserAcknowledgmentRequest(BaseModel):
         return v.strip()
 
 
+class UserAcknowledgmentBatchRequest(BaseModel):
+    """Schema for acknowledging several legal documents with one signature"""
+    document_ids: List[int] = Field(..., min_length=1, max_length=20)
+    signed_by_name: str = Field(..., min_length=2, max_length=255, description="Full legal name as digital signature")
+    
+    @validator('signed_by_name')
+    def validate_name_not_empty(cls, v):
+        if not v or not v.strip():
+            raise ValueError("Full legal name is required for signature")
+        return v.strip()
+
+
 class UserAcknowledgmentResponse(BaseModel):
     """Schema for user acknowledgment response"""
     user_id: int
@@ -118,3 +153,45 @@ class UserAcknowledgmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class CurrentDocumentSummary(BaseModel):
+    """Current version of a document type"""
+    id: int
+    version: str
+    title: str
+
+
+class DocumentAcknowledgmentStatus(BaseModel):
+    """Acknowledgment status of one document type"""
+    document_type: DocumentType
+    has_acknowledged: bool
+    current_document: Optional[CurrentDocumentSummary] = None  # None when nothing is published for the type
+
+
+class ComplianceStatusResponse(BaseModel):
+    """Acknowledgment status of several document types for the current user"""
+    all_acknowledged: bool  # True when every published document in `documents` is acknowledged
+    pending: List[DocumentType]
+    documents: List[DocumentAcknowledgmentStatus]
+
+
+class LegalAckCampaignResponse(BaseModel):
+    """Progress of a re-acknowledgment campaign"""
+    id: int
+    document_id: int
+    status: str
+    total_users: Optional[int]
+    marked_users: int
+    notified_users: int
+    notify_failures: int
+    cursor_user_id: int
+    outstanding: Optional[int] = None  # Marked users who have not acknowledged yet
+    started_at: Optional[datetime]
+    heartbeat_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    error: Optional[str]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -37,10 +37,10 @@ class SellerTransactionStatusResponse(BaseModel):
     funds_released: bool
     can_deliver_credentials: bool
     delivery_reason: Optional[str] = None
-    payment_confirmed_at: Optional[str] = None
-    credentials_delivered_at: Optional[str] = None
-    verification_deadline: Optional[str] = None
-    funds_released_at: Optional[str] = None
+    payment_confirmed_at: Optional[datetime] = None
+    credentials_delivered_at: Optional[datetime] = None
+    verification_deadline: Optional[datetime] = None
+    funds_released_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -54,4 +54,33 @@ class SellerDashboardResponse(BaseModel):
     pending_earnings_usd: float
     active_count: int
     completed_count: int
+    counts_by_state: dict[str, int] = Field(default_factory=dict)
+    skip: int = 0
+    limit: int = 20
 
+
+class SellerTransactionStatusBatchResponse(BaseModel):
+    """Seller status of several transactions; unknown or foreign ids are listed in missing_ids"""
+    transactions: list[SellerTransactionStatusResponse]
+    missing_ids: list[int] = []
+
+
+class SellerPayoutAccountRequest(BaseModel):
+    """Seller payout destination (bank or M-Pesa)"""
+    recipient_type: str = Field("mobile_money", description="Paystack recipient type (mobile_money, nuban, basa, ...)")
+    account_name: str = Field(..., min_length=1, max_length=255)
+    account_number: str = Field(..., min_length=4, max_length=50, description="Account or phone number")
+    bank_code: str = Field(..., min_length=1, max_length=50, description="Bank code, e.g. MPESA")
+
+
+class SellerPayoutAccountResponse(BaseModel):
+    """Seller payout destination"""
+    recipient_type: str
+    account_name: str
+    account_number: str
+    bank_code: str
+    currency: str
+    recipient_registered: bool
+    
+    class Config:
+        from_attributes = True
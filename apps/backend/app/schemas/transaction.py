@@ -41,24 +41,24 @@ class TransactionResponse(BaseModel):
     paystack_authorization_code: Optional[str] = None
     paystack_customer_code: Optional[str] = None
     # Step-locked purchase flow timestamps
-    purchase_initiated_at: Optional[str] = None
-    payment_pending_at: Optional[str] = None
-    funds_held_at: Optional[str] = None
-    temporary_access_granted_at: Optional[str] = None
-    verification_window_started_at: Optional[str] = None
-    verification_deadline: Optional[str] = None
-    account_verified_at: Optional[str] = None
-    ownership_agreement_pending_at: Optional[str] = None
-    ownership_agreement_signed_at: Optional[str] = None
-    funds_release_pending_at: Optional[str] = None
-    funds_released_at: Optional[str] = None
-    completed_at: Optional[str] = None
-    refunded_at: Optional[str] = None
-    cancelled_at: Optional[str] = None
+    purchase_initiated_at: Optional[datetime] = None
+    payment_pending_at: Optional[datetime] = None
+    funds_held_at: Optional[datetime] = None
+    temporary_access_granted_at: Optional[datetime] = None
+    verification_window_started_at: Optional[datetime] = None
+    verification_deadline: Optional[datetime] = None
+    account_verified_at: Optional[datetime] = None
+    ownership_agreement_pending_at: Optional[datetime] = None
+    ownership_agreement_signed_at: Optional[datetime] = None
+    funds_release_pending_at: Optional[datetime] = None
+    funds_released_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    refunded_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
     # Legacy fields (for backward compatibility, mapped from new fields)
-    contract_signed_at: Optional[str] = Field(default=None)  # Maps to ownership_agreement_signed_at
-    credentials_released_at: Optional[str] = Field(default=None)  # Maps to temporary_access_granted_at
-    access_confirmed_at: Optional[str] = Field(default=None)  # Maps to account_verified_at
+    contract_signed_at: Optional[datetime] = Field(default=None)  # Maps to ownership_agreement_signed_at
+    credentials_released_at: Optional[datetime] = Field(default=None)  # Maps to temporary_access_granted_at
+    access_confirmed_at: Optional[datetime] = Field(default=None)  # Maps to account_verified_at
     # Payout details
     payout_reference: Optional[str] = None
     commission_usd: Optional[int] = None
@@ -33,6 +33,48 @@ class FileValidator:
         ".pdf", ".doc", ".docx"  # Documents
     }
     
+    # Leading bytes that identify each allowed type (checked against the upload,
+    # since the client-supplied Content-Type is not trusted)
+    SNIFF_BYTES = 16
+    MAGIC_NUMBERS = (
+        (b"\xff\xd8\xff", "image/jpeg"),
+        (b"\x89PNG\r\n\x1a\n", "image/png"),
+        (b"GIF87a", "image/gif"),
+        (b"GIF89a", "image/gif"),
+        (b"%PDF-", "application/pdf"),
+        (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+        (b"PK\x03\x04", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    )
+    MIME_ALIASES = {"image/jpg": "image/jpeg"}
+    
+    @staticmethod
+    def sniff_mime_type(header: bytes) -> Optional[str]:
+        """Detect the file type from its leading bytes; None if it is not an allowed type"""
+        if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+            return "image/webp"
+        for magic, mime_type in FileValidator.MAGIC_NUMBERS:
+            if header.startswith(magic):
+                return mime_type
+        return None
+    
+    @staticmethod
+    def validate_content(header: bytes, mime_type: Optional[str] = None) -> Tuple[bool, Optional[str], Optional[str]]:
+        """
+        Check that the file content is an allowed type and matches the declared MIME type.
+        
+        Returns:
+            (is_valid, error_message, detected_mime_type)
+        """
+        detected = FileValidator.sniff_mime_type(header)
+        if detected is None:
+            return False, "File content is not an allowed file type", None
+        
+        declared = FileValidator.MIME_ALIASES.get(mime_type, mime_type)
+        if declared and declared != detected:
+            return False, f"File content ({detected}) does not match declared type {mime_type}", detected
+        
+        return True, None, detected
+    
     @staticmethod
     def validate_file_name(file_name: str) -> Tuple[bool, Optional[str]]:
         """
@@ -5,75 +5,86 @@ import re
 from typing import Optional
 
 
+_HEADER = re.compile(r'^(#{1,4}) (.+)$')
+_UNORDERED_ITEM = re.compile(r'^[-*] (.*)$')
+_ORDERED_ITEM = re.compile(r'^\d+\.\s+(.*)$')
+# Every span excludes its own delimiter, so a failed match stops at the next
+# delimiter instead of backtracking to the end of the line (no quadratic blowup
+# on unbalanced markup). Nesting works across delimiter kinds, e.g. **a _b_**,
+# and strong may also contain a complete single-delimiter span, e.g. **a *b* c**
+# (each repetition starts with a different character, so it cannot backtrack).
+_INLINE = re.compile(
+    r'`(?P<code>[^`]+)`'
+    r'|\*\*(?P<strong>(?:[^*]|\*[^*]+\*)+)\*\*'
+    r'|__(?P<strong_u>(?:[^_]|_[^_]+_)+)__'
+    r'|\[(?P<link_text>[^\[\]]+)\]\((?P<link_href>[^()\[\]\s]+)\)'
+    r'|\*(?P<em>[^*]+)\*'
+    r'|(?<!\w)_(?P<em_u>[^_]+)_(?!\w)'
+)
+
+
+def _render_inline(text: str) -> str:
+    """Render inline markup in one left-to-right scan (code spans are left verbatim)"""
+    def replace(match: re.Match) -> str:
+        groups = match.groupdict()
+        if groups['code'] is not None:
+            return f"<code>{groups['code']}</code>"
+        if groups['link_text'] is not None:
+            return f'<a href="{groups["link_href"]}">{_render_inline(groups["link_text"])}</a>'
+        strong = groups['strong'] if groups['strong'] is not None else groups['strong_u']
+        if strong is not None:
+            return f"<strong>{_render_inline(strong)}</strong>"
+        em = groups['em'] if groups['em'] is not None else groups['em_u']
+        return f"<em>{_render_inline(em)}</em>"
+
+    return _INLINE.sub(replace, text)
+
+
 def markdown_to_html(markdown_content: str) -> str:
     """
     Convert Markdown to HTML.
     
-    Uses a simple markdown parser. For production, consider using:
-    - markdown2 (pip install markdown2)
-    - mistune (pip install mistune)
-    - markdown (pip install markdown)
-    
-    This is a basic implementation. For full markdown support, use a library.
+    Basic fallback used when no markdown library is installed: headers,
+    bold/italic, links, inline code, and ordered/unordered lists.
+    Renders in a single pass over the lines, so time is linear in the input size.
     """
-    html = markdown_content
-    
-    # Headers
-    html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-    html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^#### (.+)$', r'<h4>\1</h4>', html, flags=re.MULTILINE)
-    
-    # Bold
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-    html = re.sub(r'__(.+?)__', r'<strong>\1</strong>', html)
-    
-    # Italic
-    html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
-    html = re.sub(r'_(.+?)_', r'<em>\1</em>', html)
-    
-    # Links
-    html = re.sub(r'\[(.+?)\]\((.+?)\)', r'<a href="\2">\1</a>', html)
-    
-    # Lists (basic)
-    lines = html.split('\n')
-    in_list = False
     result = []
+    open_list: Optional[str] = None  # "ul" / "ol" while inside a list
     
-    for line in lines:
-        if line.strip().startswith('- ') or line.strip().startswith('* '):
-            if not in_list:
-                result.append('<ul>')
-                in_list = True
-            item = line.strip()[2:]
-            result.append(f'<li>{item}</li>')
-        elif line.strip().startswith(('1. ', '2. ', '3. ', '4. ', '5. ')):
-            if not in_list:
-                result.append('<ol>')
-                in_list = True
-            item = re.sub(r'^\d+\.\s+', '', line.strip())
-            result.append(f'<li>{item}</li>')
+    for raw_line in markdown_content.split('\n'):
+        line = raw_line.strip()
+        
+        item = _UNORDERED_ITEM.match(line)
+        list_tag = 'ul' if item else None
+        if not item:
+            item = _ORDERED_ITEM.match(line)
+            list_tag = 'ol' if item else None
+        
+        if open_list and open_list != list_tag:
+            result.append(f'</{open_list}>')
+            open_list = None
+        
+        if item:
+            if not open_list:
+                result.append(f'<{list_tag}>')
+                open_list = list_tag
+            result.append(f'<li>{_render_inline(item.group(1))}</li>')
+            continue
+        
+        if not line:
+            continue
+        
+        header = _HEADER.match(line)
+        if header:
+            level = len(header.group(1))
+            result.append(f'<h{level}>{_render_inline(header.group(2))}</h{level}>')
         else:
-            if in_list:
-                result.append('</ul>' if '<ul>' in '\n'.join(result) else '</ol>')
-                in_list = False
-            if line.strip():
-                result.append(f'<p>{line}</p>')
-            else:
-                result.append('')
-    
-    if in_list:
-        result.append('</ul>')
-    
-    html = '\n'.join(result)
-    
-    # Code blocks (basic)
-    html = re.sub(r'`(.+?)`', r'<code>\1</code>', html)
+            result.append(f'<p>{_render_inline(line)}</p>')
     
-    # Line breaks
-    html = html.replace('\n\n', '</p><p>')
+    if open_list:
+        result.append(f'</{open_list}>')
     
-    return html
+    return '\n'.join(result)
 
 
 def markdown_to_html_with_library(markdown_content: str, library: str = "markdown2") -> str:
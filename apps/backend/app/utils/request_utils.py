@@ -1,7 +1,7 @@
 """
 Utility functions for extracting request information.
 """
-from fastapi import Request
+from fastapi import Request, Response, status
 
 
 def get_client_ip(request: Request) -> str:
@@ -27,3 +27,25 @@ def get_user_agent(request: Request) -> str:
     """Get user agent from request"""
     return request.headers.get("User-Agent", "unknown")
 
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists etag (or *)"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [c.strip().removeprefix("W/") for c in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_bytes_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    cache_control: str,
+    media_type: str = "application/json"
+) -> Response:
+    """Return pre-serialized bytes with validators; 304 when the client copy is current"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
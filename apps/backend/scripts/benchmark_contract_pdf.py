@@ -0,0 +1,111 @@
+"""
+Benchmark contract generation: legacy two-pass vs single-pass.
+
+Legacy: compile the Jinja template per call, run write_pdf() once to hash the
+bytes, re-render with the hash and run write_pdf() again.
+Current: precompiled template, canonical-data hash, one write_pdf().
+
+Usage:
+    python scripts/benchmark_contract_pdf.py            # 20 contracts each
+    python scripts/benchmark_contract_pdf.py -n 100
+    python scripts/benchmark_contract_pdf.py --html-only  # template rendering only (no WeasyPrint needed)
+"""
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Template
+
+from app.core.pdf_generator import PDFContractGenerator
+
+SAMPLE = {
+    "seller_name": "Jane Seller",
+    "seller_email": "seller@example.com",
+    "buyer_name": "John Buyer",
+    "buyer_email": "buyer@example.com",
+    "listing_title": "Top Rated Upwork Account",
+    "platform": "Upwork",
+    "category": "Academic",
+    "purchase_price": 1500.00,
+}
+
+
+def _template_data(i: int) -> dict:
+    data = dict(SAMPLE, buyer_email=f"buyer{i}@example.com")
+    data["purchase_price"] = f"{data['purchase_price']:.2f}"
+    data.update(contract_date="October 19, 2026", generated_at="2026-10-19T00:00:00", signed_by_name=None, signed_at=None)
+    data["template_version"] = PDFContractGenerator.TEMPLATE_VERSION
+    return data
+
+
+def legacy_html(i: int) -> str:
+    template = Template(PDFContractGenerator.CONTRACT_TEMPLATE)
+    data = _template_data(i)
+    data["contract_hash"] = ""
+    template.render(**data)
+    data["contract_hash"] = "0" * 64
+    return template.render(**data)
+
+
+def current_html(i: int) -> str:
+    data = _template_data(i)
+    data["contract_hash"] = PDFContractGenerator.compute_contract_hash(data)
+    return PDFContractGenerator.render_html(data)
+
+
+def legacy_pdf(i: int) -> bytes:
+    from weasyprint import HTML
+
+    template = Template(PDFContractGenerator.CONTRACT_TEMPLATE)
+    data = _template_data(i)
+    data["contract_hash"] = ""
+    pdf_bytes = HTML(string=template.render(**data)).write_pdf()
+    data["contract_hash"] = hashlib.sha256(pdf_bytes).hexdigest()
+    return HTML(string=template.render(**data)).write_pdf()
+
+
+def current_pdf(i: int) -> bytes:
+    return PDFContractGenerator.generate_contract(**dict(SAMPLE, buyer_email=f"buyer{i}@example.com"))[0]
+
+
+def measure(label: str, fn, n: int) -> float:
+    fn(0)  # Warm-up (fonts, template caches)
+    started = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    elapsed = time.perf_counter() - started
+    rate = n / elapsed
+    print(f"{label:<28} {n:>5} in {elapsed:7.3f}s  {rate:9.1f}/s")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contract PDF generation benchmark")
+    parser.add_argument("-n", type=int, default=20, help="Contracts per variant")
+    parser.add_argument("--html-only", action="store_true", help="Only benchmark template rendering")
+    args = parser.parse_args()
+
+    before = measure("html: compile per call", legacy_html, args.n * 50)
+    after = measure("html: precompiled", current_html, args.n * 50)
+    print(f"{'html speedup':<28} {after / before:.2f}x\n")
+
+    if args.html_only:
+        return
+
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        print(f"WeasyPrint unavailable, skipping PDF benchmark: {e}")
+        return
+
+    before = measure("pdf: two-pass (legacy)", legacy_pdf, args.n)
+    after = measure("pdf: single-pass", current_pdf, args.n)
+    print(f"{'pdf speedup':<28} {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
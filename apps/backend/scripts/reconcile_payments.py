@@ -0,0 +1,50 @@
+"""
+Reconcile transactions against payment_events and Paystack.
+
+Usage:
+    python scripts/reconcile_payments.py                         # dry run, summary only
+    python scripts/reconcile_payments.py --report out.jsonl      # every discrepancy to a file
+    python scripts/reconcile_payments.py --auto-heal             # apply safe fixes
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.payment.services.reconciliation import run_reconciliation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Payment reconciliation")
+    parser.add_argument("--auto-heal", action="store_true", help="Move verified, unprocessed payments to FUNDS_HELD")
+    parser.add_argument("--report", help="Append every discrepancy to this JSON-lines file")
+    parser.add_argument("--chunk-size", type=int, help="Transactions per page")
+    parser.add_argument("--concurrency", type=int, help="Parallel Paystack verify calls")
+    parser.add_argument("--grace-minutes", type=int, help="Skip transactions younger than this")
+    args = parser.parse_args()
+
+    options = {
+        key: value
+        for key, value in {
+            "chunk_size": args.chunk_size,
+            "concurrency": args.concurrency,
+            "grace_minutes": args.grace_minutes,
+        }.items()
+        if value is not None
+    }
+
+    db = SessionLocal()
+    try:
+        report = run_reconciliation(db, auto_heal=args.auto_heal, report_path=args.report, **options)
+    finally:
+        db.close()
+
+    report.pop("samples", None)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
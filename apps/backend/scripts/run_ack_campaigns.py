@@ -0,0 +1,68 @@
+"""
+Resume re-acknowledgment campaigns.
+
+Campaigns normally start in the background when a document is published.
+Run this after a restart, or from cron, to finish queued, failed or stalled
+campaigns. Progress is committed per chunk, so it is safe to interrupt.
+
+Usage:
+    python scripts/run_ack_campaigns.py                 # resume everything pending
+    python scripts/run_ack_campaigns.py --campaign 12   # one campaign
+    python scripts/run_ack_campaigns.py --rate 200      # override users/second
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.legal_campaigns import AckCampaignRunner
+
+
+def _report(campaign) -> None:
+    total = campaign.total_users or 0
+    done = campaign.marked_users
+    percent = f"{100 * done / total:.1f}%" if total else "n/a"
+    print(
+        f"campaign={campaign.id} document={campaign.document_id} status={campaign.status.value} "
+        f"marked={done}/{total} ({percent}) notified={campaign.notified_users} failures={campaign.notify_failures}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-acknowledgment campaign runner")
+    parser.add_argument("--campaign", type=int, help="Run a single campaign")
+    parser.add_argument("--rate", type=float, default=settings.LEGAL_CAMPAIGN_USERS_PER_SECOND, help="Users per second")
+    parser.add_argument("--chunk-size", type=int, default=settings.LEGAL_CAMPAIGN_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    runner = AckCampaignRunner(
+        chunk_size=args.chunk_size,
+        users_per_second=args.rate,
+        stale_seconds=settings.LEGAL_CAMPAIGN_STALE_SECONDS,
+    )
+
+    db = SessionLocal()
+    try:
+        if args.campaign:
+            campaign = runner.run(db, args.campaign)
+            if campaign is None:
+                print(f"campaign={args.campaign} is finished or owned by another runner")
+                return
+            campaigns = [campaign]
+        else:
+            campaigns = runner.resume_pending(db)
+        for campaign in campaigns:
+            _report(campaign)
+        if not campaigns:
+            print("No campaigns to run")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
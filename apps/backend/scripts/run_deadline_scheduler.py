@@ -0,0 +1,65 @@
+"""
+Fire expired temporary access and verification window deadlines on a fixed interval.
+
+Usage:
+    python scripts/run_deadline_scheduler.py          # loop every DEADLINE_SCHEDULER_INTERVAL_SECONDS
+    python scripts/run_deadline_scheduler.py --once   # single run (cron)
+
+Several instances may run at once; due jobs are claimed with SKIP LOCKED.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.deadline_scheduler import deadline_scheduler
+
+logger = logging.getLogger("deadline_scheduler")
+
+
+def run_once() -> dict:
+    db = SessionLocal()
+    try:
+        return deadline_scheduler.run_once(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction deadline scheduler")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=settings.DEADLINE_SCHEDULER_INTERVAL_SECONDS, help="Seconds between runs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    while True:
+        try:
+            result = run_once()
+            if result["claimed"] or args.once:
+                print(
+                    f"claimed={result['claimed']} fired={result['fired']} skipped={result['skipped']} "
+                    f"errors={result['errors']} {result['jobs_per_second']}/s"
+                )
+            # A full batch means more jobs are due: go again without sleeping
+            if result["claimed"] >= deadline_scheduler.batch_size and not result["errors"]:
+                continue
+        except Exception:
+            logger.exception("Deadline run failed")
+            if args.once:
+                sys.exit(1)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Dispatch outbox messages (emails queued by state changes) on a fixed interval.
+
+Usage:
+    python scripts/run_outbox_dispatcher.py          # loop every OUTBOX_INTERVAL_SECONDS
+    python scripts/run_outbox_dispatcher.py --once   # single run (cron)
+
+Several instances may run at once; available messages are claimed with SKIP LOCKED.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.outbox import outbox_dispatcher
+
+logger = logging.getLogger("outbox_dispatcher")
+
+
+def run_once() -> dict:
+    db = SessionLocal()
+    try:
+        return outbox_dispatcher.run_once(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transactional outbox dispatcher")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=settings.OUTBOX_INTERVAL_SECONDS, help="Seconds between runs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    while True:
+        try:
+            result = run_once()
+            if result["claimed"] or args.once:
+                print(
+                    f"claimed={result['claimed']} sent={result['sent']} retried={result['retried']} "
+                    f"failed={result['failed']} {result['messages_per_second']}/s"
+                )
+            # A full batch means more messages are waiting: go again without sleeping
+            if result["claimed"] >= outbox_dispatcher.batch_size:
+                continue
+        except Exception:
+            logger.exception("Outbox run failed")
+            if args.once:
+                sys.exit(1)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Run the seller payout engine on a fixed interval.
+
+Usage:
+    python scripts/run_payout_scheduler.py          # loop every PAYOUT_INTERVAL_SECONDS
+    python scripts/run_payout_scheduler.py --once   # single run (cron)
+
+Several instances may run at once; transactions are claimed with SKIP LOCKED.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.payment.services.payout_engine import payout_engine
+
+logger = logging.getLogger("payout_scheduler")
+
+
+def run_once() -> dict:
+    db = SessionLocal()
+    try:
+        return payout_engine.run_once(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seller payout scheduler")
+    parser.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    parser.add_argument("--interval", type=float, default=settings.PAYOUT_INTERVAL_SECONDS, help="Seconds between runs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
+    while True:
+        try:
+            result = run_once()
+            print(
+                f"selected={result['selected']} queued={result['queued']} failed={result['failed']} "
+                f"missing_recipient={result['missing_recipient']} completed={result['completed']} "
+                f"batches={result['bulk_requests']} {result['transfers_per_second']}/s"
+            )
+        except Exception:
+            logger.exception("Payout run failed")
+            if args.once:
+                sys.exit(1)
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Load test for transaction event streams: open many idle SSE connections
+against one API worker and check that they all keep receiving heartbeats.
+
+Run the API with a single worker and a short heartbeat, e.g.
+    SSE_HEARTBEAT_SECONDS=5 uvicorn app.main:app --workers 1
+
+Usage:
+    python scripts/sse_load_test.py --token <JWT> --transaction-id 42
+    python scripts/sse_load_test.py --token <JWT> --transaction-id 42 -n 10000 --duration 60
+
+Raise the open-file limit first (`ulimit -n 65536`) on both sides: each
+stream is one socket.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+
+async def _stream(client: httpx.AsyncClient, url: str, stats: dict, stop: asyncio.Event) -> None:
+    try:
+        async with client.stream("GET", url) as response:
+            if response.status_code != 200:
+                stats["rejected"] += 1
+                return
+            stats["open"] += 1
+            try:
+                async for line in response.aiter_lines():
+                    if line.startswith(": heartbeat"):
+                        stats["heartbeats"] += 1
+                    elif line.startswith("event: "):
+                        stats["events"] += 1
+                    if stop.is_set():
+                        break
+            finally:
+                stats["open"] -= 1
+    except httpx.HTTPError:
+        stats["errors"] += 1
+
+
+async def run(base_url: str, token: str, transaction_id: int, connections: int, duration: float, ramp: float) -> dict:
+    url = f"{base_url}/api/v1/transactions/{transaction_id}/events"
+    stats = {"open": 0, "rejected": 0, "errors": 0, "heartbeats": 0, "events": 0}
+    stop = asyncio.Event()
+    limits = httpx.Limits(max_connections=connections, max_keepalive_connections=0)
+    timeout = httpx.Timeout(10.0, read=None)
+
+    async with httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"}, limits=limits, timeout=timeout) as client:
+        tasks = []
+        for i in range(connections):
+            tasks.append(asyncio.create_task(_stream(client, url, stats, stop)))
+            if ramp and i % 100 == 99:
+                await asyncio.sleep(ramp * 100 / connections)
+
+        started = time.perf_counter()
+        peak = 0
+        while time.perf_counter() - started < duration:
+            await asyncio.sleep(1)
+            peak = max(peak, stats["open"])
+            print(f"\r{time.perf_counter() - started:5.0f}s open={stats['open']} heartbeats={stats['heartbeats']} "
+                  f"rejected={stats['rejected']} errors={stats['errors']}", end="", flush=True)
+        print()
+
+        stop.set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    stats["peak_open"] = peak
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hold idle SSE connections open and count heartbeats")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True, help="Access token of the buyer, seller or an admin")
+    parser.add_argument("--transaction-id", type=int, required=True, help="A transaction that is not closed")
+    parser.add_argument("-n", "--connections", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to hold the connections")
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds to spread connection setup over")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args.base_url, args.token, args.transaction_id, args.connections, args.duration, args.ramp))
+    print(f"Peak open streams: {stats['peak_open']} / {args.connections}")
+    print(f"Rejected (503): {stats['rejected']}  Errors: {stats['errors']}")
+    print(f"Heartbeats: {stats['heartbeats']}  Events: {stats['events']}")
+
+
+if __name__ == "__main__":
+    main()
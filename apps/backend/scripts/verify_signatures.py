@@ -0,0 +1,46 @@
+"""
+Verify every stored acknowledgment and ownership agreement signature.
+
+Usage:
+    python scripts/verify_signatures.py                        # summary only
+    python scripts/verify_signatures.py --report out.jsonl     # every mismatch to a file
+    python scripts/verify_signatures.py --kind legal_acknowledgment --workers 8
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.signatures import KINDS, run_signature_verification
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk signature verification")
+    parser.add_argument("--kind", action="append", choices=KINDS, help="Record kind to check (repeatable; default all)")
+    parser.add_argument("--report", help="Append every mismatch to this JSON-lines file")
+    parser.add_argument("--workers", type=int, help="Worker processes (0 = inline)")
+    parser.add_argument("--chunk-size", type=int, help="Rows per page / worker task")
+    args = parser.parse_args()
+
+    options = {
+        key: value
+        for key, value in {"workers": args.workers, "chunk_size": args.chunk_size}.items()
+        if value is not None
+    }
+
+    db = SessionLocal()
+    try:
+        report = run_signature_verification(db, kinds=args.kind or KINDS, report_path=args.report, **options)
+    finally:
+        db.close()
+
+    report.pop("samples", None)
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
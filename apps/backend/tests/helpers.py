@@ -0,0 +1,54 @@
+"""
+Shared helpers for tests that run against an in-memory SQLite database.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401  (register all tables)
+from app.models.base import Base
+from app.models.user import Role, User
+
+BUYER_AND_SELLER = (("buyer", Role.BUYER), ("seller", Role.SELLER))
+
+
+@contextmanager
+def memory_session() -> Iterator[Session]:
+    """Session on a fresh in-memory database with every table created; disposed on exit"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def seed_users(session: Session, *users: Tuple[str, Role], commit: bool = True, **fields) -> List[User]:
+    """
+    Add one user per (name, role), with ids in the given order.
+
+    Defaults to a buyer (id 1) and a seller (id 2). The email is
+    <name>@example.com; extra keyword fields apply to every user.
+    """
+    rows = [
+        User(
+            email=f"{name}@example.com",
+            phone=f"+2547{index:08d}",
+            hashed_password="x",
+            full_name=name.title(),
+            role=role,
+            **fields,
+        )
+        for index, (name, role) in enumerate(users or BUYER_AND_SELLER)
+    ]
+    session.add_all(rows)
+    if commit:
+        session.commit()
+    else:
+        session.flush()
+    return rows
@@ -0,0 +1,115 @@
+"""
+Tests for the batch status endpoints (/purchase/status, /sale/status).
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api.v1 import buyer_purchase_flow, seller_sale_flow
+from app.api.v1.dependencies import require_buyer, require_seller
+from app.core.database import get_db
+from app.models.listing import Listing, ListingState
+from app.models.ownership_agreement import OwnershipAgreement
+from app.models.temporary_access import TemporaryAccess
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+from tests.helpers import memory_session, seed_users
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session, ("buyer", Role.BUYER), ("seller", Role.SELLER), ("other", Role.BUYER))
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    api = FastAPI()
+    api.include_router(buyer_purchase_flow.router)
+    api.include_router(seller_sale_flow.router)
+    api.dependency_overrides[get_db] = lambda: db
+    api.dependency_overrides[require_buyer] = lambda: db.get(User, 1)
+    api.dependency_overrides[require_seller] = lambda: db.get(User, 2)
+    return TestClient(api)
+
+
+def _transactions(db, count, buyer_id=1):
+    """Transactions in VERIFICATION_WINDOW with temporary access and an agreement"""
+    ids = []
+    now = datetime.utcnow()
+    for _ in range(count):
+        listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.RESERVED)
+        db.add(listing)
+        db.flush()
+        transaction = Transaction(listing_id=listing.id, buyer_id=buyer_id, seller_id=2, amount_usd=10000, state=TransactionState.VERIFICATION_WINDOW)
+        db.add(transaction)
+        db.flush()
+        db.add(TemporaryAccess(transaction_id=transaction.id, access_granted_at=now - timedelta(hours=1), access_expires_at=now + timedelta(hours=10)))
+        db.add(OwnershipAgreement(transaction_id=transaction.id, agreement_content="Agreement", agreement_version="1.0", effective_date=now))
+        ids.append(transaction.id)
+    db.commit()
+    db.expire_all()
+    return ids
+
+
+def _count_queries(db):
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestBuyerBatchStatus:
+    """One request, a fixed number of queries"""
+
+    def test_returns_summaries_in_request_order(self, client, db):
+        ids = _transactions(db, 3)
+        foreign = _transactions(db, 1, buyer_id=3)[0]
+
+        response = client.get(f"/purchase/status?ids={ids[2]},{foreign},{ids[0]},{ids[2]},999")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [t["transaction_id"] for t in body["transactions"]] == [ids[2], ids[0]]
+        assert body["missing_ids"] == [foreign, 999]
+        summary = body["transactions"][0]
+        assert (summary["current_step"], summary["current_state"]) == (4, "verification_window")
+        assert summary["temporary_access_active"] and not summary["ownership_agreement_signed"]
+        assert 9 < summary["time_remaining_hours"] <= 10
+
+    def test_query_count_does_not_grow_with_ids(self, client, db):
+        few = _transactions(db, 2)
+        many = _transactions(db, 20)
+
+        statements = _count_queries(db)
+        client.get("/purchase/status?ids=" + ",".join(map(str, few)))
+        small = len(statements)
+        db.expire_all()
+        statements.clear()
+        client.get("/purchase/status?ids=" + ",".join(map(str, many)))
+
+        assert len(statements) == small
+
+    @pytest.mark.parametrize("ids", ["", "1,x", ",".join(str(i) for i in range(1, 102))])
+    def test_rejects_bad_id_lists(self, client, ids):
+        assert client.get(f"/purchase/status?ids={ids}").status_code == 400
+
+
+class TestSellerBatchStatus:
+    """Seller view of the same transactions"""
+
+    def test_returns_seller_status(self, client, db):
+        ids = _transactions(db, 5)
+
+        statements = _count_queries(db)
+        response = client.get("/sale/status?ids=" + ",".join(map(str, ids)))
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [t["transaction_id"] for t in body["transactions"]] == ids
+        assert body["transactions"][0]["current_step"] == 5
+        # current user, transactions, then one IN query per relationship
+        assert len(statements) <= 7
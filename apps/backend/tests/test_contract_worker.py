@@ -0,0 +1,199 @@
+"""
+Tests for the background contract rendering pool.
+Render functions are module-level so worker processes can import them.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database, storage
+from app.core.contract_worker import (
+    ContractRenderPool,
+    RenderQueueFull,
+    enqueue_contract_job,
+    store_job_result,
+)
+from app.models.contract import Contract
+from app.models.contract_render_job import ContractJobStatus, ContractRenderJob
+from app.models.listing import Listing
+from app.models.transaction import Transaction, TransactionState
+from tests.helpers import memory_session, seed_users
+
+
+def fake_render(payload):
+    if payload.get("sleep"):
+        time.sleep(payload["sleep"])
+    if payload.get("crash"):
+        os._exit(1)
+    if payload.get("fail"):
+        raise ValueError("bad template data")
+    return b"%PDF-" + payload["name"].encode(), "hash-" + payload["name"], 0.01
+
+
+def _pool(**kwargs):
+    events = []
+    pool = ContractRenderPool(
+        render_fn=fake_render,
+        on_start=lambda job_id: events.append(("start", job_id)),
+        on_finish=lambda job_id, result, error: events.append(("finish", job_id, result, error)),
+        initializer=None,
+        **kwargs,
+    )
+    return pool, events
+
+
+def _finished(events):
+    return {e[1]: (e[2], e[3]) for e in events if e[0] == "finish"}
+
+
+class TestContractRenderPool:
+    """Concurrency cap, timeout and crash isolation"""
+
+    def test_renders_jobs_and_reports_results(self):
+        async def scenario():
+            pool, events = _pool(max_workers=2, max_queue=10, timeout=20)
+            await pool.start()
+            try:
+                for name in ("a", "b", "c"):
+                    pool.submit(name, {"name": name})
+                assert await pool.wait("c", 20)
+                await pool._queue.join()
+            finally:
+                await pool.stop()
+            return pool, events
+
+        pool, events = asyncio.run(scenario())
+        finished = _finished(events)
+        assert finished["a"] == ((b"%PDF-a", "hash-a", 0.01), None)
+        assert set(finished) == {"a", "b", "c"}
+        assert pool.stats["succeeded"] == 3
+
+    def test_queue_is_bounded(self):
+        async def scenario():
+            pool, _ = _pool(max_workers=1, max_queue=1, timeout=20)
+            await pool.start()
+            try:
+                pool.submit("slow", {"name": "slow", "sleep": 0.5})
+                await asyncio.sleep(0.05)  # Consumer picks up the first job
+                pool.submit("queued", {"name": "queued"})
+                with pytest.raises(RenderQueueFull):
+                    pool.submit("rejected", {"name": "rejected"})
+                await pool._queue.join()
+            finally:
+                await pool.stop()
+            return pool
+
+        assert asyncio.run(scenario()).stats["rejected"] == 1
+
+    def _run(self, jobs, timeout):
+        async def scenario():
+            pool, events = _pool(max_workers=2, max_queue=10, timeout=timeout)
+            await pool.start()
+            try:
+                for job_id, payload in jobs:
+                    pool.submit(job_id, payload)
+                await asyncio.wait_for(pool._queue.join(), 90)
+            finally:
+                await pool.stop()
+            return pool, _finished(events)
+
+        return asyncio.run(scenario())
+
+    def test_crash_only_fails_the_crashing_job(self):
+        """Jobs caught in a broken pool are retried on a fresh one"""
+        pool, finished = self._run(
+            [("crash", {"name": "crash", "crash": True}), ("ok", {"name": "ok"}), ("error", {"name": "error", "fail": True})],
+            timeout=30,
+        )
+        assert finished["crash"] == (None, "Render worker crashed")
+        assert finished["ok"][0][1] == "hash-ok"
+        assert finished["error"] == (None, "ValueError: bad template data")
+        assert pool.stats["crashes"] == 1
+        assert pool.stats["pool_restarts"] >= 1
+
+    def test_hung_render_times_out(self):
+        pool, finished = self._run(
+            [("hang", {"name": "hang", "sleep": 60}), ("ok", {"name": "ok"})],
+            timeout=5,
+        )
+        assert finished["hang"] == (None, "Rendering timed out after 5s")
+        assert finished["ok"][0][1] == "hash-ok"
+        assert pool.stats["timeouts"] == 1
+
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    monkeypatch.setattr(storage, "_storage", storage.FilesystemStorage(str(tmp_path / "blobs")))
+    with memory_session() as session:
+        monkeypatch.setattr(database, "SessionLocal", sessionmaker(bind=session.get_bind()))
+        buyer, seller = seed_users(session, commit=False)
+        listing = Listing(seller_id=seller.id, title="Account", category="Academic", platform="Upwork", price_usd=10000)
+        session.add(listing)
+        session.flush()
+        session.add(Transaction(listing_id=listing.id, buyer_id=buyer.id, seller_id=seller.id, amount_usd=10000, state=TransactionState.FUNDS_HELD))
+        session.commit()
+        yield session
+
+
+class RecordingPool:
+    def __init__(self, full=False):
+        self.submitted = []
+        self.full = full
+
+    def submit(self, job_id, payload):
+        if self.full:
+            raise RenderQueueFull("full")
+        self.submitted.append(job_id)
+
+
+class TestContractJobs:
+    """Job rows, deduplication and result persistence"""
+
+    def test_active_job_is_reused(self, db):
+        pool = RecordingPool()
+        first = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=pool)
+        second = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=pool)
+        assert first.job_id == second.job_id
+        assert pool.submitted == [first.job_id]
+
+    def test_stale_job_is_replaced(self, db):
+        pool = RecordingPool()
+        stale = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=pool)
+        stale.created_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        db.commit()
+
+        fresh = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=pool)
+
+        assert fresh.job_id != stale.job_id
+        db.refresh(stale)
+        assert stale.status == ContractJobStatus.FAILED
+
+    def test_full_queue_fails_job(self, db):
+        with pytest.raises(RenderQueueFull):
+            enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=RecordingPool(full=True))
+        assert db.query(ContractRenderJob).one().status == ContractJobStatus.FAILED
+
+    def test_store_result_creates_contract(self, db):
+        job = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=RecordingPool())
+
+        store_job_result(job.job_id, (b"%PDF-x", "a" * 64, 0.25), None)
+
+        db.expire_all()
+        contract = db.query(Contract).one()
+        assert contract.pdf_hash == "a" * 64
+        assert contract.pdf_url == "/api/v1/contracts/1/pdf"
+        assert b"".join(storage.get_storage().open(contract.pdf_storage_key)) == b"%PDF-x"
+        assert job.status == ContractJobStatus.SUCCEEDED
+        assert job.contract_id == contract.id
+        assert job.render_ms == 250
+
+    def test_store_error_marks_failed(self, db):
+        job = enqueue_contract_job(db, 1, 1, {"name": "x"}, pool=RecordingPool())
+        store_job_result(job.job_id, None, "Render worker crashed")
+        db.expire_all()
+        assert job.status == ContractJobStatus.FAILED
+        assert job.error == "Render worker crashed"
@@ -0,0 +1,147 @@
+"""
+Tests for durable deadline jobs and the deadline scheduler.
+Runs against in-memory SQLite (SKIP LOCKED is a no-op there).
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.deadline_scheduler import ADVANCE, ESCALATE, REFUND, DeadlineScheduler
+from app.crud import buyer_purchase_flow
+from app.crud.scheduled_job import schedule_deadline
+from app.models.listing import Listing, ListingState
+from app.models.scheduled_job import ScheduledJob, ScheduledJobKind, ScheduledJobStatus
+from app.models.temporary_access import TemporaryAccess
+from app.models.transaction import Transaction, TransactionState
+from tests.helpers import memory_session, seed_users
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session)
+        yield session
+
+
+def _transaction(db, state, expires_at=None):
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.RESERVED)
+    db.add(listing)
+    db.flush()
+    transaction = Transaction(listing_id=listing.id, buyer_id=1, seller_id=2, amount_usd=10000, state=state)
+    db.add(transaction)
+    db.flush()
+    granted = datetime.utcnow() - timedelta(hours=1)
+    db.add(TemporaryAccess(
+        transaction_id=transaction.id,
+        access_granted_at=granted,
+        access_expires_at=expires_at or granted + timedelta(hours=48),
+    ))
+    db.commit()
+    return transaction
+
+
+def _jobs(db, transaction_id):
+    return {job.kind: job for job in db.query(ScheduledJob).filter(ScheduledJob.transaction_id == transaction_id)}
+
+
+class TestScheduling:
+    """Flow steps schedule and cancel their deadlines"""
+
+    def test_verification_window_replaces_access_expiry(self, db):
+        transaction = _transaction(db, TransactionState.TEMPORARY_ACCESS_GRANTED)
+        schedule_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, transaction.id, NOW)
+        db.commit()
+
+        buyer_purchase_flow.start_verification_window(db, transaction, verification_duration_hours=24)
+        assert 23.9 < transaction.verification_hours_remaining <= 24
+        jobs = _jobs(db, transaction.id)
+        assert jobs[ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY].status == ScheduledJobStatus.CANCELLED
+        assert jobs[ScheduledJobKind.VERIFICATION_DEADLINE].status == ScheduledJobStatus.PENDING
+
+        buyer_purchase_flow.verify_account(db, transaction, verified=True)
+        db.expire_all()
+        assert _jobs(db, transaction.id)[ScheduledJobKind.VERIFICATION_DEADLINE].status == ScheduledJobStatus.CANCELLED
+
+    def test_rescheduling_rearms_the_same_row(self, db):
+        transaction = _transaction(db, TransactionState.VERIFICATION_WINDOW)
+        schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, NOW - timedelta(hours=1))
+        db.commit()
+        DeadlineScheduler(actions={ScheduledJobKind.VERIFICATION_DEADLINE: ESCALATE}).run_once(db, now=NOW)
+
+        schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, NOW + timedelta(hours=1))
+        db.commit()
+        db.expire_all()
+
+        assert db.query(ScheduledJob).count() == 1
+        job = db.query(ScheduledJob).one()
+        assert (job.status, job.attempts, job.result) == (ScheduledJobStatus.PENDING, 0, None)
+
+
+class TestDeadlineScheduler:
+    """Due jobs fire once, in batches, with the configured action"""
+
+    def test_escalates_only_due_jobs(self, db):
+        due = [_transaction(db, TransactionState.TEMPORARY_ACCESS_GRANTED) for _ in range(3)]
+        later = _transaction(db, TransactionState.TEMPORARY_ACCESS_GRANTED)
+        for transaction in due:
+            schedule_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, transaction.id, NOW - timedelta(minutes=5))
+        schedule_deadline(db, ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY, later.id, NOW + timedelta(minutes=5))
+        db.commit()
+
+        run = DeadlineScheduler(batch_size=2).run_once(db, now=NOW)
+        assert (run["claimed"], run["fired"]) == (2, 2)
+        run = DeadlineScheduler(batch_size=2).run_once(db, now=NOW)
+        assert (run["claimed"], run["fired"]) == (1, 1)
+
+        db.expire_all()
+        for transaction in due:
+            assert transaction.state == TransactionState.DISPUTED
+            assert transaction.temporary_access.access_revoked
+            assert "Temporary access expired" in transaction.notes
+        assert later.state == TransactionState.TEMPORARY_ACCESS_GRANTED
+        assert _jobs(db, later.id)[ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY].status == ScheduledJobStatus.PENDING
+
+    def test_refund_releases_listing(self, db):
+        transaction = _transaction(db, TransactionState.VERIFICATION_WINDOW)
+        schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, NOW)
+        db.commit()
+
+        DeadlineScheduler(actions={ScheduledJobKind.VERIFICATION_DEADLINE: REFUND}).run_once(db, now=NOW)
+        db.expire_all()
+
+        assert transaction.state == TransactionState.REFUNDED
+        assert transaction.refunded_at is not None
+        assert transaction.listing.state == ListingState.APPROVED
+        assert _jobs(db, transaction.id)[ScheduledJobKind.VERIFICATION_DEADLINE].result == REFUND
+
+    def test_advance_counts_silence_as_verified(self, db):
+        transaction = _transaction(db, TransactionState.VERIFICATION_WINDOW)
+        schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, NOW)
+        db.commit()
+
+        DeadlineScheduler(actions={ScheduledJobKind.VERIFICATION_DEADLINE: ADVANCE}).run_once(db, now=NOW)
+        db.expire_all()
+
+        assert transaction.state == TransactionState.OWNERSHIP_AGREEMENT_PENDING
+        assert transaction.account_verified
+        assert not transaction.temporary_access.access_revoked
+
+    def test_transactions_that_moved_on_are_skipped_and_never_refired(self, db):
+        transaction = _transaction(db, TransactionState.OWNERSHIP_AGREEMENT_PENDING)
+        schedule_deadline(db, ScheduledJobKind.VERIFICATION_DEADLINE, transaction.id, NOW)
+        db.commit()
+        scheduler = DeadlineScheduler()
+
+        first = scheduler.run_once(db, now=NOW)
+        second = scheduler.run_once(db, now=NOW + timedelta(hours=1))
+
+        assert (first["claimed"], first["fired"], first["skipped"]) == (1, 0, 1)
+        assert second["claimed"] == 0
+        assert transaction.state == TransactionState.OWNERSHIP_AGREEMENT_PENDING
+        assert scheduler.stats(db)["jobs_by_kind"]["verification_deadline"] == {"done": 1}
+
+    def test_rejects_unsupported_actions(self):
+        with pytest.raises(ValueError):
+            DeadlineScheduler(actions={ScheduledJobKind.TEMPORARY_ACCESS_EXPIRY: ADVANCE})
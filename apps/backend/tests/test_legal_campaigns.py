@@ -0,0 +1,155 @@
+"""
+Tests for re-acknowledgment campaigns fanned out when a legal document is published.
+"""
+import pytest
+
+from app.core.legal_campaigns import AckCampaignRunner
+from app.crud import legal_ack_campaign as campaign_crud
+from app.crud import legal_document as legal_document_crud
+from app.crud import user_legal_acknowledgment as acknowledgment_crud
+from app.models.legal_ack_campaign import AckCampaignStatus, PendingLegalAcknowledgment
+from app.models.legal_document import DocumentType
+from app.models.user import Role
+from app.schemas.legal_document import LegalDocumentCreate
+from tests.helpers import memory_session, seed_users
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        users = seed_users(session, *[(f"user{i}", Role.BUYER) for i in range(25)], commit=False)
+        users[3].is_active = False
+        session.commit()
+        yield session
+
+
+def _publish(db, document_type=DocumentType.TOS, slug="terms"):
+    document = legal_document_crud.create_legal_document(
+        db,
+        LegalDocumentCreate(title="Terms of Service", slug=slug, document_type=document_type, content_markdown="Terms"),
+    )
+    return legal_document_crud.publish_legal_document(db, document, published_by_id=1)
+
+
+class RecordingNotifier:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, messages):
+        self.batches.append([m["to"] for m in messages])
+        return 0 if self.fail else len(messages)
+
+
+def _runner(notifier, **kwargs):
+    sleeps = []
+    runner = AckCampaignRunner(chunk_size=10, users_per_second=1e9, notifier=notifier, sleep=sleeps.append, **kwargs)
+    return runner, sleeps
+
+
+class TestQueueCampaign:
+    """Publishing required documents queues a campaign"""
+
+    def test_required_type_queues_campaign(self, db):
+        document = _publish(db)
+        campaign = campaign_crud.get_latest_campaign_for_document(db, document.id)
+        assert campaign.status == AckCampaignStatus.QUEUED
+
+    def test_optional_type_does_not(self, db):
+        document = _publish(db, DocumentType.FAQ, "faq")
+        assert campaign_crud.get_latest_campaign_for_document(db, document.id) is None
+
+    def test_new_version_supersedes_unfinished_campaign(self, db):
+        old = _publish(db)
+        _publish(db, slug="terms-v2")
+        db.expire_all()
+        assert campaign_crud.get_latest_campaign_for_document(db, old.id).status == AckCampaignStatus.SUPERSEDED
+
+
+class TestAckCampaignRunner:
+    """Chunked marking and batched notification"""
+
+    def test_marks_and_notifies_unacknowledged_active_users(self, db):
+        document = _publish(db)
+        acknowledgment_crud.create_user_acknowledgment(db, user_id=1, document_id=document.id)
+        campaign = campaign_crud.get_latest_campaign_for_document(db, document.id)
+        notifier = RecordingNotifier()
+
+        campaign = _runner(notifier)[0].run(db, campaign.id)
+
+        # 25 users - 1 inactive - 1 already acknowledged
+        assert campaign.status == AckCampaignStatus.COMPLETED
+        assert campaign.total_users == 23
+        assert campaign.marked_users == 23
+        assert campaign.notified_users == 23
+        assert [len(batch) for batch in notifier.batches] == [10, 10, 3]
+        pending_users = {p.user_id for p in db.query(PendingLegalAcknowledgment).all()}
+        assert 1 not in pending_users and 4 not in pending_users
+        assert all(p.notified_at is not None for p in db.query(PendingLegalAcknowledgment).all())
+
+    def test_new_version_reaches_users_who_acknowledged_the_old_one(self, db):
+        document = _publish(db)
+        acknowledgment_crud.create_user_acknowledgment(db, user_id=1, document_id=document.id)
+        document = legal_document_crud.publish_legal_document(db, document, published_by_id=1, new_version="2.0")
+        campaign = campaign_crud.get_latest_campaign_for_document(db, document.id)
+
+        campaign = _runner(RecordingNotifier())[0].run(db, campaign.id)
+
+        assert campaign.total_users == 24
+        assert 1 in {p.user_id for p in db.query(PendingLegalAcknowledgment).all()}
+
+    def test_resumes_from_cursor_without_duplicates(self, db):
+        document = _publish(db)
+        campaign_id = campaign_crud.get_latest_campaign_for_document(db, document.id).id
+        notifier = RecordingNotifier()
+        runner, _ = _runner(notifier)
+
+        partial = runner.run(db, campaign_id, max_chunks=1)
+        assert partial.status == AckCampaignStatus.RUNNING
+        assert partial.cursor_user_id == 11  # user 4 is inactive
+
+        # A live runner holds the campaign; a fresh one cannot claim it
+        assert runner.run(db, campaign_id) is None
+
+        # Simulate a crash: the heartbeat goes stale and another runner takes over
+        takeover, _ = _runner(notifier, stale_seconds=-1)
+        campaign = takeover.run(db, campaign_id)
+
+        assert campaign.status == AckCampaignStatus.COMPLETED
+        assert db.query(PendingLegalAcknowledgment).count() == 24
+        notified = [email for batch in notifier.batches for email in batch]
+        assert len(notified) == len(set(notified)) == 24
+
+    def test_rate_limit_sleeps_between_chunks(self, db):
+        document = _publish(db)
+        campaign_id = campaign_crud.get_latest_campaign_for_document(db, document.id).id
+        runner = AckCampaignRunner(chunk_size=10, users_per_second=100, notifier=RecordingNotifier(), sleep=(sleeps := []).append)
+
+        runner.run(db, campaign_id)
+
+        assert len(sleeps) == 3
+        assert all(0 < s <= 0.1 for s in sleeps)
+
+    def test_notification_failures_are_counted(self, db):
+        document = _publish(db)
+        campaign_id = campaign_crud.get_latest_campaign_for_document(db, document.id).id
+        campaign = _runner(RecordingNotifier(fail=True))[0].run(db, campaign_id)
+        assert campaign.notify_failures == 24
+        assert db.query(PendingLegalAcknowledgment).filter(PendingLegalAcknowledgment.notified_at.isnot(None)).count() == 0
+
+    def test_stops_when_superseded(self, db):
+        document = _publish(db)
+        campaign_id = campaign_crud.get_latest_campaign_for_document(db, document.id).id
+        document.is_current = False
+        db.commit()
+        campaign = _runner(RecordingNotifier())[0].run(db, campaign_id)
+        assert campaign.status == AckCampaignStatus.SUPERSEDED
+
+    def test_acknowledging_closes_pending_marker(self, db):
+        document = _publish(db)
+        campaign_id = campaign_crud.get_latest_campaign_for_document(db, document.id).id
+        _runner(RecordingNotifier())[0].run(db, campaign_id)
+
+        acknowledgment_crud.create_user_acknowledgment(db, user_id=2, document_id=document.id)
+
+        assert campaign_crud.count_outstanding(db, document.id) == 23
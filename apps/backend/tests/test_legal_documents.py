@@ -0,0 +1,377 @@
+"""
+Tests for pre-rendered public legal documents and the fallback markdown renderer.
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import legal
+from app.core.database import get_db
+from app.crud import legal_document as legal_document_crud
+from app.models.legal_document import DocumentType, LegalDocument
+from app.models.user import Role, User
+from app.schemas.legal_document import LegalDocumentCreate, LegalDocumentUpdate
+from app.utils.markdown_renderer import markdown_to_html
+from tests.helpers import memory_session, seed_users
+
+
+class TestFallbackRenderer:
+    """Single-pass fallback renderer"""
+
+    def test_renders_blocks_and_inline_markup(self):
+        html = markdown_to_html(
+            "# Terms\nRead **all _of_ [this](https://example.com)** and `a*b*`\n\n- one\n- two\n1. first\nEnd"
+        )
+        assert html.split("\n") == [
+            "<h1>Terms</h1>",
+            '<p>Read <strong>all <em>of</em> <a href="https://example.com">this</a></strong> and <code>a*b*</code></p>',
+            "<ul>",
+            "<li>one</li>",
+            "<li>two</li>",
+            "</ul>",
+            "<ol>",
+            "<li>first</li>",
+            "</ol>",
+            "<p>End</p>",
+        ]
+
+    @pytest.mark.parametrize("markdown, expected", [
+        ("**bold *it* more**", "<p><strong>bold <em>it</em> more</strong></p>"),
+        ("__bold _it_ more__", "<p><strong>bold <em>it</em> more</strong></p>"),
+        ("**a *b* c *d***", "<p><strong>a <em>b</em> c <em>d</em></strong></p>"),
+    ])
+    def test_emphasis_nested_in_strong(self, markdown, expected):
+        assert markdown_to_html(markdown) == expected
+
+    @pytest.mark.parametrize("chunk", ["[a", "[a](b", "*a", "**a", "__a", "`a", "[a](", "**a*b*", "__a_b_"])
+    def test_unbalanced_markup_is_linear(self, chunk):
+        started = time.perf_counter()
+        markdown_to_html(chunk * 20000)
+        assert time.perf_counter() - started < 1.0
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session, ("admin", Role.ADMIN))
+        legal.public_document_cache.invalidate()
+        yield session
+
+
+@pytest.fixture
+def client(db):
+    api = FastAPI()
+    api.include_router(legal.router, prefix="/legal")
+    api.dependency_overrides[get_db] = lambda: db
+    return TestClient(api)
+
+
+def _publish(db, content="# Terms\nBe **nice**."):
+    document = legal_document_crud.create_legal_document(
+        db,
+        LegalDocumentCreate(title="Terms of Service", slug="terms", document_type=DocumentType.TOS, content_markdown=content),
+    )
+    return legal_document_crud.publish_legal_document(db, document, published_by_id=1)
+
+
+class TestPublicLegalDocuments:
+    """HTML rendered at write time, served from a hash-keyed cache"""
+
+    def test_publish_stores_html_and_hash(self, db):
+        document = _publish(db)
+        assert document.content_html == "<h1>Terms</h1>\n\n<p>Be <strong>nice</strong>.</p>\n"
+        assert len(document.content_hash) == 64
+
+    def test_reads_do_not_render(self, client, db, monkeypatch):
+        document = _publish(db)
+        monkeypatch.setattr(legal_document_crud, "markdown_to_html_with_library", lambda *a, **k: pytest.fail("rendered on read"))
+
+        first = client.get("/legal/terms")
+        second = client.get(f"/legal/{DocumentType.TOS.value}/current")
+
+        assert first.status_code == 200
+        assert first.json()["content_html"] == document.content_html
+        assert first.headers["etag"] == f'"{document.content_hash}"'
+        assert second.content == first.content
+        assert legal.public_document_cache.stats()["hits"] == 1
+
+    def test_if_none_match_returns_304(self, client, db):
+        _publish(db)
+        etag = client.get("/legal/terms").headers["etag"]
+        response = client.get("/legal/terms", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_update_changes_etag_and_content(self, client, db):
+        document = _publish(db)
+        old_etag = client.get("/legal/terms").headers["etag"]
+
+        legal_document_crud.update_legal_document(db, document, LegalDocumentUpdate(content_markdown="# Terms\nUpdated."))
+        response = client.get("/legal/terms", headers={"If-None-Match": old_etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != old_etag
+        assert "Updated." in response.json()["content_html"]
+
+    def test_legacy_rows_are_rendered_on_first_read(self, client, db):
+        db.add(LegalDocument(title="Privacy", slug="privacy", document_type=DocumentType.PRIVACY, content_markdown="Private.", is_current=True))
+        db.commit()
+
+        response = client.get("/legal/privacy")
+
+        assert response.json()["content_html"] == "<p>Private.</p>\n"
+        assert db.query(LegalDocument).filter_by(slug="privacy").one().content_hash is not None
+
+    def test_missing_document_is_404(self, client, db):
+        assert client.get("/legal/nope").status_code == 404
+
+
+class TestLegalDocumentLists:
+    """Metadata-only lists; cached public bytes, keyset admin pages"""
+
+    @pytest.fixture
+    def admin_client(self, db):
+        from app.api.v1 import admin_legal
+        from app.api.v1.dependencies import require_super_admin
+
+        api = FastAPI()
+        api.include_router(admin_legal.router, prefix="/admin/legal")
+        api.dependency_overrides[get_db] = lambda: db
+        api.dependency_overrides[require_super_admin] = lambda: db.query(User).one()
+        return TestClient(api)
+
+    def test_public_list_is_cached_and_rekeyed_on_publish(self, client, db):
+        legal.public_list_cache.invalidate()
+        _publish(db)
+        statements = _count_queries(db)
+
+        first = client.get("/legal")
+        second = client.get("/legal")
+        not_modified = client.get("/legal", headers={"If-None-Match": first.headers["etag"]})
+
+        assert [d["slug"] for d in first.json()] == ["terms"]
+        assert second.content == first.content
+        assert not_modified.status_code == 304
+        assert legal.public_list_cache.stats()["hits"] == 1
+        assert not any("content_markdown" in s for s in statements)
+
+        document = legal_document_crud.create_legal_document(
+            db,
+            LegalDocumentCreate(title="Privacy", slug="privacy", document_type=DocumentType.PRIVACY, content_markdown="P"),
+        )
+        legal_document_crud.publish_legal_document(db, document, published_by_id=1)
+        refreshed = client.get("/legal", headers={"If-None-Match": first.headers["etag"]})
+
+        assert refreshed.status_code == 200
+        assert {d["slug"] for d in refreshed.json()} == {"terms", "privacy"}
+
+    def test_admin_list_keyset_pages(self, admin_client, db):
+        from datetime import datetime, timedelta
+
+        base = datetime(2026, 1, 1)
+        for i in range(5):
+            document = legal_document_crud.create_legal_document(
+                db,
+                LegalDocumentCreate(title=f"Draft {i}", slug=f"draft-{i}", document_type=DocumentType.FAQ, content_markdown="x" * 1000),
+            )
+            document.created_at = base + timedelta(days=i // 2)  # Pairs share a timestamp; id breaks the tie
+        db.commit()
+        statements = _count_queries(db)
+
+        seen, cursor, pages = [], None, 0
+        for _ in range(10):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = admin_client.get("/admin/legal", params=params).json()
+            pages += 1
+            seen.extend(item["id"] for item in body["items"])
+            assert all("content_markdown" not in item for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert seen == [5, 4, 3, 2, 1]
+        assert not any("content_markdown" in s for s in statements)
+
+    def test_admin_list_rejects_bad_cursor(self, admin_client):
+        assert admin_client.get("/admin/legal", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.fixture
+def compliance_client(db, monkeypatch):
+    from app.api.v1 import user_acknowledgments
+    from app.api.v1.dependencies import get_current_user
+    from app.core.legal_compliance import compliance_cache
+
+    compliance_cache.invalidate_all()
+    user = db.query(User).one()
+    api = FastAPI()
+    api.include_router(user_acknowledgments.router, prefix="/acknowledgments")
+    api.dependency_overrides[get_db] = lambda: db
+    api.dependency_overrides[get_current_user] = lambda: user
+    return TestClient(api), user
+
+
+def _count_queries(db):
+    from sqlalchemy import event
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestComplianceStatus:
+    """One joined query per user, cached as a bitmap"""
+
+    def _publish_type(self, db, document_type, slug):
+        document = legal_document_crud.create_legal_document(
+            db,
+            LegalDocumentCreate(title=slug.title(), slug=slug, document_type=document_type, content_markdown="Text"),
+        )
+        return legal_document_crud.publish_legal_document(db, document, published_by_id=1)
+
+    def test_status_for_all_required_types(self, compliance_client, db):
+        from app.crud import user_legal_acknowledgment as acknowledgment_crud
+
+        client, user = compliance_client
+        tos = self._publish_type(db, DocumentType.TOS, "terms")
+        self._publish_type(db, DocumentType.PRIVACY, "privacy")
+        acknowledgment_crud.create_user_acknowledgment(db, user.id, tos.id)
+
+        body = client.get("/acknowledgments/status").json()
+
+        by_type = {d["document_type"]: d for d in body["documents"]}
+        assert by_type["terms_of_service"]["has_acknowledged"] is True
+        assert by_type["privacy_policy"]["has_acknowledged"] is False
+        assert by_type["seller_agreement"]["current_document"] is None
+        assert body["pending"] == ["privacy_policy"]
+        assert body["all_acknowledged"] is False
+
+    def test_single_query_then_cached(self, compliance_client, db):
+        client, _ = compliance_client
+        self._publish_type(db, DocumentType.TOS, "terms")
+        statements = _count_queries(db)
+
+        client.get("/acknowledgments/status")
+        client.get("/acknowledgments/status?document_types=terms_of_service")
+        client.get("/acknowledgments/check/terms_of_service")
+
+        legal_queries = [s for s in statements if "legal_documents" in s]
+        assert len(legal_queries) == 1
+        assert "LEFT OUTER JOIN user_legal_acknowledgments" in legal_queries[0]
+
+    def test_acknowledge_and_publish_invalidate(self, compliance_client, db):
+        from app.crud import user_legal_acknowledgment as acknowledgment_crud
+
+        client, user = compliance_client
+        tos = self._publish_type(db, DocumentType.TOS, "terms")
+        params = {"document_types": "terms_of_service"}
+        assert client.get("/acknowledgments/status", params=params).json()["all_acknowledged"] is False
+
+        acknowledgment_crud.create_user_acknowledgment(db, user.id, tos.id)
+        assert client.get("/acknowledgments/status", params=params).json()["all_acknowledged"] is True
+
+        new_version = self._publish_type(db, DocumentType.TOS, "terms-v2")
+        body = client.get("/acknowledgments/status", params=params).json()
+        assert body["pending"] == ["terms_of_service"]
+        assert body["documents"][0]["current_document"]["id"] == new_version.id
+
+    def test_republished_version_needs_new_acknowledgment(self, compliance_client, db):
+        from app.crud import user_legal_acknowledgment as acknowledgment_crud
+
+        client, user = compliance_client
+        tos = self._publish_type(db, DocumentType.TOS, "terms")
+        acknowledgment_crud.create_user_acknowledgment(db, user.id, tos.id)
+        params = {"document_types": "terms_of_service"}
+        assert client.get("/acknowledgments/status", params=params).json()["all_acknowledged"] is True
+
+        legal_document_crud.publish_legal_document(db, tos, published_by_id=user.id, new_version="2.0")
+        assert client.get("/acknowledgments/status", params=params).json()["pending"] == ["terms_of_service"]
+
+
+class TestComplianceCache:
+    """Bounded LRU with invalidations shared across workers"""
+
+    def test_evicts_least_recently_used(self):
+        from app.core.legal_compliance import ComplianceCache
+
+        cache = ComplianceCache(ttl_seconds=60, max_entries=2)
+        cache.put(1, cache.epoch, {}, 1)
+        cache.put(2, cache.epoch, {}, 2)
+        cache.get(1)
+        cache.put(3, cache.epoch, {}, 3)
+
+        assert cache.get(2) is None
+        assert cache.get(1) == ({}, 1) and cache.get(3) == ({}, 3)
+
+    def test_notifications_from_other_workers_invalidate(self):
+        import json
+
+        from app.core.event_broker import notify_bridge
+        from app.core.legal_compliance import COMPLIANCE_EVENT, compliance_cache
+
+        for user_id in (1, 2):
+            compliance_cache.put(user_id, compliance_cache.epoch, {}, 1)
+
+        notify_bridge.dispatch(json.dumps({"type": COMPLIANCE_EVENT, "user_id": 1}))
+        assert compliance_cache.get(1) is None
+        assert compliance_cache.get(2) is not None
+
+        notify_bridge.resync()  # Notifications may have been missed while disconnected
+        assert compliance_cache.get(2) is None
+
+
+class TestBatchAcknowledgment:
+    """Several documents acknowledged with one upsert and one audit insert"""
+
+    def _publish_types(self, db):
+        documents = []
+        for document_type, slug in ((DocumentType.TOS, "terms"), (DocumentType.PRIVACY, "privacy"), (DocumentType.BUYER_AGREEMENT, "buyer")):
+            document = legal_document_crud.create_legal_document(
+                db,
+                LegalDocumentCreate(title=slug.title(), slug=slug, document_type=document_type, content_markdown="Text"),
+            )
+            documents.append(legal_document_crud.publish_legal_document(db, document, published_by_id=1))
+        return documents
+
+    def test_batch_acknowledges_in_one_statement(self, compliance_client, db):
+        from app.models.audit_log import AuditAction, AuditLog
+
+        client, _ = compliance_client
+        documents = self._publish_types(db)
+        ids = [d.id for d in documents]
+        statements = _count_queries(db)
+
+        response = client.post("/acknowledgments/acknowledge/batch", json={"document_ids": ids, "signed_by_name": "admin"})
+
+        assert response.status_code == 200
+        assert [a["document_id"] for a in response.json()] == ids
+        inserts = [s for s in statements if s.startswith("INSERT INTO user_legal_acknowledgments")]
+        assert len(inserts) == 1 and "ON CONFLICT" in inserts[0]
+        assert len([s for s in statements if s.startswith("INSERT INTO audit_logs")]) == 1
+        assert db.query(AuditLog).filter(AuditLog.action == AuditAction.LEGAL_DOCUMENT_ACKNOWLEDGED).count() == 3
+        assert client.get("/acknowledgments/status").json()["pending"] == []
+
+    def test_repeat_updates_existing_rows(self, compliance_client, db):
+        from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
+
+        client, _ = compliance_client
+        ids = [d.id for d in self._publish_types(db)]
+        first = client.post("/acknowledgments/acknowledge/batch", json={"document_ids": ids, "signed_by_name": "Admin"}).json()
+        second = client.post("/acknowledgments/acknowledge/batch", json={"document_ids": ids + ids[:1], "signed_by_name": "Admin"}).json()
+
+        assert db.query(UserLegalAcknowledgment).count() == 3
+        assert len(second) == 3
+        assert second[0]["signature_hash"] != first[0]["signature_hash"]
+
+    def test_unknown_document_or_wrong_name_rejected(self, compliance_client, db):
+        client, _ = compliance_client
+        ids = [d.id for d in self._publish_types(db)]
+
+        missing = client.post("/acknowledgments/acknowledge/batch", json={"document_ids": ids + [999], "signed_by_name": "Admin"})
+        wrong_name = client.post("/acknowledgments/acknowledge/batch", json={"document_ids": ids, "signed_by_name": "Someone Else"})
+
+        assert missing.status_code == 404
+        assert wrong_name.status_code == 400
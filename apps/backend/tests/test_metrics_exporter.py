@@ -0,0 +1,129 @@
+"""
+Tests for the Prometheus exposition (/metrics), the background refresher and
+multiprocess aggregation.
+"""
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api.v1 import health
+from app.core.database import get_db
+from app.core.metrics import CACHE_REQUESTS
+from app.core.metrics_exporter import MetricsRefresher
+from app.middleware.metrics import PrometheusMiddleware
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from tests.helpers import memory_session, seed_users
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        buyer, _ = seed_users(session, commit=False)
+        buyer.is_email_verified = buyer.is_phone_verified = True
+        for state in (ListingState.RESERVED, ListingState.SOLD, ListingState.APPROVED):
+            session.add(Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=state))
+        session.flush()
+        for listing_id, state in ((1, TransactionState.FUNDS_HELD), (2, TransactionState.COMPLETED)):
+            session.add(Transaction(listing_id=listing_id, buyer_id=1, seller_id=2, amount_usd=10000, state=state))
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    refresher = MetricsRefresher()
+    monkeypatch.setattr(health, "metrics_refresher", refresher)
+    api = FastAPI()
+    api.include_router(health.router)
+    api.add_middleware(PrometheusMiddleware)
+    api.dependency_overrides[get_db] = lambda: db
+    return TestClient(api), refresher
+
+
+class TestBusinessGauges:
+    """One GROUP BY per table, off the scrape path"""
+
+    def test_snapshot_uses_one_query_per_table(self, db):
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        snapshot = MetricsRefresher().refresh_business(db)
+
+        assert len(statements) == 3
+        assert all("GROUP BY" in s for s in statements)
+        assert snapshot["transactions"]["funds_held"] == 1
+        assert snapshot["transactions"]["refunded"] == 0
+        assert snapshot["listings"]["sold"] == 1
+        assert snapshot["users"]["buyer:true"] == 1 and snapshot["users"]["seller:false"] == 1
+
+    def test_scrape_does_not_query(self, client, db):
+        api, refresher = client
+        refresher.refresh_business(db)
+        statements = []
+        event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        response = api.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'escrow_transactions{state="completed"} 1.0' in response.text
+        assert 'escrow_users{role="buyer",verified="true"} 1.0' in response.text
+        assert statements == []
+
+
+class TestExposition:
+    """Route histograms, cache ratios and the JSON summary"""
+
+    def test_route_latency_and_cache_ratio(self, client):
+        api, _ = client
+        CACHE_REQUESTS.labels(cache="exporter_test", result="hits").inc(3)
+        CACHE_REQUESTS.labels(cache="exporter_test", result="misses").inc(1)
+
+        api.get("/health")
+        api.get("/no-such-path")
+        body = api.get("/metrics").text
+
+        assert 'http_request_duration_seconds_count{method="GET",route="/health"}' in body
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in body
+        assert 'cache_hit_ratio{cache="exporter_test"} 0.75' in body
+
+    def test_json_summary_is_kept(self, client):
+        api, _ = client
+
+        response = api.get("/metrics", headers={"Accept": "application/json"})
+
+        metrics = response.json()["metrics"]
+        assert metrics["transactions"]["total"] == 2
+        assert metrics["listings"]["approved"] == 1
+        assert metrics["users"] == {"total": 2, "verified": 1}
+
+
+class TestMultiprocess:
+    """Samples written by several workers are aggregated on scrape"""
+
+    def test_workers_are_aggregated(self, tmp_path):
+        env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": BACKEND_DIR}
+        worker = textwrap.dedent("""
+            from app.core.metrics import HTTP_REQUESTS, TRANSACTIONS_BY_STATE
+            HTTP_REQUESTS.labels(method="GET", route="/x", status="200").inc(2)
+            TRANSACTIONS_BY_STATE.labels(state="funds_held").set(7)
+        """)
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", worker], env=env, cwd=BACKEND_DIR, check=True)
+
+        scrape = subprocess.run(
+            [sys.executable, "-c", "from app.core.metrics_exporter import render_latest; print(render_latest()[0].decode())"],
+            env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True,
+        ).stdout
+
+        assert 'http_requests_total{method="GET",route="/x",status="200"} 4.0' in scrape
+        assert 'escrow_transactions{state="funds_held"} 7.0' in scrape
@@ -0,0 +1,133 @@
+"""
+Tests for the transactional outbox and its dispatcher.
+Runs against in-memory SQLite (SKIP LOCKED is a no-op there).
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.outbox import OutboxDispatcher
+from app.core.state_machine import transition
+from app.crud.outbox import TRANSACTION_UPDATE_EMAIL, enqueue_message
+from app.models.listing import Listing, ListingState
+from app.models.outbox_message import OutboxMessage, OutboxStatus
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+from tests.helpers import memory_session, seed_users
+
+S = TransactionState
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session)
+        yield session
+
+
+def _transaction(db):
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.APPROVED)
+    db.add(listing)
+    db.flush()
+    transaction = Transaction(listing_id=listing.id, buyer_id=1, seller_id=2, amount_usd=10000, state=S.PURCHASE_INITIATED)
+    db.add(transaction)
+    db.commit()
+    return transaction
+
+
+def _messages(db):
+    return [(m.topic, json.loads(m.payload)) for m in db.query(OutboxMessage).order_by(OutboxMessage.id)]
+
+
+class TestEnqueue:
+    """Messages are written in the producing transaction"""
+
+    def test_transitions_queue_notifications(self, db):
+        transaction = _transaction(db)
+
+        transition(db, transaction, S.FUNDS_HELD)
+        transition(db, transaction, S.REFUNDED)
+
+        assert _messages(db) == [
+            (TRANSACTION_UPDATE_EMAIL, {"transaction_id": transaction.id, "user_id": 2, "state": "funds_held"}),
+            (TRANSACTION_UPDATE_EMAIL, {"transaction_id": transaction.id, "user_id": 1, "state": "refunded"}),
+            (TRANSACTION_UPDATE_EMAIL, {"transaction_id": transaction.id, "user_id": 2, "state": "refunded"}),
+        ]
+
+    def test_rollback_discards_messages(self, db):
+        transaction = _transaction(db)
+
+        transition(db, transaction, S.FUNDS_HELD, commit=False)
+        enqueue_message(db, "test.topic", {"n": 1})
+        db.rollback()
+
+        assert _messages(db) == []
+
+
+class TestDispatcher:
+    """Claim, dispatch, retry and give up"""
+
+    def test_dispatches_and_marks_done(self, db):
+        calls = []
+        dispatcher = OutboxDispatcher(handlers={"test.topic": lambda db, payload: calls.append(payload)})
+        for n in range(3):
+            enqueue_message(db, "test.topic", {"n": n})
+        enqueue_message(db, "test.topic", {"n": 99}, delay_seconds=600)
+        db.commit()
+
+        run = dispatcher.run_once(db)
+
+        assert (run["claimed"], run["sent"]) == (3, 3)
+        assert calls == [{"n": 0}, {"n": 1}, {"n": 2}]
+        statuses = [m.status for m in db.query(OutboxMessage).order_by(OutboxMessage.id)]
+        assert statuses == [OutboxStatus.DONE] * 3 + [OutboxStatus.PENDING]
+        assert dispatcher.run_once(db)["claimed"] == 0
+
+    def test_failures_back_off_then_park(self, db):
+        def failing(db, payload):
+            raise RuntimeError("provider down")
+
+        dispatcher = OutboxDispatcher(max_attempts=2, retry_base_seconds=60, handlers={"test.topic": failing})
+        enqueue_message(db, "test.topic", {})
+        enqueue_message(db, "unknown.topic", {})
+        db.commit()
+        now = datetime.now(timezone.utc)
+
+        first = dispatcher.run_once(db, now)
+        early = dispatcher.run_once(db, now + timedelta(seconds=30))
+        second = dispatcher.run_once(db, now + timedelta(seconds=61))
+
+        assert (first["retried"], first["failed"]) == (1, 1)
+        assert early["claimed"] == 0
+        assert second["failed"] == 1
+        messages = db.query(OutboxMessage).order_by(OutboxMessage.id).all()
+        assert [(m.status, m.attempts) for m in messages] == [(OutboxStatus.FAILED, 2), (OutboxStatus.FAILED, 1)]
+        assert messages[0].last_error == "provider down"
+
+    def test_handler_database_error_does_not_abort_batch(self, db):
+        def broken(db, payload):
+            if payload["n"] == 0:
+                db.add(User(email="buyer@example.com", phone="+254700000009", hashed_password="x", full_name="Dup", role=Role.BUYER))
+                db.flush()
+
+        dispatcher = OutboxDispatcher(handlers={"test.topic": broken})
+        enqueue_message(db, "test.topic", {"n": 0})
+        enqueue_message(db, "test.topic", {"n": 1})
+        db.commit()
+
+        run = dispatcher.run_once(db)
+
+        assert (run["retried"], run["sent"]) == (1, 1)
+        assert dispatcher.stats(db)["messages_by_topic"] == {"test.topic": {"pending": 1, "done": 1}}
+
+    def test_transaction_update_email(self, db, monkeypatch):
+        sent = []
+        monkeypatch.setattr("app.core.outbox.send_email", lambda to, subject, html, text: sent.append((to, subject)) or True)
+        transaction = _transaction(db)
+        transition(db, transaction, S.FUNDS_HELD)
+
+        run = OutboxDispatcher().run_once(db)
+
+        assert run["sent"] == 1
+        assert sent == [("seller@example.com", "Payment received - ESCROW")]
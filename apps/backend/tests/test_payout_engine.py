@@ -0,0 +1,282 @@
+"""
+Tests for the batched seller payout engine.
+Runs against in-memory SQLite with a fake Paystack service.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.models.listing import Listing, ListingState
+from app.models.payout import PayoutTransfer, PayoutTransferStatus, SellerPayoutAccount
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role
+from app.payment.services.payout_engine import PayoutEngine, apply_transfer_event
+from tests.helpers import memory_session, seed_users
+
+
+class FakePaystack:
+    """Records calls; bulk transfers accept everything unless told otherwise"""
+
+    def __init__(self):
+        self.recipient_calls = []
+        self.bulk_calls = []
+        self.reject_references = set()
+        self.omit_references = set()  # Accepted but left out of the bulk response
+        self.raise_on_bulk = False
+        self.during_bulk = None
+        self.transfers = {}
+
+    def create_transfer_recipient(self, type, name, account_number, bank_code, email):
+        self.recipient_calls.append(account_number)
+        return {"status": True, "data": {"recipient_code": f"RCP_{account_number}"}}
+
+    def initiate_bulk_transfer(self, transfers, source="balance", currency="KES"):
+        self.bulk_calls.append(transfers)
+        if self.during_bulk:
+            self.during_bulk()
+        if self.raise_on_bulk:
+            raise ValueError("Failed to initiate bulk transfer: timeout")
+        for t in transfers:
+            self.transfers[t["reference"]] = "failed" if t["reference"] in self.reject_references else "pending"
+        return {
+            "status": True,
+            "message": f"{len(transfers)} transfers queued.",
+            "data": [
+                {"reference": t["reference"], "transfer_code": f"TRF_{t['reference']}", "status": "pending"}
+                for t in transfers
+                if t["reference"] not in self.reject_references | self.omit_references
+            ],
+        }
+
+    def verify_transfer_by_reference(self, reference):
+        if reference not in self.transfers:
+            raise ValueError("Failed to verify transfer: 404 Transfer not found")
+        return {"status": True, "data": {"reference": reference, "transfer_code": f"TRF_{reference}", "status": self.transfers[reference]}}
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        yield session
+
+
+def _seed(db, sellers=3, per_seller=4, with_accounts=True):
+    buyer, *seller_users = seed_users(db, ("buyer", Role.BUYER), *[(f"seller{s}", Role.SELLER) for s in range(sellers)], commit=False)
+    transactions = []
+    for s, seller in enumerate(seller_users):
+        if with_accounts:
+            db.add(SellerPayoutAccount(
+                seller_id=seller.id, account_name=f"Seller {s}", account_number=f"07000000{s:02d}", bank_code="MPESA"
+            ))
+        for i in range(per_seller):
+            listing = Listing(seller_id=seller.id, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.RESERVED)
+            db.add(listing)
+            db.flush()
+            txn = Transaction(
+                listing_id=listing.id, buyer_id=buyer.id, seller_id=seller.id,
+                amount_usd=10000, amount=10000, state=TransactionState.FUNDS_RELEASE_PENDING,
+                funds_release_pending_at=datetime(2026, 10, 19, 10, 0, len(transactions), tzinfo=timezone.utc),
+            )
+            db.add(txn)
+            transactions.append(txn)
+    db.commit()
+    return transactions
+
+
+class TestPayoutEngine:
+    """Claiming, batching, recipient caching and settlement"""
+
+    def test_batches_transfers_and_caches_recipients(self, db):
+        """12 payouts for 3 sellers go out in chunks, with one recipient per seller"""
+        _seed(db)
+        fake = FakePaystack()
+        engine = PayoutEngine(paystack_service=fake, chunk_size=5)
+
+        result = engine.run_once(db)
+
+        assert result["selected"] == 12
+        assert result["queued"] == 12
+        assert result["bulk_requests"] == 3
+        assert [len(call) for call in fake.bulk_calls] == [5, 5, 2]
+        assert len(fake.recipient_calls) == 3
+        assert {t["amount"] for call in fake.bulk_calls for t in call} == {9000}
+        assert db.query(Transaction).filter(Transaction.state == TransactionState.FUNDS_RELEASED).count() == 12
+
+        # Second run: nothing left to send, recipients come from the cache
+        assert engine.run_once(db)["selected"] == 0
+        assert len(fake.recipient_calls) == 3
+
+    def test_transfer_success_webhook_then_bulk_completion(self, db):
+        transactions = _seed(db, sellers=1, per_seller=2)
+        engine = PayoutEngine(paystack_service=FakePaystack())
+        engine.run_once(db)
+
+        transfer = apply_transfer_event(db, "transfer.success", {"reference": f"PAYOUT_{transactions[0].id}"})
+        assert transfer.status == PayoutTransferStatus.SUCCESS
+
+        result = engine.run_once(db)
+        assert result["completed"] == 1
+        db.expire_all()
+        assert transactions[0].state == TransactionState.COMPLETED
+        assert transactions[0].listing.state == ListingState.SOLD
+        assert transactions[1].state == TransactionState.FUNDS_RELEASED
+
+    def test_reversal_after_success_is_recorded(self, db, caplog):
+        """transfer.reversed after transfer.success is kept; a repeated success is not"""
+        transactions = _seed(db, sellers=1, per_seller=1)
+        engine = PayoutEngine(paystack_service=FakePaystack())
+        engine.run_once(db)
+        reference = f"PAYOUT_{transactions[0].id}"
+        apply_transfer_event(db, "transfer.success", {"reference": reference})
+        engine.run_once(db)
+
+        with caplog.at_level("ERROR"):
+            transfer = apply_transfer_event(db, "transfer.reversed", {"reference": reference, "reason": "Account closed"})
+
+        assert transfer.status == PayoutTransferStatus.REVERSED
+        assert transfer.failure_reason == "Account closed"
+        assert "reversed after success" in caplog.text
+        assert transactions[0].state == TransactionState.COMPLETED
+
+        transfer = apply_transfer_event(db, "transfer.success", {"reference": reference})
+        assert transfer.status == PayoutTransferStatus.REVERSED
+
+    def test_duplicate_success_is_ignored(self, db):
+        transactions = _seed(db, sellers=1, per_seller=1)
+        PayoutEngine(paystack_service=FakePaystack()).run_once(db)
+        reference = f"PAYOUT_{transactions[0].id}"
+        apply_transfer_event(db, "transfer.success", {"reference": reference})
+
+        transfer = apply_transfer_event(db, "transfer.failed", {"reference": reference, "reason": "late"})
+
+        assert transfer.status == PayoutTransferStatus.SUCCESS
+        assert transfer.failure_reason is None
+
+    def test_failed_transfers_are_retried_with_new_reference(self, db):
+        transactions = _seed(db, sellers=1, per_seller=2)
+        fake = FakePaystack()
+        fake.reject_references = {f"PAYOUT_{transactions[0].id}"}
+        engine = PayoutEngine(paystack_service=fake, max_attempts=2)
+
+        first = engine.run_once(db)
+        assert first["queued"] == 1 and first["failed"] == 1
+
+        fake.reject_references = set()
+        second = engine.run_once(db)
+        assert second["queued"] == 1
+        assert fake.bulk_calls[-1][0]["reference"] == f"PAYOUT_{transactions[0].id}_R1"
+
+    def test_unknown_outcome_keeps_reference(self, db):
+        """A failed request is resent with the same references so Paystack can dedupe"""
+        transactions = _seed(db, sellers=1, per_seller=1)
+        fake = FakePaystack()
+        fake.raise_on_bulk = True
+        engine = PayoutEngine(paystack_service=fake)
+
+        assert engine.run_once(db)["failed"] == 1
+        transfer = db.query(PayoutTransfer).one()
+        assert transfer.status == PayoutTransferStatus.QUEUED
+
+        fake.raise_on_bulk = False
+        assert engine.run_once(db)["queued"] == 1
+        assert fake.bulk_calls[-1][0]["reference"] == f"PAYOUT_{transactions[0].id}"
+
+    def test_sellers_without_payout_account_are_skipped(self, db):
+        _seed(db, sellers=2, per_seller=1, with_accounts=False)
+        engine = PayoutEngine(paystack_service=FakePaystack())
+
+        result = engine.run_once(db)
+
+        assert result["missing_recipient"] == 2
+        assert result["queued"] == 0
+        stats = engine.stats(db)
+        assert stats["totals"]["missing_recipient"] == 2
+        assert stats["transfers_by_status"] == {}
+
+    def test_in_flight_transfers_are_not_sent_twice(self, db):
+        """A run that starts while another is calling Paystack skips its transfers"""
+        _seed(db, sellers=1, per_seller=2)
+        fake = FakePaystack()
+        engine = PayoutEngine(paystack_service=fake)
+        other = sessionmaker(bind=db.get_bind())()
+        concurrent = []
+        fake.during_bulk = lambda: concurrent.append(engine.run_once(other))
+
+        result = engine.run_once(db)
+
+        assert result["queued"] == 2
+        assert concurrent[0]["selected"] == 0
+        assert len(fake.bulk_calls) == 1
+        other.close()
+
+    def test_abandoned_send_is_resent_after_lease(self, db):
+        """A crash mid-send leaves SENDING rows; they are resent with the same reference once the lease expires"""
+        transactions = _seed(db, sellers=1, per_seller=1)
+        fake = FakePaystack()
+
+        def crash():
+            raise RuntimeError("worker killed")
+
+        fake.during_bulk = crash
+        engine = PayoutEngine(paystack_service=fake, send_lease_seconds=300)
+        now = datetime.now(timezone.utc)
+        with pytest.raises(RuntimeError):
+            engine.run_once(db, now)
+        db.rollback()
+        assert db.query(PayoutTransfer).one().status == PayoutTransferStatus.SENDING
+
+        fake.during_bulk = None
+        assert engine.run_once(db, now + timedelta(seconds=60))["selected"] == 0
+        assert engine.run_once(db, now + timedelta(seconds=301))["queued"] == 1
+        assert fake.bulk_calls[-1][0]["reference"] == f"PAYOUT_{transactions[0].id}"
+
+    def test_transfer_missing_from_response_is_looked_up(self, db):
+        transactions = _seed(db, sellers=1, per_seller=2)
+        fake = FakePaystack()
+        fake.omit_references = {f"PAYOUT_{t.id}" for t in transactions}
+        engine = PayoutEngine(paystack_service=fake)
+
+        result = engine.run_once(db)
+
+        assert result["queued"] == 2
+        assert {t.transfer_code for t in db.query(PayoutTransfer)} == {f"TRF_PAYOUT_{t.id}" for t in transactions}
+        assert db.query(Transaction).filter(Transaction.state == TransactionState.FUNDS_RELEASED).count() == 2
+
+    def test_unconfirmed_missing_transfer_keeps_reference(self, db):
+        transactions = _seed(db, sellers=1, per_seller=1)
+        fake = FakePaystack()
+        fake.omit_references = {f"PAYOUT_{transactions[0].id}"}
+        fake.verify_transfer_by_reference = lambda reference: {"status": False, "data": None}
+        engine = PayoutEngine(paystack_service=fake)
+
+        assert engine.run_once(db)["failed"] == 1
+        transfer = db.query(PayoutTransfer).one()
+        assert (transfer.status, transfer.reference) == (PayoutTransferStatus.QUEUED, f"PAYOUT_{transactions[0].id}")
+
+    def test_transactions_without_kes_amount_are_skipped(self, db):
+        transactions = _seed(db, sellers=1, per_seller=2)
+        transactions[0].amount = None
+        db.commit()
+        fake = FakePaystack()
+
+        result = PayoutEngine(paystack_service=fake).run_once(db)
+
+        assert (result["missing_amount"], result["queued"]) == (1, 1)
+        assert [t["reference"] for t in fake.bulk_calls[0]] == [f"PAYOUT_{transactions[1].id}"]
+
+    def test_stored_commission_rate_is_applied_to_transfer(self, db, monkeypatch):
+        transactions = _seed(db, sellers=1, per_seller=2)
+        transactions[0].commission_percent = 12  # Fixed at funds release
+        db.commit()
+        monkeypatch.setattr("app.core.config.settings.PLATFORM_COMMISSION_PERCENT", 8)
+        fake = FakePaystack()
+
+        PayoutEngine(paystack_service=fake).run_once(db)
+
+        assert [t["amount"] for t in fake.bulk_calls[0]] == [8800, 9200]
+        db.expire_all()
+        assert [(t.commission_percent, t.commission_usd, t.payout_amount_usd) for t in transactions] == [
+            (12, 1200, 8800),
+            (8, 800, 9200),
+        ]
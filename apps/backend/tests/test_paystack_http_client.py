@@ -0,0 +1,213 @@
+"""
+Tests for the pooled, retrying Paystack HTTP client.
+
+A local stub server stands in for api.paystack.co so retries, timeouts,
+connection reuse and the circuit breaker can be exercised end to end.
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from app.payment.services.http_client import (
+    AsyncPaystackHTTPClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    PaystackHTTPClient,
+)
+
+
+class StubPaystackServer:
+    """Threaded HTTP stub; each path is answered from a scripted list of (status, delay)"""
+
+    def __init__(self):
+        self.scripts = {}
+        self.calls = []
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                stub.calls.append((self.command, self.path))
+                stub.client_ports.add(self.client_address[1])
+                script = stub.scripts.get(self.path) or [(200, 0)]
+                status_code, delay = script.pop(0) if len(script) > 1 else script[0]
+                if delay:
+                    time.sleep(delay)
+                body = json.dumps({"status": status_code < 400, "data": {"path": self.path}}).encode()
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _respond
+            do_POST = _respond
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def count(self, path):
+        return sum(1 for _, p in self.calls if p == path)
+
+
+@pytest.fixture
+def stub():
+    server = StubPaystackServer()
+    server.thread.start()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def make_client(**overrides):
+    options = dict(
+        connect_timeout=1.0,
+        read_timeout=1.0,
+        pool_size=4,
+        max_retries=2,
+        backoff_base=0.01,
+        backoff_max=0.02,
+        breaker=CircuitBreaker(failure_threshold=3, reset_timeout=0.2),
+    )
+    options.update(overrides)
+    return PaystackHTTPClient(**options)
+
+
+class TestPaystackHTTPClient:
+    """Sync client behaviour against the stub server"""
+
+    def test_reuses_pooled_connection(self, stub):
+        """Sequential calls share one keep-alive connection"""
+        client = make_client()
+        for _ in range(5):
+            assert client.get(f"{stub.base_url}/bank", "/bank").status_code == 200
+        assert len(stub.client_ports) == 1
+        client.close()
+
+    def test_retries_idempotent_get_on_5xx(self, stub):
+        """GET is retried on 503 and returns the eventual success"""
+        stub.scripts["/transaction/verify/ref"] = [(503, 0), (503, 0), (200, 0)]
+        client = make_client()
+        response = client.get(f"{stub.base_url}/transaction/verify/ref", "/transaction/verify")
+        assert response.status_code == 200
+        assert stub.count("/transaction/verify/ref") == 3
+        stats = client.get_stats()["endpoints"]["GET /transaction/verify"]
+        assert stats["retries"] == 2
+        assert stats["errors"] == 2
+
+    def test_does_not_retry_post_by_default(self, stub):
+        """Non-idempotent POST is sent once even on 503"""
+        stub.scripts["/transaction/initialize"] = [(503, 0), (200, 0)]
+        client = make_client()
+        response = client.post(f"{stub.base_url}/transaction/initialize", "/transaction/initialize", json={})
+        assert response.status_code == 503
+        assert stub.count("/transaction/initialize") == 1
+
+    def test_post_retried_when_marked_idempotent(self, stub):
+        """Reference-deduplicated POSTs can opt into retries"""
+        stub.scripts["/transfer"] = [(502, 0), (200, 0)]
+        client = make_client()
+        response = client.post(f"{stub.base_url}/transfer", "/transfer", json={}, idempotent=True)
+        assert response.status_code == 200
+        assert stub.count("/transfer") == 2
+
+    def test_read_timeout_is_enforced(self, stub):
+        """A hung call fails after the per-call timeout instead of blocking"""
+        stub.scripts["/slow"] = [(200, 0.5)]
+        client = make_client(max_retries=0)
+        start = time.monotonic()
+        with pytest.raises(requests.exceptions.Timeout):
+            client.get(f"{stub.base_url}/slow", "/slow", timeout=0.1)
+        assert time.monotonic() - start < 0.45
+
+    def test_circuit_opens_and_recovers(self, stub):
+        """Breaker rejects fast while open and closes after a successful trial call"""
+        stub.scripts["/down"] = [(500, 0), (500, 0), (500, 0), (200, 0)]
+        client = make_client(max_retries=0)
+        for _ in range(3):
+            assert client.get(f"{stub.base_url}/down", "/down").status_code == 500
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        with pytest.raises(CircuitOpenError):
+            client.get(f"{stub.base_url}/down", "/down")
+        assert stub.count("/down") == 3
+
+        time.sleep(0.25)
+        assert client.breaker.state == CircuitBreaker.HALF_OPEN
+        assert client.get(f"{stub.base_url}/down", "/down").status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_unexpected_error_does_not_stick_trial(self, stub, monkeypatch):
+        """A non-transport exception during the trial call still settles the breaker"""
+        client = make_client(max_retries=0)
+        for _ in range(3):
+            client.breaker.record_failure()
+        time.sleep(0.25)
+
+        def explode(*args, **kwargs):
+            raise ValueError("bad header")
+
+        monkeypatch.setattr(client.session, "request", explode)
+        with pytest.raises(ValueError):
+            client.get(f"{stub.base_url}/bank", "/bank")
+        monkeypatch.undo()
+
+        assert client.breaker.state == CircuitBreaker.OPEN
+        time.sleep(0.25)
+        assert client.get(f"{stub.base_url}/bank", "/bank").status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_interrupted_trial_is_released(self):
+        """A trial abandoned without an outcome lets the next caller try"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.release_trial()
+
+        assert breaker.allow_request()
+
+
+class TestAsyncPaystackHTTPClient:
+    """Async client behaviour against the stub server"""
+
+    def test_async_retries_and_pools(self, stub):
+        """httpx variant retries GETs and keeps one connection alive"""
+        stub.scripts["/transaction/verify/abc"] = [(500, 0), (200, 0)]
+
+        async def run():
+            client = AsyncPaystackHTTPClient(
+                connect_timeout=1.0,
+                read_timeout=1.0,
+                pool_size=4,
+                max_retries=2,
+                backoff_base=0.01,
+                backoff_max=0.02,
+                breaker=CircuitBreaker(failure_threshold=5, reset_timeout=1.0),
+            )
+            try:
+                first = await client.get(f"{stub.base_url}/transaction/verify/abc", "/transaction/verify")
+                second = await client.get(f"{stub.base_url}/bank", "/bank")
+                return first.status_code, second.status_code
+            finally:
+                await client.aclose()
+
+        assert asyncio.run(run()) == (200, 200)
+        assert stub.count("/transaction/verify/abc") == 2
+        assert len(stub.client_ports) == 1
@@ -0,0 +1,165 @@
+"""
+Tests for the local Paystack simulator.
+"""
+import threading
+import time
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.payment.services import paystack as paystack_module
+from app.payment.services.paystack import PaystackService
+from app.payment.simulator import SimulatorConfig, create_simulator_app
+
+
+class WebhookSink:
+    """Captures webhook deliveries instead of POSTing them"""
+
+    def __init__(self):
+        self.received = []
+
+    async def __call__(self, url, body, headers):
+        self.received.append((url, body, headers))
+
+
+def make_simulator(**config):
+    sink = WebhookSink()
+    config.setdefault("webhook_url", "http://backend/api/v1/webhooks/paystack")
+    sim_app = create_simulator_app(config=SimulatorConfig(**config), webhook_sender=sink)
+    return sim_app, sink
+
+
+def initialize(client, reference="REF123"):
+    return client.post(
+        "/transaction/initialize",
+        json={"email": "buyer@example.com", "amount": 150000, "reference": reference, "currency": "KES",
+              "metadata": {"transaction_id": 7}},
+    )
+
+
+class TestPaystackSimulatorAPI:
+    """Endpoint behaviour of the simulator"""
+
+    def test_initialize_checkout_verify(self):
+        """Checkout completes the payment and emits a correctly signed charge.success"""
+        sim_app, sink = make_simulator()
+        sim = sim_app.state.simulator
+        with TestClient(sim_app) as client:
+            data = initialize(client).json()["data"]
+            assert data["reference"] == "REF123"
+            assert client.get("/transaction/verify/REF123").json()["data"]["status"] == "abandoned"
+
+            checkout_path = data["authorization_url"].split("testserver", 1)[1]
+            assert client.get(checkout_path).status_code == 200
+            client.portal.call(sim.drain)
+
+            verified = client.get("/transaction/verify/REF123").json()["data"]
+            assert verified["status"] == "success"
+            assert verified["authorization"]["authorization_code"].startswith("AUTH_")
+
+        assert len(sink.received) == 1
+        url, body, headers = sink.received[0]
+        assert url.endswith("/api/v1/webhooks/paystack")
+        assert b'"charge.success"' in body
+        assert PaystackService().verify_webhook_signature(body.decode("utf-8"), headers["X-Paystack-Signature"])
+
+    def test_duplicate_reference_rejected(self):
+        """Re-initializing an existing reference fails like Paystack does"""
+        sim_app, _ = make_simulator()
+        with TestClient(sim_app) as client:
+            assert initialize(client).status_code == 200
+            assert initialize(client).status_code == 400
+
+    def test_transfer_emits_transfer_success(self):
+        """Transfers are deduplicated by reference and emit transfer.success"""
+        sim_app, sink = make_simulator()
+        sim = sim_app.state.simulator
+        with TestClient(sim_app) as client:
+            recipient = client.post("/transferrecipient", json={
+                "type": "mobile_money", "name": "Seller", "account_number": "0712345678",
+                "bank_code": "MPESA", "email": "seller@example.com",
+            }).json()["data"]
+            body = {"source": "balance", "amount": 90000, "recipient": recipient["recipient_code"], "reference": "PAYOUT_1"}
+            first = client.post("/transfer", json=body).json()["data"]
+            second = client.post("/transfer", json=body).json()["data"]
+            assert first["transfer_code"] == second["transfer_code"]
+            assert client.get(f"/transfer/{first['transfer_code']}").json()["data"]["status"] == "success"
+            client.portal.call(sim.drain)
+        assert [b for _, b, _ in sink.received if b'"transfer.success"' in b]
+
+    def test_bulk_transfer_emits_one_webhook_per_transfer(self):
+        sim_app, sink = make_simulator()
+        sim = sim_app.state.simulator
+        with TestClient(sim_app) as client:
+            transfers = [
+                {"amount": 9000, "recipient": "RCP_1", "reference": f"PAYOUT_{i}", "reason": "payout"}
+                for i in range(3)
+            ]
+            data = client.post("/transfer/bulk", json={"source": "balance", "currency": "KES", "transfers": transfers}).json()["data"]
+            assert [item["reference"] for item in data] == ["PAYOUT_0", "PAYOUT_1", "PAYOUT_2"]
+            again = client.post("/transfer/bulk", json={"transfers": transfers[:1]}).json()["data"]
+            assert again[0]["transfer_code"] == data[0]["transfer_code"]
+            client.portal.call(sim.drain)
+        assert len([b for _, b, _ in sink.received if b'"transfer.success"' in b]) == 3
+
+    def test_error_rate_and_duplicates(self):
+        """Injected failures return 500 and duplicate_rate delivers webhooks twice"""
+        sim_app, sink = make_simulator(error_rate=1.0, duplicate_rate=1.0)
+        sim = sim_app.state.simulator
+        with TestClient(sim_app) as client:
+            assert initialize(client).status_code == 500
+            client.post("/_sim/config", json={"error_rate": 0.0})
+            assert initialize(client).status_code == 200
+            client.post("/_sim/charge/REF123")
+            client.portal.call(sim.drain)
+            stats = client.get("/_sim/config").json()["stats"]
+        assert stats["injected_errors"] == 1
+        assert stats["duplicates_sent"] == 1
+        assert len(sink.received) == 2
+        assert sink.received[0][1] == sink.received[1][1]
+
+    def test_latency_is_applied(self):
+        """Configured latency delays API responses"""
+        sim_app, _ = make_simulator(latency_ms=100)
+        with TestClient(sim_app) as client:
+            start = time.monotonic()
+            client.get("/transaction/verify/missing")
+            assert time.monotonic() - start >= 0.1
+
+
+@pytest.fixture
+def simulator_server():
+    sim_app, sink = make_simulator()
+    server = uvicorn.Server(uvicorn.Config(sim_app, host="127.0.0.1", port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}", sink
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+class TestPaystackServiceAgainstSimulator:
+    """PaystackService pointed at the simulator via PAYSTACK_BASE_URL"""
+
+    def test_service_round_trip(self, simulator_server, monkeypatch):
+        base_url, _ = simulator_server
+        monkeypatch.setattr(paystack_module.settings, "PAYSTACK_BASE_URL", base_url)
+        service = PaystackService()
+        assert service.BASE_URL == base_url
+
+        init = service.initialize_payment(email="buyer@example.com", amount=150000, reference="SIMREF1")
+        assert init["data"]["authorization_url"].startswith(base_url)
+        assert service.verify_transaction("SIMREF1")["data"]["status"] == "abandoned"
+
+        recipient = service.create_transfer_recipient(
+            type="mobile_money", name="Seller", account_number="0700000000", bank_code="MPESA",
+            email="seller@example.com",
+        )
+        transfer = service.initiate_transfer(
+            source="balance", amount=1000, recipient=recipient["data"]["recipient_code"], reference="SIMPAYOUT1",
+        )
+        assert service.verify_transfer(transfer["data"]["transfer_code"])["data"]["status"] == "success"
@@ -0,0 +1,90 @@
+"""
+Tests for single-pass contract PDF generation and the canonical contract hash.
+WeasyPrint is replaced with a stub so the tests run without system libraries.
+"""
+import sys
+import types
+
+import pytest
+
+from app.core.pdf_generator import PDFContractGenerator
+
+CONTRACT = {
+    "seller_name": "Jane Seller",
+    "seller_email": "seller@example.com",
+    "buyer_name": "John Buyer",
+    "buyer_email": "buyer@example.com",
+    "listing_title": "Upwork Account",
+    "platform": "Upwork",
+    "category": "Academic",
+    "purchase_price": 1500.0,
+}
+
+
+@pytest.fixture
+def fake_weasyprint(monkeypatch):
+    """Stub weasyprint.HTML; records the HTML of every write_pdf() call"""
+    rendered = []
+
+    class HTML:
+        def __init__(self, string):
+            self.string = string
+
+        def write_pdf(self):
+            rendered.append(self.string)
+            return b"%PDF-1.7 " + str(len(rendered)).encode()
+
+    module = types.ModuleType("weasyprint")
+    module.HTML = HTML
+    monkeypatch.setitem(sys.modules, "weasyprint", module)
+    return rendered
+
+
+class TestContractHash:
+    """Canonical hashing of contract data"""
+
+    def _data(self, **overrides):
+        data = {
+            "contract_date": "October 19, 2026",
+            "purchase_price": "1500.00",
+            "signed_by_name": None,
+            "signed_at": None,
+            "template_version": PDFContractGenerator.TEMPLATE_VERSION,
+            **{k: v for k, v in CONTRACT.items() if k != "purchase_price"},
+        }
+        data.update(overrides)
+        return data
+
+    def test_hash_ignores_volatile_and_unknown_fields(self):
+        base = PDFContractGenerator.compute_contract_hash(self._data())
+        assert base == PDFContractGenerator.compute_contract_hash(
+            self._data(generated_at="2030-01-01T00:00:00", contract_hash="x")
+        )
+
+    def test_hash_is_whitespace_and_unicode_normalized(self):
+        composed = PDFContractGenerator.compute_contract_hash(self._data(buyer_name="Jos\u00e9 Buyer"))
+        decomposed = PDFContractGenerator.compute_contract_hash(self._data(buyer_name=" Jose\u0301 Buyer "))
+        assert composed == decomposed
+
+    def test_hash_changes_with_contract_terms(self):
+        base = PDFContractGenerator.compute_contract_hash(self._data())
+        assert base != PDFContractGenerator.compute_contract_hash(self._data(purchase_price="1500.01"))
+        assert base != PDFContractGenerator.compute_contract_hash(self._data(template_version="other"))
+
+
+class TestGenerateContract:
+    """One layout per contract with the hash embedded"""
+
+    def test_single_write_pdf_with_embedded_hash(self, fake_weasyprint):
+        pdf_bytes, contract_hash = PDFContractGenerator.generate_contract(**CONTRACT)
+
+        assert pdf_bytes.startswith(b"%PDF")
+        assert len(fake_weasyprint) == 1
+        html = fake_weasyprint[0]
+        assert f"Contract Hash: {contract_hash}" in html
+        assert f'content="escrow-contract, sha256:{contract_hash}' in html
+
+    def test_same_data_same_hash(self, fake_weasyprint):
+        _, first = PDFContractGenerator.generate_contract(**CONTRACT)
+        _, second = PDFContractGenerator.generate_contract(**CONTRACT)
+        assert first == second
@@ -0,0 +1,109 @@
+"""
+Tests for atomic listing reservation in initiate_purchase.
+The stress test runs real threads against a file-backed SQLite database,
+where writers serialize on the database lock much like row locks in PostgreSQL.
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401  (register all tables)
+from app.crud import buyer_purchase_flow
+from app.models.base import Base
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+
+BUYERS = 20
+LISTINGS = 5
+ATTEMPTS = 300
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'purchase.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=32,
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    session.add(User(email="seller@example.com", phone="+254710000000", hashed_password="x", full_name="Seller", role=Role.SELLER))
+    for i in range(BUYERS):
+        session.add(User(email=f"buyer{i}@example.com", phone=f"+2547000000{i:02d}", hashed_password="x", full_name=f"Buyer {i}", role=Role.BUYER))
+    for i in range(LISTINGS):
+        session.add(Listing(seller_id=1, title=f"Account {i}", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.APPROVED))
+    session.commit()
+    session.close()
+    yield factory
+    engine.dispose()
+
+
+def _attempt(factory, listing_id, buyer_id):
+    db = factory()
+    try:
+        buyer_purchase_flow.initiate_purchase(db, listing_id, buyer_id)
+        return "ok"
+    except ValueError as e:
+        return str(e)
+    finally:
+        db.close()
+
+
+class TestConcurrentPurchase:
+    """Parallel buyers never double-sell a listing"""
+
+    def test_parallel_attempts_reserve_each_listing_once(self, session_factory):
+        listing_ids = [i % LISTINGS + 1 for i in range(ATTEMPTS)]
+        buyer_ids = [i % BUYERS + 2 for i in range(ATTEMPTS)]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            outcomes = list(pool.map(lambda args: _attempt(session_factory, *args), zip(listing_ids, buyer_ids)))
+
+        assert Counter(outcomes) == {
+            "ok": LISTINGS,
+            "Listing already has an active transaction": ATTEMPTS - LISTINGS,
+        }
+        db = session_factory()
+        per_listing = Counter(listing_id for (listing_id,) in db.query(Transaction.listing_id))
+        assert per_listing == {listing_id: 1 for listing_id in range(1, LISTINGS + 1)}
+        assert {state for (state,) in db.query(Listing.state)} == {ListingState.RESERVED}
+        db.close()
+
+    def test_refunded_listing_can_be_bought_again(self, session_factory):
+        db = session_factory()
+        first = buyer_purchase_flow.initiate_purchase(db, 1, 2)
+        first.state = TransactionState.REFUNDED
+        db.get(Listing, 1).state = ListingState.APPROVED
+        db.commit()
+
+        second = buyer_purchase_flow.initiate_purchase(db, 1, 3)
+
+        assert second.id != first.id
+        assert db.get(Listing, 1).state == ListingState.RESERVED
+        db.close()
+
+    def test_partial_unique_index_rejects_second_open_transaction(self, session_factory):
+        db = session_factory()
+        buyer_purchase_flow.initiate_purchase(db, 1, 2)
+        db.add(Transaction(listing_id=1, buyer_id=3, seller_id=1, amount_usd=10000, state=TransactionState.PURCHASE_INITIATED))
+        with pytest.raises(IntegrityError):
+            db.commit()
+        db.rollback()
+        db.close()
+
+    def test_unavailable_listings_explain_why(self, session_factory):
+        db = session_factory()
+        db.get(Listing, 2).state = ListingState.SOLD
+        db.commit()
+
+        with pytest.raises(ValueError, match="Listing not found"):
+            buyer_purchase_flow.initiate_purchase(db, 99, 2)
+        with pytest.raises(ValueError, match="Only approved listings"):
+            buyer_purchase_flow.initiate_purchase(db, 2, 2)
+        assert db.query(Transaction).count() == 0
+        db.close()
@@ -0,0 +1,85 @@
+"""
+Tests for the /live and /ready probes and the readiness monitor.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.api.v1 import health
+from app.core.readiness import ReadinessMonitor
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/ready.db", poolclass=QueuePool, pool_size=2, max_overflow=0)
+    yield engine
+    engine.dispose()
+
+
+class TestReadinessMonitor:
+    """Thresholds flip readiness; probes read the cache"""
+
+    def test_pool_saturation(self, engine):
+        monitor = ReadinessMonitor(pool_max_utilization=0.9)
+        first, second = engine.connect(), engine.connect()
+
+        saturated = monitor.evaluate(engine=engine)
+        first.close()
+        second.close()
+        recovered = monitor.evaluate(engine=engine)
+
+        assert saturated["status"] == "not_ready"
+        assert saturated["checks"]["db_pool"] == {"ok": False, "checked_out": 2, "capacity": 2, "utilization": 1.0}
+        assert recovered["status"] == "ready"
+
+    def test_blocked_loop_is_detected(self):
+        monitor = ReadinessMonitor(interval=0.05, max_loop_lag=0.1)
+
+        async def scenario():
+            await monitor.start()
+            await asyncio.sleep(0.1)
+            time.sleep(0.3)  # a handler doing blocking work on the loop
+            await asyncio.sleep(0.01)
+            await monitor.stop()
+
+        asyncio.run(scenario())
+
+        assert monitor.state["status"] == "not_ready"
+        assert monitor.state["checks"]["event_loop"]["lag_seconds"] >= 0.2
+
+    def test_probe_reads_cached_state(self, engine):
+        monitor = ReadinessMonitor()
+        monitor.evaluate(engine=engine)
+
+        started = time.perf_counter()
+        for _ in range(1000):
+            ready, body = monitor.readiness()
+        per_call = (time.perf_counter() - started) / 1000
+
+        assert ready and body.startswith(b'{"status": "ready"')
+        assert per_call < 0.0005
+
+
+class TestProbeEndpoints:
+    """GET /live and GET /ready"""
+
+    def test_ready_follows_monitor(self, engine, monkeypatch):
+        monitor = ReadinessMonitor()
+        monkeypatch.setattr(health, "readiness_monitor", monitor)
+        api = FastAPI()
+        api.include_router(health.router)
+        client = TestClient(api)
+
+        monitor.evaluate(engine=engine)
+        assert client.get("/ready").status_code == 200
+
+        monitor.evaluate(loop_lag=10.0, engine=engine)
+        response = client.get("/ready")
+        assert response.status_code == 503
+        assert response.json()["checks"]["event_loop"]["ok"] is False
+        assert client.get("/live").json() == {"status": "alive"}
@@ -0,0 +1,203 @@
+"""
+Tests for payment reconciliation.
+Runs against in-memory SQLite with a fake Paystack service.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.listing import Listing, ListingState
+from app.models.payment_event import PaymentEvent, PaymentEventType
+from app.models.payout import PayoutTransfer, PayoutTransferStatus
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import User
+from app.payment.services import reconciliation
+from app.payment.services.reconciliation import Reconciler, run_reconciliation
+from tests.helpers import memory_session, seed_users
+
+
+class FakePaystack:
+    """verify_transaction answers from a dict and tracks peak concurrency"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def verify_transaction(self, reference):
+        with self._lock:
+            self.calls.append(reference)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.01)
+        with self._lock:
+            self.active -= 1
+        status, amount = self.statuses.get(reference, ("abandoned", None))
+        if status == "error":
+            raise ValueError("Failed to verify transaction: timeout")
+        return {
+            "status": True,
+            "data": {"status": status, "amount": amount, "authorization": {"authorization_code": f"AUTH_{reference}"}},
+        }
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        yield session
+
+
+def _add(db, state, reference=None, amount=10000, events=(), payment_amount=None, amount_usd=77):
+    if not db.query(User).first():
+        seed_users(db, commit=False)
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=amount_usd, state=ListingState.APPROVED)
+    db.add(listing)
+    db.flush()
+    txn = Transaction(
+        listing_id=listing.id, buyer_id=1, seller_id=2, amount_usd=amount_usd, amount=amount,
+        payment_amount=payment_amount, state=state, paystack_reference=reference, created_at=datetime.utcnow() - timedelta(hours=2),
+    )
+    db.add(txn)
+    db.flush()
+    for event_type in events:
+        db.add(PaymentEvent(transaction_id=txn.id, event_type=event_type, payload="{}"))
+    db.commit()
+    return txn
+
+
+class TestReconciler:
+    """Classification, healing and streaming behaviour"""
+
+    def test_classifies_discrepancies(self, db):
+        lost = _add(db, TransactionState.PAYMENT_PENDING, "REF_LOST")
+        _add(db, TransactionState.PAYMENT_PENDING, "REF_ABANDONED")
+        _add(db, TransactionState.PAYMENT_PENDING, "REF_SHORT")
+        _add(db, TransactionState.FUNDS_HELD, "REF_OK", events=[PaymentEventType.CHARGE_SUCCESS])
+        _add(db, TransactionState.FUNDS_HELD, "REF_UNPAID")
+        _add(db, TransactionState.COMPLETED, "REF_DONE")
+        _add(db, TransactionState.COMPLETED, "REF_PAID_OUT", events=[PaymentEventType.TRANSFER_SUCCESS])
+        fake = FakePaystack({
+            "REF_LOST": ("success", 10000),
+            "REF_SHORT": ("success", 500),
+            "REF_UNPAID": ("failed", None),
+        })
+
+        report = Reconciler(paystack_service=fake, grace_minutes=0).run(db).to_dict()
+
+        assert report["scanned"] == 7
+        assert report["by_kind"] == {
+            "missing_charge_webhook": 1,
+            "payment_abandoned": 1,
+            "amount_mismatch": 1,
+            "funds_held_unpaid": 1,
+            "completed_without_transfer": 1,
+        }
+        # Rows resolved by the event join are never sent to Paystack
+        assert sorted(fake.calls) == ["REF_ABANDONED", "REF_LOST", "REF_SHORT", "REF_UNPAID"]
+        assert report["healed"] == 0
+        db.expire_all()
+        assert lost.state == TransactionState.PAYMENT_PENDING
+
+    def test_auto_heal_moves_verified_payment_to_funds_held(self, db):
+        lost = _add(db, TransactionState.PAYMENT_PENDING, "REF_LOST")
+        short = _add(db, TransactionState.PAYMENT_PENDING, "REF_SHORT")
+        fake = FakePaystack({"REF_LOST": ("success", 10000), "REF_SHORT": ("success", 1)})
+
+        report = Reconciler(paystack_service=fake, grace_minutes=0, auto_heal=True).run(db)
+
+        assert report.healed == 1
+        db.expire_all()
+        assert lost.state == TransactionState.FUNDS_HELD
+        assert lost.paystack_authorization_code == "AUTH_REF_LOST"
+        assert lost.listing.state == ListingState.RESERVED
+        assert short.state == TransactionState.PAYMENT_PENDING
+
+    def test_expected_amount_is_the_kes_charge(self, db):
+        """payment_amount (bumped to the 100-cent minimum), then amount; never amount_usd"""
+        legacy = _add(db, TransactionState.PAYMENT_PENDING, "REF_LEGACY", amount=None, payment_amount=10000, amount_usd=10000 // 130)
+        bumped = _add(db, TransactionState.PAYMENT_PENDING, "REF_BUMPED", amount=40, payment_amount=100)
+        unpriced = _add(db, TransactionState.PAYMENT_PENDING, "REF_UNPRICED", amount=None, amount_usd=10000)
+        fake = FakePaystack({
+            "REF_LEGACY": ("success", 10000),
+            "REF_BUMPED": ("success", 100),
+            "REF_UNPRICED": ("success", 10000),
+        })
+
+        report = Reconciler(paystack_service=fake, grace_minutes=0, auto_heal=True).run(db).to_dict()
+
+        assert report["by_kind"] == {"missing_charge_webhook": 2, "amount_mismatch": 1}
+        assert report["healed"] == 2
+        db.expire_all()
+        assert legacy.state == TransactionState.FUNDS_HELD
+        assert bumped.state == TransactionState.FUNDS_HELD
+        assert unpriced.state == TransactionState.PAYMENT_PENDING
+
+    def test_streams_in_chunks_with_bounded_concurrency(self, db):
+        for i in range(25):
+            _add(db, TransactionState.PAYMENT_PENDING, f"REF_{i}")
+        fake = FakePaystack({})
+
+        report = Reconciler(paystack_service=fake, grace_minutes=0, chunk_size=10, concurrency=3).run(db)
+
+        assert report.chunks == 3
+        assert report.scanned == 25
+        assert len(fake.calls) == 25
+        assert fake.peak <= 3
+
+    def test_recent_transactions_are_skipped(self, db):
+        txn = _add(db, TransactionState.PAYMENT_PENDING, "REF_NEW")
+        txn.created_at = datetime.utcnow()
+        db.commit()
+
+        report = Reconciler(paystack_service=FakePaystack({}), grace_minutes=30).run(db)
+
+        assert report.scanned == 0
+
+    def test_released_payouts_age_from_release_and_skip_in_flight_transfers(self, db):
+        just_released = _add(db, TransactionState.FUNDS_RELEASED, "REF_JUST")
+        just_released.funds_released_at = datetime.utcnow()
+        in_flight = _add(db, TransactionState.FUNDS_RELEASED, "REF_IN_FLIGHT")
+        failed = _add(db, TransactionState.FUNDS_RELEASED, "REF_FAILED")
+        for txn, status in ((in_flight, PayoutTransferStatus.PENDING), (failed, PayoutTransferStatus.FAILED)):
+            txn.funds_released_at = datetime.utcnow() - timedelta(hours=1)
+            db.add(PayoutTransfer(
+                transaction_id=txn.id, seller_id=2, reference=f"PAYOUT_{txn.id}",
+                recipient_code="RCP_1", amount=9000, status=status,
+            ))
+        db.commit()
+
+        report = Reconciler(paystack_service=FakePaystack({}), grace_minutes=30).run(db).to_dict()
+
+        assert report["scanned"] == 2
+        assert report["by_kind"] == {"completed_without_transfer": 1}
+        assert report["samples"][0]["transaction_id"] == failed.id
+
+    def test_transfer_reversed_after_success_is_reported(self, db):
+        reversed_txn = _add(db, TransactionState.COMPLETED, "REF_REVERSED", events=[PaymentEventType.TRANSFER_SUCCESS])
+        db.add(PayoutTransfer(
+            transaction_id=reversed_txn.id, seller_id=2, reference=f"PAYOUT_{reversed_txn.id}",
+            recipient_code="RCP_1", amount=9000, status=PayoutTransferStatus.REVERSED,
+        ))
+        db.commit()
+
+        report = Reconciler(paystack_service=FakePaystack({}), grace_minutes=0).run(db).to_dict()
+
+        assert report["by_kind"] == {"completed_without_transfer": 1}
+        assert report["samples"][0]["transaction_id"] == reversed_txn.id
+
+    def test_verify_errors_are_reported_not_raised(self, db, tmp_path, monkeypatch):
+        _add(db, TransactionState.PAYMENT_PENDING, "REF_ERR")
+        fake = FakePaystack({"REF_ERR": ("error", None)})
+        monkeypatch.setattr(reconciliation.Reconciler, "paystack", property(lambda self: fake))
+        path = tmp_path / "report.jsonl"
+
+        report = run_reconciliation(db, report_path=str(path), grace_minutes=0)
+
+        assert report["by_kind"] == {"verify_failed": 1}
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert lines[0]["reference"] == "REF_ERR"
@@ -0,0 +1,104 @@
+"""
+Tests for the seller_stats summary and the paginated seller dashboard.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.core.state_machine import transition, transition_many
+from app.crud import buyer_purchase_flow, seller_sale_flow
+from app.crud.seller_stats import get_seller_summary, rebuild_seller_stats
+from app.models.listing import Listing, ListingState
+from app.models.transaction import TransactionState
+from app.payment.crud import escrow_completion
+from tests.helpers import memory_session, seed_users
+
+S = TransactionState
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session)
+        yield session
+
+
+@pytest.fixture
+def engine(db):
+    return db.get_bind()
+
+
+def _purchase(db, price=10000):
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=price, state=ListingState.APPROVED)
+    db.add(listing)
+    db.commit()
+    return buyer_purchase_flow.initiate_purchase(db, listing.id, 1)
+
+
+def _rebuilt(db):
+    """Summary recomputed from scratch, for comparison with the incremental one"""
+    incremental = get_seller_summary(db, 2)
+    rebuild_seller_stats(db, [2])
+    db.commit()
+    return incremental, get_seller_summary(db, 2)
+
+
+class TestSellerStats:
+    """Transitions keep the summary equal to a full recount"""
+
+    def test_summary_follows_transitions(self, db):
+        held = _purchase(db, 10000)
+        transition(db, held, S.FUNDS_HELD)
+        sold = _purchase(db, 20000)
+        transition(db, sold, S.FUNDS_HELD)
+        escrow_completion.force_release(db, sold, reason="test", admin_id=1)
+        refunded = _purchase(db, 5000)
+        transition(db, refunded, S.FUNDS_HELD)
+        transition(db, refunded, S.REFUNDED)
+        _purchase(db, 7000)
+
+        summary = get_seller_summary(db, 2)
+        assert summary["pending_earnings_usd"] == 10000
+        assert (summary["active_count"], summary["completed_count"]) == (2, 1)
+        assert summary["counts_by_state"] == {"funds_held": 1, "completed": 1, "refunded": 1, "purchase_initiated": 1}
+
+        incremental, rebuilt = _rebuilt(db)
+        assert incremental == rebuilt
+
+    def test_completed_payouts_count_as_earnings(self, db):
+        transaction = _purchase(db, 10000)
+        transition(db, transaction, S.FUNDS_HELD)
+        transaction.payout_amount_usd = 9000
+        db.commit()
+        transition(db, transaction, S.DISPUTED)
+        transition_many(db, [transaction.id], S.DISPUTED, S.COMPLETED)
+        db.commit()
+
+        incremental, rebuilt = _rebuilt(db)
+        assert incremental["total_earnings_usd"] == 9000
+        assert incremental == rebuilt
+
+
+class TestSellerDashboard:
+    """Dashboard cost does not grow with seller history"""
+
+    def test_pages_are_eager_loaded(self, db, engine):
+        for _ in range(12):
+            transition(db, _purchase(db), S.FUNDS_HELD)
+        db.expire_all()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        try:
+            data = seller_sale_flow.get_seller_dashboard_data(db, 2, skip=0, limit=5)
+            for t in data["active_transactions"]:
+                seller_sale_flow.can_deliver_credentials(db, t)
+                t.temporary_access
+        finally:
+            event.remove(engine, "before_cursor_execute", listener)
+
+        assert len(data["active_transactions"]) == 5
+        assert data["active_count"] == 12
+        assert data["pending_earnings_usd"] == 1200.0
+        # summary + two pages, each with listing, credentials and temporary access loaders
+        assert len(statements) <= 9
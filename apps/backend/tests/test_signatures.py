@@ -0,0 +1,153 @@
+"""
+Tests for acknowledgment / ownership agreement signatures and the bulk verifier.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core import signatures
+from app.core.signatures import (
+    LEGACY,
+    MISMATCH,
+    UNKNOWN_KEY,
+    VALID,
+    Signer,
+    SignatureVerifier,
+    acknowledgment_payload,
+)
+from app.crud import legal_document as legal_document_crud
+from app.crud import user_legal_acknowledgment as acknowledgment_crud
+from app.models.legal_document import DocumentType
+from app.models.listing import Listing
+from app.models.ownership_agreement import OwnershipAgreement
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+from app.models.user_legal_acknowledgment import UserLegalAcknowledgment
+from app.schemas.legal_document import LegalDocumentCreate, LegalDocumentUpdate
+from tests.helpers import memory_session, seed_users
+
+
+class TestCanonicalSignatures:
+    """Canonical payloads and keyed hashing"""
+
+    def test_timestamp_representation_does_not_matter(self):
+        aware = datetime(2026, 10, 19, 12, 0, 0, 123456, tzinfo=timezone.utc)
+        naive = aware.replace(tzinfo=None)
+        nairobi = aware.astimezone(timezone(timedelta(hours=3)))
+        payloads = {acknowledgment_payload(1, 2, "1.0", "abc", "Jane Doe", value) for value in (aware, naive, nairobi)}
+        assert len(payloads) == 1
+        assert b'"signed_at":"2026-10-19T12:00:00.123456Z"' in payloads.pop()
+
+    def test_sign_and_verify(self):
+        signer = Signer.from_secrets("k1", "secret")
+        payload = acknowledgment_payload(1, 2, "1.0", "abc", "Jane Doe", datetime(2026, 1, 1))
+        key_id, digest = signer.sign(payload)
+
+        assert key_id == "k1" and len(digest) == 64
+        assert signer.verify(payload, key_id, digest) == VALID
+        assert signer.verify(payload.replace(b"Jane", b"John"), key_id, digest) == MISMATCH
+        assert Signer.from_secrets("k1", "other").verify(payload, key_id, digest) == MISMATCH
+        assert signer.verify(payload, None, digest) == LEGACY
+
+    def test_retired_keys_still_verify(self):
+        payload = b"payload"
+        _, old_digest = Signer.from_secrets("k1", "old").sign(payload)
+        rotated = Signer.from_secrets("k2", "new", {"k1": "old"})
+
+        assert rotated.verify(payload, "k1", old_digest) == VALID
+        assert rotated.sign(payload)[0] == "k2"
+        assert Signer.from_secrets("k2", "new").verify(payload, "k1", old_digest) == UNKNOWN_KEY
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(signatures, "_signer", Signer.from_secrets("k1", "test-secret"))
+    with memory_session() as session:
+        seed_users(session, *[(f"user{i}", Role.BUYER) for i in range(3)])
+        yield session
+
+
+def _sign_acknowledgments(db):
+    document = legal_document_crud.create_legal_document(
+        db,
+        LegalDocumentCreate(title="Terms", slug="terms", document_type=DocumentType.TOS, content_markdown="Terms"),
+    )
+    document = legal_document_crud.publish_legal_document(db, document, published_by_id=1)
+    for user in db.query(User).all():
+        acknowledgment_crud.create_user_acknowledgment(db, user.id, document.id, signed_by_name=user.full_name)
+    return document
+
+
+def _sign_agreement(db):
+    buyer, seller = db.query(User).limit(2).all()
+    listing = Listing(seller_id=seller.id, title="Account", category="Academic", platform="Upwork", price_usd=10000)
+    db.add(listing)
+    db.flush()
+    transaction = Transaction(listing_id=listing.id, buyer_id=buyer.id, seller_id=seller.id, amount_usd=10000, state=TransactionState.OWNERSHIP_AGREEMENT_PENDING)
+    db.add(transaction)
+    db.flush()
+    agreement = OwnershipAgreement(transaction_id=transaction.id, agreement_content="I accept ownership.")
+    db.add(agreement)
+    db.flush()
+    agreement.sign(buyer.full_name, datetime.now(timezone.utc))
+    db.commit()
+    return agreement
+
+
+class TestBulkVerifier:
+    """Streams signed rows and reports mismatches"""
+
+    def test_freshly_signed_rows_verify(self, db):
+        _sign_acknowledgments(db)
+        _sign_agreement(db)
+
+        report = SignatureVerifier(workers=0, chunk_size=2).run(db).to_dict()
+
+        assert report["checked"] == 4
+        assert report["mismatches"] == 0
+        assert report["by_kind"]["legal_acknowledgment"]["valid"] == 3
+        assert report["by_kind"]["ownership_agreement"]["valid"] == 1
+        assert report["chunks"] == 3
+
+    def test_document_changes_do_not_break_signatures(self, db):
+        """Signatures cover the snapshot on the acknowledgment, not the live document"""
+        document = _sign_acknowledgments(db)
+        signed_hash = document.content_hash
+        legal_document_crud.update_legal_document(db, document, LegalDocumentUpdate(content_markdown="Terms, edited"))
+        legal_document_crud.publish_legal_document(db, document, published_by_id=1, new_version="2.0")
+
+        report = SignatureVerifier(workers=0).run(db, kinds=["legal_acknowledgment"]).to_dict()
+
+        assert document.content_hash != signed_hash
+        assert report["mismatches"] == 0
+        assert {(a.version, a.content_hash) for a in db.query(UserLegalAcknowledgment)} == {("1.0", signed_hash)}
+
+    def test_tampered_and_legacy_rows_are_reported(self, db):
+        _sign_acknowledgments(db)
+        agreement = _sign_agreement(db)
+        rows = db.query(UserLegalAcknowledgment).order_by(UserLegalAcknowledgment.id).all()
+        rows[0].signed_by_name = "Somebody Else"
+        rows[1].signature_key_id = None  # As written before keyed signatures
+        agreement.agreement_content = "Edited after signing."
+        db.commit()
+
+        report = SignatureVerifier(workers=0).run(db).to_dict()
+
+        acknowledgments = report["by_kind"]["legal_acknowledgment"]
+        assert (acknowledgments["valid"], acknowledgments["mismatch"], acknowledgments["legacy"]) == (1, 1, 1)
+        assert report["by_kind"]["ownership_agreement"]["mismatch"] == 1
+        assert {(s["kind"], s["id"]) for s in report["samples"]} == {
+            ("legal_acknowledgment", rows[0].id),
+            ("ownership_agreement", agreement.id),
+        }
+
+    def test_process_pool_matches_inline(self, db):
+        _sign_acknowledgments(db)
+        db.query(UserLegalAcknowledgment).filter(UserLegalAcknowledgment.user_id == 2).update({"signed_by_name": "X"})
+        db.commit()
+
+        report = SignatureVerifier(workers=2, chunk_size=1).run(db).to_dict()
+
+        assert report["checked"] == 3
+        assert report["mismatches"] == 1
+        assert report["rows_per_second"] > 0
@@ -0,0 +1,165 @@
+"""
+Tests for the transaction state machine: table, guarded transitions,
+state history and side-effect hooks.
+"""
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core import state_machine
+from app.core.state_machine import (
+    InvalidTransitionError,
+    StaleTransitionError,
+    TERMINAL_STATES,
+    can_transition,
+    on_transition,
+    transition,
+    transition_many,
+)
+from app.crud import buyer_purchase_flow, transaction as transaction_crud
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from app.models.transaction_state_event import TransactionStateEvent
+from app.models.user import Role
+from app.payment.crud import escrow_completion
+from tests.helpers import memory_session, seed_users
+
+
+@pytest.fixture
+def session_factory():
+    with memory_session() as session:
+        seed_users(session, ("buyer", Role.BUYER), ("seller", Role.SELLER), ("admin", Role.SUPER_ADMIN))
+        yield sessionmaker(bind=session.get_bind())
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+def _purchase(db):
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.APPROVED)
+    db.add(listing)
+    db.commit()
+    return buyer_purchase_flow.initiate_purchase(db, listing.id, 1)
+
+
+def _history(db, transaction_id):
+    return [
+        (event.from_state, event.to_state)
+        for event in db.query(TransactionStateEvent)
+        .filter(TransactionStateEvent.transaction_id == transaction_id)
+        .order_by(TransactionStateEvent.id)
+    ]
+
+
+class TestTransitionTable:
+    """The table is the single source of allowed moves"""
+
+    def test_webhook_can_hold_funds_straight_from_purchase_initiated(self):
+        assert can_transition(TransactionState.PURCHASE_INITIATED, TransactionState.FUNDS_HELD)
+
+    def test_terminal_states_have_no_exits(self):
+        assert TERMINAL_STATES == {TransactionState.COMPLETED, TransactionState.REFUNDED, TransactionState.CANCELLED}
+        assert not can_transition(TransactionState.COMPLETED, TransactionState.REFUNDED)
+
+    def test_model_delegates_to_table(self, db):
+        transaction = _purchase(db)
+        assert transaction.can_transition_to(TransactionState.FUNDS_HELD)
+        assert not transaction.can_transition_to(TransactionState.COMPLETED)
+        assert transaction.get_current_step() == 1
+
+
+class TestTransition:
+    """Guarded transitions record history and run hooks"""
+
+    def test_webhook_path_holds_funds_and_records_history(self, db):
+        transaction = _purchase(db)
+        transaction_crud.update_transaction_state(
+            db, transaction, TransactionState.FUNDS_HELD,
+            paystack_authorization_code="AUTH_1", reason="charge.success"
+        )
+
+        assert transaction.state == TransactionState.FUNDS_HELD
+        assert transaction.funds_held_at is not None
+        assert transaction.paystack_authorization_code == "AUTH_1"
+        assert transaction.listing.state == ListingState.RESERVED
+        assert _history(db, transaction.id) == [
+            (None, TransactionState.PURCHASE_INITIATED),
+            (TransactionState.PURCHASE_INITIATED, TransactionState.FUNDS_HELD),
+        ]
+
+    def test_disallowed_transition_changes_nothing(self, db):
+        transaction = _purchase(db)
+        with pytest.raises(InvalidTransitionError):
+            transition(db, transaction, TransactionState.COMPLETED)
+        assert transaction.state == TransactionState.PURCHASE_INITIATED
+        assert len(_history(db, transaction.id)) == 1
+
+    def test_concurrent_writer_loses_the_guard(self, session_factory, db):
+        transaction = _purchase(db)
+        other = session_factory()
+        stale = other.get(Transaction, transaction.id)
+
+        transition(db, transaction, TransactionState.CANCELLED)
+        with pytest.raises(StaleTransitionError):
+            transition(other, stale, TransactionState.FUNDS_HELD)
+        other.close()
+
+        db.expire_all()
+        assert transaction.state == TransactionState.CANCELLED
+        assert transaction.listing.state == ListingState.APPROVED
+        assert len(_history(db, transaction.id)) == 2
+
+    def test_bulk_transition_skips_rows_that_moved(self, db):
+        held = _purchase(db)
+        transition(db, held, TransactionState.FUNDS_HELD)
+        cancelled = _purchase(db)
+        transition(db, cancelled, TransactionState.CANCELLED)
+
+        moved = transition_many(
+            db, [held.id, cancelled.id], TransactionState.FUNDS_HELD, TransactionState.REFUNDED, reason="bulk"
+        )
+        db.commit()
+        db.expire_all()
+
+        assert moved == [held.id]
+        assert held.state == TransactionState.REFUNDED
+        assert held.listing.state == ListingState.APPROVED
+
+    def test_registered_hooks_receive_events(self, db, monkeypatch):
+        # Registration goes into a copy that monkeypatch restores afterwards
+        monkeypatch.setitem(state_machine._hooks, TransactionState.FUNDS_HELD, list(state_machine._hooks[TransactionState.FUNDS_HELD]))
+        seen = []
+
+        @on_transition(TransactionState.FUNDS_HELD)
+        def _capture(session, events):
+            seen.extend((e.transaction_id, e.from_state, e.to_state) for e in events)
+
+        transaction = _purchase(db)
+        transition(db, transaction, TransactionState.FUNDS_HELD)
+
+        assert seen == [(transaction.id, TransactionState.PURCHASE_INITIATED, TransactionState.FUNDS_HELD)]
+
+
+class TestAdminOverrides:
+    """Admin overrides go through the same guarded path"""
+
+    def test_force_release_is_recorded_with_reason(self, db):
+        transaction = _purchase(db)
+        transition(db, transaction, TransactionState.FUNDS_HELD)
+
+        escrow_completion.force_release(db, transaction, reason="Seller proved delivery", admin_id=3)
+
+        event = db.query(TransactionStateEvent).order_by(TransactionStateEvent.id.desc()).first()
+        assert (event.from_state, event.to_state, event.actor_id) == (TransactionState.FUNDS_HELD, TransactionState.COMPLETED, 3)
+        assert "Seller proved delivery" in event.reason
+        assert transaction.completed_at is not None
+        assert transaction.listing.state == ListingState.SOLD
+
+    def test_force_release_refuses_closed_transactions(self, db):
+        transaction = _purchase(db)
+        transition(db, transaction, TransactionState.CANCELLED)
+        with pytest.raises(InvalidTransitionError):
+            escrow_completion.force_release(db, transaction, reason="late", admin_id=3)
@@ -0,0 +1,179 @@
+"""
+Tests for content-addressed blob storage.
+"""
+import hashlib
+import io
+import os
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import storage
+from app.core.storage import FilesystemStorage, S3Storage, StorageBackend, StorageError, blob_response
+from app.utils.file_validator import FileValidator
+
+DATA = b"%PDF-1.7 contract body " * 1000
+KEY = hashlib.sha256(DATA).hexdigest()
+
+
+@pytest.fixture
+def fs(tmp_path):
+    return FilesystemStorage(str(tmp_path / "blobs"))
+
+
+class TestFilesystemStorage:
+    """Sharding, deduplication and atomic writes"""
+
+    def test_put_bytes_shards_by_hash(self, fs):
+        blob = fs.put_bytes(DATA)
+
+        assert blob.key == KEY
+        assert blob.size == len(DATA)
+        path = fs.path_for(KEY)
+        assert path.endswith(os.path.join(KEY[:2], KEY[2:4], KEY))
+        with open(path, "rb") as handle:
+            assert handle.read() == DATA
+
+    def test_identical_content_is_stored_once(self, fs):
+        first = fs.put_bytes(DATA)
+        second = fs.put_stream(io.BytesIO(DATA))
+
+        assert not first.deduplicated
+        assert second.deduplicated
+        assert second.key == first.key
+        assert os.listdir(fs.tmp_dir) == []
+
+    def test_stream_over_limit_leaves_nothing_behind(self, fs):
+        with pytest.raises(StorageError):
+            fs.put_stream(io.BytesIO(DATA), max_size=100)
+
+        assert os.listdir(fs.tmp_dir) == []
+        assert not fs.exists(KEY)
+
+    def test_backend_interface_is_abstract(self):
+        class PartialStorage(StorageBackend):
+            def put_bytes(self, data):
+                return None
+
+        with pytest.raises(TypeError):
+            PartialStorage()
+
+    def test_rejects_non_hash_keys(self, fs):
+        with pytest.raises(StorageError):
+            fs.path_for("../../etc/passwd")
+
+    def test_open_streams_content(self, fs):
+        fs.put_bytes(DATA)
+        assert b"".join(fs.open(KEY)) == DATA
+
+
+def _client(monkeypatch, backend):
+    monkeypatch.setattr(storage, "_storage", backend)
+    app = FastAPI()
+
+    @app.get("/blob/{key}")
+    def download(key: str):
+        return blob_response(key, filename="contract.pdf", media_type="application/pdf")
+
+    return TestClient(app)
+
+
+class TestDownloads:
+    """Responses built by blob_response"""
+
+    def test_range_request(self, fs, monkeypatch):
+        fs.put_bytes(DATA)
+        client = _client(monkeypatch, fs)
+
+        full = client.get(f"/blob/{KEY}")
+        partial = client.get(f"/blob/{KEY}", headers={"Range": "bytes=0-9"})
+
+        assert full.status_code == 200
+        assert full.content == DATA
+        assert full.headers["etag"] == f'"{KEY}"'
+        assert partial.status_code == 206
+        assert partial.content == DATA[:10]
+
+    def test_missing_blob_is_404(self, fs, monkeypatch):
+        client = _client(monkeypatch, fs)
+        assert client.get(f"/blob/{KEY}").status_code == 404
+
+    def test_accel_redirect(self, tmp_path, monkeypatch):
+        backend = FilesystemStorage(str(tmp_path), accel_redirect_prefix="/_blobs/")
+        backend.put_bytes(DATA)
+        response = _client(monkeypatch, backend).get(f"/blob/{KEY}")
+
+        assert response.headers["x-accel-redirect"] == f"/_blobs/{KEY[:2]}/{KEY[2:4]}/{KEY}"
+        assert response.content == b""
+
+
+def _s3():
+    client = boto3.client(
+        "s3",
+        region_name="us-east-1",
+        endpoint_url="http://localhost:9000",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+    return S3Storage("escrow", client=client), Stubber(client)
+
+
+class TestS3Storage:
+    """Object keys, deduplication via HEAD and presigned downloads"""
+
+    def test_put_uploads_new_content(self):
+        backend, stubber = _s3()
+        object_key = f"blobs/{KEY[:2]}/{KEY[2:4]}/{KEY}"
+        stubber.add_client_error("head_object", "404", http_status_code=404)
+        stubber.add_response("put_object", {}, {
+            "Bucket": "escrow",
+            "Key": object_key,
+            "Body": DATA,
+            "ChecksumSHA256": storage._b64_sha256(KEY),
+        })
+        with stubber:
+            blob = backend.put_bytes(DATA)
+        stubber.assert_no_pending_responses()
+        assert blob.key == KEY and not blob.deduplicated
+
+    def test_existing_content_is_not_uploaded(self):
+        backend, stubber = _s3()
+        stubber.add_response("head_object", {"ContentLength": len(DATA)})
+        with stubber:
+            assert backend.put_bytes(DATA).deduplicated
+
+    def test_download_redirects_to_presigned_url(self, monkeypatch):
+        backend, _ = _s3()
+        response = _client(monkeypatch, backend).get(f"/blob/{KEY}", follow_redirects=False)
+
+        assert response.status_code == 307
+        location = response.headers["location"]
+        assert location.startswith("http://localhost:9000/escrow/blobs/")
+        assert "X-Amz-Signature" in location or "Signature=" in location
+
+
+class TestUploadSniffing:
+    """Uploads are typed by their leading bytes, not the client's Content-Type"""
+
+    @pytest.mark.parametrize("header, mime_type", [
+        (DATA[:16], "application/pdf"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "image/png"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "image/webp"),
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "image/jpg"),
+        (b"PK\x03\x04\x14\x00\x06\x00", None),
+    ])
+    def test_accepts_matching_content(self, header, mime_type):
+        is_valid, error, detected = FileValidator.validate_content(header, mime_type)
+
+        assert is_valid and error is None
+        assert detected == FileValidator.sniff_mime_type(header)
+
+    def test_rejects_spoofed_content_type(self):
+        is_valid, error, detected = FileValidator.validate_content(b"<html><script>", "application/pdf")
+        assert not is_valid and detected is None
+
+        is_valid, error, detected = FileValidator.validate_content(DATA[:16], "image/png")
+        assert not is_valid and detected == "application/pdf"
@@ -0,0 +1,68 @@
+"""
+Tests for the precompiled Terms of Service bundle and endpoints.
+"""
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import terms
+from app.core.terms_of_service import TermsOfService, get_terms_bundle
+from app.schemas.terms import TermsResponse
+
+
+@pytest.fixture
+def client():
+    api = FastAPI()
+    api.include_router(terms.router)
+    return TestClient(api)
+
+
+class TestTermsBundle:
+    """Blobs compiled once per process"""
+
+    def test_bundle_is_built_once(self):
+        assert get_terms_bundle() is get_terms_bundle()
+
+    def test_json_blob_matches_schema(self):
+        blob = get_terms_bundle().get_json()
+        data = TermsResponse(**json.loads(blob.body))
+        assert data.version == TermsOfService.CURRENT_VERSION
+        assert data.content == TermsOfService.FULL_TERMS
+
+    def test_unknown_version_is_missing(self):
+        assert get_terms_bundle().get_json("0.1") is None
+        with pytest.raises(KeyError):
+            TermsOfService.get_terms("0.1")
+
+
+class TestTermsEndpoints:
+    """Blobs served with validators and cache headers"""
+
+    def test_current_terms(self, client):
+        response = client.get("/terms")
+        blob = get_terms_bundle().get_json()
+        assert response.content == blob.body
+        assert response.headers["etag"] == blob.etag
+        assert response.headers["cache-control"] == terms.CURRENT_CACHE
+
+    def test_versioned_terms_are_immutable(self, client):
+        response = client.get("/terms", params={"version": TermsOfService.CURRENT_VERSION})
+        assert response.headers["cache-control"] == terms.IMMUTABLE_CACHE
+
+    def test_conditional_request(self, client):
+        etag = client.get("/terms").headers["etag"]
+        response = client.get("/terms", headers={"If-None-Match": f"W/{etag}"})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_html_and_platform_role(self, client):
+        html = client.get("/terms/html")
+        assert html.headers["content-type"].startswith("text/html")
+        assert b"<h1>ESCROW Platform Terms of Service</h1>" in html.content
+        role = client.get("/terms/platform-role").json()
+        assert role == {"clause": TermsOfService.PLATFORM_ROLE_CLAUSE, "version": TermsOfService.CURRENT_VERSION}
+
+    def test_unknown_version_is_404(self, client):
+        assert client.get("/terms", params={"version": "9.9"}).status_code == 404
@@ -0,0 +1,171 @@
+"""
+Tests for transaction event push (broker, commit hook and the SSE endpoint).
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import transactions
+from app.api.v1.dependencies import get_current_user
+from app.core import event_broker
+from app.core.database import get_db
+from app.core.event_broker import SubscriberLimitReached, TransactionEventBroker
+from app.core.state_machine import transition
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import Role, User
+from tests.helpers import memory_session, seed_users
+
+S = TransactionState
+
+
+@pytest.fixture
+def db():
+    with memory_session() as session:
+        seed_users(session, ("buyer", Role.BUYER), ("seller", Role.SELLER), ("other", Role.BUYER))
+        yield session
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    """Fresh broker in place of the global one"""
+    broker = TransactionEventBroker(max_queue=4, max_subscribers=10_000)
+    monkeypatch.setattr(event_broker, "transaction_event_broker", broker)
+    monkeypatch.setattr(transactions, "transaction_event_broker", broker)
+    return broker
+
+
+def _transaction(db, state=S.PURCHASE_INITIATED):
+    listing = Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.APPROVED)
+    db.add(listing)
+    db.flush()
+    transaction = Transaction(listing_id=listing.id, buyer_id=1, seller_id=2, amount_usd=10000, state=state)
+    db.add(transaction)
+    db.commit()
+    return transaction
+
+
+def _client(db, user_id):
+    api = FastAPI()
+    api.include_router(transactions.router, prefix="/transactions")
+    api.dependency_overrides[get_db] = lambda: db
+    api.dependency_overrides[get_current_user] = lambda: db.get(User, user_id)
+    return TestClient(api)
+
+
+def _events(body):
+    """Parse a text/event-stream body into (event, data) pairs"""
+    parsed = []
+    for block in body.split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if line.startswith(("event: ", "data: ")))
+        if "event" in lines:
+            parsed.append((lines["event"], json.loads(lines["data"])))
+    return parsed
+
+
+class TestBroker:
+    """Fan-out, backpressure and idle subscriber cost"""
+
+    def test_fans_out_per_transaction_and_drops_oldest(self, broker):
+        async def scenario():
+            first, second, other = broker.subscribe(1), broker.subscribe(1), broker.subscribe(2)
+            for n in range(6):
+                broker.publish({"transaction_id": 1, "n": n})
+            await asyncio.sleep(0)
+
+            received = [first.queue.get_nowait()["n"] for _ in range(first.queue.qsize())]
+            return received, second.queue.qsize(), other.queue.qsize(), first.dropped
+
+        received, second_size, other_size, dropped = asyncio.run(scenario())
+
+        assert received == [2, 3, 4, 5]
+        assert (second_size, other_size, dropped) == (4, 0, 2)
+
+    def test_holds_ten_thousand_idle_subscribers(self, broker):
+        async def scenario():
+            subscriptions = [broker.subscribe(n % 500) for n in range(10_000)]
+            waiters = [asyncio.create_task(s.next_event(timeout=5)) for s in subscriptions]
+            await asyncio.sleep(0)
+            with pytest.raises(SubscriberLimitReached):
+                broker.subscribe(1)
+
+            assert broker.publish({"transaction_id": 7, "type": "transition"}) == 20
+            targets = [w for s, w in zip(subscriptions, waiters) if s.transaction_id == 7]
+            await asyncio.wait_for(asyncio.gather(*targets), timeout=1)
+            woken = sum(1 for w in waiters if w.done())
+
+            for w in waiters:
+                w.cancel()
+            await asyncio.gather(*waiters, return_exceptions=True)
+            for s in subscriptions:
+                broker.unsubscribe(s)
+            return woken
+
+        assert asyncio.run(scenario()) == 20
+        assert broker.subscriber_count() == 0
+
+
+class TestCommitHook:
+    """State machine transitions are published only once committed"""
+
+    def test_publishes_after_commit_only(self, db, broker):
+        async def scenario():
+            subscription = broker.subscribe(transaction.id)
+            transition(db, transaction, S.FUNDS_HELD, commit=False)
+            db.rollback()
+            await asyncio.sleep(0)
+            assert subscription.queue.empty()
+
+            transition(db, db.get(Transaction, transaction.id), S.FUNDS_HELD)
+            return await subscription.next_event(timeout=1)
+
+        transaction = _transaction(db)
+        event = asyncio.run(scenario())
+
+        assert (event["type"], event["from_state"], event["to_state"]) == ("transition", "purchase_initiated", "funds_held")
+
+
+class TestEventStream:
+    """GET /transactions/{id}/events"""
+
+    def test_terminal_transaction_gets_snapshot_and_closes(self, db, broker):
+        transaction = _transaction(db, S.COMPLETED)
+
+        response = _client(db, 2).get(f"/transactions/{transaction.id}/events")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.text.startswith("retry: ")
+        assert _events(response.text) == [
+            ("snapshot", {"type": "snapshot", "transaction_id": transaction.id, "state": "completed", "current_step": 7}),
+        ]
+        assert broker.subscriber_count() == 0
+
+    def test_stream_ends_on_terminal_transition(self, broker):
+        async def scenario():
+            subscription = broker.subscribe(5)
+            snapshot = {"type": "snapshot", "transaction_id": 5, "state": "funds_held", "current_step": 2}
+            stream = transactions._event_stream(subscription, snapshot)
+            chunks = [await stream.__anext__()]
+            broker.publish({"type": "transition", "transaction_id": 5, "from_state": "funds_held", "to_state": "refunded"})
+            chunks += [chunk async for chunk in stream]
+            return "".join(chunks)
+
+        body = asyncio.run(scenario())
+
+        assert [name for name, _ in _events(body)] == ["snapshot", "transition"]
+        assert broker.subscriber_count() == 0
+
+    def test_rejects_other_users_and_full_workers(self, db, broker):
+        transaction = _transaction(db)
+
+        assert _client(db, 3).get(f"/transactions/{transaction.id}/events").status_code == 403
+        assert _client(db, 1).get("/transactions/999/events").status_code == 404
+
+        broker.max_subscribers = 0
+        response = _client(db, 1).get(f"/transactions/{transaction.id}/events")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "30"
@@ -0,0 +1,183 @@
+"""
+Tests for request coalescing and terminal-result caching of Paystack verification,
+and for the checks step 2 applies to the verified charge.
+"""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1 import buyer_purchase_flow
+from app.api.v1.dependencies import require_buyer
+from app.core.cache import CoalescingCache
+from app.core.database import get_db
+from app.models.listing import Listing, ListingState
+from app.models.transaction import Transaction, TransactionState
+from app.models.user import User
+from app.payment.services import paystack as paystack_module
+from app.payment.services.paystack import PaystackService
+from tests.helpers import memory_session, seed_users
+
+
+class TestCoalescingCache:
+    """Single-flight + TTL behaviour"""
+
+    def test_concurrent_calls_share_one_load(self):
+        """Many threads asking for one key trigger a single loader call"""
+        cache = CoalescingCache("test", ttl_seconds=60)
+        calls = []
+        barrier = threading.Barrier(10)
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"value": 42}
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(cache.get_or_load("k", loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 10
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["coalesced"] == 9
+        assert stats["calls_saved"] == 9
+
+    def test_only_accepted_results_are_cached(self):
+        """should_cache controls what is stored"""
+        cache = CoalescingCache("test", ttl_seconds=60, should_cache=lambda r: r == "final")
+        values = iter(["pending", "final", "ignored"])
+        assert cache.get_or_load("k", lambda: next(values)) == "pending"
+        assert cache.get_or_load("k", lambda: next(values)) == "final"
+        assert cache.get_or_load("k", lambda: next(values)) == "final"
+        assert cache.stats()["hits"] == 1
+
+    def test_entries_expire(self):
+        cache = CoalescingCache("test", ttl_seconds=0.05)
+        cache.get_or_load("k", lambda: 1)
+        time.sleep(0.06)
+        assert cache.get_or_load("k", lambda: 2) == 2
+
+    def test_errors_propagate_and_are_not_cached(self):
+        cache = CoalescingCache("test", ttl_seconds=60)
+
+        def boom():
+            raise RuntimeError("upstream down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("k", boom)
+        assert cache.get_or_load("k", lambda: "ok") == "ok"
+        assert cache.stats()["errors"] == 1
+
+
+class TestVerifyTransactionCaching:
+    """PaystackService.verify_transaction uses the shared verification cache"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self, monkeypatch):
+        cache = CoalescingCache(
+            "paystack_verify", ttl_seconds=60, should_cache=paystack_module._is_terminal_verification
+        )
+        monkeypatch.setattr(paystack_module, "verification_cache", cache)
+        return cache
+
+    def test_terminal_result_cached_pending_not(self, monkeypatch, fresh_cache):
+        statuses = {"REF_OK": ["success"], "REF_PENDING": ["ongoing", "ongoing"]}
+        calls = []
+
+        def fake_fetch(self, reference):
+            calls.append(reference)
+            return {"status": True, "data": {"reference": reference, "status": statuses[reference].pop(0)}}
+
+        monkeypatch.setattr(PaystackService, "_fetch_verification", fake_fetch)
+        service = PaystackService()
+
+        for _ in range(3):
+            assert service.verify_transaction("REF_OK")["data"]["status"] == "success"
+        for _ in range(2):
+            assert service.verify_transaction("REF_PENDING")["data"]["status"] == "ongoing"
+
+        assert calls.count("REF_OK") == 1
+        assert calls.count("REF_PENDING") == 2
+        assert fresh_cache.stats()["hits"] == 2
+
+    def test_callers_get_independent_copies(self, monkeypatch):
+        monkeypatch.setattr(
+            PaystackService, "_fetch_verification",
+            lambda self, ref: {"status": True, "data": {"status": "success"}},
+        )
+        service = PaystackService()
+        first = service.verify_transaction("REF")
+        first["data"]["status"] = "tampered"
+        assert service.verify_transaction("REF")["data"]["status"] == "success"
+
+
+@pytest.fixture
+def payment_client(monkeypatch):
+    verified = {}
+    monkeypatch.setattr(PaystackService, "__init__", lambda self: None)
+    monkeypatch.setattr(PaystackService, "verify_transaction", lambda self, reference: {"status": True, "data": verified[reference]})
+    with memory_session() as db:
+        seed_users(db, commit=False)
+        db.add(Listing(seller_id=2, title="Account", category="Academic", platform="Upwork", price_usd=10000, state=ListingState.RESERVED))
+        db.flush()
+        db.add(Transaction(
+            listing_id=1, buyer_id=1, seller_id=2, amount_usd=77, amount=10000, payment_amount=10000,
+            state=TransactionState.PURCHASE_INITIATED,
+        ))
+        db.commit()
+
+        api = FastAPI()
+        api.include_router(buyer_purchase_flow.router)
+        api.dependency_overrides[get_db] = lambda: db
+        api.dependency_overrides[require_buyer] = lambda: db.get(User, 1)
+        yield TestClient(api), db, verified
+
+
+class TestPaymentConfirmation:
+    """Step 2 only settles a verified charge for this transaction"""
+
+    def _charge(self, reference, amount=10000, currency="KES", transaction_id=1):
+        return {"status": "success", "reference": reference, "amount": amount, "currency": currency, "metadata": {"transaction_id": transaction_id}}
+
+    @pytest.mark.parametrize("charge, detail", [
+        ({"amount": 100}, "Paid amount 100 does not match expected 10000"),
+        ({"currency": "NGN"}, "Paid currency NGN does not match KES"),
+        ({"transaction_id": 2}, "Payment belongs to another transaction"),
+    ])
+    def test_mismatched_charge_is_rejected(self, payment_client, charge, detail):
+        client, db, verified = payment_client
+        verified["REF"] = self._charge("REF", **charge)
+
+        response = client.post("/purchase/1/payment/confirm", json={"paystack_reference": "REF"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == detail
+
+    def test_reference_without_link_to_transaction_is_rejected(self, payment_client):
+        client, db, verified = payment_client
+        verified["OTHER"] = {**self._charge("OTHER"), "metadata": ""}
+
+        response = client.post("/purchase/1/payment/confirm", json={"paystack_reference": "OTHER"})
+
+        assert response.status_code == 400
+
+    def test_matching_charge_holds_funds(self, payment_client):
+        client, db, verified = payment_client
+        verified["REF"] = self._charge("REF")
+
+        response = client.post("/purchase/1/payment/confirm", json={"paystack_reference": "REF"})
+
+        assert response.status_code == 200
+        assert db.get(Transaction, 1).state == TransactionState.FUNDS_HELD
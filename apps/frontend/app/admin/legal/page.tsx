@@ -1,29 +1,38 @@
 'use client';
 
 import { useState } from 'react';
-import { useLegalDocuments, useDeleteLegalDocument, usePublishLegalDocument } from '@/lib/hooks/useLegalDocuments';
+import { useLegalDocument, useLegalDocuments, useDeleteLegalDocument, usePublishLegalDocument } from '@/lib/hooks/useLegalDocuments';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from '@/components/ui/dialog';
 import { LegalDocumentForm } from '@/components/admin/legal-document-form';
 import { useCreateLegalDocument, useUpdateLegalDocument } from '@/lib/hooks/useLegalDocuments';
 import { Loader2, Plus, FileText, Edit, Trash2, Globe, History, Sparkles } from 'lucide-react';
-import { LegalDocument, DocumentType, DOCUMENT_TYPE_LABELS, DOCUMENT_TYPE_ICONS } from '@/types/legal';
+import { LegalDocumentSummary, DocumentType, DOCUMENT_TYPE_LABELS, DOCUMENT_TYPE_ICONS } from '@/types/legal';
 import { toast } from 'sonner';
 import Link from 'next/link';
 import { format } from 'date-fns';
 
 export default function AdminLegalDocumentsPage() {
   const [isCreateModalOpen, setIsCreateModalOpen] = useState(false);
-  const [editingDocument, setEditingDocument] = useState<LegalDocument | null>(null);
-  const [publishingDocument, setPublishingDocument] = useState<LegalDocument | null>(null);
+  const [editingDocument, setEditingDocument] = useState<LegalDocumentSummary | null>(null);
+  const [publishingDocument, setPublishingDocument] = useState<LegalDocumentSummary | null>(null);
   const [selectedType, setSelectedType] = useState<DocumentType | 'all'>('all');
 
-  const { data: documents, isLoading } = useLegalDocuments({
+  const {
+    data,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useLegalDocuments({
     current_only: false,
     document_type: selectedType !== 'all' ? selectedType : undefined,
   });
 
+  // The list carries metadata only; load the content when editing
+  const { data: editingContent } = useLegalDocument(editingDocument?.id ?? 0);
+
   const createMutation = useCreateLegalDocument();
   const updateMutation = useUpdateLegalDocument();
   const deleteMutation = useDeleteLegalDocument();
@@ -71,7 +80,7 @@ export default function AdminLegalDocumentsPage() {
     }
   };
 
-  const filteredDocuments = documents || [];
+  const filteredDocuments = data?.pages.flatMap((page) => page.items) ?? [];
 
   return (
     <>
@@ -224,6 +233,15 @@ export default function AdminLegalDocumentsPage() {
             ))}
           </div>
         )}
+
+        {hasNextPage && (
+          <div className="flex justify-center mt-8">
+            <Button variant="outline" onClick={() => fetchNextPage()} disabled={isFetchingNextPage}>
+              {isFetchingNextPage && <Loader2 className="h-4 w-4 mr-2 animate-spin" />}
+              Load more
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* Create Modal */}
@@ -248,9 +266,14 @@ export default function AdminLegalDocumentsPage() {
             <DialogTitle>Edit Legal Document</DialogTitle>
             <DialogDescription>Edit legal document</DialogDescription>
           </DialogHeader>
-          {editingDocument && (
+          {editingDocument && !editingContent && (
+            <div className="flex items-center justify-center h-full">
+              <Loader2 className="h-8 w-8 animate-spin text-primary" />
+            </div>
+          )}
+          {editingDocument && editingContent && (
             <LegalDocumentForm
-              initialData={editingDocument}
+              initialData={editingContent}
               onSubmit={handleUpdate}
               onCancel={() => setEditingDocument(null)}
               isLoading={updateMutation.isPending}
@@ -1,36 +1,42 @@
 /**
  * React Query hooks for legal documents
  */
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
+import { useInfiniteQuery, useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { apiClient } from '@/lib/api';
 import { queryKeys } from '@/lib/query-keys';
 import type {
   LegalDocument,
+  LegalDocumentPage,
   LegalDocumentPublic,
   LegalDocumentList,
   LegalDocumentCreate,
   LegalDocumentUpdate,
   LegalDocumentPublishRequest,
   UserAcknowledgmentRequest,
+  UserAcknowledgmentBatchRequest,
   UserAcknowledgmentResponse,
   AcknowledgmentStatus,
+  ComplianceStatus,
   DocumentType,
 } from '@/types/legal';
 
 // Admin endpoints
 export function useLegalDocuments(filters?: { document_type?: DocumentType; current_only?: boolean }) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: queryKeys.legal.documents(filters),
-    queryFn: async () => {
+    queryFn: async ({ pageParam }) => {
       const params = new URLSearchParams();
       if (filters?.document_type) params.append('document_type', filters.document_type);
       if (filters?.current_only) params.append('current_only', 'true');
+      if (pageParam) params.append('cursor', pageParam);
       
-      const response = await apiClient.get<LegalDocument[]>(
+      const response = await apiClient.get<LegalDocumentPage>(
         `/admin/legal?${params.toString()}`
       );
       return response.data;
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
   });
 }
 
@@ -156,6 +162,26 @@ export function useAcknowledgeDocument() {
   });
 }
 
+/**
+ * Acknowledge several documents (e.g. every pending type at signup) in one request.
+ */
+export function useAcknowledgeDocuments() {
+  const queryClient = useQueryClient();
+  
+  return useMutation({
+    mutationFn: async (data: UserAcknowledgmentBatchRequest) => {
+      const response = await apiClient.post<UserAcknowledgmentResponse[]>(
+        '/acknowledgments/acknowledge/batch',
+        data
+      );
+      return response.data;
+    },
+    onSuccess: () => {
+      queryClient.invalidateQueries({ queryKey: queryKeys.legal.acknowledgments });
+    },
+  });
+}
+
 export function useAcknowledgmentStatus(documentType: DocumentType) {
   return useQuery({
     queryKey: queryKeys.legal['acknowledgments.status'](documentType),
@@ -176,3 +202,26 @@ export function useAcknowledgmentStatus(documentType: DocumentType) {
   });
 }
 
+/**
+ * Acknowledgment status of several document types in one request.
+ * Defaults to the server's required document types.
+ */
+export function useComplianceStatus(documentTypes?: DocumentType[]) {
+  return useQuery({
+    queryKey: queryKeys.legal['acknowledgments.compliance'](documentTypes),
+    queryFn: async () => {
+      const params = new URLSearchParams();
+      documentTypes?.forEach((type) => params.append('document_types', type));
+      const response = await apiClient.get<ComplianceStatus>(
+        `/acknowledgments/status?${params.toString()}`
+      );
+      return response.data;
+    },
+    retry: (failureCount, error: any) => {
+      if (error?.response?.status === 401) {
+        return false;
+      }
+      return failureCount < 3;
+    },
+  });
+}
@@ -59,6 +59,8 @@ export const queryKeys = {
     acknowledgments: ['legal', 'acknowledgments'] as const,
     'acknowledgments.status': (type: string) =>
       ['legal', 'acknowledgments', 'status', type] as const,
+    'acknowledgments.compliance': (types?: string[]) =>
+      ['legal', 'acknowledgments', 'compliance', types ?? 'required'] as const,
   },
 } as const;
 
@@ -24,6 +24,14 @@ export interface LegalDocument {
   updated_at: string | null;
 }
 
+// Admin list item (no content; fetch /admin/legal/{id} for it)
+export type LegalDocumentSummary = Omit<LegalDocument, 'content_markdown'>;
+
+export interface LegalDocumentPage {
+  items: LegalDocumentSummary[];
+  next_cursor: string | null;
+}
+
 export interface LegalDocumentPublic {
   id: number;
   title: string;
@@ -69,6 +77,11 @@ export interface UserAcknowledgmentRequest {
   signed_by_name: string;  // Full legal name as digital signature
 }
 
+export interface UserAcknowledgmentBatchRequest {
+  document_ids: number[];
+  signed_by_name: string;  // One signature applied to every document
+}
+
 export interface UserAcknowledgmentResponse {
   user_id: number;
   document_id: number;
@@ -88,6 +101,20 @@ export interface AcknowledgmentStatus {
   } | null;
 }
 
+export interface ComplianceStatus {
+  all_acknowledged: boolean;
+  pending: DocumentType[];
+  documents: Array<{
+    document_type: DocumentType;
+    has_acknowledged: boolean;
+    current_document: {
+      id: number;
+      version: string;
+      title: string;
+    } | null;
+  }>;
+}
+
 export const DOCUMENT_TYPE_LABELS: Record<DocumentType, string> = {
   terms_of_service: 'Terms of Service',
   privacy_policy: 'Privacy Policy',